@@ -0,0 +1,423 @@
+"""Local stand-ins for every external service YBot talks to.
+
+Each fake is a small threaded HTTP server that answers the subset of the real
+API the tools use, with configurable latency and error injection:
+
+- ``composio``     POST /api/v3/tools/execute/<SLUG> (posts, media, tweet lookups)
+- ``telegram``     /bot<token>/getUpdates, /sendMessage, /sendPhoto
+- ``firecrawl``    /v1|v2/scrape, /v1|v2/search, /v2/batch/scrape[/<id>]
+- ``pollinations`` GET /prompt/<prompt> (returns PNG bytes)
+- ``mistral``      POST /v1/chat/completions, driven by a scripted conversation
+- ``coingecko``    GET /api/v3/coins/markets, /api/v3/search/trending
+- ``web``          GET / (a static yieldbot.cc-like page)
+"""
+
+import itertools
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, List, Optional
+
+
+PNG_1PX = bytes.fromhex(
+    "89504e470d0a1a0a0000000d4948445200000001000000010806000000"
+    "1f15c4890000000d49444154789c6360000002000100e221bc330000000049454e44ae426082"
+)
+
+YIELDBOT_HTML = """<!doctype html><html><head><title>Yieldbot</title></head><body>
+<nav><a href="/">Home</a><a href="/vault">Vault</a></nav>
+<section id="hero"><h1>Yieldbot - AI DeFi yield automation</h1>
+<p>$YBOT vault TVL $2,400,000 with 12.8% APY. Fundraiser pool 68% filled, growth continues.</p></section>
+<section id="tokens"><table>
+<tr><td>$YBOT</td><td>$0.042</td><td>+6.1%</td></tr>
+<tr><td>$ETH</td><td>$3,912.55</td><td>+2.4%</td></tr>
+<tr><td>$SOL</td><td>$221.10</td><td>-1.3%</td></tr>
+</table></section>
+<footer>Bullish momentum, rising volume. yieldbot.cc</footer>
+</body></html>"""
+
+MARKDOWN_PAGE = """# Trending Crypto
+
+| Token | Price | 24h |
+|---|---|---|
+| $POWER | $0.91 | +106.2% |
+| $LUNC | $0.00012 | +53.0% |
+| $LINK | $24.10 | +4.1% |
+| $ETH | $3,912.55 | +2.4% |
+| $SOL | $221.10 | -1.3% |
+
+Markets rallied after ETF inflows; DeFi TVL rose 3% week over week.
+""" * 8
+
+
+class FakeService:
+    """One fake HTTP service: a route table plus latency/error injection and counters."""
+
+    def __init__(self, name: str, latency_ms: float = 0.0, jitter_ms: float = 0.0,
+                 error_rate: float = 0.0, error_status: int = 500, seed: int = 0):
+        self.name = name
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.calls = 0
+        self.errors = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._routes: List[tuple] = []
+        self.server: Optional[ThreadingHTTPServer] = None
+
+    def route(self, method: str, pattern: str, handler: Callable) -> None:
+        """Register ``handler(match, body_dict, raw_body) -> (status, body, content_type)``."""
+        self._routes.append((method, re.compile(pattern), handler))
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _dispatch(self, method: str, path: str, raw: bytes):
+        with self._lock:
+            self.calls += 1
+            self.bytes_in += len(raw)
+            delay = self.latency_ms + (self._rng.uniform(0, self.jitter_ms) if self.jitter_ms else 0)
+            fail = self.error_rate and self._rng.random() < self.error_rate
+            if fail:
+                self.errors += 1
+        if delay:
+            time.sleep(delay / 1000)
+        if fail:
+            return self.error_status, json.dumps({"error": f"injected {self.name} failure"}).encode(), "application/json"
+        try:
+            body = json.loads(raw) if raw else {}
+        except ValueError:
+            body = {}
+        path_only = path.split("?", 1)[0]
+        for route_method, pattern, handler in self._routes:
+            match = pattern.fullmatch(path_only)
+            if route_method == method and match:
+                status, payload, content_type = handler(match, body, raw)
+                if not isinstance(payload, (bytes, bytearray)):
+                    payload = json.dumps(payload).encode()
+                return status, payload, content_type
+        return 404, json.dumps({"error": f"{self.name}: no route for {method} {path_only}"}).encode(), "application/json"
+
+    def start(self, host: str = "127.0.0.1", port: int = 0) -> "FakeService":
+        service = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _handle(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                raw = self.rfile.read(length) if length else b""
+                status, payload, content_type = service._dispatch(self.command, self.path, raw)
+                with service._lock:
+                    service.bytes_out += len(payload)
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            do_GET = do_POST = do_DELETE = _handle
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, name=f"fake-{self.name}", daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        if self.server:
+            self.server.shutdown()
+            self.server.server_close()
+
+    def stats(self) -> dict:
+        return {"calls": self.calls, "errors": self.errors, "bytes_in": self.bytes_in, "bytes_out": self.bytes_out}
+
+
+def _json(payload, status: int = 200):
+    return status, payload, "application/json"
+
+
+def make_composio(**opts) -> FakeService:
+    service = FakeService("composio", **opts)
+    ids = itertools.count(1790000000000000001)
+
+    def execute(match, body, raw):
+        slug = match.group(1)
+        args = body.get("arguments") or {}
+        if slug == "TWITTER_CREATION_OF_A_POST":
+            return _json({"successful": True, "data": {"data": {"id": str(next(ids)), "text": args.get("text", "")}}})
+        if slug == "TWITTER_UPLOAD_MEDIA":
+            return _json({"successful": True, "data": {"media_id_string": str(next(ids))}})
+        if slug == "TWITTER_POST_LOOKUP_BY_POST_IDS":
+            tweets = [{"id": i, "text": f"Fake tweet {i}", "public_metrics": {
+                "impression_count": int(i[-4:]) * 10, "like_count": int(i[-3:]), "retweet_count": int(i[-2:]),
+                "reply_count": int(i[-1]), "quote_count": 0, "bookmark_count": 1}}
+                for i in args.get("ids") or [] if i.isdigit()]
+            return _json({"successful": True, "data": {"data": tweets}})
+        if slug == "LINKEDIN_GET_MY_INFO":
+            return _json({"successful": True, "data": {"id": "urn:li:person:fake"}})
+        if slug == "LINKEDIN_CREATE_LINKED_IN_POST":
+            return _json({"successful": True, "data": {"id": f"urn:li:share:{next(ids)}"}})
+        return _json({"successful": True, "data": {}})
+
+    service.route("POST", r"/api/v3/tools/execute/(\w+)", execute)
+    return service
+
+
+def make_telegram(**opts) -> FakeService:
+    service = FakeService("telegram", **opts)
+    ids = itertools.count(1000)
+
+    def get_updates(match, body, raw):
+        updates = [
+            {"update_id": 500 + i, "message": {"message_id": i, "chat": {"id": -100, "title": "yieldbotai"},
+                                              "text": f"gm, what's the APY today? #{i}"}}
+            for i in range(5)
+        ]
+        return _json({"ok": True, "result": updates})
+
+    def send(match, body, raw):
+        return _json({"ok": True, "result": {"message_id": next(ids), "chat": {"id": body.get("chat_id")}}})
+
+    service.route("GET", r"/bot[^/]+/getUpdates", get_updates)
+    service.route("POST", r"/bot[^/]+/getUpdates", get_updates)
+    service.route("POST", r"/bot[^/]+/send(Message|Photo)", send)
+    return service
+
+
+def _document(url: str) -> dict:
+    return {"markdown": MARKDOWN_PAGE, "metadata": {"title": f"Fake page for {url}", "sourceURL": url, "statusCode": 200}}
+
+
+def make_firecrawl(**opts) -> FakeService:
+    service = FakeService("firecrawl", **opts)
+
+    def scrape(match, body, raw):
+        return _json({"success": True, "data": _document(body.get("url", ""))})
+
+    def search(match, body, raw):
+        query = body.get("query", "")
+        results = [
+            {"url": f"https://news.example.com/{i}-{abs(hash(query)) % 1000}", "title": f"{query} #{i}",
+             "description": "DeFi TVL rose 3% as ETH led majors higher."}
+            for i in range(int(body.get("limit") or 5))
+        ]
+        return _json({"success": True, "data": {"web": results}})
+
+    # Batch jobs complete half of their URLs per status poll
+    jobs: Dict[str, dict] = {}
+
+    def start_batch(match, body, raw):
+        job_id = uuid.uuid4().hex
+        jobs[job_id] = {"urls": list(body.get("urls") or []), "polls": 0, "status": "scraping"}
+        return _json({"success": True, "id": job_id, "url": f"{service.url}/v2/batch/scrape/{job_id}"})
+
+    def batch_status(match, body, raw):
+        job = jobs.get(match.group(1))
+        if job is None:
+            return _json({"success": False, "error": "Job not found"}, 404)
+        total = len(job["urls"])
+        job["polls"] += 1
+        completed = min(total, job["polls"] * max(1, (total + 1) // 2))
+        if completed == total and job["status"] == "scraping":
+            job["status"] = "completed"
+        return _json({"success": True, "status": job["status"], "completed": completed, "total": total,
+                      "creditsUsed": completed, "next": None,
+                      "data": [_document(url) for url in job["urls"][:completed]]})
+
+    def cancel_batch(match, body, raw):
+        job = jobs.get(match.group(1))
+        if job is not None:
+            job["status"] = "cancelled"
+        return _json({"success": True, "status": "cancelled"})
+
+    service.route("POST", r"/v[12]/scrape", scrape)
+    service.route("POST", r"/v[12]/search", search)
+    service.route("POST", r"/v2/batch/scrape", start_batch)
+    service.route("GET", r"/v2/batch/scrape/([0-9a-f]+)", batch_status)
+    service.route("DELETE", r"/v2/batch/scrape/([0-9a-f]+)", cancel_batch)
+    return service
+
+
+def make_pollinations(image_bytes: int = 256 * 1024, **opts) -> FakeService:
+    service = FakeService("pollinations", **opts)
+    payload = PNG_1PX + b"\0" * max(0, image_bytes - len(PNG_1PX))
+    service.route("GET", r"/prompt/.*", lambda match, body, raw: (200, payload, "image/png"))
+    return service
+
+
+# symbol, name, price, 24h %, market cap, volume, rank (the tokens of MARKDOWN_PAGE)
+COINS = [
+    ("btc", "Bitcoin", 97250.0, 1.8, 1.93e12, 3.1e10, 1),
+    ("eth", "Ethereum", 3912.55, 2.4, 4.71e11, 1.9e10, 2),
+    ("sol", "Solana", 221.1, -1.3, 1.05e11, 4.2e9, 5),
+    ("link", "Chainlink", 24.1, 4.1, 1.5e10, 9.8e8, 14),
+    ("power", "Power Protocol", 0.91, 106.2, 3.1e8, 2.2e8, 312),
+    ("lunc", "Terra Classic", 0.00012, 53.0, 6.9e8, 1.4e8, 190),
+]
+
+
+def make_coingecko(**opts) -> FakeService:
+    service = FakeService("coingecko", **opts)
+
+    def markets(match, body, raw):
+        # The fake ignores the symbols filter; the provider picks the symbols it asked for
+        return _json([{"id": name.lower().replace(" ", "-"), "symbol": symbol, "name": name, "current_price": price,
+                       "price_change_percentage_24h": change, "market_cap": cap, "total_volume": volume,
+                       "market_cap_rank": rank} for symbol, name, price, change, cap, volume, rank in COINS])
+
+    def trending(match, body, raw):
+        coins = [{"item": {"id": name.lower(), "symbol": symbol.upper(), "name": name, "market_cap_rank": rank,
+                           "data": {"price": price, "price_change_percentage_24h": {"usd": change},
+                                    "market_cap": f"${cap:,.0f}", "total_volume": f"${volume:,.0f}"}}}
+                 for symbol, name, price, change, cap, volume, rank in sorted(COINS, key=lambda c: -c[3])]
+        return _json({"coins": coins, "nfts": [], "categories": []})
+
+    service.route("GET", r"/api/v3/coins/markets", markets)
+    service.route("GET", r"/api/v3/search/trending", trending)
+    return service
+
+
+def make_web(**opts) -> FakeService:
+    service = FakeService("web", **opts)
+    service.route("GET", r"/.*", lambda match, body, raw: (200, YIELDBOT_HTML.encode(), "text/html"))
+    return service
+
+
+class ChatScript:
+    """Scripted assistant turns for the fake chat model.
+
+    Each turn is either a string (final answer) or a list of ``(tool_name, args)``
+    tool calls. The turn served is chosen from the number of assistant messages
+    already in the request, so concurrent conversations stay independent.
+    """
+
+    def __init__(self, turns: List, final: str = "Cycle complete."):
+        self.turns = turns
+        self.final = final
+
+    def turn_for(self, messages: List[dict]):
+        index = sum(1 for m in messages if m.get("role") == "assistant")
+        return self.turns[index] if index < len(self.turns) else self.final
+
+
+def _tool_call_id() -> str:
+    return uuid.uuid4().hex[:9]
+
+
+def make_mistral(script: ChatScript, **opts) -> FakeService:
+    service = FakeService("mistral", **opts)
+
+    def completions(match, body, raw):
+        messages = body.get("messages") or []
+        turn = script.turn_for(messages)
+        if callable(turn):
+            turn = turn(messages, body)
+        message = {"role": "assistant", "content": "", "tool_calls": None}
+        finish_reason = "stop"
+        if isinstance(turn, str):
+            message["content"] = turn
+        else:
+            message["tool_calls"] = [
+                {"id": _tool_call_id(), "type": "function", "function": {"name": name, "arguments": json.dumps(args)}}
+                for name, args in turn
+            ]
+            finish_reason = "tool_calls"
+        usage = {
+            "prompt_tokens": len(raw) // 4,
+            "completion_tokens": max(1, len(json.dumps(message)) // 4),
+        }
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        completion_id = uuid.uuid4().hex
+        model = body.get("model", "fake-mistral")
+        if body.get("stream"):
+            delta = {k: v for k, v in message.items() if v is not None}
+            chunks = [
+                {"id": completion_id, "object": "chat.completion.chunk", "model": model,
+                 "choices": [{"index": 0, "delta": delta, "finish_reason": None}]},
+                {"id": completion_id, "object": "chat.completion.chunk", "model": model,
+                 "choices": [{"index": 0, "delta": {"content": ""}, "finish_reason": finish_reason}], "usage": usage},
+            ]
+            stream = "".join(f"data: {json.dumps(c)}\n\n" for c in chunks) + "data: [DONE]\n\n"
+            return 200, stream.encode(), "text/event-stream"
+        return _json({
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "message": message, "finish_reason": finish_reason}],
+            "usage": usage,
+        })
+
+    service.route("POST", r"/v1/chat/completions", completions)
+    return service
+
+
+class FakeStack:
+    """Starts all fakes and exposes the environment that points YBot at them."""
+
+    def __init__(self, script: ChatScript, latency_ms: Optional[Dict[str, float]] = None,
+                 error_rate: Optional[Dict[str, float]] = None, jitter_ms: float = 0.0, seed: int = 0):
+        latency_ms = latency_ms or {}
+        error_rate = error_rate or {}
+
+        def opts(name):
+            return {
+                "latency_ms": latency_ms.get(name, latency_ms.get("*", 0.0)),
+                "error_rate": error_rate.get(name, error_rate.get("*", 0.0)),
+                "jitter_ms": jitter_ms,
+                "seed": seed,
+            }
+
+        self.services = {
+            "composio": make_composio(**opts("composio")),
+            "telegram": make_telegram(**opts("telegram")),
+            "firecrawl": make_firecrawl(**opts("firecrawl")),
+            "pollinations": make_pollinations(**opts("pollinations")),
+            "mistral": make_mistral(script, **opts("mistral")),
+            "coingecko": make_coingecko(**opts("coingecko")),
+            "web": make_web(**opts("web")),
+        }
+
+    def __enter__(self) -> "FakeStack":
+        for service in self.services.values():
+            service.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        for service in self.services.values():
+            service.stop()
+
+    def env(self) -> Dict[str, str]:
+        s = self.services
+        return {
+            "COMPOSIO_BASE_URL": f"{s['composio'].url}/api/v3",
+            "TELEGRAM_API_BASE": s["telegram"].url,
+            "FIRECRAWL_API_URL": s["firecrawl"].url,
+            "POLLINATIONS_BASE_URL": s["pollinations"].url,
+            "MISTRAL_BASE_URL": f"{s['mistral'].url}/v1",
+            "YIELDBOT_URL": s["web"].url,
+            "MARKET_DATA_PROVIDER": "coingecko",
+            "COINGECKO_API_URL": f"{s['coingecko'].url}/api/v3",
+            "MISTRAL_API_KEY": "fake-mistral-key",
+            "COMPOSIO_API_KEY": "fake-composio-key",
+            "TELEGRAM_BOT_TOKEN": "123456:FAKE",
+            "FIRECRAWL_API_KEY": "fc-fake",
+            "LANGSMITH_TRACING": "false",
+            "LANGCHAIN_TRACING_V2": "false",
+        }
+
+    def stats(self) -> Dict[str, dict]:
+        return {name: service.stats() for name, service in self.services.items()}
@@ -0,0 +1,113 @@
+"""HTML parser benchmark for ``src/html_extract.py``.
+
+Times every available backend (lxml, stream, bs4) on saved pages and reports
+median parse time, peak Python memory (tracemalloc) and whether the output
+matches the BeautifulSoup reference::
+
+    python -m benchmarks.parse                         # built-in sample pages
+    python -m benchmarks.parse --pages saved/ --repeat 20
+    python -m benchmarks.parse --selectors "section#tokens, h1" --max-chars 50000
+    python -m benchmarks.parse --save saved/ https://yieldbot.cc https://www.coindesk.com/markets/
+
+``--save`` fetches pages once into a directory so later runs parse the same
+bytes offline. Without ``--pages`` the benchmark uses the yieldbot.cc fake
+page and a synthetic ~200 KB page with the scripts, styles and navigation
+of a typical crypto site.
+"""
+
+import argparse
+import glob
+import json
+import os
+import re
+import statistics
+import time
+import tracemalloc
+from typing import Dict, List
+
+from benchmarks.fakes import YIELDBOT_HTML
+from src.html_extract import available_backends, decode_html, extract_text
+
+
+def _large_page(rows: int = 1500) -> str:
+    script = "<script>window.__DATA__=" + json.dumps({"k": list(range(2000))}) + "</script>"
+    style = "<style>" + ".c{color:red}" * 2000 + "</style>"
+    nav = "<nav>" + "".join(f'<a href="/p/{i}">Link {i}</a>' for i in range(300)) + "</nav>"
+    table = "".join(f'<tr class="row"><td class="sym">$TK{i}</td><td class="price">${i * 1.37:.2f}</td>'
+                    f'<td>{(i % 21) - 10:+.1f}%</td></tr>' for i in range(rows))
+    return (f"<!doctype html><html><head><title>Trending</title>{style}{script}</head><body>{nav}"
+            f'<main><h1>Trending crypto</h1><section id="tokens"><table>{table}</table></section>'
+            f"<article><p>{'Markets rallied after ETF inflows. ' * 400}</p></article></main>"
+            f"<footer>{'Disclaimer. ' * 200}</footer>{script}</body></html>")
+
+
+def builtin_pages() -> Dict[str, str]:
+    return {"yieldbot_fake": YIELDBOT_HTML, "large_synthetic": _large_page()}
+
+
+def load_pages(directory: str) -> Dict[str, str]:
+    pages = {}
+    for path in sorted(glob.glob(os.path.join(directory, "*.htm*"))):
+        with open(path, "rb") as fh:
+            pages[os.path.basename(path)] = decode_html(fh.read())
+    return pages
+
+
+def save_pages(directory: str, urls: List[str]) -> None:
+    from src import http_client
+
+    os.makedirs(directory, exist_ok=True)
+    for url in urls:
+        response = http_client.get(url, timeout=30)
+        name = re.sub(r"[^A-Za-z0-9]+", "_", url.split("://", 1)[-1]).strip("_")[:80] + ".html"
+        with open(os.path.join(directory, name), "wb") as fh:
+            fh.write(response.content)
+        print(f"[PARSE] Saved {url} -> {name} ({len(response.content)} bytes)")
+
+
+def measure(html: str, backend: str, selectors: str, max_chars, repeat: int) -> dict:
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = extract_text(html, selectors, max_chars, backend)
+        times.append((time.perf_counter() - t0) * 1000)
+    tracemalloc.start()
+    extract_text(html, selectors, max_chars, backend)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"backend": backend, "p50_ms": statistics.median(times), "peak_kb": peak / 1024,
+            "chars": len(result["text"]), "matched": result["matched"], "text": result["text"]}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare HTML extraction backends on saved pages")
+    parser.add_argument("--pages", help="directory of saved .html pages (default: built-in samples)")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--selectors", default="", help='e.g. "section#tokens, .price, h1"')
+    parser.add_argument("--max-chars", type=int, default=None)
+    parser.add_argument("--save", nargs="+", metavar=("DIR", "URL"), help="fetch URLs into DIR and exit")
+    parser.add_argument("--json", help="write raw results to this file")
+    args = parser.parse_args()
+
+    if args.save:
+        save_pages(args.save[0], args.save[1:])
+        return
+
+    pages = load_pages(args.pages) if args.pages else builtin_pages()
+    results = []
+    print(f"\n{'page':<28} {'KB':>6} {'backend':<7} {'p50 ms':>8} {'peak KB':>8} {'chars':>7}  same as bs4")
+    for name, html in pages.items():
+        rows = [measure(html, backend, args.selectors, args.max_chars, args.repeat) for backend in available_backends()]
+        reference = next((r["text"] for r in rows if r["backend"] == "bs4"), None)
+        for row in rows:
+            same = "-" if reference is None else ("yes" if row["text"] == reference else "no")
+            print(f"{name[:28]:<28} {len(html) / 1024:>6.0f} {row['backend']:<7} {row['p50_ms']:>8.2f} "
+                  f"{row['peak_kb']:>8.0f} {row['chars']:>7}  {same}")
+            results.append({"page": name, **{k: v for k, v in row.items() if k != "text"}, "same_as_bs4": same})
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump(results, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,280 @@
+"""Offline end-to-end benchmarks for YBot.
+
+Runs the real agent entry points against the local fakes in
+``benchmarks/fakes.py`` with a scripted chat model, so a full cycle can be
+timed on a laptop with no network and no API keys::
+
+    python -m benchmarks.run                          # all scenarios, 3 repeats
+    python -m benchmarks.run --scenario graph --repeat 5
+    python -m benchmarks.run --latency-ms "*=50,mistral=400" --error-rate telegram=0.2
+    python -m benchmarks.run --json bench.json
+    python -m benchmarks.run --scenario autonomous --cassette cycle.jsonl --replay-mode timing
+
+Each repeat runs in a fresh subprocess (own data dir, own fakes) and reports
+wall time, LLM turns, HTTP calls per service and peak RSS. With ``--cassette``
+the scenario replays a cycle recorded with ``HTTP_CASSETTE_MODE=record``
+(see ``src/cassette.py``) instead of talking to the fakes.
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+from urllib.parse import urlparse
+
+from benchmarks.fakes import ChatScript, FakeStack
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _last_tool_result(messages: List[dict], name: str) -> dict:
+    for message in reversed(messages):
+        if message.get("role") == "tool" and message.get("name") == name:
+            try:
+                return json.loads(message.get("content") or "{}")
+            except ValueError:
+                return {}
+    return {}
+
+
+def _tweet_id(messages: List[dict]) -> str:
+    data = _last_tool_result(messages, "twitter_create_post").get("data") or {}
+    return str(data.get("id") or (data.get("data") or {}).get("id") or "0")
+
+
+TWEET = "$YBOT vault at 12.8% APY while $POWER +106% and $LUNC +53% lead trending; $LINK +4%, $ETH +2.4%. DeFi TVL up 3% WoW. 09:30 UTC #DeFi #Crypto #AI"
+LINKEDIN = "Professional DeFi market analysis: Yieldbot's vault holds $2.4M at 12.8% APY. " * 6
+
+PUBLISH_TURNS = [
+    [("twitter_create_post", {"text": TWEET})],
+    lambda messages, body: [("twitter_reply_to_post", {"tweet_id": _tweet_id(messages),
+                                                       "reply_text": f"Live data at https://yieldbot.cc - {time.time():.0f}"})],
+    [("linkedin_create_post", {"commentary": LINKEDIN}),
+     ("send_telegram_message", {"chat_id": "@yieldbotai", "text": TWEET})],
+]
+
+def _publish_content(messages: List[dict], body: dict) -> list:
+    return [("publish_content", {"tweet": TWEET, "reply": f"Live data at https://yieldbot.cc - {time.time():.0f}",
+                                 "linkedin": LINKEDIN, "telegram": TWEET, "hashtags": ["#DeFi", "#Crypto", "#AI"],
+                                 "tokens": ["POWER", "LUNC", "LINK", "ETH"]})]
+
+def _batch_post(i: int) -> dict:
+    return {"slot": "", "angle": f"angle {i}", "tweet": f"{TWEET} [{i}] {'abcdefgh'[i] * 40}",
+            "reply": f"Live data at https://yieldbot.cc - slot {i}", "linkedin": LINKEDIN, "telegram": TWEET}
+
+
+SCRIPTS = {
+    "autonomous": ChatScript([
+        [("monitor_telegram_group", {}), ("fast_scrape_and_cache", {}), ("scrape_yieldbot_website", {})],
+        [("get_top_movers", {})],
+        _publish_content,
+    ]),
+    "graph": ChatScript([
+        [("monitor_telegram_group", {}), ("fast_scrape_and_cache", {"force_refresh": True})],
+        [("get_cached_research", {})],
+        *([_publish_content] if os.getenv("GRAPH_PUBLISH_STAGE", "false").lower() == "true" else PUBLISH_TURNS),
+    ]),
+    "batch": ChatScript([
+        [("PostPlan", {"posts": [_batch_post(i) for i in range(8)]})],
+    ]),
+    "twitter": ChatScript([
+        [("twitter_create_post", {"text": TWEET})],
+    ]),
+}
+
+
+def run_scenario(name: str) -> None:
+    """Invoke one agent entry point (imports happen after env points at the fakes)."""
+    if name == "autonomous":
+        from src.agent import create_twitter_agent, run_autonomous_post
+        run_autonomous_post(create_twitter_agent())
+    elif name == "graph":
+        from src.graph import run_agent
+        run_agent("Run the full research and publish cycle now.")
+    elif name == "twitter":
+        from src.twitter_agent import run_twitter_post
+        run_twitter_post()
+    elif name == "batch":
+        from src import batch
+        batch.refill()
+        batch.publish_due()
+    else:
+        raise ValueError(f"Unknown scenario: {name}")
+
+
+def _parse_map(spec: str) -> Dict[str, float]:
+    """Parse ``"*=50,mistral=400"`` into ``{"*": 50.0, "mistral": 400.0}``."""
+    result = {}
+    for item in filter(None, (part.strip() for part in (spec or "").split(","))):
+        key, _, value = item.partition("=")
+        if not value:
+            key, value = "*", key
+        result[key.strip()] = float(value)
+    return result
+
+
+def replay_child(args) -> None:
+    """Run a scenario against a recorded cassette instead of the fakes."""
+    data_dir = tempfile.mkdtemp(prefix="ybot-replay-")
+    cassette_path = os.path.abspath(args.cassette)
+    for key in ("MISTRAL_API_KEY", "COMPOSIO_API_KEY", "TELEGRAM_BOT_TOKEN", "FIRECRAWL_API_KEY"):
+        os.environ.setdefault(key, "replay-placeholder")
+    os.environ.update({
+        "YBOT_DATA_DIR": data_dir,
+        "RUN_LEDGER_PATH": os.path.join(data_dir, "run_history.db"),
+        "MEMORY_BACKEND": "memory",
+        "TELEMETRY_SINKS": "memory",
+        "LANGSMITH_TRACING": "false",
+        "LANGCHAIN_TRACING_V2": "false",
+    })
+    os.chdir(data_dir)
+
+    from src.cassette import use_cassette
+    from src.config import config
+
+    error = None
+    log_path = os.path.join(data_dir, "agent.log")
+    with use_cassette(cassette_path, args.replay_mode) as cassette:
+        t0 = time.perf_counter()
+        with open(log_path, "w") as log, contextlib.redirect_stdout(log):
+            try:
+                run_scenario(args.child)
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+        wall = time.perf_counter() - t0
+
+    from src.instrumentation import ring_buffer
+    mistral_host = urlparse(config.MISTRAL_BASE_URL).netloc
+    result = {
+        "scenario": f"{args.child}@replay",
+        "wall_s": wall,
+        "llm_turns": cassette.served[mistral_host],
+        "http_calls": sum(count for host, count in cassette.served.items() if host != mistral_host),
+        "tool_calls": len(ring_buffer.spans(kind="tool")),
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "services": dict(cassette.served),
+        "error": error or (f"{cassette.misses} cassette misses" if cassette.misses else None),
+        "log": log_path,
+    }
+    with open(args.result, "w") as fh:
+        json.dump(result, fh)
+
+
+def child(args) -> None:
+    """Run a single scenario in this process and write its measurements to ``args.result``."""
+    if args.cassette:
+        replay_child(args)
+        return
+    data_dir = tempfile.mkdtemp(prefix="ybot-bench-")
+    with FakeStack(SCRIPTS[args.child], latency_ms=_parse_map(args.latency_ms),
+                   error_rate=_parse_map(args.error_rate), jitter_ms=args.jitter_ms, seed=args.seed) as stack:
+        os.environ.update(stack.env())
+        os.environ.update({
+            "YBOT_DATA_DIR": data_dir,
+            "RUN_LEDGER_PATH": os.path.join(data_dir, "run_history.db"),
+            "MEMORY_BACKEND": "memory",
+            "TELEMETRY_SINKS": "memory",
+        })
+        os.chdir(data_dir)
+
+        error = None
+        log_path = os.path.join(data_dir, "agent.log")
+        t0 = time.perf_counter()
+        with open(log_path, "w") as log, contextlib.redirect_stdout(log):
+            try:
+                run_scenario(args.child)
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+        wall = time.perf_counter() - t0
+
+        stats = stack.stats()
+        from src.instrumentation import ring_buffer
+        tool_spans = ring_buffer.spans(kind="tool")
+
+    result = {
+        "scenario": args.child,
+        "wall_s": wall,
+        "llm_turns": stats["mistral"]["calls"],
+        "http_calls": sum(s["calls"] for name, s in stats.items() if name != "mistral"),
+        "tool_calls": len(tool_spans),
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        "services": stats,
+        "error": error,
+        "log": log_path,
+    }
+    with open(args.result, "w") as fh:
+        json.dump(result, fh)
+
+
+def parent(args) -> List[dict]:
+    scenarios = list(SCRIPTS) if args.scenario == "all" else [args.scenario]
+    env = dict(os.environ, PYTHONPATH=ROOT + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    passthrough = ["--latency-ms", args.latency_ms, "--error-rate", args.error_rate,
+                   "--jitter-ms", str(args.jitter_ms), "--seed", str(args.seed)]
+    if args.cassette:
+        passthrough += ["--cassette", os.path.abspath(args.cassette), "--replay-mode", args.replay_mode]
+    results = []
+    for scenario in scenarios:
+        for _ in range(args.repeat):
+            with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as tmp:
+                result_path = tmp.name
+            proc = subprocess.run(
+                [sys.executable, "-m", "benchmarks.run", "--child", scenario, "--result", result_path, *passthrough],
+                cwd=ROOT, env=env, capture_output=True, text=True,
+            )
+            if proc.returncode != 0 or not os.path.getsize(result_path):
+                print(f"[BENCH] {scenario} crashed:\n{proc.stderr[-2000:]}")
+                continue
+            with open(result_path) as fh:
+                results.append(json.load(fh))
+            os.unlink(result_path)
+    return results
+
+
+def summarize(results: List[dict]) -> None:
+    print(f"\n{'scenario':<12} {'runs':>4} {'wall p50':>9} {'wall max':>9} {'llm':>4} {'http':>5} {'tools':>5} {'rss MB':>7}  errors")
+    for scenario in dict.fromkeys(r["scenario"] for r in results):
+        rows = [r for r in results if r["scenario"] == scenario]
+        walls = [r["wall_s"] for r in rows]
+        errors = sorted({r["error"] for r in rows if r["error"]})
+        print(f"{scenario:<12} {len(rows):>4} {statistics.median(walls):>8.2f}s {max(walls):>8.2f}s "
+              f"{rows[-1]['llm_turns']:>4} {rows[-1]['http_calls']:>5} {rows[-1]['tool_calls']:>5} "
+              f"{max(r['peak_rss_mb'] for r in rows):>7.1f}  {'; '.join(errors) or '-'}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Offline YBot benchmarks against local fakes")
+    parser.add_argument("--scenario", default="all", choices=["all", *SCRIPTS])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--latency-ms", default="", help='per-service latency, e.g. "*=20,mistral=300"')
+    parser.add_argument("--error-rate", default="", help='per-service error rate, e.g. "telegram=0.2"')
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--cassette", help="replay a recorded HTTP cassette instead of using the fakes")
+    parser.add_argument("--replay-mode", default="fast", choices=["fast", "timing"])
+    parser.add_argument("--json", help="write raw results to this file")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--result", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(args)
+        return
+
+    results = parent(args)
+    summarize(results)
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump(results, fh, indent=2)
+
+
+if __name__ == "__main__":
+    main()
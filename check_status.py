@@ -1,11 +1,15 @@
 #!/usr/bin/env python3
 """Check the status of the running agent scheduler."""
 
+import argparse
 import json
 import sys
 from pathlib import Path
 
-def main():
+from src.config import config
+
+
+def print_last_status():
     status_file = Path("agent_status.json")
 
     if not status_file.exists():
@@ -33,5 +37,83 @@ def main():
         print(f"❌ Error reading status: {e}")
         sys.exit(1)
 
+
+def _ms(value) -> str:
+    return f"{value / 1000:.1f}s" if value is not None else "-"
+
+
+def print_history(limit: int, window: int):
+    """Show recent runs, step percentiles and platform failure rates from the run ledger."""
+    if not Path(config.RUN_LEDGER_PATH).exists():
+        print(f"\n❌ No run ledger at {config.RUN_LEDGER_PATH}")
+        return
+
+    from src.run_ledger import last_runs, platform_failure_rates, step_percentiles
+
+    runs = last_runs(limit)
+    print(f"\n🕒 Last {len(runs)} Runs")
+    print("=" * 30)
+    for run in runs:
+        tokens = (run["prompt_tokens"] or 0) + (run["completion_tokens"] or 0)
+        ids = ", ".join(
+            f"{label}={run[column]}"
+            for label, column in (("tweet", "tweet_id"), ("linkedin", "linkedin_id"), ("telegram", "telegram_message_id"))
+            if run[column]
+        )
+        print(f"  {run['started_at'][:19]}  {run['status'][:40]:<40} {_ms(run['duration_ms']):>8}  tokens={tokens}"
+              + (f"  deploy={run['deploy']}" if run["deploy"] else "")
+              + (f"  [{ids}]" if ids else ""))
+
+    percentiles = step_percentiles(window)
+    if percentiles:
+        print(f"\n⏱️  Step Timings (last {window} runs)")
+        print("=" * 30)
+        print(f"  {'step':<32} {'kind':<6} {'n':>4} {'p50':>8} {'p95':>8}")
+        for name, stats in sorted(percentiles.items(), key=lambda item: -(item[1]["p95_ms"] or 0)):
+            print(f"  {name:<32} {stats['kind']:<6} {stats['count']:>4} {_ms(stats['p50_ms']):>8} {_ms(stats['p95_ms']):>8}")
+
+    rates = platform_failure_rates(window)
+    if rates:
+        print(f"\n📉 Failure Rates (last {window} runs)")
+        print("=" * 30)
+        for platform, stats in sorted(rates.items()):
+            print(f"  {platform:<16} {stats['failures']}/{stats['attempts']} failed ({stats['failure_rate']:.0%})")
+
+
+def print_engagement(days: float):
+    """Show engagement totals and top posts from the engagement store."""
+    if not Path(config.ENGAGEMENT_DB_PATH).exists():
+        return
+
+    from src.engagement import summary
+
+    stats = summary(days)
+    if not stats["platforms"]:
+        return
+    print(f"\n💬 Engagement (posts from the last {days:g} days)")
+    print("=" * 30)
+    for platform, totals in sorted(stats["platforms"].items()):
+        rate = f"{totals['engagement_rate']:.2%}" if totals["engagement_rate"] is not None else "-"
+        print(f"  {platform:<10} posts={totals['posts']} measured={totals['measured']} "
+              f"likes={totals['likes']} reposts={totals['reposts']} replies={totals['replies']} "
+              f"impressions={totals['impressions']} rate={rate}")
+    for post in stats["top_posts"][:3]:
+        print(f"  top: {post['post_id']}  engagement={post['engagement']}  {(post['text'] or '')[:60]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--runs", type=int, default=10, help="number of recent runs to list")
+    parser.add_argument("--window", type=int, default=50, help="runs used for percentiles and failure rates")
+    parser.add_argument("--days", type=float, default=7, help="days of posts in the engagement summary")
+    parser.add_argument("--last-only", action="store_true", help="only show the last run status file")
+    args = parser.parse_args()
+
+    print_last_status()
+    if not args.last_only:
+        print_history(args.runs, args.window)
+        print_engagement(args.days)
+
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -7,11 +7,17 @@ import logging
 import sys
 from datetime import datetime
 from pathlib import Path
+from typing import Optional
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 
+from src import batch, engagement, instrumentation
+from src.cassette import install_from_env
 from src.config import config
-from src.agent import create_twitter_agent, run_autonomous_post
+from src.agent import create_twitter_agent, final_response, run_autonomous_cycle
+from src.blobs import get_blob_store
+from src.memory import prune_checkpoints
+from src.run_ledger import RunRecorder
 
 logger = logging.getLogger(__name__)
 
@@ -47,42 +53,74 @@ def load_status() -> dict:
     return last_run_status
 
 
+def platform_status(outcomes: dict, platform: str) -> str:
+    """Status line for one platform from its recorded publish outcome."""
+    outcome = outcomes.get(platform)
+    if not outcome:
+        return "Not attempted"
+    if outcome["outcome"] == "skipped":
+        return f"Skipped: {outcome['error']}"
+    return "Posted" if outcome["outcome"] == "ok" else f"Failed: {outcome['error']}"
+
+
 async def run_agent_task() -> dict:
     """Run the agent and return results."""
     logger.info("Scheduled agent run starting...")
+    recorder = RunRecorder()
 
     try:
         # Validate config
-        config.validate()
+        with recorder.step("validate_config"):
+            config.validate()
 
         # Create agent
-        agent = create_twitter_agent()
+        with recorder.step("create_agent"):
+            agent = create_twitter_agent()
+
+        # Run agent, collecting per-tool and per-model spans for this cycle
+        with instrumentation.collect(recorder.run_id) as spans:
+            try:
+                with recorder.step("agent_cycle"):
+                    result = run_autonomous_cycle(agent)
+            finally:
+                recorder.ingest_spans(spans)
+
+        recorder.ingest_messages(result.get("messages", []))
+        publishes = recorder.publishes
 
-        # Run agent
-        result = run_autonomous_post(agent)
+        # A cycle succeeded only if at least one platform actually published
+        ok = any(o["outcome"] == "ok" for o in publishes.values())
+        error = None if ok else ("all platforms failed" if publishes else "nothing was published")
 
         # Update status
         status = {
             "last_run": datetime.now().isoformat(),
-            "status": "Success",
+            "status": "Success" if ok else f"Failed: {error}",
+            "run_id": recorder.run_id,
             "results": {
-                "tweet": result.get("tweet_text", "N/A") if isinstance(result, dict) else "Posted",
-                "linkedin": result.get("linkedin_text", "N/A") if isinstance(result, dict) else "Posted",
-                "telegram": "Posted" if result else "Failed",
-                "twitter_status": "Posted" if result else "Failed",
-                "linkedin_status": "Posted" if result else "Failed"
+                "response": final_response(result),
+                "tweet_id": (publishes.get("twitter") or {}).get("post_id") or "N/A",
+                "twitter_status": platform_status(publishes, "twitter"),
+                "linkedin_status": platform_status(publishes, "linkedin"),
+                "telegram_status": platform_status(publishes, "telegram"),
             }
         }
+        recorder.finish("Success" if ok else "Failed", error)
 
-        logger.info("Agent run completed successfully")
+        if ok:
+            logger.info("Agent run completed successfully")
+        else:
+            logger.warning(f"Agent run finished without publishing: {error}")
 
     except Exception as e:
         logger.exception("Agent run failed")
         status = {
             "last_run": datetime.now().isoformat(),
             "status": f"Failed: {str(e)}",
+            "run_id": recorder.run_id,
             "results": {}
         }
+        recorder.finish("Failed", str(e))
 
     # Save and return
     global last_run_status
@@ -91,22 +129,127 @@ async def run_agent_task() -> dict:
     return status
 
 
+async def run_batch_refill_task() -> dict:
+    """Top up the publish queue from a fresh research snapshot (batch mode)."""
+    try:
+        result = batch.refill(force_refresh=True)
+        logger.info(f"Batch refill: {result}")
+        return result
+    except Exception as e:
+        logger.exception("Batch refill failed")
+        return {"error": str(e)}
+
+
+async def run_publish_due_task() -> Optional[dict]:
+    """Publish the next queued post whose slot has arrived (batch mode)."""
+    global last_run_status
+    try:
+        result = batch.publish_due()
+    except Exception as e:
+        logger.exception("Queued publish failed")
+        return {"error": str(e)}
+    if result:
+        outcomes = {o["platform"]: o for o in result["outcomes"]}
+
+        last_run_status = {
+            "last_run": datetime.now().isoformat(),
+            "status": "Success" if any(o["outcome"] == "ok" for o in outcomes.values()) else "Failed: all platforms failed",
+            "run_id": result["run_id"],
+            "results": {
+                "response": f"Published queued post for slot {result['slot']}",
+                "tweet_id": (outcomes.get("twitter") or {}).get("post_id") or "N/A",
+                "twitter_status": platform_status(outcomes, "twitter"),
+                "linkedin_status": platform_status(outcomes, "linkedin"),
+                "telegram_status": platform_status(outcomes, "telegram"),
+            }
+        }
+        save_status(last_run_status)
+        logger.info(f"Published queued post {result['post_id']} (slot {result['slot']})")
+    return result
+
+
+async def run_engagement_refresh_task() -> dict:
+    """Fetch metrics for published posts that are due (batched lookups, decaying schedule)."""
+    try:
+        result = engagement.refresh_due()
+        logger.info(f"Engagement refresh: {result}")
+        return result
+    except Exception as e:
+        logger.exception("Engagement refresh failed")
+        return {"error": str(e)}
+
+
+async def run_prune_task() -> dict:
+    """Prune old thread checkpoints and tool-output blobs according to the retention settings."""
+    try:
+        result = prune_checkpoints()
+        result["blobs_deleted"] = get_blob_store().prune()
+        logger.info(f"Checkpoint pruning: {result}")
+        return result
+    except Exception as e:
+        logger.exception("Checkpoint pruning failed")
+        return {"error": str(e)}
+
+
 def start_scheduler() -> AsyncIOScheduler:
     """Start the background scheduler."""
     scheduler = AsyncIOScheduler()
 
-    # Run every 90 minutes (to respect LinkedIn rate limits)
+    if config.BATCH_MODE:
+        # Generate posts ahead of time and publish each one when its slot arrives
+        scheduler.add_job(
+            run_batch_refill_task,
+            'interval',
+            minutes=config.BATCH_CHECK_MINUTES,
+            id='batch_refill',
+            name='Refill publish queue',
+            replace_existing=True
+        )
+        scheduler.add_job(
+            run_publish_due_task,
+            'interval',
+            minutes=1,
+            id='publish_due',
+            name='Publish due posts',
+            replace_existing=True
+        )
+    else:
+        # Run every 90 minutes (to respect LinkedIn rate limits)
+        scheduler.add_job(
+            run_agent_task,
+            'interval',
+            minutes=90,
+            id='agent_task',
+            name='Run YBot Agent',
+            replace_existing=True
+        )
+
+    # Refresh engagement metrics of published posts; only due posts are looked up
+    scheduler.add_job(
+        run_engagement_refresh_task,
+        'interval',
+        minutes=config.ENGAGEMENT_REFRESH_MINUTES,
+        id='engagement_refresh',
+        name='Refresh engagement metrics',
+        replace_existing=True
+    )
+
+    # Apply checkpoint retention once a day
     scheduler.add_job(
-        run_agent_task,
+        run_prune_task,
         'interval',
-        minutes=90,
-        id='agent_task',
-        name='Run YBot Agent',
+        hours=24,
+        id='prune_checkpoints',
+        name='Prune old checkpoints',
         replace_existing=True
     )
 
     scheduler.start()
-    logger.info("Scheduler started - agent will run every 90 minutes")
+    if config.BATCH_MODE:
+        logger.info(f"Scheduler started in batch mode - {config.BATCH_SIZE} posts per batch, "
+                    f"one every {config.BATCH_SLOT_MINUTES} minutes")
+    else:
+        logger.info("Scheduler started - agent will run every 90 minutes")
 
     # Load existing status
     load_status()
@@ -137,12 +280,20 @@ async def main():
         config.validate()
         logger.info("Configuration validated successfully")
 
+        # Record or replay HTTP traffic when HTTP_CASSETTE is set
+        install_from_env()
+
         # Start scheduler
         scheduler = start_scheduler()
 
         # Run initial task immediately
-        logger.info("Running initial agent task...")
-        await run_agent_task()
+        if config.BATCH_MODE:
+            logger.info("Filling publish queue...")
+            await run_batch_refill_task()
+            await run_publish_due_task()
+        else:
+            logger.info("Running initial agent task...")
+            await run_agent_task()
 
         # Keep the event loop running
         logger.info("Scheduler is running. Press Ctrl+C to stop.")
@@ -2,33 +2,44 @@
 
 import sys
 import os
+from src.cassette import install_from_env
+from src.blobs import blob_middleware
 from src.config import config
+from src.context import context_middleware
+from src.memory import get_checkpointer, get_memory_store
+from src.models import cascade_middleware, get_model
+from src.prefetch import prefetch_cycle
+from src.resilience import cycle_deadline, deadline_middleware
+from src.tool_registry import tool_middleware
 from src.tools import get_all_tools
 
 
 TWITTER_AGENT_PROMPT = """You are YBot, an AUTONOMOUS AI agent for Yieldbot ($YBOT).
 
-## EXECUTE IMMEDIATELY - 7 STEPS:
+## EXECUTE IMMEDIATELY - 4 STEPS:
 1. Monitor Telegram group: Use the monitor_telegram_group tool
 2. Scrape multiple sites: Use the fast_scrape_and_cache tool once (regulated fast crawl) and scrape_yieldbot_website tool for yieldbot-specific data. Use cached daily_research_YYYYMMDD.json for rest-of-day.
-3. Analyze all scraped data: Extract top tokens, prices, trends, why tokens are pumping/falling from ALL sources
-4. Write comprehensive tweet: Use specific real data from multiple sources (280 chars max, include $YBOT, token analysis, 2-3 hashtags, NO EMOJIS). ALWAYS make content UNIQUE - add current timestamp, different phrasing, or focus on different aspects each time.
-5. Post to Twitter + reply atomically: Use the twitter_post_and_reply tool with tweet_text and a UNIQUE reply text (never "Check out more at https://yieldbot.cc" - always modify with timestamp, different message, or unique content to avoid duplicate detection)
-6. Create professional LinkedIn post: Transform the tweet content into professional LinkedIn format (expand abbreviations, add context, make it suitable for professional network, max 3000 chars) and use linkedin_create_post tool
-7. Post to Telegram: Use the telegram_send_message tool with chat_id="@yieldbotai" and text=tweet_text
+3. Analyze all scraped data: Use the get_top_movers tool for the ranked top tokens (price, % changes, momentum, z-score, source agreement), then explain why they're pumping/falling from ALL sources
+4. Write and publish everything in ONE call: Use the publish_content tool with all versions at once. It posts the tweet, replies to it, posts to LinkedIn and sends to Telegram (@yieldbotai):
+   - tweet: comprehensive tweet with specific real data from multiple sources (280 chars max, include $YBOT, token analysis, 2-3 hashtags, NO EMOJIS). ALWAYS make content UNIQUE - add current timestamp, different phrasing, or focus on different aspects each time.
+   - reply: a UNIQUE reply linking to https://yieldbot.cc (never "Check out more at https://yieldbot.cc" - always modify with timestamp, different message, or unique content to avoid duplicate detection)
+   - linkedin: professional LinkedIn version of the tweet (expand abbreviations, add context, make it suitable for professional network, max 3000 chars)
+   - telegram: the tweet text for Telegram
+   - hashtags and tokens: the hashtags used and the token symbols cited
 
 CRITICAL:
 - NO EMOJIS in tweet text
 - Max 280 characters
 - Use REAL data from MULTIPLE sources - specific tokens, prices, trends, market analysis
 - Include $YBOT token symbol prominently
-- Mention top 5 tokens and why they're pumping/falling based on scraped data
+- Mention top 5 tokens from get_top_movers and why they're pumping/falling based on scraped data
 - Include fundraiser pool data if available
 - Include market trends from multiple sources
 - Telegram chat_id is "@yieldbotai"
 - Website link: https://yieldbot.cc
 - ALWAYS CREATE UNIQUE CONTENT: Add timestamp like "12:34 UTC", use different sentence structure, focus on different tokens/metrics, or add current market observations. Never post identical content.
-- If Twitter rejects for duplicate content, modify the tweet text with a unique suffix or different focus before retrying.
+- If Twitter rejects for duplicate content, call publish_content again with a unique suffix or different focus in the tweet.
+- publish_content fixes emojis, length, missing $YBOT/link and hashtag count itself. If it returns status "invalid", rewrite only the listed parts and call it again.
 - REPLY TEXT MUST BE UNIQUE: Never use identical reply text. Always modify with timestamps, different messages, or unique content.
 - LinkedIn posts should be professional: Expand crypto abbreviations, explain DeFi concepts, focus on market analysis and trends for professional audience
 
@@ -51,27 +62,10 @@ CRITICAL:
 - Use identical reply text - always make replies unique
 - Hit LinkedIn API unnecessarily - profile is cached
 
-Just execute the 7 steps above. Scrape multiple sources, analyze real data, create UNIQUE comprehensive post, then create professional LinkedIn version.
+Just execute the 4 steps above. Scrape multiple sources, analyze real data, create UNIQUE comprehensive post, then create professional LinkedIn version.
 """
 
 
-def get_memory_store():
-    """Get the appropriate memory store based on configuration."""
-    if config.MEMORY_BACKEND == "postgres" and config.DATABASE_URL:
-        try:
-            from langgraph.checkpoint.postgres import PostgresSaver
-            return PostgresSaver.from_conn_string(config.DATABASE_URL)
-        except ImportError:
-            try:
-                from langgraph.store.postgres import PostgresStore
-                return PostgresStore(connection_string=config.DATABASE_URL)
-            except ImportError:
-                print("PostgresStore not available. Falling back to InMemoryStore")
-    
-    from langgraph.store.memory import InMemoryStore
-    return InMemoryStore()
-
-
 def make_memory_backend(runtime):
     """Create a CompositeBackend for hybrid memory storage."""
     from deepagents.backends import CompositeBackend, StateBackend, StoreBackend
@@ -87,31 +81,29 @@ def make_memory_backend(runtime):
 def create_twitter_agent():
     """Create a Deep Agent configured for Twitter content creation with long-term memory."""
     from deepagents import create_deep_agent
-    from langchain.chat_models import init_chat_model
     
-    model = init_chat_model(
-        model=config.MISTRAL_MODEL,
-        model_provider="mistralai",
-        api_key=config.MISTRAL_API_KEY,
-        temperature=0.3,
-    )
+    model = get_model("writer")
     
     tools = get_all_tools()
     store = get_memory_store()
+    checkpointer = get_checkpointer()
     
     agent = create_deep_agent(
         model=model,
         tools=tools,
         system_prompt=TWITTER_AGENT_PROMPT,
         store=store,
+        checkpointer=checkpointer,
         backend=make_memory_backend,
+        middleware=[cascade_middleware(), tool_middleware(), deadline_middleware(), context_middleware(),
+                    blob_middleware()],
     )
     
     return agent
 
 
-def run_agent(user_input: str, agent=None, thread_id: str = None) -> str:
-    """Run the Deep Agent with user input."""
+def invoke_agent(user_input: str, agent=None, thread_id: str = None) -> dict:
+    """Run the Deep Agent with user input and return the final graph state."""
     import uuid
     
     if agent is None:
@@ -123,21 +115,91 @@ def run_agent(user_input: str, agent=None, thread_id: str = None) -> str:
         }
     }
     
-    result = agent.invoke(
+    return agent.invoke(
         {"messages": [{"role": "user", "content": user_input}]},
         config=config_dict
     )
-    
+
+
+def final_response(result: dict) -> str:
+    """Extract the last message text from an agent result state."""
     if "messages" in result and result["messages"]:
         return result["messages"][-1].content
     
     return str(result)
 
 
+def run_agent(user_input: str, agent=None, thread_id: str = None) -> str:
+    """Run the Deep Agent with user input."""
+    return final_response(invoke_agent(user_input, agent, thread_id))
+
+
+AUTONOMOUS_COMMAND = "Monitor Telegram, scrape yieldbot.cc and multiple crypto sites for real token data, analyze trends and prices from all sources, then create and post comprehensive content based on REAL data. Execute all 4 steps immediately. NO EMOJIS in tweet. Post to Twitter and Telegram, then reply to tweet with website link."
+
+
+def run_autonomous_cycle(agent=None, thread_id: str = None) -> dict:
+    """Run autonomous post cycle and return the final state (messages, tool results).
+
+    The cycle runs under ``CYCLE_DEADLINE_SECONDS`` (see ``src.resilience``), and
+    the research tools in ``PREFETCH_TOOLS`` start in the background while the
+    model plans its first turn (see ``src.prefetch``).
+    """
+    if agent is None:
+        agent = create_twitter_agent()
+    with cycle_deadline(), prefetch_cycle():
+        return invoke_agent(AUTONOMOUS_COMMAND, agent, thread_id)
+
+
 def run_autonomous_post(agent=None, thread_id: str = None) -> str:
     """Run autonomous post cycle - no user input needed."""
-    command = "Monitor Telegram, scrape yieldbot.cc and multiple crypto sites for real token data, analyze trends and prices from all sources, then create and post comprehensive content based on REAL data. Execute all 7 steps immediately. NO EMOJIS in tweet. Post to Twitter and Telegram, then reply to tweet with website link."
-    return run_agent(command, agent, thread_id)
+    return final_response(run_autonomous_cycle(agent, thread_id))
+
+
+async def stream_in_thread(agent, inputs, config: dict, **kwargs):
+    """Async iterator over ``agent.stream`` run in a worker thread.
+
+    The persistent checkpointers (``SqliteSaver``, ``PostgresSaver``) only
+    implement the sync API, so ``agent.astream`` fails on them. The worker runs
+    in a copy of the caller's context (deadline, spans) and stops after the
+    current step once the consumer goes away.
+    """
+    import asyncio
+    import contextvars
+    import threading
+
+    loop = asyncio.get_running_loop()
+    queue: asyncio.Queue = asyncio.Queue()
+    stop = threading.Event()
+    end = object()
+
+    def emit(item, error=None) -> None:
+        try:
+            loop.call_soon_threadsafe(queue.put_nowait, (item, error))
+        except RuntimeError:  # event loop already closed
+            pass
+
+    def pump() -> None:
+        try:
+            for chunk in agent.stream(inputs, config=config, **kwargs):
+                if stop.is_set():
+                    break
+                emit(chunk)
+        except BaseException as e:
+            emit(end, e)
+            return
+        emit(end)
+
+    loop.run_in_executor(None, contextvars.copy_context().run, pump)
+    try:
+        while True:
+            item, error = await queue.get()
+            if item is end:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        stop.set()
 
 
 async def run_agent_async(user_input: str, agent=None, thread_id: str = None):
@@ -153,9 +215,10 @@ async def run_agent_async(user_input: str, agent=None, thread_id: str = None):
         }
     }
     
-    async for chunk in agent.astream(
+    async for chunk in stream_in_thread(
+        agent,
         {"messages": [{"role": "user", "content": user_input}]},
-        config=config_dict,
+        config_dict,
         stream_mode="values"
     ):
         if "messages" in chunk:
@@ -185,6 +248,8 @@ def main():
     if config.setup_tracing():
         print(f"LangSmith tracing enabled -> Project: {config.LANGSMITH_PROJECT}")
     
+    install_from_env()
+    
     print(f"Memory backend: {config.MEMORY_BACKEND}")
     
     print("\nInitializing Deep Agent with long-term memory...")
@@ -0,0 +1,170 @@
+"""Trend analytics over the price history in ``src.timeseries``.
+
+The agent prompt asks for the top tokens and why they move. The model used
+to rank them by reading scraped text, which is slow and often wrong on the
+numbers. ``top_movers`` computes the numbers locally for every tracked
+symbol at once, with NumPy operations over the store's ``(series, samples)``
+matrices:
+
+- ``chg_24h``       - latest 24h % change reported by the source (or computed)
+- ``chg_<N>h``      - % change over each of ``TREND_WINDOWS_HOURS``
+- ``momentum``      - mean % return per sample over the last ``TREND_MOMENTUM_SAMPLES``
+- ``z``             - latest return as a z-score of the series' earlier returns
+- ``sources/agree`` - how many sources report the symbol and how many of them
+  agree with the direction of its 24h move
+
+The model gets a small ranked table and only has to explain it.
+"""
+
+import time
+from typing import List, Optional
+
+import numpy as np
+
+from src.config import config
+from src.timeseries import get_store
+
+
+def _last_valid(values: np.ndarray) -> np.ndarray:
+    """Column index of each row's last finite value (-1 when there is none)."""
+    cols = np.arange(values.shape[1])
+    return np.where(np.isfinite(values), cols, -1).max(axis=1)
+
+
+def _take(values: np.ndarray, index: np.ndarray) -> np.ndarray:
+    taken = values[np.arange(len(values)), np.maximum(index, 0)]
+    return np.where(index >= 0, taken, np.nan)
+
+
+def _masked_mean(values: np.ndarray, min_count: int = 1) -> np.ndarray:
+    valid = np.isfinite(values)
+    count = valid.sum(axis=1)
+    total = np.where(valid, values, 0.0).sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(count >= min_count, total / count, np.nan)
+
+
+def _masked_std(values: np.ndarray, min_count: int = 2) -> np.ndarray:
+    mean = _masked_mean(values, min_count)
+    sq = (values - mean[:, None]) ** 2
+    return np.sqrt(_masked_mean(sq, min_count))
+
+
+def window_changes(ts: np.ndarray, price: np.ndarray, hours: List[float]) -> np.ndarray:
+    """``(series, len(hours))`` % change from the last sample at least ``h`` hours before the latest one."""
+    ts = np.where(np.isfinite(price), ts, np.nan)
+    last = _last_valid(ts)
+    last_ts, last_price = _take(ts, last), _take(price, last)
+    cols = np.arange(ts.shape[1])
+    changes = np.full((len(ts), len(hours)), np.nan)
+    for i, h in enumerate(hours):
+        target = last_ts - h * 3600
+        with np.errstate(invalid="ignore"):
+            base_idx = np.where(ts <= target[:, None], cols, -1).max(axis=1)
+            base = _take(price, base_idx)
+            changes[:, i] = (last_price / base - 1.0) * 100
+    return changes
+
+
+def trend_metrics(ts: np.ndarray, price: np.ndarray, change: np.ndarray, hours: List[float],
+                  momentum_samples: int) -> dict:
+    """Per-series metrics as arrays; every input is an ``(series, samples)`` matrix."""
+    with np.errstate(invalid="ignore", divide="ignore"):
+        returns = np.diff(np.log(np.where(price > 0, price, np.nan)), axis=1) * 100
+    last_change_idx = _last_valid(change)
+    last_return_idx = _last_valid(returns)
+    latest_return = _take(returns, last_return_idx)
+    # Earlier returns only, so the latest move is scored against the history before it
+    earlier = np.where(np.arange(returns.shape[1])[None, :] < last_return_idx[:, None], returns, np.nan)
+    sigma = _masked_std(earlier, min_count=3)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        z = np.where(sigma > 0, (latest_return - _masked_mean(earlier, 3)) / sigma, np.nan)
+    windows = window_changes(ts, price, hours)
+    reported = _take(change, last_change_idx)
+    computed_24h = window_changes(ts, price, [24.0])[:, 0]
+    return {
+        "price": _take(price, _last_valid(price)),
+        "chg_24h": np.where(np.isfinite(reported), reported, computed_24h),
+        "windows": windows,
+        "momentum": _masked_mean(returns[:, -momentum_samples:]) if returns.shape[1] else np.full(len(ts), np.nan),
+        "z": z,
+        "last_ts": _take(ts, _last_valid(ts)),
+    }
+
+
+def _round(value, digits: int = 2):
+    return None if value is None or not np.isfinite(value) else round(float(value), digits)
+
+
+def _price(value):
+    return None if not np.isfinite(value) else float(f"{value:.6g}")
+
+
+def top_movers(limit: int = 5, direction: str = "all", store=None, now: Optional[float] = None) -> dict:
+    """Ranked table of the symbols with the largest 24h moves.
+
+    ``direction`` is ``all``, ``gainers`` or ``losers``. Symbols whose latest
+    sample is older than ``TREND_STALE_HOURS`` are left out. The primary
+    series of a symbol is the market data provider's; symbols only seen in
+    scraped text use that.
+    """
+    store = store or get_store()
+    now = time.time() if now is None else now
+    hours = [float(h) for h in config.TREND_WINDOWS_HOURS.split(",") if h.strip()]
+    n = min(store.window, config.TREND_HISTORY_SAMPLES)
+    keys, ts = store.matrix("ts", n)
+    if not keys:
+        return {"as_of": None, "tracked": 0, "columns": [], "rows": [],
+                "note": "No price history yet; run get_market_data or fast_scrape_and_cache first."}
+    _, price = store.matrix("price", n)
+    _, change = store.matrix("change_24h", n)
+    metrics = trend_metrics(ts, price, change, hours, config.TREND_MOMENTUM_SAMPLES)
+
+    symbols = np.array([k.split("|", 1)[0] for k in keys])
+    sources = np.array([k.split("|", 1)[1] for k in keys])
+    fresh = metrics["last_ts"] >= now - config.TREND_STALE_HOURS * 3600
+    has_move = np.isfinite(metrics["chg_24h"])
+
+    # Primary series per symbol: the provider's, else the one with the most price samples
+    provider = (config.MARKET_DATA_PROVIDER or "").lower()
+    preference = (sources == provider) * 1e6 + np.isfinite(price).sum(axis=1) + fresh * 1e7
+    order = np.lexsort((-preference, symbols))
+    unique_symbols, first = np.unique(symbols[order], return_index=True)
+    primary = order[first]
+    inverse = np.searchsorted(unique_symbols, symbols)
+
+    # Cross-source agreement on the direction of the 24h move (fresh series only)
+    direction_sign = np.sign(metrics["chg_24h"])
+    reporting = fresh & has_move
+    agrees = reporting & (direction_sign == direction_sign[primary][inverse])
+    source_count = np.bincount(inverse, weights=reporting, minlength=len(unique_symbols)).astype(int)
+    agree_count = np.bincount(inverse, weights=agrees, minlength=len(unique_symbols)).astype(int)
+
+    chg = metrics["chg_24h"][primary]
+    eligible = fresh[primary] & np.isfinite(chg)
+    if direction == "gainers":
+        eligible &= chg > 0
+    elif direction == "losers":
+        eligible &= chg < 0
+    score = np.where(eligible, np.abs(chg), -np.inf)
+    ranked = [i for i in np.argsort(-score, kind="stable") if eligible[i]][:max(0, limit)]
+
+    window_cols = [f"chg_{int(h) if h == int(h) else h}h" for h in hours]
+    columns = ["symbol", "price", "chg_24h", *window_cols, "momentum", "z", "sources", "agree"]
+    rows = []
+    for i in ranked:
+        p = primary[i]
+        rows.append([
+            str(unique_symbols[i]), _price(metrics["price"][p]), _round(chg[i]),
+            *[_round(v) for v in metrics["windows"][p]],
+            _round(metrics["momentum"][p], 3), _round(metrics["z"][p]),
+            int(source_count[i]), int(agree_count[i]),
+        ])
+    return {
+        "as_of": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(now)),
+        "tracked": int(len(unique_symbols)),
+        "columns": columns,
+        "rows": rows,
+        "note": "chg in %, momentum = mean % return per sample, |z| > 2 = unusual move, "
+                "agree = sources reporting the same direction; null = not enough history",
+    }
@@ -0,0 +1,303 @@
+"""Day-ahead batch generation and the publish queue.
+
+Instead of researching and writing from scratch every cycle, batch mode
+takes one research snapshot, asks the model once for the next
+``BATCH_SIZE`` posts (each with its own angle and time slot) and stores them
+in a SQLite queue. The scheduler then publishes whatever is due, which needs
+no model call at slot time. The queue is refilled when it runs low, or
+regenerated early when the market has moved more than
+``BATCH_REGEN_THRESHOLD_PCT`` since the snapshot the pending posts were
+written from.
+
+Enable with ``BATCH_MODE=true`` (see ``scheduler.py``).
+"""
+
+import json
+import re
+import sqlite3
+import threading
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+from src.blobs import resolve_result
+from src.config import config
+from src.content import PostContent, finalize
+from src.models import invoke_structured
+from src.prefetch import prefetch_cycle
+from src.resilience import cycle_deadline
+from src.run_ledger import PUBLISH_TOOLS, RunRecorder, outcome_from_result
+
+
+TELEGRAM_CHAT = "@yieldbotai"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS posts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    batch_id TEXT NOT NULL,
+    slot TEXT NOT NULL,
+    angle TEXT,
+    tweet TEXT NOT NULL,
+    reply TEXT,
+    linkedin TEXT,
+    telegram TEXT,
+    status TEXT NOT NULL DEFAULT 'queued',
+    fingerprint TEXT,
+    created_at TEXT NOT NULL,
+    published_at TEXT,
+    result TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_posts_status_slot ON posts(status, slot);
+"""
+
+
+class PostDraft(PostContent):
+    """One scheduled post and its per-platform variants."""
+
+    slot: str = Field(description="UTC publish time, ISO 8601, copied from the slot list")
+    angle: str = Field(description="The distinct focus of this post, e.g. 'top gainer', 'vault APY'")
+
+
+class PostPlan(BaseModel):
+    """A batch of posts generated from one research snapshot."""
+
+    posts: List[PostDraft]
+
+
+BATCH_PROMPT = """You are YBot's content planner. Using ONLY the research snapshot below, write
+{count} posts, one for each time slot listed. Give every post a different angle (different
+tokens, metrics or market observation) so no two posts read alike, and do not repeat any of the
+recently published tweets. Rules for every tweet: max 280 characters, include $YBOT, 2-3
+hashtags, NO EMOJIS, real numbers from the snapshot only. LinkedIn versions are professional and
+explain abbreviations. Replies are short, unique and link to https://yieldbot.cc.
+
+Slots (UTC): {slots}
+
+Recently published tweets:
+{recent}
+
+Research snapshot:
+{snapshot}"""
+
+
+# "$SOL +4.2%", "$ETH -1.3 %", "$POWER up 106%"
+_MOVE_RE = re.compile(r"\$([A-Z][A-Z0-9]{1,9})\b[^$%\n]{0,24}?([+-]?\d+(?:\.\d+)?)\s?%")
+
+
+def market_fingerprint(snapshot: str) -> Dict[str, float]:
+    """Percentage moves per token symbol mentioned in a research snapshot."""
+    moves: Dict[str, float] = {}
+    for symbol, value in _MOVE_RE.findall(snapshot):
+        moves.setdefault(symbol, float(value))
+    return moves
+
+
+def market_shift(old: Dict[str, float], new: Dict[str, float]) -> float:
+    """Largest change, in percentage points, of a token present in both fingerprints."""
+    shared = set(old) & set(new)
+    if not shared:
+        return 0.0 if not old or not new else float("inf")
+    return max(abs(new[s] - old[s]) for s in shared)
+
+
+class PublishQueue:
+    """SQLite-backed queue of generated posts waiting for their slot.
+
+    Use it as a context manager (or call ``close``) so its connection is closed.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.conn = sqlite3.connect(path or config.PUBLISH_QUEUE_PATH, timeout=10, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+
+    def __enter__(self) -> "PublishQueue":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def enqueue(self, drafts: List[PostDraft], fingerprint: Dict[str, float]) -> str:
+        batch_id = uuid.uuid4().hex
+        now = datetime.now(timezone.utc).isoformat()
+        with self.conn:
+            self.conn.executemany(
+                """INSERT INTO posts (batch_id, slot, angle, tweet, reply, linkedin, telegram, fingerprint, created_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                [(batch_id, d.slot, d.angle, d.tweet, d.reply, d.linkedin, d.telegram, json.dumps(fingerprint), now)
+                 for d in drafts],
+            )
+        return batch_id
+
+    def pending(self) -> List[sqlite3.Row]:
+        return self.conn.execute("SELECT * FROM posts WHERE status = 'queued' ORDER BY slot").fetchall()
+
+    def pending_fingerprint(self) -> Optional[Dict[str, float]]:
+        row = self.conn.execute(
+            "SELECT fingerprint FROM posts WHERE status = 'queued' ORDER BY id DESC LIMIT 1").fetchone()
+        return json.loads(row["fingerprint"]) if row and row["fingerprint"] else None
+
+    def next_due(self, now: Optional[datetime] = None) -> Optional[sqlite3.Row]:
+        now = (now or datetime.now(timezone.utc)).replace(microsecond=0)
+        return self.conn.execute(
+            "SELECT * FROM posts WHERE status = 'queued' AND slot <= ? ORDER BY slot LIMIT 1",
+            (now.isoformat(),)).fetchone()
+
+    def mark(self, post_id: int, status: str, result: Optional[dict] = None) -> None:
+        with self.conn:
+            self.conn.execute(
+                "UPDATE posts SET status = ?, published_at = ?, result = ? WHERE id = ?",
+                (status, datetime.now(timezone.utc).isoformat(), json.dumps(result, default=str), post_id))
+
+    def supersede_pending(self) -> int:
+        with self.conn:
+            return self.conn.execute("UPDATE posts SET status = 'superseded' WHERE status = 'queued'").rowcount
+
+    def recent_tweets(self, limit: int = 20) -> List[str]:
+        rows = self.conn.execute(
+            "SELECT tweet FROM posts WHERE status IN ('published', 'queued') ORDER BY id DESC LIMIT ?",
+            (limit,)).fetchall()
+        return [row["tweet"] for row in rows]
+
+
+_tools: Optional[dict] = None
+_tools_lock = threading.Lock()
+
+
+def _tools_by_name() -> dict:
+    """All tools by name, built once per process."""
+    global _tools
+    with _tools_lock:
+        if _tools is None:
+            from src.tools import get_all_tools
+            _tools = {t.name: t for t in get_all_tools()}
+        return _tools
+
+
+def gather_research(tools: Optional[dict] = None, force_refresh: bool = False) -> str:
+    """Collect one research snapshot as text (daily scrape cache, yieldbot.cc and Telegram).
+
+    The three sources are fetched concurrently through ``prefetch_cycle``.
+    """
+    tools = tools or _tools_by_name()
+    plan = {name: args for name, args in (("fast_scrape_and_cache", {"force_refresh": force_refresh}),
+                                          ("scrape_yieldbot_website", {}),
+                                          ("monitor_telegram_group", {})) if name in tools}
+    sections = []
+    with prefetch_cycle(plan):
+        for name, args in plan.items():
+            try:
+                result = resolve_result(tools[name].func(**args))
+            except Exception as e:
+                result = {"error": str(e)}
+            sections.append(f"## {name}\n{json.dumps(result, ensure_ascii=False, default=str)[:8000]}")
+    return "\n\n".join(sections)
+
+
+def next_slots(count: int, start: Optional[datetime] = None, minutes: Optional[int] = None) -> List[str]:
+    minutes = minutes or config.BATCH_SLOT_MINUTES
+    start = start or datetime.now(timezone.utc)
+    return [(start + timedelta(minutes=minutes * i)).replace(microsecond=0).isoformat() for i in range(count)]
+
+
+def generate_batch(snapshot: str, slots: List[str], history: List[str], model=None) -> List[PostDraft]:
+    """One structured model call for all slots; drafts that break a platform rule after auto-fixes are dropped."""
+    prompt = BATCH_PROMPT.format(
+        count=len(slots),
+        slots=", ".join(slots),
+        recent="\n".join(f"- {t}" for t in history[:10]) or "- (none)",
+        snapshot=snapshot[:20000],
+    )
+    if model is not None:
+        plan = model.with_structured_output(PostPlan).invoke(prompt)
+    else:
+        plan = invoke_structured(PostPlan, prompt, role="writer")
+    drafts, seen = [], list(history)
+    for slot, draft in zip(slots, plan.posts):
+        draft.slot = slot
+        draft, issues = finalize(draft, seen)
+        if issues:
+            print(f"[BATCH] Dropping draft for {slot}: {'; '.join(issues)}")
+            continue
+        drafts.append(draft)
+        seen.extend([draft.tweet, draft.reply])
+    return drafts
+
+
+def refill(queue: Optional[PublishQueue] = None, force_refresh: bool = False) -> dict:
+    """Top up the queue, regenerating pending posts if the market moved past the threshold."""
+    if queue is None:
+        with PublishQueue() as queue:
+            return refill(queue, force_refresh)
+    with cycle_deadline():
+        snapshot = gather_research(force_refresh=force_refresh)
+    fingerprint = market_fingerprint(snapshot)
+    pending = queue.pending()
+    shift = market_shift(queue.pending_fingerprint() or {}, fingerprint) if pending else 0.0
+
+    superseded = 0
+    if pending and shift > config.BATCH_REGEN_THRESHOLD_PCT:
+        print(f"[BATCH] Market moved {shift:.1f} pts since the pending batch; regenerating")
+        superseded = queue.supersede_pending()
+        pending = []
+    if len(pending) >= config.BATCH_MIN_PENDING:
+        return {"status": "skipped", "pending": len(pending), "shift": shift}
+
+    start = None
+    if pending:
+        start = datetime.fromisoformat(pending[-1]["slot"]) + timedelta(minutes=config.BATCH_SLOT_MINUTES)
+    slots = next_slots(config.BATCH_SIZE - len(pending), start)
+    drafts = generate_batch(snapshot, slots, queue.recent_tweets())
+    batch_id = queue.enqueue(drafts, fingerprint)
+    print(f"[BATCH] Queued {len(drafts)} posts (batch {batch_id[:8]})")
+    return {"status": "generated", "batch_id": batch_id, "queued": len(drafts),
+            "superseded": superseded, "shift": shift}
+
+
+def publish_post(post, tools: Optional[dict] = None) -> List[dict]:
+    """Publish one queued post to every platform and return per-platform outcomes."""
+    tools = tools or _tools_by_name()
+    outcomes = []
+
+    def call(name: str, **kwargs):
+        if name not in tools:
+            return None
+        try:
+            result = tools[name].func(**kwargs)
+        except Exception as e:
+            result = {"error": str(e)}
+        outcomes.append(outcome_from_result(PUBLISH_TOOLS[name], result))
+        return outcomes[-1]
+
+    tweet = call("twitter_create_post", text=post["tweet"])
+    if tweet and tweet["outcome"] == "ok" and tweet.get("post_id") and post["reply"]:
+        call("twitter_reply_to_post", tweet_id=tweet["post_id"], reply_text=post["reply"])
+    if post["linkedin"]:
+        call("linkedin_create_post", commentary=post["linkedin"])
+    call("send_telegram_message", chat_id=TELEGRAM_CHAT, text=post["telegram"] or post["tweet"])
+    return outcomes
+
+
+def publish_due(queue: Optional[PublishQueue] = None, now: Optional[datetime] = None) -> Optional[dict]:
+    """Publish the next due post, if any, recording it in the run ledger."""
+    if queue is None:
+        with PublishQueue() as queue:
+            return publish_due(queue, now)
+    post = queue.next_due(now)
+    if post is None:
+        return None
+    recorder = RunRecorder()
+    with recorder.step("publish_queued"), cycle_deadline():
+        outcomes = publish_post(post)
+    for outcome in outcomes:
+        recorder.record_publish(outcome["platform"], outcome["outcome"], outcome.get("post_id"), outcome.get("error"))
+    ok = any(o["outcome"] == "ok" for o in outcomes)
+    queue.mark(post["id"], "published" if ok else "failed", {"run_id": recorder.run_id, "outcomes": outcomes})
+    recorder.finish("Success" if ok else "Failed", None if ok else "all platforms failed")
+    return {"post_id": post["id"], "slot": post["slot"], "run_id": recorder.run_id, "outcomes": outcomes}
@@ -0,0 +1,207 @@
+"""Content-addressed storage for large tool outputs.
+
+Checkpoints embed the full message list, so a 20 KB scrape result would be
+re-serialized on every super-step of a cycle. Tool results larger than
+``BLOB_OFFLOAD_CHARS`` are written once to ``BLOB_DIR`` under their SHA-256
+and the message keeps only a small reference::
+
+    {"blob_ref": "blob:sha256:ab12...", "chars": 21034, "preview": "...", "status": "success"}
+
+References are expanded back to the full payload for the model call of the
+turn that produced them (``expand_blob_refs`` / ``blob_middleware``); older
+ones stay compact and can be read on demand with the ``read_blob`` tool.
+"""
+
+import hashlib
+import json
+import os
+import time
+from functools import wraps
+from typing import Callable, List, Optional
+
+from src.config import config
+
+
+REF_PREFIX = "blob:sha256:"
+PREVIEW_CHARS = 600
+
+
+class BlobStore:
+    """Immutable blobs on disk, sharded by the first two hex digits of their hash."""
+
+    def __init__(self, root: Optional[str] = None):
+        self.root = root or config.BLOB_DIR or config.data_path("blobs")
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.root, digest[:2], digest)
+
+    def put(self, text: str) -> str:
+        """Store ``text`` and return its reference; identical content is written only once."""
+        data = text.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._path(digest)
+        if os.path.exists(path):
+            os.utime(path)
+        else:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as fh:
+                fh.write(data)
+            os.replace(tmp, path)
+        return REF_PREFIX + digest
+
+    def get(self, ref: str) -> Optional[str]:
+        digest = ref[len(REF_PREFIX):] if ref.startswith(REF_PREFIX) else ref
+        if len(digest) != 64 or not all(c in "0123456789abcdef" for c in digest):
+            return None
+        try:
+            with open(self._path(digest), "rb") as fh:
+                return fh.read().decode("utf-8")
+        except FileNotFoundError:
+            return None
+
+    def prune(self, retention_days: Optional[int] = None) -> int:
+        """Delete blobs not written or referenced for ``retention_days``; returns the count."""
+        retention_days = config.BLOB_RETENTION_DAYS if retention_days is None else retention_days
+        if retention_days <= 0 or not os.path.isdir(self.root):
+            return 0
+        cutoff = time.time() - retention_days * 86400
+        removed = 0
+        for dirpath, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+                    removed += 1
+        return removed
+
+
+_store: Optional[BlobStore] = None
+
+
+def get_blob_store() -> BlobStore:
+    global _store
+    if _store is None:
+        _store = BlobStore()
+    return _store
+
+
+def _serialize(result) -> str:
+    return result if isinstance(result, str) else json.dumps(result, ensure_ascii=False, default=str)
+
+
+def make_ref(result, text: str, ref: str) -> dict:
+    """Compact stand-in for an offloaded result; keeps top-level status fields for outcome parsing."""
+    stub = {"blob_ref": ref, "chars": len(text), "preview": text[:PREVIEW_CHARS]}
+    if isinstance(result, dict):
+        for key, value in result.items():
+            if isinstance(value, (str, int, float, bool)) and len(str(value)) <= 200:
+                stub.setdefault(key, value)
+        stub["keys"] = list(result)
+    return stub
+
+
+def offload_large_output(name: str, func: Callable) -> Callable:
+    """Tool wrapper that moves results over ``BLOB_OFFLOAD_CHARS`` into the blob store."""
+    if name == "read_blob":
+        return func
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        result = func(*args, **kwargs)
+        if config.BLOB_OFFLOAD_CHARS <= 0:
+            return result
+        text = _serialize(result)
+        if len(text) <= config.BLOB_OFFLOAD_CHARS:
+            return result
+        try:
+            ref = get_blob_store().put(text)
+        except OSError as e:
+            print(f"[BLOBS] Could not offload {name} output: {e}")
+            return result
+        return make_ref(result, text, ref)
+
+    return wrapper
+
+
+def resolve_result(result):
+    """Return the original tool result for an offloaded one (direct tool calls outside the agent)."""
+    if isinstance(result, dict) and isinstance(result.get("blob_ref"), str):
+        payload = get_blob_store().get(result["blob_ref"])
+        if payload is not None:
+            try:
+                return json.loads(payload)
+            except ValueError:
+                return payload
+    return result
+
+
+def _blob_ref(content) -> Optional[str]:
+    if not isinstance(content, str) or REF_PREFIX not in content:
+        return None
+    try:
+        data = json.loads(content)
+    except ValueError:
+        return None
+    return data.get("blob_ref") if isinstance(data, dict) else None
+
+
+def expand_blob_refs(messages: List, current_turn_only: bool = True) -> List:
+    """Replace blob references in tool messages with the stored payload.
+
+    By default only the tool results after the last user message are
+    expanded; older references stay compact.
+    """
+    start = 0
+    if current_turn_only:
+        for i, message in enumerate(messages):
+            if getattr(message, "type", None) == "human":
+                start = i
+    store = get_blob_store()
+    expanded = list(messages)
+    for i in range(start, len(expanded)):
+        message = expanded[i]
+        if getattr(message, "type", None) != "tool":
+            continue
+        ref = _blob_ref(message.content)
+        payload = store.get(ref) if ref else None
+        if payload is not None:
+            expanded[i] = message.model_copy(update={"content": payload})
+    return expanded
+
+
+def blob_middleware():
+    """Deep-agent middleware that expands this turn's blob references for the model call."""
+    from langchain.agents.middleware import AgentMiddleware
+
+    class BlobRefMiddleware(AgentMiddleware):
+        def wrap_model_call(self, request, handler):
+            return handler(request.override(messages=expand_blob_refs(request.messages)))
+
+        async def awrap_model_call(self, request, handler):
+            return await handler(request.override(messages=expand_blob_refs(request.messages)))
+
+    return BlobRefMiddleware()
+
+
+def get_blob_tools() -> list:
+    from langchain_core.tools import tool
+
+    @tool
+    def read_blob(ref: str, offset: int = 0, limit: int = 8000) -> dict:
+        """Read a stored tool output by its blob_ref (e.g. from an earlier scrape), in chunks of `limit` chars."""
+        content = get_blob_store().get(ref)
+        if content is None:
+            return {"status": "error", "error": f"Unknown blob reference: {ref}"}
+        chunk = content[offset:offset + limit]
+        next_offset = offset + len(chunk)
+        return {
+            "status": "success",
+            "ref": ref,
+            "chars": len(content),
+            "offset": offset,
+            "next_offset": next_offset if next_offset < len(content) else None,
+            "content": chunk,
+        }
+
+    return [read_blob]
@@ -0,0 +1,176 @@
+"""In-process TTL/LRU caches with single-flight loading.
+
+Tool reads that repeat within a cycle (the same ``scrape_page`` URL twice,
+``get_cached_research`` after every step), or across overlapping runs in the
+server, should not go back to Firecrawl or re-parse a JSON file. A
+``TTLCache`` keeps recent values in memory:
+
+- entries expire after their TTL and the least recently used ones are
+  evicted once ``max_entries`` or ``max_bytes`` (approximate payload size)
+  is exceeded
+- ``get_or_load`` is single-flight: concurrent misses for the same key wait
+  for one upstream load instead of each starting their own
+- loader exceptions are not cached, and waiting callers see the same error
+- hits, misses, coalesced waits, evictions and expirations are counted
+  (``stats()``, and ``cache_stats()`` for every named cache)
+
+Cached values are shared between callers; treat them as read-only.
+"""
+
+import json
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+from src.config import config
+
+
+def approx_size(value) -> int:
+    """Rough payload size in bytes, used for the memory bound."""
+    if isinstance(value, (bytes, str)):
+        return len(value)
+    try:
+        return len(json.dumps(value, default=str))
+    except (TypeError, ValueError):
+        return 1024
+
+
+class _Flight:
+    """A load in progress that other callers for the same key can wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error: Optional[BaseException] = None
+
+
+class TTLCache:
+    """Thread-safe LRU cache with per-entry TTL, a size bound and single-flight loads."""
+
+    def __init__(self, name: str, ttl: float = 300.0, max_entries: int = 256,
+                 max_bytes: Optional[int] = None, sizeof: Callable[[Any], int] = approx_size):
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = config.CACHE_MAX_BYTES if max_bytes is None else max_bytes
+        self.sizeof = sizeof
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()  # key -> (expires_at, size, value)
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = self.misses = self.coalesced = self.evictions = self.expirations = 0
+
+    def _lookup(self, key: Hashable):
+        """Return ``(True, value)`` for a live entry; caller holds the lock."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        expires_at, size, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            self._bytes -= size
+            self.expirations += 1
+            return False, None
+        self._entries.move_to_end(key)
+        return True, value
+
+    def get(self, key: Hashable, default=None):
+        with self._lock:
+            found, value = self._lookup(key)
+            if found:
+                self.hits += 1
+                return value
+            self.misses += 1
+            return default
+
+    def set(self, key: Hashable, value, ttl: Optional[float] = None, size: Optional[int] = None) -> None:
+        size = self.sizeof(value) if size is None else size
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            if self.max_bytes and size > self.max_bytes:
+                return
+            self._entries[key] = (time.monotonic() + (self.ttl if ttl is None else ttl), size, value)
+            self._bytes += size
+            while self._entries and (len(self._entries) > self.max_entries or
+                                     (self.max_bytes and self._bytes > self.max_bytes)):
+                _, (_, evicted_size, _) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any], ttl: Optional[float] = None,
+                    size: Optional[int] = None):
+        """Cached value for ``key``, or the result of ``loader()`` shared by all concurrent callers."""
+        with self._lock:
+            found, value = self._lookup(key)
+            if found:
+                self.hits += 1
+                return value
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                self.misses += 1
+                flight = self._flights[key] = _Flight()
+            else:
+                self.coalesced += 1
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+        try:
+            flight.value = loader()
+            self.set(key, flight.value, ttl, size)
+            return flight.value
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.done.set()
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        """Drop one key, or everything when ``key`` is None."""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+                self._bytes = 0
+                return
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._bytes -= entry[1]
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": (self.hits + self.coalesced) / lookups if lookups else 0.0,
+            }
+
+
+_caches: Dict[str, TTLCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(name: str, ttl: float = 300.0, max_entries: int = 256, max_bytes: Optional[int] = None) -> TTLCache:
+    """Named process-wide cache; the settings apply when it is first created."""
+    with _caches_lock:
+        if name not in _caches:
+            _caches[name] = TTLCache(name, ttl, max_entries, max_bytes)
+        return _caches[name]
+
+
+def cache_stats() -> Dict[str, dict]:
+    with _caches_lock:
+        caches = list(_caches.values())
+    return {cache.name: cache.stats() for cache in caches}
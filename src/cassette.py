@@ -0,0 +1,309 @@
+"""HTTP record/replay cassettes for deterministic offline cycles.
+
+Recording captures every HTTP exchange made through ``requests`` (the tools,
+the Firecrawl client) and ``httpx`` (the Mistral chat client) into a JSONL
+cassette, with API keys, bot tokens and auth headers redacted. Replay serves
+those exchanges back in order per method+URL, either with the recorded
+latencies (``timing``) or as fast as possible (``fast``).
+
+Enable from the environment::
+
+    HTTP_CASSETTE=cycle.jsonl HTTP_CASSETTE_MODE=record python scheduler.py
+    HTTP_CASSETTE=cycle.jsonl HTTP_CASSETTE_MODE=fast python -m src.agent --auto
+
+or in code with ``with use_cassette("cycle.jsonl", "fast"): ...``.
+"""
+
+import base64
+import hashlib
+import json
+import re
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from contextlib import contextmanager
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+from src.config import config
+
+
+MODES = ("record", "timing", "fast")
+
+_SECRET_HEADERS = {"authorization", "x-api-key", "api-key", "cookie", "set-cookie", "proxy-authorization"}
+_DROP_RESPONSE_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection", "set-cookie"}
+_SECRET_KEYS = re.compile(r"(api[_-]?key|token|secret|password|authorization)", re.IGNORECASE)
+_BOT_TOKEN = re.compile(r"/bot[^/]+/")
+REDACTED = "<REDACTED>"
+
+
+class CassetteMiss(LookupError):
+    """Raised in replay when no recorded interaction matches a request."""
+
+
+def _secret_values() -> list:
+    values = [config.MISTRAL_API_KEY, config.COMPOSIO_API_KEY, config.TELEGRAM_BOT_TOKEN,
+              config.FIRECRAWL_API_KEY, config.LANGSMITH_API_KEY]
+    return sorted({v for v in values if v and len(v) >= 6}, key=len, reverse=True)
+
+
+def redact_text(text: str) -> str:
+    """Remove known secret values and Telegram bot tokens from a string."""
+    for secret in _secret_values():
+        text = text.replace(secret, REDACTED)
+    return _BOT_TOKEN.sub(f"/bot{REDACTED}/", text)
+
+
+def _redact_json(value):
+    if isinstance(value, dict):
+        return {k: REDACTED if _SECRET_KEYS.search(k) else _redact_json(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_redact_json(v) for v in value]
+    return value
+
+
+def redact_body(body: Optional[bytes]) -> Optional[str]:
+    if not body:
+        return None
+    text = body.decode("utf-8", errors="replace") if isinstance(body, (bytes, bytearray)) else str(body)
+    try:
+        text = json.dumps(_redact_json(json.loads(text)), sort_keys=True)
+    except ValueError:
+        pass
+    return redact_text(text)
+
+
+def _encode_body(content: bytes) -> dict:
+    try:
+        return {"text": redact_text(content.decode("utf-8"))}
+    except UnicodeDecodeError:
+        return {"base64": base64.b64encode(content).decode("ascii")}
+
+
+def _decode_body(entry: dict) -> bytes:
+    if "base64" in entry:
+        return base64.b64decode(entry["base64"])
+    return (entry.get("text") or "").encode("utf-8")
+
+
+class Cassette:
+    """A JSONL file of recorded HTTP interactions."""
+
+    def __init__(self, path: str, mode: str = "fast", match_body: bool = False):
+        if mode not in MODES:
+            raise ValueError(f"Unknown cassette mode {mode!r}; expected one of {MODES}")
+        self.path = path
+        self.mode = mode
+        self.match_body = match_body
+        self._lock = threading.Lock()
+        self._t0 = time.perf_counter()
+        self._queues: Dict[str, deque] = defaultdict(deque)
+        self.hits = 0
+        self.misses = 0
+        self.served: Counter = Counter()
+        if mode != "record":
+            with open(path, "r", encoding="utf-8") as fh:
+                for line in fh:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self._queues[entry["key"]].append(entry)
+        else:
+            open(path, "w").close()
+
+    def key(self, method: str, url: str, body: Optional[bytes]) -> str:
+        key = f"{method.upper()} {redact_text(url)}"
+        if self.match_body:
+            digest = hashlib.sha256((redact_body(body) or "").encode()).hexdigest()[:16]
+            key += f" #{digest}"
+        return key
+
+    def record(self, method: str, url: str, request_body, status: int, headers: dict,
+               content: bytes, elapsed_ms: float) -> None:
+        entry = {
+            "key": self.key(method, url, request_body),
+            "method": method.upper(),
+            "url": redact_text(url),
+            "request_body": redact_body(request_body),
+            "status": status,
+            "headers": {k: v for k, v in headers.items()
+                        if k.lower() not in _DROP_RESPONSE_HEADERS and k.lower() not in _SECRET_HEADERS},
+            "body": _encode_body(content),
+            "elapsed_ms": round(elapsed_ms, 2),
+            "offset_ms": round((time.perf_counter() - self._t0) * 1000, 2),
+        }
+        line = json.dumps(entry) + "\n"
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as fh:
+                fh.write(line)
+
+    def play(self, method: str, url: str, request_body) -> dict:
+        """Pop the next recorded interaction for this request, sleeping in ``timing`` mode."""
+        key = self.key(method, url, request_body)
+        with self._lock:
+            queue = self._queues.get(key)
+            if not queue:
+                self.misses += 1
+                raise CassetteMiss(f"No recorded interaction for {key}")
+            entry = queue.popleft()
+            self.hits += 1
+            self.served[urlparse(url).netloc] += 1
+        if self.mode == "timing" and entry.get("elapsed_ms"):
+            time.sleep(entry["elapsed_ms"] / 1000)
+        return entry
+
+
+_active: Optional[Cassette] = None
+_originals: dict = {}
+
+
+def _requests_send(adapter, request, **kwargs):
+    import requests
+    from requests.structures import CaseInsensitiveDict
+
+    cassette = _active
+    if cassette is None:
+        return _originals["requests"](adapter, request, **kwargs)
+
+    if cassette.mode == "record":
+        t0 = time.perf_counter()
+        response = _originals["requests"](adapter, request, **kwargs)
+        content = response.content
+        cassette.record(request.method, request.url, request.body, response.status_code,
+                        dict(response.headers), content, (time.perf_counter() - t0) * 1000)
+        return response
+
+    try:
+        entry = cassette.play(request.method, request.url, request.body)
+    except CassetteMiss as e:
+        raise requests.ConnectionError(str(e), request=request)
+    response = requests.Response()
+    response.status_code = entry["status"]
+    response.headers = CaseInsensitiveDict(entry["headers"])
+    response._content = _decode_body(entry["body"])
+    response.url = request.url
+    response.request = request
+    response.reason = "OK" if entry["status"] < 400 else "Error"
+    response.encoding = "utf-8"
+    response.connection = adapter
+    return response
+
+
+def _httpx_entry_to_response(entry: dict, request):
+    import httpx
+
+    return httpx.Response(entry["status"], headers=entry["headers"], content=_decode_body(entry["body"]), request=request)
+
+
+def _httpx_send(transport, request):
+    import httpx
+
+    cassette = _active
+    if cassette is None:
+        return _originals["httpx"](transport, request)
+
+    url = str(request.url)
+    if cassette.mode == "record":
+        t0 = time.perf_counter()
+        response = _originals["httpx"](transport, request)
+        content = response.read()
+        cassette.record(request.method, url, request.content, response.status_code,
+                        dict(response.headers), content, (time.perf_counter() - t0) * 1000)
+        return httpx.Response(response.status_code, headers=response.headers, content=content, request=request)
+
+    try:
+        entry = cassette.play(request.method, url, request.content)
+    except CassetteMiss as e:
+        raise httpx.ConnectError(str(e), request=request)
+    return _httpx_entry_to_response(entry, request)
+
+
+async def _httpx_send_async(transport, request):
+    import asyncio
+    import httpx
+
+    cassette = _active
+    if cassette is None:
+        return await _originals["httpx_async"](transport, request)
+
+    url = str(request.url)
+    if cassette.mode == "record":
+        t0 = time.perf_counter()
+        response = await _originals["httpx_async"](transport, request)
+        content = await response.aread()
+        cassette.record(request.method, url, request.content, response.status_code,
+                        dict(response.headers), content, (time.perf_counter() - t0) * 1000)
+        return httpx.Response(response.status_code, headers=response.headers, content=content, request=request)
+
+    try:
+        entry = await asyncio.to_thread(cassette.play, request.method, url, request.content)
+    except CassetteMiss as e:
+        raise httpx.ConnectError(str(e), request=request)
+    return _httpx_entry_to_response(entry, request)
+
+
+def _patch() -> None:
+    if _originals:
+        return
+    try:
+        from requests.adapters import HTTPAdapter
+
+        _originals["requests"] = HTTPAdapter.send
+        HTTPAdapter.send = _requests_send
+    except ImportError:
+        pass
+    try:
+        import httpx
+
+        _originals["httpx"] = httpx.HTTPTransport.handle_request
+        _originals["httpx_async"] = httpx.AsyncHTTPTransport.handle_async_request
+        httpx.HTTPTransport.handle_request = _httpx_send
+        httpx.AsyncHTTPTransport.handle_async_request = _httpx_send_async
+    except ImportError:
+        pass
+
+
+def _unpatch() -> None:
+    if "requests" in _originals:
+        from requests.adapters import HTTPAdapter
+
+        HTTPAdapter.send = _originals["requests"]
+    if "httpx" in _originals:
+        import httpx
+
+        httpx.HTTPTransport.handle_request = _originals["httpx"]
+        httpx.AsyncHTTPTransport.handle_async_request = _originals["httpx_async"]
+    _originals.clear()
+
+
+def install(path: str, mode: str = "fast", match_body: bool = False) -> Cassette:
+    """Route all ``requests``/``httpx`` traffic through a cassette until ``uninstall()``."""
+    global _active
+    cassette = Cassette(path, mode, match_body)
+    _patch()
+    _active = cassette
+    print(f"[CASSETTE] {mode} mode -> {path}")
+    return cassette
+
+
+def uninstall() -> None:
+    global _active
+    if _active is not None and _active.mode != "record":
+        print(f"[CASSETTE] Replay finished: {_active.hits} hits, {_active.misses} misses")
+    _active = None
+    _unpatch()
+
+
+@contextmanager
+def use_cassette(path: str, mode: str = "fast", match_body: bool = False):
+    cassette = install(path, mode, match_body)
+    try:
+        yield cassette
+    finally:
+        uninstall()
+
+
+def install_from_env() -> Optional[Cassette]:
+    """Install a cassette when ``HTTP_CASSETTE`` is set (mode from ``HTTP_CASSETTE_MODE``)."""
+    if not config.HTTP_CASSETTE:
+        return None
+    return install(config.HTTP_CASSETTE, config.HTTP_CASSETTE_MODE)
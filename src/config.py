@@ -21,6 +21,18 @@ class Config:
     MISTRAL_API_KEY: str = os.getenv("MISTRAL_API_KEY", "")
     MISTRAL_MODEL: str = os.getenv("MISTRAL_MODEL", "mistral-large-latest")
     
+    # Per-role models (see src/models.py); the writer defaults to MISTRAL_MODEL
+    MODEL_CASCADE: bool = os.getenv("MODEL_CASCADE", "true").lower() == "true"
+    MODEL_ROUTER: str = os.getenv("MODEL_ROUTER", "mistral-small-latest")
+    MODEL_ROUTER_TEMPERATURE: float = float(os.getenv("MODEL_ROUTER_TEMPERATURE", "0.0"))
+    MODEL_ROUTER_MAX_TOKENS: int = int(os.getenv("MODEL_ROUTER_MAX_TOKENS", "1024"))
+    MODEL_EXTRACTOR: str = os.getenv("MODEL_EXTRACTOR", "mistral-small-latest")
+    MODEL_EXTRACTOR_TEMPERATURE: float = float(os.getenv("MODEL_EXTRACTOR_TEMPERATURE", "0.0"))
+    MODEL_EXTRACTOR_MAX_TOKENS: int = int(os.getenv("MODEL_EXTRACTOR_MAX_TOKENS", "2048"))
+    MODEL_WRITER: str = os.getenv("MODEL_WRITER", MISTRAL_MODEL)
+    MODEL_WRITER_TEMPERATURE: float = float(os.getenv("MODEL_WRITER_TEMPERATURE", "0.3"))
+    MODEL_WRITER_MAX_TOKENS: int = int(os.getenv("MODEL_WRITER_MAX_TOKENS", "0"))
+    
     # LangSmith settings (new format)
     LANGSMITH_API_KEY: str = os.getenv("LANGSMITH_API_KEY", "")
     LANGSMITH_TRACING: bool = os.getenv("LANGSMITH_TRACING", "false").lower() == "true"
@@ -51,10 +63,142 @@ class Config:
     
     # Firecrawl settings (for DeFi/crypto research)
     FIRECRAWL_API_KEY: str = os.getenv("FIRECRAWL_API_KEY", "")
+    FIRECRAWL_BATCH_POLL_SECONDS: float = float(os.getenv("FIRECRAWL_BATCH_POLL_SECONDS", "2"))
+    FIRECRAWL_BATCH_TIMEOUT_SECONDS: float = float(os.getenv("FIRECRAWL_BATCH_TIMEOUT_SECONDS", "120"))
+    
+    # Service endpoints (override to point at local stand-ins, see benchmarks/)
+    COMPOSIO_BASE_URL: str = os.getenv("COMPOSIO_BASE_URL", "https://backend.composio.dev/api/v3")
+    TELEGRAM_API_BASE: str = os.getenv("TELEGRAM_API_BASE", "https://api.telegram.org")
+    POLLINATIONS_BASE_URL: str = os.getenv("POLLINATIONS_BASE_URL", "https://image.pollinations.ai")
+    FIRECRAWL_API_URL: str = os.getenv("FIRECRAWL_API_URL", "https://api.firecrawl.dev")
+    MISTRAL_BASE_URL: str = os.getenv("MISTRAL_BASE_URL", "https://api.mistral.ai/v1")
+    YIELDBOT_URL: str = os.getenv("YIELDBOT_URL", "https://yieldbot.cc")
+    
+    # Market data from JSON price APIs ('coingecko', 'coinmarketcap', 'fake' or 'none'; see src/market_data.py)
+    MARKET_DATA_PROVIDER: str = os.getenv("MARKET_DATA_PROVIDER", "coingecko")
+    COINGECKO_API_URL: str = os.getenv("COINGECKO_API_URL", "https://api.coingecko.com/api/v3")
+    COINGECKO_API_KEY: str = os.getenv("COINGECKO_API_KEY", "")
+    COINMARKETCAP_API_URL: str = os.getenv("COINMARKETCAP_API_URL", "https://pro-api.coinmarketcap.com")
+    COINMARKETCAP_API_KEY: str = os.getenv("COINMARKETCAP_API_KEY", "")
+    MARKET_SYMBOLS: str = os.getenv("MARKET_SYMBOLS", "BTC,ETH,SOL")
+    MARKET_TRENDING_LIMIT: int = int(os.getenv("MARKET_TRENDING_LIMIT", "7"))
+    MARKET_DATA_TTL_SECONDS: float = float(os.getenv("MARKET_DATA_TTL_SECONDS", "120"))
+    
+    # Rolling price history across cycles (see src/timeseries.py)
+    TIMESERIES_WINDOW: int = int(os.getenv("TIMESERIES_WINDOW", "1024"))
+    TIMESERIES_MIN_INTERVAL_SECONDS: float = float(os.getenv("TIMESERIES_MIN_INTERVAL_SECONDS", "300"))
+    # Top-movers analytics over that history (see src/analytics.py)
+    TREND_WINDOWS_HOURS: str = os.getenv("TREND_WINDOWS_HOURS", "6,72,168")
+    TREND_HISTORY_SAMPLES: int = int(os.getenv("TREND_HISTORY_SAMPLES", "256"))
+    TREND_MOMENTUM_SAMPLES: int = int(os.getenv("TREND_MOMENTUM_SAMPLES", "6"))
+    TREND_STALE_HOURS: float = float(os.getenv("TREND_STALE_HOURS", "6"))
+    
+    # HTML text extraction ('auto', 'lxml', 'stream' or 'bs4'; see src/html_extract.py)
+    HTML_PARSER: str = os.getenv("HTML_PARSER", "auto")
+    # Sections of yieldbot.cc to extract (simple selectors, comma-separated); empty = whole page
+    YIELDBOT_SELECTORS: str = os.getenv("YIELDBOT_SELECTORS", "")
+    HTML_SCAN_CHARS: int = int(os.getenv("HTML_SCAN_CHARS", "50000"))
+    
+    # In-process caches for repeated tool reads (see src/cache.py); CACHE_MAX_BYTES is per cache
+    CACHE_MAX_BYTES: int = int(os.getenv("CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+    SCRAPE_CACHE_TTL_SECONDS: float = float(os.getenv("SCRAPE_CACHE_TTL_SECONDS", "900"))
+    RESEARCH_CACHE_TTL_SECONDS: float = float(os.getenv("RESEARCH_CACHE_TTL_SECONDS", "3600"))
+    
+    # Time budget per cycle and circuit breakers per external service (see src/resilience.py)
+    CYCLE_DEADLINE_SECONDS: float = float(os.getenv("CYCLE_DEADLINE_SECONDS", "600"))
+    CYCLE_OPTIONAL_RESERVE_SECONDS: float = float(os.getenv("CYCLE_OPTIONAL_RESERVE_SECONDS", "120"))
+    HTTP_TIMEOUT_SECONDS: float = float(os.getenv("HTTP_TIMEOUT_SECONDS", "20"))
+    FIRECRAWL_TIMEOUT_SECONDS: float = float(os.getenv("FIRECRAWL_TIMEOUT_SECONDS", "60"))
+    BREAKER_FAILURE_THRESHOLD: int = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "3"))
+    BREAKER_RESET_SECONDS: float = float(os.getenv("BREAKER_RESET_SECONDS", "300"))
+    
+    # Research tools started in the background at cycle start (see src/prefetch.py); empty disables
+    PREFETCH_TOOLS: str = os.getenv("PREFETCH_TOOLS", "monitor_telegram_group,fast_scrape_and_cache,scrape_yieldbot_website")
+    # Longest wait at post time for the background image render and upload (see src/media_pipeline.py)
+    MEDIA_PIPELINE_TIMEOUT_SECONDS: float = float(os.getenv("MEDIA_PIPELINE_TIMEOUT_SECONDS", "90"))
+    
+    # Post content generation and the local platform rules (see src/content.py, src/content_validator.py)
+    CONTENT_CANDIDATES: int = int(os.getenv("CONTENT_CANDIDATES", "3"))
+    CONTENT_REQUIRED_TOKENS: str = os.getenv("CONTENT_REQUIRED_TOKENS", "$YBOT")
+    CONTENT_REPLY_LINK: str = os.getenv("CONTENT_REPLY_LINK", "https://yieldbot.cc")
+    CONTENT_MIN_HASHTAGS: int = int(os.getenv("CONTENT_MIN_HASHTAGS", "2"))
+    CONTENT_MAX_HASHTAGS: int = int(os.getenv("CONTENT_MAX_HASHTAGS", "3"))
+    CONTENT_DEFAULT_HASHTAGS: str = os.getenv("CONTENT_DEFAULT_HASHTAGS", "#DeFi,#AI,#Crypto")
+    CONTENT_SIMILARITY_THRESHOLD: float = float(os.getenv("CONTENT_SIMILARITY_THRESHOLD", "0.8"))
+    
+    # Publish stage of the LangGraph workflow: parallel platform branches with retries (see src/graph.py)
+    GRAPH_PUBLISH_STAGE: bool = os.getenv("GRAPH_PUBLISH_STAGE", "false").lower() == "true"
+    PUBLISH_RETRY_ATTEMPTS: int = int(os.getenv("PUBLISH_RETRY_ATTEMPTS", "3"))
+    PUBLISH_RETRY_INTERVAL_SECONDS: float = float(os.getenv("PUBLISH_RETRY_INTERVAL_SECONDS", "2"))
+    
+    # HTTP record/replay cassette (modes: record, timing, fast)
+    HTTP_CASSETTE: str = os.getenv("HTTP_CASSETTE", "")
+    HTTP_CASSETTE_MODE: str = os.getenv("HTTP_CASSETTE_MODE", "fast")
+    
+    # Directory for daily caches and reports (defaults to the project root)
+    DATA_DIR: str = os.getenv("YBOT_DATA_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
     
-    # Memory settings
+    # Memory settings ('memory', 'sqlite' or 'postgres')
     MEMORY_BACKEND: str = os.getenv("MEMORY_BACKEND", "memory")
     DATABASE_URL: str = os.getenv("DATABASE_URL", "")
+    SQLITE_MEMORY_PATH: str = os.getenv("SQLITE_MEMORY_PATH", "ybot_memory.db")
+    POSTGRES_POOL_MAX_SIZE: int = int(os.getenv("POSTGRES_POOL_MAX_SIZE", "10"))
+    MEMORY_RETENTION_DAYS: int = int(os.getenv("MEMORY_RETENTION_DAYS", "14"))
+    CHECKPOINT_KEEP_LAST: int = int(os.getenv("CHECKPOINT_KEEP_LAST", "20"))
+    STORE_TTL_MINUTES: int = int(os.getenv("STORE_TTL_MINUTES", "0"))
+    
+    # Tool exposure per model call ('phase' = only tools for the current phase/intent, 'all')
+    TOOL_EXPOSURE: str = os.getenv("TOOL_EXPOSURE", "phase").lower()
+    
+    # Conversation context budget (per model call)
+    CONTEXT_MAX_TOKENS: int = int(os.getenv("CONTEXT_MAX_TOKENS", "12000"))
+    CONTEXT_KEEP_TURNS: int = int(os.getenv("CONTEXT_KEEP_TURNS", "2"))
+    CONTEXT_TOOL_OUTPUT_CHARS: int = int(os.getenv("CONTEXT_TOOL_OUTPUT_CHARS", "600"))
+    CONTEXT_LLM_SUMMARY: bool = os.getenv("CONTEXT_LLM_SUMMARY", "false").lower() == "true"
+    
+    # Project tool results to the fields the model needs (full payloads go to the blob store)
+    TOOL_PROJECTION: bool = os.getenv("TOOL_PROJECTION", "true").lower() == "true"
+    PROJECTION_TEXT_CHARS: int = int(os.getenv("PROJECTION_TEXT_CHARS", "1500"))
+    
+    # Out-of-line storage for large tool outputs (BLOB_DIR defaults to DATA_DIR/blobs)
+    BLOB_DIR: str = os.getenv("BLOB_DIR", "")
+    BLOB_OFFLOAD_CHARS: int = int(os.getenv("BLOB_OFFLOAD_CHARS", "4000"))
+    BLOB_RETENTION_DAYS: int = int(os.getenv("BLOB_RETENTION_DAYS", "7"))
+    
+    # Streaming HTTP API (python -m src.server)
+    SERVER_HOST: str = os.getenv("SERVER_HOST", "0.0.0.0")
+    SERVER_PORT: int = int(os.getenv("PORT", os.getenv("SERVER_PORT", "8000")))
+    SERVER_AGENT: str = os.getenv("SERVER_AGENT", "deep")
+    SERVER_MAX_CONCURRENCY: int = int(os.getenv("SERVER_MAX_CONCURRENCY", "2"))
+    SERVER_MAX_QUEUE: int = int(os.getenv("SERVER_MAX_QUEUE", "8"))
+    SERVER_API_TOKEN: str = os.getenv("SERVER_API_TOKEN", "")
+    
+    # Batch day-ahead generation (scheduler publishes from a queue instead of full cycles)
+    BATCH_MODE: bool = os.getenv("BATCH_MODE", "false").lower() == "true"
+    BATCH_SIZE: int = int(os.getenv("BATCH_SIZE", "8"))
+    BATCH_MIN_PENDING: int = int(os.getenv("BATCH_MIN_PENDING", "2"))
+    BATCH_SLOT_MINUTES: int = int(os.getenv("BATCH_SLOT_MINUTES", "90"))
+    BATCH_CHECK_MINUTES: int = int(os.getenv("BATCH_CHECK_MINUTES", "180"))
+    BATCH_REGEN_THRESHOLD_PCT: float = float(os.getenv("BATCH_REGEN_THRESHOLD_PCT", "5.0"))
+    PUBLISH_QUEUE_PATH: str = os.getenv("PUBLISH_QUEUE_PATH", "publish_queue.db")
+    
+    # Run history ledger (SQLite, append-only)
+    RUN_LEDGER_PATH: str = os.getenv("RUN_LEDGER_PATH", "run_history.db")
+    
+    # Engagement metrics of published posts (see src/engagement.py)
+    ENGAGEMENT_DB_PATH: str = os.getenv("ENGAGEMENT_DB_PATH", "engagement.db")
+    ENGAGEMENT_REFRESH_MINUTES: int = int(os.getenv("ENGAGEMENT_REFRESH_MINUTES", "15"))
+    ENGAGEMENT_MIN_REFRESH_MINUTES: float = float(os.getenv("ENGAGEMENT_MIN_REFRESH_MINUTES", "15"))
+    ENGAGEMENT_MAX_REFRESH_HOURS: float = float(os.getenv("ENGAGEMENT_MAX_REFRESH_HOURS", "24"))
+    ENGAGEMENT_REFRESH_FACTOR: float = float(os.getenv("ENGAGEMENT_REFRESH_FACTOR", "0.25"))
+    ENGAGEMENT_MAX_AGE_DAYS: float = float(os.getenv("ENGAGEMENT_MAX_AGE_DAYS", "14"))
+    ENGAGEMENT_BATCH_SIZE: int = int(os.getenv("ENGAGEMENT_BATCH_SIZE", "100"))
+    ENGAGEMENT_MAX_BATCHES: int = int(os.getenv("ENGAGEMENT_MAX_BATCHES", "3"))
+    
+    # Telemetry spans: comma-separated sinks from memory, jsonl, langsmith (or 'off')
+    TELEMETRY_SINKS: str = os.getenv("TELEMETRY_SINKS", "memory")
+    TELEMETRY_JSONL_PATH: str = os.getenv("TELEMETRY_JSONL_PATH", "telemetry_spans.jsonl")
+    TELEMETRY_BUFFER_SIZE: int = int(os.getenv("TELEMETRY_BUFFER_SIZE", "2048"))
     
     @classmethod
     def validate(cls) -> bool:
@@ -78,6 +222,11 @@ class Config:
             os.environ["LANGCHAIN_PROJECT"] = cls.LANGSMITH_PROJECT
             return True
         return False
+    
+    @classmethod
+    def data_path(cls, filename: str) -> str:
+        """Path of a cache/report file inside DATA_DIR."""
+        return os.path.join(cls.DATA_DIR, filename)
 
 
 config = Config()
@@ -0,0 +1,129 @@
+"""Every platform variant of a post from one structured model call.
+
+The autonomous prompt used to write the tweet, the reply, the LinkedIn
+version and the Telegram text in separate turns, each a full model round
+trip after the previous post went out. ``PostContent`` holds all of them
+(plus the hashtags and the tokens the post cites) and is filled in at once:
+
+- ``generate_content`` - one structured-output call from a research
+  snapshot. It asks for ``CONTENT_CANDIDATES`` alternatives and keeps the
+  best one that passes the platform rules
+- the ``publish_content`` tool - the agent writes ``PostContent`` as the
+  tool's arguments in one call, and the tool publishes every variant
+- ``publish`` - fan-out to the publish tools (tweet, reply to it, LinkedIn,
+  Telegram), returning one outcome per platform
+
+``finalize`` runs the platform rules of ``src.content_validator`` with their
+auto-fixes. Content that still breaks a rule is not published.
+
+``batch.PostDraft`` extends ``PostContent`` with a slot and an angle, so
+queued posts are written and published the same way.
+"""
+
+from typing import Iterable, List, Optional, Tuple
+
+from pydantic import BaseModel, Field
+
+from src import content_validator
+from src.config import config
+from src.market_data import normalize_symbols
+from src.models import invoke_structured
+
+
+class PostContent(BaseModel):
+    """One post and its per-platform variants."""
+
+    tweet: str = Field(description="Tweet text, max 280 chars, includes $YBOT, no emojis")
+    reply: str = Field(description="Unique reply pointing to https://yieldbot.cc")
+    linkedin: str = Field(description="Professional LinkedIn version, max 3000 chars")
+    telegram: str = Field(description="Telegram message text")
+    hashtags: List[str] = Field(default_factory=list, description="The 2-3 hashtags used in the tweet, e.g. '#DeFi'")
+    tokens: List[str] = Field(default_factory=list,
+                              description="Symbols of the tokens the post cites real numbers for, e.g. 'SOL'")
+
+
+class ContentCandidates(BaseModel):
+    """Alternative posts for the same snapshot; the best valid one is published."""
+
+    candidates: List[PostContent]
+
+
+CONTENT_PROMPT = """You are YBot, the content writer for Yieldbot ($YBOT). Using ONLY the research
+snapshot below, write {count} alternative post(s) with different angles, each with all of its
+platform versions. The tweet is max 280 characters, includes $YBOT and 2-3 hashtags, uses real
+numbers from the snapshot and NO EMOJIS, and must not repeat any of the recently published tweets. The reply is short, unique and links to
+https://yieldbot.cc. The LinkedIn version is professional, explains abbreviations and DeFi
+concepts, max 3000 characters. The Telegram text may add one line of context to the tweet.
+{focus}
+Recently published tweets:
+{recent}
+
+Research snapshot:
+{snapshot}"""
+
+
+def recent_posts(limit: int = 20) -> List[str]:
+    """Recently published or queued tweet and reply texts, for the uniqueness rules."""
+    from src import engagement
+    from src.batch import PublishQueue
+
+    def queued() -> List[str]:
+        with PublishQueue() as queue:
+            return queue.recent_tweets(limit)
+
+    texts = []
+    for source in (queued, lambda: engagement.recent_texts("twitter", limit)):
+        try:
+            texts.extend(source())
+        except Exception as e:
+            print(f"[CONTENT] Could not read recent posts: {e}")
+    return list(dict.fromkeys(texts))
+
+
+def _normalize(content: PostContent) -> PostContent:
+    content.hashtags = list(dict.fromkeys(f"#{tag.strip().lstrip('#')}" for tag in content.hashtags if tag.strip("# ")))
+    content.tokens = normalize_symbols(content.tokens)
+    return content
+
+
+def finalize(content: PostContent, history: Iterable[str] = ()) -> Tuple[PostContent, List[str]]:
+    """Normalize hashtags and tokens and apply the platform rules; returns the content and the issues left."""
+    content, issues, fixes = content_validator.repair(_normalize(content), list(history))
+    if fixes:
+        print(f"[CONTENT] Auto-fixed: {', '.join(fixes)}")
+    return content, issues
+
+
+def generate_content(snapshot: str, history: Iterable[str] = (), focus: str = "", model=None,
+                     candidates: Optional[int] = None) -> Tuple[PostContent, List[str]]:
+    """All variants of one post in a single structured model call, plus the rule issues it still has.
+
+    With ``candidates`` > 1 (default ``CONTENT_CANDIDATES``) the call returns
+    that many alternatives and the best one after auto-fixes is kept.
+    """
+    history = list(history)
+    count = max(1, candidates or config.CONTENT_CANDIDATES)
+    prompt = CONTENT_PROMPT.format(
+        count=count,
+        focus=f"Focus: {focus}\n" if focus else "",
+        recent="\n".join(f"- {t}" for t in history[:10]) or "- (none)",
+        snapshot=snapshot[:20000],
+    )
+    schema = ContentCandidates if count > 1 else PostContent
+    if model is not None:
+        result = model.with_structured_output(schema).invoke(prompt)
+    else:
+        result = invoke_structured(schema, prompt, role="writer")
+    drafts = result.candidates if count > 1 else [result]
+    content, issues, fixes = content_validator.best([_normalize(d) for d in drafts], history)
+    if fixes:
+        print(f"[CONTENT] Auto-fixed: {', '.join(fixes)}")
+    if issues:
+        print(f"[CONTENT] Best of {len(drafts)} candidates still breaks: {'; '.join(issues)}")
+    return content, issues
+
+
+def publish(content: PostContent, tools: Optional[dict] = None) -> List[dict]:
+    """Publish every variant and return per-platform outcomes (see ``batch.publish_post``)."""
+    from src.batch import publish_post
+    return publish_post(content.model_dump(), tools)
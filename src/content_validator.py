@@ -0,0 +1,294 @@
+"""Deterministic platform rules for post content, with minimal auto-fixes.
+
+The platform rules (280 characters, no emojis, ``$YBOT``, 2-3 hashtags, a
+unique reply) used to live only in the prompt. A miss showed up as an API
+rejection or a Twitter duplicate 403, and the model spent more turns
+rewriting. Every variant of a ``PostContent`` now goes through the rules in
+``RULES`` before it is published:
+
+- ``NoEmojis``      - strips emoji and pictographs
+- ``RequiredText``  - e.g. ``$YBOT`` in the tweet; appended when missing
+- ``HashtagCount``  - drops extra hashtags, or adds the post's own (then the
+  defaults) when there are too few
+- ``Unique``        - an exact repeat of a recent post gets a UTC time stamp
+  when that makes it pass (e.g. the reply); a near-duplicate, or a repeat
+  still too similar with the stamp, cannot be fixed locally
+- ``MaxLength``     - Twitter texts are measured with twitter-text weights
+  (URLs count 23, most non-Latin characters count 2) and shortened by
+  dropping the last words that are not hashtags, links, time stamps or
+  required tokens; other texts are cut at a word boundary
+
+``repair`` applies the fixes and returns the issues no fix could resolve.
+``best`` repairs several candidates and picks the one with the fewest
+remaining issues, then the fewest fixes. Rules are plain objects with
+``check`` and ``fix``; add one for a field with ``add_rule``.
+"""
+
+import re
+import time
+import unicodedata
+from abc import ABC, abstractmethod
+from difflib import SequenceMatcher
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from src.config import config
+
+
+URL_WEIGHT = 23
+# twitter-text v3: code points in these ranges weigh 1, everything else 2
+_LIGHT_RANGES = ((0x0000, 0x10FF), (0x2000, 0x200D), (0x2010, 0x201F), (0x2032, 0x2037))
+
+_URL_RE = re.compile(r"https?://\S+", re.IGNORECASE)
+_HASHTAG_RE = re.compile(r"(?<![\w#])#\w+")
+_STAMP_RE = re.compile(r"^\d{1,2}:\d{2}(:\d{2})?$|^UTC[.,;:!?]*$")
+_EMOJI_RE = re.compile(
+    "[\U0001F000-\U0001FAFF\U00002600-\U000027BF\U00002300-\U000023FF\U00002B00-\U00002BFF"
+    "\U0001F1E6-\U0001F1FF\U0000FE0F\U0000200D\U000020E3]"
+)
+
+
+def _char_weight(ch: str) -> int:
+    cp = ord(ch)
+    return 1 if any(start <= cp <= end for start, end in _LIGHT_RANGES) else 2
+
+
+def weighted_length(text: str) -> int:
+    """Length as Twitter counts it (twitter-text v3 weights, URLs as 23)."""
+    text = unicodedata.normalize("NFC", text or "")
+    length, pos = 0, 0
+    for match in _URL_RE.finditer(text):
+        length += sum(map(_char_weight, text[pos:match.start()])) + URL_WEIGHT
+        pos = match.end()
+    return length + sum(map(_char_weight, text[pos:]))
+
+
+def strip_emojis(text: str) -> str:
+    text = _EMOJI_RE.sub("", text)
+    return "\n".join(re.sub(r"[ \t]{2,}", " ", line).strip() for line in text.splitlines()).strip()
+
+
+def normalize_text(text: str) -> str:
+    return " ".join((text or "").lower().split())
+
+
+def too_similar(text: str, history: Iterable[str], threshold: float = 0.8) -> bool:
+    norm = normalize_text(text)
+    return any(SequenceMatcher(None, norm, normalize_text(h)).ratio() >= threshold for h in history)
+
+
+def hashtags(text: str) -> List[str]:
+    return _HASHTAG_RE.findall(text or "")
+
+
+def _protected(word: str, keep: Sequence[str]) -> bool:
+    word = word.strip()
+    return bool(_HASHTAG_RE.fullmatch(word.rstrip(".,;:!?")) or _URL_RE.match(word) or _STAMP_RE.match(word)
+                or any(k and k in word for k in keep))
+
+
+def fit(text: str, limit: int, keep: Sequence[str] = ()) -> str:
+    """Drop the last unprotected words until ``text`` is within ``limit`` weighted characters."""
+    words = text.split(" ")
+    while weighted_length(" ".join(words)) > limit:
+        index = next((i for i in range(len(words) - 1, -1, -1) if not _protected(words[i], keep)), None)
+        if index is None:
+            break
+        del words[index]
+    text = " ".join(w for w in words if w)
+    return re.sub(r"\s+([.,;:!?])", r"\1", re.sub(r"[,;:\-]+(\s+#)", r"\1", text))
+
+
+def clip(text: str, limit: int) -> str:
+    """Cut ``text`` to ``limit`` characters at a word boundary."""
+    if len(text) <= limit:
+        return text
+    cut = text[:limit]
+    return (cut.rsplit(None, 1)[0] if " " in cut else cut).rstrip(" ,;:-")
+
+
+class Rule(ABC):
+    """One check on one text field; ``fix`` returns the text unchanged when it cannot help."""
+
+    name = "rule"
+
+    @abstractmethod
+    def check(self, text: str, context: dict) -> Optional[str]:
+        """The issue with ``text``, or None when it passes."""
+
+    def fix(self, text: str, context: dict) -> str:
+        return text
+
+
+class NoEmojis(Rule):
+    name = "no_emojis"
+
+    def check(self, text, context):
+        return "contains emojis" if _EMOJI_RE.search(text) else None
+
+    def fix(self, text, context):
+        return strip_emojis(text)
+
+
+class RequiredText(Rule):
+    name = "required_text"
+
+    def __init__(self, *needles: str):
+        self.needles = [n for n in needles if n]
+
+    def _missing(self, text: str) -> List[str]:
+        return [n for n in self.needles if n not in text]
+
+    def check(self, text, context):
+        missing = self._missing(text)
+        return f"missing {', '.join(missing)}" if missing else None
+
+    def fix(self, text, context):
+        for needle in self._missing(text):
+            pattern = re.compile(re.escape(needle), re.IGNORECASE)
+            text = pattern.sub(needle, text) if pattern.search(text) else f"{text} {needle}"
+        return text
+
+
+class HashtagCount(Rule):
+    name = "hashtag_count"
+
+    def __init__(self, minimum: int, maximum: int, defaults: Sequence[str] = ()):
+        self.minimum, self.maximum, self.defaults = minimum, maximum, list(defaults)
+
+    def check(self, text, context):
+        count = len(hashtags(text))
+        if count < self.minimum or count > self.maximum:
+            return f"{count} hashtags (want {self.minimum}-{self.maximum})"
+        return None
+
+    def fix(self, text, context):
+        tags = hashtags(text)
+        if len(tags) > self.maximum:
+            for tag in tags[self.maximum:]:
+                text = re.sub(rf"\s*(?<![\w#]){re.escape(tag)}\b", "", text, count=1)
+            return text.strip()
+        present = {t.lower() for t in tags}
+        for tag in [*context.get("hashtags", []), *self.defaults]:
+            if len(present) >= self.minimum:
+                break
+            if tag.lower() not in present:
+                text, present = f"{text} {tag}", present | {tag.lower()}
+        return text
+
+
+class Unique(Rule):
+    """Not a repeat of a recent post (``context["history"]``) or of the ``other`` fields of this post."""
+
+    name = "unique"
+
+    def __init__(self, threshold: Optional[float] = None, other: Sequence[str] = ()):
+        self.threshold = threshold
+        self.other = list(other)
+
+    def _history(self, context: dict) -> List[str]:
+        return [*context.get("history", []), *(context["fields"].get(f, "") for f in self.other)]
+
+    def check(self, text, context):
+        history = self._history(context)
+        norm = normalize_text(text)
+        if any(norm == normalize_text(h) for h in history):
+            return "repeats a recent post"
+        if self.threshold is not None and too_similar(text, history, self.threshold):
+            return "too similar to a recent post"
+        return None
+
+    def fix(self, text, context):
+        history = {normalize_text(h) for h in self._history(context)}
+        if normalize_text(text) not in history:
+            return text  # near-duplicates need a rewrite
+        for stamp in (time.strftime("%H:%M UTC", time.gmtime()), time.strftime("%H:%M:%S UTC", time.gmtime())):
+            stamped = f"{text} {stamp}"
+            # A stamp only helps if the result is not still too similar
+            if self.check(stamped, context) is None:
+                return stamped
+        return text
+
+
+class MaxLength(Rule):
+    name = "max_length"
+
+    def __init__(self, limit: int, weighted: bool = False, keep: Sequence[str] = ()):
+        self.limit, self.weighted, self.keep = limit, weighted, list(keep)
+
+    def measure(self, text: str) -> int:
+        return weighted_length(text) if self.weighted else len(text)
+
+    def check(self, text, context):
+        length = self.measure(text)
+        return f"{length} characters (max {self.limit})" if length > self.limit else None
+
+    def fix(self, text, context):
+        return fit(text, self.limit, self.keep) if self.weighted else clip(text, self.limit)
+
+
+def _csv(value: str) -> List[str]:
+    return [v.strip() for v in (value or "").split(",") if v.strip()]
+
+
+def default_rules() -> Dict[str, List[Rule]]:
+    """Rules per ``PostContent`` field, from the ``CONTENT_*`` settings; fixes run in this order."""
+    required = _csv(config.CONTENT_REQUIRED_TOKENS)
+    link = config.CONTENT_REPLY_LINK
+    return {
+        "tweet": [NoEmojis(), RequiredText(*required),
+                  HashtagCount(config.CONTENT_MIN_HASHTAGS, config.CONTENT_MAX_HASHTAGS,
+                               _csv(config.CONTENT_DEFAULT_HASHTAGS)),
+                  Unique(config.CONTENT_SIMILARITY_THRESHOLD), MaxLength(280, weighted=True, keep=required)],
+        "reply": [NoEmojis(), RequiredText(link), Unique(other=["tweet"]),
+                  MaxLength(280, weighted=True, keep=[link])],
+        "linkedin": [NoEmojis(), MaxLength(3000)],
+        "telegram": [NoEmojis(), MaxLength(4096)],
+    }
+
+
+RULES: Dict[str, List[Rule]] = default_rules()
+
+
+def add_rule(field: str, rule: Rule) -> None:
+    """Run ``rule`` on ``field`` after the built-in rules."""
+    RULES.setdefault(field, []).append(rule)
+
+
+def _context(content, history: Sequence[str]) -> dict:
+    fields = {name: getattr(content, name) or "" for name in RULES if hasattr(content, name)}
+    return {"history": list(history), "fields": fields, "hashtags": list(getattr(content, "hashtags", []) or [])}
+
+
+def validate(content, history: Sequence[str] = ()) -> List[str]:
+    """Issues as ``"<field>: <problem>"``; empty when every rule passes."""
+    context = _context(content, history)
+    return [f"{field}: {issue}" for field, text in context["fields"].items() for rule in RULES[field]
+            if (issue := rule.check(text, context))]
+
+
+def repair(content, history: Sequence[str] = ()) -> Tuple[object, List[str], List[str]]:
+    """A fixed copy of ``content``, the issues left and the fixes applied (``"<field>: <rule>"``)."""
+    context = _context(content, history)
+    fixes = []
+    for _ in range(2):  # a second pass catches a fix that broke an earlier rule
+        for field, rules in RULES.items():
+            if field not in context["fields"]:
+                continue
+            for rule in rules:
+                text = context["fields"][field]
+                if rule.check(text, context) is None:
+                    continue
+                fixed = rule.fix(text, context)
+                if fixed != text:
+                    context["fields"][field] = fixed
+                    fixes.append(f"{field}: {rule.name}")
+    repaired = content.model_copy(update=context["fields"])
+    return repaired, validate(repaired, history), fixes
+
+
+def best(candidates: Iterable, history: Sequence[str] = ()) -> Tuple[object, List[str], List[str]]:
+    """The repaired candidate with the fewest remaining issues, then the fewest fixes."""
+    results = [repair(candidate, history) for candidate in candidates]
+    if not results:
+        raise ValueError("no content candidates")
+    return min(results, key=lambda r: (len(r[1]), len(r[2])))
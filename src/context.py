@@ -0,0 +1,174 @@
+"""Token-budgeted conversation context for long-running threads.
+
+Interactive sessions reuse one thread, so every turn would otherwise re-send
+the whole history, including multi-kilobyte scrape results. ``ContextCompactor``
+keeps system messages and the most recent turns verbatim, shrinks older tool
+outputs to short stubs and, if the history is still over budget, folds the
+oldest turns into a single cached summary message.
+
+It is used as a node in ``src.graph`` and as ``ContextBudgetMiddleware`` for
+the deep agent.
+"""
+
+import hashlib
+from collections import OrderedDict
+from typing import Callable, List, Optional
+
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage, ToolMessage
+from langchain_core.messages.utils import count_tokens_approximately
+
+from src.config import config
+
+
+SUMMARY_ID = "context-summary"
+SUMMARY_HEADER = "Summary of earlier conversation:\n"
+
+
+def _text(message: BaseMessage) -> str:
+    content = message.content
+    if isinstance(content, str):
+        return content
+    return " ".join(part.get("text", "") if isinstance(part, dict) else str(part) for part in content)
+
+
+def extractive_summary(messages: List[BaseMessage], max_chars: int = 1500) -> str:
+    """Cheap summary: user requests, assistant answers and which tools ran."""
+    lines = []
+    for message in messages:
+        if isinstance(message, HumanMessage):
+            lines.append(f"User: {_text(message)[:200]}")
+        elif isinstance(message, ToolMessage):
+            lines.append(f"Tool {message.name or 'tool'} returned {len(_text(message))} chars")
+        elif message.type == "ai" and _text(message).strip():
+            lines.append(f"Assistant: {_text(message)[:300]}")
+    summary = "\n".join(lines)
+    return summary[:max_chars]
+
+
+def llm_summarizer(model) -> Callable[[List[BaseMessage]], str]:
+    """Build a summarizer that asks ``model`` for a short digest of dropped turns."""
+
+    def summarize(messages: List[BaseMessage]) -> str:
+        transcript = extractive_summary(messages, max_chars=6000)
+        response = model.invoke([
+            SystemMessage(content="Summarize this earlier part of the conversation in at most 8 short bullet "
+                                  "points. Keep concrete facts: token symbols, prices, post IDs, user preferences."),
+            HumanMessage(content=transcript),
+        ])
+        return _text(response)
+
+    return summarize
+
+
+class ContextCompactor:
+    """Keeps a message list under a token budget, caching stubs and summaries."""
+
+    def __init__(self, max_tokens: Optional[int] = None, keep_turns: Optional[int] = None,
+                 tool_output_chars: Optional[int] = None,
+                 summarizer: Optional[Callable[[List[BaseMessage]], str]] = None,
+                 cache_size: int = 256):
+        self.max_tokens = max_tokens or config.CONTEXT_MAX_TOKENS
+        self.keep_turns = keep_turns or config.CONTEXT_KEEP_TURNS
+        self.tool_output_chars = tool_output_chars or config.CONTEXT_TOOL_OUTPUT_CHARS
+        self.summarizer = summarizer or extractive_summary
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, str]" = OrderedDict()
+
+    def _cached(self, key: str, compute: Callable[[], str]) -> str:
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+        value = compute()
+        self._cache[key] = value
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return value
+
+    def _stub(self, message: ToolMessage) -> ToolMessage:
+        text = _text(message)
+        key = "stub:" + (message.id or hashlib.sha1(text.encode()).hexdigest())
+        content = self._cached(key, lambda: (
+            f"[earlier {message.name or 'tool'} output compacted from {len(text)} chars] "
+            f"{text[:self.tool_output_chars]}"
+        ))
+        return message.model_copy(update={"content": content})
+
+    def _recent_start(self, messages: List[BaseMessage]) -> int:
+        """Index where the last ``keep_turns`` user turns begin."""
+        human_positions = [i for i, m in enumerate(messages) if isinstance(m, HumanMessage)]
+        if len(human_positions) <= self.keep_turns:
+            return human_positions[0] if human_positions else 0
+        return human_positions[-self.keep_turns]
+
+    def compact(self, messages: List[BaseMessage]) -> List[BaseMessage]:
+        """Return a budgeted copy of ``messages``; returns the same list when already within budget."""
+        messages = list(messages)
+        if count_tokens_approximately(messages) <= self.max_tokens:
+            return messages
+
+        prefix = [m for m in messages if isinstance(m, SystemMessage) and m.id != SUMMARY_ID]
+        previous_summary = next((m for m in messages if isinstance(m, SystemMessage) and m.id == SUMMARY_ID), None)
+        body = [m for m in messages if not isinstance(m, SystemMessage)]
+        start = self._recent_start(body)
+        old, recent = body[:start], body[start:]
+
+        # 1. Shrink old tool outputs to stubs
+        old = [
+            self._stub(m) if isinstance(m, ToolMessage) and len(_text(m)) > self.tool_output_chars else m
+            for m in old
+        ]
+        summary = previous_summary
+        candidate = prefix + ([summary] if summary else []) + old + recent
+        if count_tokens_approximately(candidate) <= self.max_tokens or not old:
+            return candidate
+
+        # 2. Fold the old turns into one summary message. Whole turns only, so
+        #    tool calls never lose their results; each turn is summarized once
+        #    and cached, so the summary grows incrementally as turns age out.
+        parts = [_text(previous_summary)] if previous_summary else []
+        for turn in self._turns(old):
+            key = "summary:" + hashlib.sha1("|".join(m.id or _text(m)[:64] for m in turn).encode()).hexdigest()
+            parts.append(self._cached(key, lambda turn=turn: self.summarizer(turn)))
+        text = "\n".join(p for p in parts if p).removeprefix(SUMMARY_HEADER)[-4000:]
+        summary = SystemMessage(content=SUMMARY_HEADER + text, id=SUMMARY_ID)
+        return prefix + [summary] + recent
+
+    @staticmethod
+    def _turns(messages: List[BaseMessage]) -> List[List[BaseMessage]]:
+        turns: List[List[BaseMessage]] = []
+        for message in messages:
+            if isinstance(message, HumanMessage) or not turns:
+                turns.append([])
+            turns[-1].append(message)
+        return turns
+
+
+def context_node(compactor: ContextCompactor):
+    """LangGraph node that rewrites the thread's messages to the compacted list when over budget."""
+    from langgraph.graph.message import REMOVE_ALL_MESSAGES
+    from langchain_core.messages import RemoveMessage
+
+    def manage_context(state: dict) -> dict:
+        messages = state["messages"]
+        compacted = compactor.compact(messages)
+        if len(compacted) == len(messages) and all(a is b for a, b in zip(compacted, messages)):
+            return {}
+        return {"messages": [RemoveMessage(id=REMOVE_ALL_MESSAGES), *compacted]}
+
+    return manage_context
+
+
+def context_middleware(compactor: Optional[ContextCompactor] = None):
+    """Deep-agent middleware that sends the model a budgeted view of the history."""
+    from langchain.agents.middleware import AgentMiddleware
+
+    compactor = compactor or ContextCompactor()
+
+    class ContextBudgetMiddleware(AgentMiddleware):
+        def wrap_model_call(self, request, handler):
+            return handler(request.override(messages=compactor.compact(request.messages)))
+
+        async def awrap_model_call(self, request, handler):
+            return await handler(request.override(messages=compactor.compact(request.messages)))
+
+    return ContextBudgetMiddleware()
@@ -0,0 +1,323 @@
+"""Engagement tracking for published posts.
+
+Every post ID the run ledger records as published is added to
+``tracked_posts``. Metrics are fetched in multi-ID lookups, up to
+``ENGAGEMENT_BATCH_SIZE`` posts per request, only for posts that are due. A
+post's next check is scheduled in proportion to its age, so it is checked
+often while fresh and rarely once old:
+
+    interval = clamp(age * ENGAGEMENT_REFRESH_FACTOR,
+                     ENGAGEMENT_MIN_REFRESH_MINUTES, ENGAGEMENT_MAX_REFRESH_HOURS)
+
+Tracking stops after ``ENGAGEMENT_MAX_AGE_DAYS``, or after three lookups
+that no longer return the post (deleted). A refresh makes at most
+``ENGAGEMENT_MAX_BATCHES`` requests. Posts left over stay due for the next
+refresh, so a backlog never turns into a burst of API calls.
+
+Each fetch updates the post's latest counters and appends a row to
+``metric_samples``. ``summary()`` answers the aggregate questions (totals,
+engagement rate, top posts, best hours) from the local tables.
+
+Metrics are fetched for Twitter (``TWITTER_POST_LOOKUP_BY_POST_IDS`` via
+Composio, 100 IDs per call). LinkedIn and Telegram IDs are recorded, but
+their APIs offer no batched metrics lookup for these accounts, so they are
+not polled; add a fetcher to ``FETCHERS`` to change that.
+"""
+
+import sqlite3
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, List, Optional
+
+from src import http_client
+from src.config import config
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tracked_posts (
+    platform TEXT NOT NULL,
+    post_id TEXT NOT NULL,
+    run_id TEXT,
+    text TEXT,
+    published_at REAL NOT NULL,
+    next_check_at REAL,
+    last_checked_at REAL,
+    checks INTEGER NOT NULL DEFAULT 0,
+    misses INTEGER NOT NULL DEFAULT 0,
+    impressions INTEGER,
+    likes INTEGER,
+    reposts INTEGER,
+    replies INTEGER,
+    quotes INTEGER,
+    bookmarks INTEGER,
+    PRIMARY KEY (platform, post_id)
+);
+CREATE TABLE IF NOT EXISTS metric_samples (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    platform TEXT NOT NULL,
+    post_id TEXT NOT NULL,
+    fetched_at REAL NOT NULL,
+    impressions INTEGER,
+    likes INTEGER,
+    reposts INTEGER,
+    replies INTEGER,
+    quotes INTEGER,
+    bookmarks INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_tracked_due ON tracked_posts(platform, next_check_at);
+CREATE INDEX IF NOT EXISTS idx_samples_post ON metric_samples(platform, post_id);
+"""
+
+METRICS = ("impressions", "likes", "reposts", "replies", "quotes", "bookmarks")
+MAX_MISSES = 3
+
+# Ledger platform name -> tracked platform (replies are tweets too)
+PLATFORMS = {"twitter": "twitter", "twitter_reply": "twitter", "linkedin": "linkedin", "telegram": "telegram"}
+
+
+class EngagementError(RuntimeError):
+    """A metrics lookup that returned an error response."""
+
+
+def connect(path: Optional[str] = None) -> sqlite3.Connection:
+    """Open the engagement database, creating the schema on first use."""
+    conn = sqlite3.connect(path or config.ENGAGEMENT_DB_PATH, timeout=10)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def next_interval(age_seconds: float) -> float:
+    """Seconds until the next check of a post that is ``age_seconds`` old."""
+    return min(max(age_seconds * config.ENGAGEMENT_REFRESH_FACTOR, config.ENGAGEMENT_MIN_REFRESH_MINUTES * 60),
+               config.ENGAGEMENT_MAX_REFRESH_HOURS * 3600)
+
+
+def _next_check(published_at: float, now: float) -> Optional[float]:
+    age = now - published_at
+    if age > config.ENGAGEMENT_MAX_AGE_DAYS * 86400:
+        return None
+    return now + next_interval(age)
+
+
+def fetch_twitter_metrics(ids: List[str]) -> Dict[str, dict]:
+    """Public metrics for up to 100 tweets in one Composio call; deleted tweets are missing."""
+    response = http_client.post(
+        f"{config.COMPOSIO_BASE_URL}/tools/execute/TWITTER_POST_LOOKUP_BY_POST_IDS",
+        json={
+            "connected_account_id": config.TWITTER_CONNECTED_ACCOUNT_ID,
+            "user_id": config.COMPOSIO_USER_ID,
+            "name": "TWITTER_POST_LOOKUP_BY_POST_IDS",
+            "arguments": {"ids": list(ids), "tweet_fields": ["public_metrics", "created_at"]},
+        },
+        headers={"x-api-key": config.COMPOSIO_API_KEY, "Content-Type": "application/json"},
+        service="composio",
+    )
+    try:
+        result = response.json()
+    except ValueError:
+        raise EngagementError(f"Tweet lookup failed ({response.status_code}): {response.text[:300]}")
+    if not result.get("successful"):
+        raise EngagementError(f"Tweet lookup failed: {str(result.get('error') or result)[:300]}")
+    data = result.get("data") or {}
+    tweets = data.get("data") if isinstance(data, dict) else data
+    metrics = {}
+    for tweet in tweets or []:
+        public = tweet.get("public_metrics") or {}
+        metrics[str(tweet.get("id"))] = {
+            "text": tweet.get("text"),
+            "impressions": public.get("impression_count"),
+            "likes": public.get("like_count"),
+            "reposts": public.get("retweet_count"),
+            "replies": public.get("reply_count"),
+            "quotes": public.get("quote_count"),
+            "bookmarks": public.get("bookmark_count"),
+        }
+    return metrics
+
+
+# Platform -> fetch(ids) -> {post_id: metrics}; each call gets at most ENGAGEMENT_BATCH_SIZE IDs
+FETCHERS: Dict[str, Callable[[List[str]], Dict[str, dict]]] = {"twitter": fetch_twitter_metrics}
+
+
+def track_post(platform: str, post_id: str, run_id: Optional[str] = None, text: Optional[str] = None,
+               published_at: Optional[float] = None, path: Optional[str] = None) -> bool:
+    """Start tracking a published post; returns False when it is already tracked."""
+    platform = PLATFORMS.get(platform, platform)
+    if not post_id:
+        return False
+    published_at = time.time() if published_at is None else published_at
+    # Platforms without a fetcher are recorded but never scheduled
+    next_check = published_at + next_interval(0) if platform in FETCHERS else None
+    conn = connect(path)
+    with conn:
+        cursor = conn.execute(
+            """INSERT OR IGNORE INTO tracked_posts (platform, post_id, run_id, text, published_at, next_check_at)
+               VALUES (?, ?, ?, ?, ?, ?)""",
+            (platform, str(post_id), run_id, text, published_at, next_check))
+    conn.close()
+    return cursor.rowcount > 0
+
+
+def track_published(run_id: str, publishes: Dict[str, dict], path: Optional[str] = None) -> int:
+    """Track every successful publish of a run (``RunRecorder.publishes``)."""
+    tracked = 0
+    for platform, outcome in publishes.items():
+        if outcome.get("outcome") == "ok" and outcome.get("post_id") and platform in PLATFORMS:
+            tracked += track_post(platform, outcome["post_id"], run_id, path=path)
+    return tracked
+
+
+def _store_metrics(conn: sqlite3.Connection, platform: str, rows: List[sqlite3.Row],
+                   metrics: Dict[str, dict], now: float) -> None:
+    updates, samples, misses = [], [], []
+    for row in rows:
+        found = metrics.get(row["post_id"])
+        next_check = _next_check(row["published_at"], now)
+        if found is None:
+            misses.append((None if row["misses"] + 1 >= MAX_MISSES else next_check, now, platform, row["post_id"]))
+            continue
+        values = tuple(found.get(m) for m in METRICS)
+        updates.append((next_check, now, found.get("text"), *values, platform, row["post_id"]))
+        samples.append((platform, row["post_id"], now, *values))
+    conn.executemany(
+        f"""UPDATE tracked_posts SET next_check_at = ?, last_checked_at = ?, checks = checks + 1,
+            text = COALESCE(text, ?), {', '.join(f'{m} = ?' for m in METRICS)} WHERE platform = ? AND post_id = ?""", updates)
+    conn.executemany(
+        f"INSERT INTO metric_samples (platform, post_id, fetched_at, {', '.join(METRICS)}) "
+        f"VALUES (?, ?, ?, {', '.join('?' * len(METRICS))})", samples)
+    conn.executemany(
+        """UPDATE tracked_posts SET next_check_at = ?, last_checked_at = ?, misses = misses + 1
+           WHERE platform = ? AND post_id = ?""", misses)
+
+
+def refresh_due(platforms: Optional[Iterable[str]] = None, include: Iterable[str] = (),
+                max_batches: Optional[int] = None, now: Optional[float] = None,
+                path: Optional[str] = None) -> dict:
+    """Fetch metrics for the posts that are due, in batched lookups.
+
+    ``include`` adds specific post IDs to the first batch even when they are
+    not due yet (``analyze_tweet_performance`` on one tweet piggybacks on the
+    due ones instead of spending a call of its own).
+    """
+    now = time.time() if now is None else now
+    max_batches = config.ENGAGEMENT_MAX_BATCHES if max_batches is None else max_batches
+    size = config.ENGAGEMENT_BATCH_SIZE
+    include = [str(i) for i in include]
+    summary = {"requests": 0, "updated": 0, "missing": 0, "errors": []}
+    conn = connect(path)
+    try:
+        for platform in platforms or FETCHERS:
+            fetch = FETCHERS.get(platform)
+            if fetch is None:
+                continue
+            rows = conn.execute(
+                f"""SELECT * FROM tracked_posts WHERE platform = ? AND
+                    (next_check_at <= ? OR post_id IN ({', '.join('?' * len(include))}))
+                    ORDER BY post_id IN ({', '.join('?' * len(include))}) DESC, next_check_at LIMIT ?""",
+                (platform, now, *include, *include, size * max_batches)).fetchall()
+            for start in range(0, len(rows), size):
+                batch = rows[start:start + size]
+                try:
+                    metrics = fetch([row["post_id"] for row in batch])
+                except Exception as e:
+                    # Leave the posts due; the next refresh retries them
+                    print(f"[ENGAGEMENT] {platform} lookup failed: {e}")
+                    summary["errors"].append(str(e)[:300])
+                    break
+                summary["requests"] += 1
+                with conn:
+                    _store_metrics(conn, platform, batch, metrics, now)
+                summary["updated"] += sum(1 for row in batch if row["post_id"] in metrics)
+                summary["missing"] += sum(1 for row in batch if row["post_id"] not in metrics)
+    finally:
+        conn.close()
+    if summary["requests"]:
+        print(f"[ENGAGEMENT] Refreshed {summary['updated']} posts in {summary['requests']} lookups"
+              f" ({summary['missing']} missing)")
+    return summary
+
+
+def _iso(ts: Optional[float]) -> Optional[str]:
+    return None if ts is None else datetime.fromtimestamp(ts, timezone.utc).replace(microsecond=0).isoformat()
+
+
+def recent_texts(platform: str, limit: int = 20, path: Optional[str] = None) -> List[str]:
+    """Texts of the most recent tracked posts (known once their metrics were looked up)."""
+    conn = connect(path)
+    rows = conn.execute(
+        "SELECT text FROM tracked_posts WHERE platform = ? AND text IS NOT NULL ORDER BY published_at DESC LIMIT ?",
+        (PLATFORMS.get(platform, platform), limit)).fetchall()
+    conn.close()
+    return [row["text"] for row in rows]
+
+
+def post_metrics(platform: str, post_id: str, path: Optional[str] = None) -> Optional[dict]:
+    """Latest counters and the number of samples for one tracked post."""
+    conn = connect(path)
+    row = conn.execute("SELECT * FROM tracked_posts WHERE platform = ? AND post_id = ?",
+                       (PLATFORMS.get(platform, platform), str(post_id))).fetchone()
+    samples = conn.execute("SELECT COUNT(*) FROM metric_samples WHERE platform = ? AND post_id = ?",
+                           (PLATFORMS.get(platform, platform), str(post_id))).fetchone()[0]
+    conn.close()
+    if row is None:
+        return None
+    return {
+        "platform": row["platform"],
+        "post_id": row["post_id"],
+        "published_at": _iso(row["published_at"]),
+        "last_checked_at": _iso(row["last_checked_at"]),
+        "next_check_at": _iso(row["next_check_at"]),
+        "samples": samples,
+        **{m: row[m] for m in METRICS},
+    }
+
+
+def summary(days: float = 7, platform: Optional[str] = None, top: int = 5,
+            now: Optional[float] = None, path: Optional[str] = None) -> dict:
+    """Totals, per-post averages, engagement rate, top posts and best UTC hours for recent posts."""
+    now = time.time() if now is None else now
+    since = now - days * 86400
+    engagement = " + ".join(f"COALESCE({m}, 0)" for m in METRICS if m != "impressions")
+    where, params = "published_at >= ?", [since]
+    if platform:
+        where += " AND platform = ?"
+        params.append(PLATFORMS.get(platform, platform))
+    conn = connect(path)
+    totals = conn.execute(
+        f"""SELECT platform, COUNT(*) AS posts, COUNT(last_checked_at) AS measured,
+                   {', '.join(f'SUM({m}) AS {m}' for m in METRICS)}, SUM({engagement}) AS engagement
+            FROM tracked_posts WHERE {where} GROUP BY platform""", params).fetchall()
+    top_posts = conn.execute(
+        f"""SELECT platform, post_id, text, published_at, impressions, likes, reposts, replies,
+                   {engagement} AS engagement
+            FROM tracked_posts WHERE {where} AND last_checked_at IS NOT NULL
+            ORDER BY engagement DESC LIMIT ?""", (*params, top)).fetchall()
+    hours = conn.execute(
+        f"""SELECT CAST(strftime('%H', published_at, 'unixepoch') AS INTEGER) AS hour,
+                   COUNT(*) AS posts, AVG({engagement}) AS avg_engagement
+            FROM tracked_posts WHERE {where} AND last_checked_at IS NOT NULL
+            GROUP BY hour ORDER BY avg_engagement DESC LIMIT 3""", params).fetchall()
+    conn.close()
+
+    platforms = {}
+    for row in totals:
+        measured = row["measured"] or 0
+        impressions = row["impressions"] or 0
+        platforms[row["platform"]] = {
+            "posts": row["posts"],
+            "measured": measured,
+            **{m: row[m] or 0 for m in METRICS},
+            "engagement": row["engagement"] or 0,
+            "avg_engagement": round((row["engagement"] or 0) / measured, 1) if measured else None,
+            "engagement_rate": round((row["engagement"] or 0) / impressions, 4) if impressions else None,
+        }
+    return {
+        "days": days,
+        "platforms": platforms,
+        "top_posts": [{**dict(r), "published_at": _iso(r["published_at"]),
+                       "text": (r["text"] or "")[:100] or None} for r in top_posts],
+        "best_hours_utc": [{"hour": r["hour"], "posts": r["posts"], "avg_engagement": round(r["avg_engagement"], 1)}
+                           for r in hours],
+    }
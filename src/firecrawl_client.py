@@ -0,0 +1,180 @@
+"""Shared Firecrawl client on top of ``src.http_client``.
+
+The research tools used to build a new SDK client per call, and the SDK
+opens a fresh connection per request. One client for the whole process
+talks to the Firecrawl v2 REST API through the shared session instead. That
+gives connection reuse, the ``firecrawl`` circuit breaker, cycle-budget
+timeouts and ``http`` spans like every other integration.
+
+Multi-URL research goes through the batch scrape job API: one submission
+for all targets, then polling. ``iter_batch_scrape`` yields each document as
+soon as the job reports it, so callers can use partial results before the
+whole batch has finished.
+"""
+
+import threading
+import time
+from typing import Dict, Iterator, List, Optional
+from urllib.parse import urlsplit, urlunsplit
+
+from src import http_client, resilience
+from src.config import config
+
+
+BATCH_DONE = ("completed", "failed", "cancelled")
+
+
+class FirecrawlError(RuntimeError):
+    """A Firecrawl request that returned an error response."""
+
+    def __init__(self, message: str, status: Optional[int] = None):
+        super().__init__(message)
+        self.status = status
+
+
+def normalize_url(url: str) -> str:
+    """Key used to de-duplicate results: lower-case host, no fragment or trailing slash."""
+    parts = urlsplit((url or "").strip())
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip("/"), parts.query, ""))
+
+
+def document_url(document: dict) -> Optional[str]:
+    metadata = document.get("metadata") or {}
+    return metadata.get("sourceURL") or metadata.get("url") or document.get("url")
+
+
+class FirecrawlClient:
+    """Minimal Firecrawl v2 client: scrape, search and batch scrape."""
+
+    def __init__(self, api_key: Optional[str] = None, api_url: Optional[str] = None):
+        self.api_key = api_key or config.FIRECRAWL_API_KEY
+        self.api_url = (api_url or config.FIRECRAWL_API_URL).rstrip("/")
+
+    def _request(self, method: str, path: str, payload: Optional[dict] = None) -> dict:
+        url = path if path.startswith("http") else f"{self.api_url}{path}"
+        response = http_client.request(
+            method, url, service="firecrawl", json=payload,
+            headers={"Authorization": f"Bearer {self.api_key}", "Content-Type": "application/json"},
+            timeout=config.FIRECRAWL_TIMEOUT_SECONDS,
+        )
+        try:
+            body = response.json()
+        except ValueError:
+            body = {"error": response.text[:300]}
+        if response.status_code == 429:
+            raise FirecrawlError(f"Rate Limit Exceeded: {body.get('error') or response.text[:200]}", 429)
+        if not response.ok or body.get("success") is False:
+            raise FirecrawlError(f"Firecrawl {method} {path} failed ({response.status_code}): "
+                                 f"{body.get('error') or response.text[:300]}", response.status_code)
+        return body
+
+    def scrape(self, url: str, formats: Optional[List[str]] = None, max_age: Optional[int] = None) -> dict:
+        """Scrape one page; returns the document (``markdown``, ``metadata``)."""
+        payload = {"url": url, "formats": formats or ["markdown"]}
+        if max_age is not None:
+            payload["maxAge"] = max_age
+        return self._request("POST", "/v2/scrape", payload).get("data") or {}
+
+    def search(self, query: str, limit: int = 5) -> dict:
+        """Search the web; returns result lists keyed by source (``web``, ``news``, ...)."""
+        data = self._request("POST", "/v2/search", {"query": query, "limit": limit}).get("data") or {}
+        return data if isinstance(data, dict) else {"web": data}
+
+    def start_batch_scrape(self, urls: List[str], formats: Optional[List[str]] = None,
+                           max_age: Optional[int] = None) -> str:
+        """Submit one batch scrape job for ``urls`` and return its ID."""
+        payload = {"urls": list(urls), "formats": formats or ["markdown"]}
+        if max_age is not None:
+            payload["maxAge"] = max_age
+        return self._request("POST", "/v2/batch/scrape", payload)["id"]
+
+    def batch_status(self, job_id: str) -> dict:
+        """Status, counts and every document scraped so far (following result pages)."""
+        body = self._request("GET", f"/v2/batch/scrape/{job_id}")
+        documents = list(body.get("data") or [])
+        next_url = body.get("next")
+        while next_url and body.get("status") in BATCH_DONE:
+            page = self._request("GET", next_url)
+            documents.extend(page.get("data") or [])
+            next_url = page.get("next")
+        return {"status": body.get("status"), "completed": body.get("completed", 0),
+                "total": body.get("total", 0), "data": documents}
+
+    def cancel_batch_scrape(self, job_id: str) -> None:
+        try:
+            self._request("DELETE", f"/v2/batch/scrape/{job_id}")
+        except Exception as e:
+            print(f"[FIRECRAWL] Could not cancel batch {job_id}: {e}")
+
+    def iter_batch_scrape(self, urls: List[str], formats: Optional[List[str]] = None,
+                          max_age: Optional[int] = None,
+                          poll_seconds: Optional[float] = None,
+                          timeout: Optional[float] = None) -> Iterator[dict]:
+        """Yield documents of a batch scrape as they complete.
+
+        The job is polled every ``poll_seconds`` (default
+        ``FIRECRAWL_BATCH_POLL_SECONDS``). Polling stops after ``timeout``
+        seconds (default ``FIRECRAWL_BATCH_TIMEOUT_SECONDS``, applies even
+        outside a cycle) or at the cycle deadline, and the job is cancelled,
+        so a slow or stuck batch returns whatever finished in time.
+        """
+        poll_seconds = config.FIRECRAWL_BATCH_POLL_SECONDS if poll_seconds is None else poll_seconds
+        timeout = config.FIRECRAWL_BATCH_TIMEOUT_SECONDS if timeout is None else timeout
+        job_id = self.start_batch_scrape(urls, formats, max_age)
+        give_up = time.monotonic() + timeout
+        seen = set()
+        while True:
+            status = self.batch_status(job_id)
+            for document in status["data"]:
+                key = normalize_url(document_url(document) or "")
+                if key not in seen:
+                    seen.add(key)
+                    yield document
+            if status["status"] in BATCH_DONE:
+                if status["status"] != "completed":
+                    print(f"[FIRECRAWL] Batch {job_id} ended as {status['status']}")
+                return
+            if time.monotonic() + poll_seconds > give_up:
+                print(f"[FIRECRAWL] Batch {job_id}: not done after {timeout:.0f}s "
+                      f"({status['completed']}/{status['total']} documents)")
+                self.cancel_batch_scrape(job_id)
+                return
+            try:
+                resilience.sleep(poll_seconds)
+            except resilience.DeadlineExceeded:
+                print(f"[FIRECRAWL] Batch {job_id}: out of cycle budget after "
+                      f"{status['completed']}/{status['total']} documents")
+                self.cancel_batch_scrape(job_id)
+                return
+
+
+def merge_search_results(*results: dict) -> Dict[str, list]:
+    """Merge search result dicts (``web``/``news``/...), keeping the first hit per URL."""
+    merged: Dict[str, list] = {}
+    seen = set()
+    for result in results:
+        for source, items in (result or {}).items():
+            if not isinstance(items, list):
+                continue
+            for item in items:
+                url = item.get("url") if isinstance(item, dict) else None
+                key = normalize_url(url) if url else None
+                if key and key in seen:
+                    continue
+                if key:
+                    seen.add(key)
+                merged.setdefault(source, []).append(item)
+    return merged
+
+
+_client: Optional[FirecrawlClient] = None
+_client_lock = threading.Lock()
+
+
+def get_firecrawl() -> FirecrawlClient:
+    """The process-wide Firecrawl client."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = FirecrawlClient()
+        return _client
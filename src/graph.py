@@ -1,13 +1,28 @@
 """LangGraph workflow definitions for AI Agent YBot."""
 
-from typing import Annotated, TypedDict, Sequence
-from langchain_core.messages import BaseMessage, HumanMessage, AIMessage
+import json
+import re
+import threading
+import uuid
+from http import HTTPStatus
+from typing import Annotated, Callable, Dict, List, Optional, TypedDict, Sequence
+import requests
+from langchain_core.messages import BaseMessage, HumanMessage, AIMessage, ToolMessage
 from langgraph.graph import StateGraph, END
 from langgraph.graph.message import add_messages
 from langgraph.prebuilt import ToolNode
+from langgraph.types import RetryPolicy
+from pydantic import ValidationError
 
+from src import resilience
+from src.blobs import expand_blob_refs
+from src.content import PostContent, finalize, recent_posts
+from src.context import ContextCompactor, context_node, llm_summarizer
+from src.models import get_model, invoke_with_cascade
+from src.resilience import expired
+from src.run_ledger import PUBLISH_TOOLS, outcome_from_result
+from src.tool_registry import select_tools, tool_schema
 from src.tools import get_all_tools
-from langchain_mistralai import ChatMistralAI
 from src.config import config
 
 
@@ -16,7 +31,171 @@ class AgentState(TypedDict):
     messages: Annotated[Sequence[BaseMessage], add_messages]
 
 
-def create_agent_graph():
+def merge_outcomes(current: Optional[List[dict]], update: Optional[List[dict]]) -> List[dict]:
+    """Reducer for ``outcomes``: branches append theirs, ``None`` clears the list."""
+    if update is None:
+        return []
+    return (current or []) + update
+
+
+class PublishState(AgentState):
+    """Agent state plus the publish stage: the final content and the merged branch outcomes.
+
+    ``outcomes`` only holds the current publish; it is cleared when a publish
+    starts and again once ``merge`` has reported it, so checkpointed threads
+    do not grow with every post.
+    """
+    content: Optional[dict]
+    publish_id: Optional[str]
+    publish_call_id: Optional[str]
+    outcomes: Annotated[List[dict], merge_outcomes]
+
+
+TELEGRAM_CHAT = "@yieldbotai"
+
+# Publish errors without an HTTP status that a retry cannot fix (the same text stays a duplicate)
+PERMANENT_PHRASES = ("duplicate content",)
+
+# Exceptions from a publish tool that a retry may get past; any other exception is a bug
+TRANSIENT_EXCEPTIONS = (requests.RequestException, TimeoutError, ConnectionError, resilience.CircuitOpenError)
+
+# Result fields that carry the HTTP status of a failed call (Telegram reports ``error_code``)
+STATUS_FIELDS = ("status_code", "error_code", "http_status")
+ERROR_FIELDS = ("error", "description", "message", "detail")
+
+# A status in error text counts only when labelled ("status 403", "code: 400") or followed by
+# its reason phrase ("403 Forbidden"), so ids, prices and durations ("4003 ms") never match
+_STATUS_RE = re.compile(
+    r"\b(?:status(?:[ _]code)?|http|error[ _]code|code)\W{0,3}([1-5]\d\d)\b"
+    r"|\b([1-5]\d\d) (?:" + "|".join(re.escape(s.phrase) for s in HTTPStatus if s >= 400) + r")\b",
+    re.IGNORECASE,
+)
+
+
+class PublishRetry(RuntimeError):
+    """A publish branch failed transiently; raised so the branch's RetryPolicy runs it again."""
+
+
+def _twitter_steps(content: dict, done: Dict[str, dict]) -> List[tuple]:
+    steps = [("twitter_create_post", {"text": content["tweet"]})]
+    tweet = done.get("twitter")
+    if tweet and tweet["outcome"] == "ok" and tweet.get("post_id") and content.get("reply"):
+        steps.append(("twitter_reply_to_post", {"tweet_id": tweet["post_id"], "reply_text": content["reply"]}))
+    return steps
+
+
+# Branch -> the (tool, kwargs) steps it runs, given the content and the outcomes so far
+PUBLISH_BRANCHES: Dict[str, Callable[[dict, Dict[str, dict]], List[tuple]]] = {
+    "twitter": _twitter_steps,
+    "linkedin": lambda content, done: [("linkedin_create_post", {"commentary": content["linkedin"]})],
+    "telegram": lambda content, done: [("send_telegram_message",
+                                        {"chat_id": TELEGRAM_CHAT, "text": content["telegram"] or content["tweet"]})],
+}
+
+
+def status_code(result) -> Optional[int]:
+    """HTTP status reported by a failed publish result, or None when it does not give one."""
+    if isinstance(result, str):
+        match = _STATUS_RE.search(result)
+        return int(match.group(1) or match.group(2)) if match else None
+    if not isinstance(result, dict):
+        return None
+    for field in STATUS_FIELDS:
+        value = result.get(field)
+        if isinstance(value, int) and 100 <= value < 600:
+            return value
+    for value in result.values():
+        if isinstance(value, dict):
+            code = status_code(value)
+            if code is not None:
+                return code
+    for field in ERROR_FIELDS:
+        if isinstance(result.get(field), str):
+            code = status_code(result[field])
+            if code is not None:
+                return code
+    return None
+
+
+def is_retryable(result, error: Optional[BaseException] = None) -> bool:
+    """Whether a failed publish may succeed when tried again.
+
+    Exceptions are classified by type and results by the HTTP status they
+    report: 408, 429 and 5xx are transient, any other status is not. Results
+    without a status are retried unless they report duplicate content.
+    """
+    if error is not None:
+        return isinstance(error, TRANSIENT_EXCEPTIONS)
+    code = status_code(result)
+    if code is not None:
+        return code == 408 or resilience.is_failure_status(code)
+    text = (result if isinstance(result, str) else json.dumps(result, default=str)).lower()
+    return not any(phrase in text for phrase in PERMANENT_PHRASES)
+
+
+def publish_branch(name: str, tools: Dict[str, object]) -> Callable:
+    """Graph node that publishes the content to one platform.
+
+    Outcomes of earlier attempts are kept per publish, so a retry only redoes
+    the steps that failed (a retried reply does not post the tweet again).
+    Transient failures raise ``PublishRetry`` while attempts and cycle time
+    remain; after that the branch returns its failed outcomes like any other.
+    """
+    progress: Dict[str, dict] = {}
+    lock = threading.Lock()
+
+    def run_step(tool: str, kwargs: dict) -> tuple:
+        """The step's outcome, and whether a failure is worth retrying."""
+        if tool not in tools:
+            return {"platform": PUBLISH_TOOLS[tool], "outcome": "skipped", "error": f"{tool} not available"}, False
+        error = None
+        try:
+            result = tools[tool].func(**kwargs)
+        except Exception as e:
+            result, error = {"error": str(e)}, e
+        outcome = outcome_from_result(PUBLISH_TOOLS[tool], result)
+        return outcome, outcome["outcome"] == "error" and is_retryable(result, error)
+
+    def node(state: PublishState) -> dict:
+        with lock:
+            entry = progress.setdefault(state["publish_id"], {"attempts": 0, "done": {}, "retry": {}})
+            entry["attempts"] += 1
+        done, retry = entry["done"], entry["retry"]
+        while True:
+            pending = [(tool, kwargs) for tool, kwargs in PUBLISH_BRANCHES[name](state["content"], done)
+                       if (done.get(PUBLISH_TOOLS[tool]) or {}).get("outcome") != "ok"]
+            if not pending:
+                break
+            for tool, kwargs in pending:
+                done[PUBLISH_TOOLS[tool]], retry[PUBLISH_TOOLS[tool]] = run_step(tool, kwargs)
+            if any(done[PUBLISH_TOOLS[tool]]["outcome"] != "ok" for tool, _ in pending):
+                break
+        left = resilience.remaining()
+        failed = [f"{p}: {o['error']}" for p, o in done.items() if o["outcome"] == "error" and retry.get(p)]
+        if failed and entry["attempts"] < config.PUBLISH_RETRY_ATTEMPTS \
+                and (left is None or left > config.PUBLISH_RETRY_INTERVAL_SECONDS * 2):
+            print(f"[PUBLISH] {name} attempt {entry['attempts']} failed ({'; '.join(failed)}); retrying")
+            raise PublishRetry("; ".join(failed))
+        with lock:
+            progress.pop(state["publish_id"], None)
+        return {"outcomes": [{**o, "publish_id": state["publish_id"]} for o in done.values()]}
+
+    return node
+
+
+def route_content(state: PublishState):
+    """Rejected content goes back to the model; final content fans out to the platform branches."""
+    if not state.get("content"):
+        return "context"
+    return [f"publish_{name}" for name in PUBLISH_BRANCHES
+            if name != "linkedin" or state["content"].get("linkedin")]
+
+
+def _publish_call(message) -> Optional[dict]:
+    return next((c for c in getattr(message, "tool_calls", None) or [] if c["name"] == "publish_content"), None)
+
+
+def create_agent_graph(checkpointer=None, publish_stage: Optional[bool] = None):
     """
     Create the LangGraph agent workflow.
     
@@ -26,26 +205,46 @@ def create_agent_graph():
     3. Execute tools and process results
     4. Provide final responses
     
+    Each turn is answered by the model role chosen in ``src.models`` (router
+    or writer, with escalation). A context node runs before every model turn
+    and keeps the thread under ``CONTEXT_MAX_TOKENS`` (see ``src.context``),
+    so long sessions do not re-send their whole history.
+    
+    With the publish stage (``GRAPH_PUBLISH_STAGE``, off by default) the model
+    publishes only through ``publish_content``. That call leaves the agent
+    loop for a ``content`` node, which applies the platform rules. The
+    Twitter (post + reply), LinkedIn and Telegram branches then run in
+    parallel, each with its own ``RetryPolicy``. Their outcomes are merged
+    by the ``outcomes`` reducer, so content is live everywhere after the
+    slowest platform rather than after all of them in turn.
+    
+    Args:
+        checkpointer: Optional checkpointer (see ``src.memory.get_checkpointer``)
+            to persist thread state between invocations.
+        publish_stage: Override ``GRAPH_PUBLISH_STAGE``.
+    
     Returns:
         Compiled LangGraph workflow.
     """
-    # Initialize the Mistral LLM
-    llm = ChatMistralAI(
-        model=config.MISTRAL_MODEL,
-        api_key=config.MISTRAL_API_KEY,
-        temperature=0.7,
-    )
+    publish_stage = config.GRAPH_PUBLISH_STAGE if publish_stage is None else publish_stage
     
     # Get available tools
     tools = get_all_tools()
+    # With the publish stage, single-platform publish tools are not offered to the model
+    model_tools = [t for t in tools if not (publish_stage and t.name in PUBLISH_TOOLS)]
     
-    # Bind tools to the LLM
-    llm_with_tools = llm.bind_tools(tools)
+    # Keep the message history within the token budget
+    compactor = ContextCompactor(
+        summarizer=llm_summarizer(get_model("extractor")) if config.CONTEXT_LLM_SUMMARY else None
+    )
     
     # Define the agent node
     def agent_node(state: AgentState) -> dict:
         """Process messages and decide on next action."""
-        response = llm_with_tools.invoke(state["messages"])
+        messages = state["messages"]
+        # Past the cycle deadline the model gets no tools and has to wrap up
+        exposed = [] if expired() else [tool_schema(t) for t in select_tools(messages, model_tools)]
+        response = invoke_with_cascade(expand_blob_refs(messages), exposed)
         return {"messages": [response]}
     
     # Define the conditional edge function
@@ -53,6 +252,10 @@ def create_agent_graph():
         """Determine if we should continue to tools or end."""
         last_message = state["messages"][-1]
         
+        # Final content leaves the agent loop for the publish stage
+        if publish_stage and _publish_call(last_message):
+            return "content"
+        
         # If the LLM made a tool call, route to tools
         if hasattr(last_message, "tool_calls") and last_message.tool_calls:
             return "tools"
@@ -60,31 +263,83 @@ def create_agent_graph():
         # Otherwise, end the conversation
         return END
     
+    # Publish stage: validate the content, then fan out to the platform branches
+    def content_node(state: PublishState) -> dict:
+        """Check the ``publish_content`` call; invalid content goes back to the model."""
+        message = state["messages"][-1]
+        call = _publish_call(message)
+        # Other tool calls of the same turn are not run once the content is final
+        replies = [ToolMessage(content=json.dumps({"status": "skipped", "reason": "publishing"}),
+                               name=c["name"], tool_call_id=c["id"])
+                   for c in message.tool_calls if c["id"] != call["id"]]
+        try:
+            content, issues = finalize(PostContent(**call["args"]), recent_posts())
+        except ValidationError as e:
+            content, issues = None, [str(e)]
+        if issues:
+            print(f"[PUBLISH] Content rejected: {'; '.join(issues)}")
+            replies.append(ToolMessage(content=json.dumps({"status": "invalid", "issues": issues, "published": False}),
+                                       name="publish_content", tool_call_id=call["id"]))
+            return {"messages": replies, "content": None, "publish_id": None}
+        return {"messages": replies, "content": content.model_dump(), "publish_id": uuid.uuid4().hex,
+                "publish_call_id": call["id"], "outcomes": None}
+    
+    def merge_node(state: PublishState) -> dict:
+        """Report the merged branch outcomes as the ``publish_content`` result."""
+        outcomes = [{k: v for k, v in o.items() if k != "publish_id"}
+                    for o in state["outcomes"] if o.get("publish_id") == state["publish_id"]]
+        status = "success" if any(o["outcome"] == "ok" for o in outcomes) else "error"
+        summary = "; ".join(f"{o['platform']}: {o['outcome']}" + (f" ({o['post_id']})" if o.get("post_id") else "")
+                            + (f" - {o['error']}" if o.get("error") else "") for o in outcomes)
+        print(f"[PUBLISH] {summary}")
+        return {
+            "messages": [
+                ToolMessage(content=json.dumps({"status": status, "outcomes": outcomes}),
+                            name="publish_content", tool_call_id=state["publish_call_id"]),
+                AIMessage(content=f"Published - {summary}"),
+            ],
+            "content": None,
+            "outcomes": None,
+        }
+    
     # Create the graph
-    workflow = StateGraph(AgentState)
+    workflow = StateGraph(PublishState if publish_stage else AgentState)
     
     # Add nodes
+    workflow.add_node("context", context_node(compactor))
     workflow.add_node("agent", agent_node)
     workflow.add_node("tools", ToolNode(tools))
     
     # Set entry point
-    workflow.set_entry_point("agent")
+    workflow.set_entry_point("context")
+    workflow.add_edge("context", "agent")
     
     # Add conditional edges
+    routes = {"tools": "tools", END: END}
+    if publish_stage:
+        routes["content"] = "content"
+        by_name = {t.name: t for t in tools}
+        retry = RetryPolicy(max_attempts=config.PUBLISH_RETRY_ATTEMPTS,
+                            initial_interval=config.PUBLISH_RETRY_INTERVAL_SECONDS, retry_on=PublishRetry)
+        workflow.add_node("content", content_node)
+        workflow.add_node("merge", merge_node)
+        for name in PUBLISH_BRANCHES:
+            workflow.add_node(f"publish_{name}", publish_branch(name, by_name), retry_policy=retry)
+            workflow.add_edge(f"publish_{name}", "merge")
+        workflow.add_conditional_edges("content", route_content,
+                                       ["context", *(f"publish_{name}" for name in PUBLISH_BRANCHES)])
+        workflow.add_edge("merge", END)
     workflow.add_conditional_edges(
         "agent",
         should_continue,
-        {
-            "tools": "tools",
-            END: END,
-        }
+        routes,
     )
     
-    # Tools always return to agent
-    workflow.add_edge("tools", "agent")
+    # Tools always return to agent (through the context budget)
+    workflow.add_edge("tools", "context")
     
     # Compile and return the graph
-    return workflow.compile()
+    return workflow.compile(checkpointer=checkpointer)
 
 
 def run_agent(user_input: str, graph=None) -> str:
@@ -0,0 +1,272 @@
+"""Fast text extraction from scraped HTML.
+
+``scrape_yieldbot_website`` used to build a full BeautifulSoup tree with the
+pure-Python ``html.parser`` and flatten all of it, only to keep a few
+thousand characters. ``extract_text`` does the same job with the cheapest
+available backend:
+
+- ``lxml``   - C parser, used when ``lxml`` is installed
+- ``stream`` - a streaming ``html.parser.HTMLParser``. It builds no tree,
+  collects text as it goes and stops once ``max_chars`` have been collected
+- ``bs4``    - the previous BeautifulSoup path, kept as the reference
+
+``HTML_PARSER`` picks one (``auto`` = lxml if available, else stream).
+
+Selectors limit extraction to the sections that matter, for example
+``"section#tokens, .price, h1"``. They are simple selectors: a tag, ``#id``
+and/or ``.class`` parts, comma-separated. When no selector is given, or none
+matches, the whole document's text is returned, the same as
+``BeautifulSoup(html).get_text(" ", strip=True)``. Text inside script, style
+and template tags is skipped, as in bs4.
+
+``python -m benchmarks.parse`` compares the backends on saved pages.
+"""
+
+import re
+from html.parser import HTMLParser
+from typing import List, Optional, Tuple, Union
+
+from src.config import config
+
+
+SKIP_TAGS = {"script", "style", "template"}
+VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta",
+             "param", "source", "track", "wbr"}
+FEED_CHUNK = 16 * 1024
+
+_SELECTOR_RE = re.compile(r"^([a-zA-Z][a-zA-Z0-9-]*)?((?:[#.][\w-]+)*)$")
+
+Selector = Tuple[Optional[str], Optional[str], Tuple[str, ...]]
+
+
+def parse_selectors(selectors: Union[str, List[str], None]) -> List[Selector]:
+    """``"section#tokens, .price"`` -> ``[("section", "tokens", ()), (None, None, ("price",))]``."""
+    if not selectors:
+        return []
+    if isinstance(selectors, str):
+        selectors = selectors.split(",")
+    parsed = []
+    for raw in selectors:
+        raw = raw.strip()
+        if not raw:
+            continue
+        match = _SELECTOR_RE.match(raw)
+        if match is None:
+            raise ValueError(f"Unsupported selector {raw!r}; use tag, #id and .class parts only")
+        tag, rest = match.group(1), match.group(2)
+        ids = re.findall(r"#([\w-]+)", rest)
+        classes = tuple(re.findall(r"\.([\w-]+)", rest))
+        parsed.append((tag.lower() if tag else None, ids[0] if ids else None, classes))
+    return parsed
+
+
+def _matches(selectors: List[Selector], tag: str, element_id: Optional[str], classes: set) -> bool:
+    for sel_tag, sel_id, sel_classes in selectors:
+        if sel_tag and sel_tag != tag:
+            continue
+        if sel_id and sel_id != element_id:
+            continue
+        if not classes.issuperset(sel_classes):
+            continue
+        return True
+    return False
+
+
+def decode_html(content: bytes, content_type: str = "") -> str:
+    """Decode a response body using the header charset, a ``<meta charset>`` or UTF-8."""
+    match = re.search(r"charset=([\w-]+)", content_type or "", re.IGNORECASE) or \
+        re.search(rb"<meta[^>]+charset=[\"']?([\w-]+)", content[:2048], re.IGNORECASE)
+    charset = match.group(1) if match else "utf-8"
+    if isinstance(charset, bytes):
+        charset = charset.decode("ascii", "ignore")
+    try:
+        return content.decode(charset, errors="replace")
+    except LookupError:
+        return content.decode("utf-8", errors="replace")
+
+
+class _TextCollector(HTMLParser):
+    """Streaming text extraction; text is kept only inside selected elements (if any)."""
+
+    def __init__(self, selectors: List[Selector], max_chars: Optional[int]):
+        super().__init__(convert_charrefs=True)
+        self.selectors = selectors
+        self.max_chars = max_chars
+        self.parts: List[str] = []
+        self.pending: List[str] = []  # a text run can arrive in pieces across feed() chunks
+        self.chars = 0
+        self.stack: List[Tuple[str, bool, bool]] = []  # (tag, selected, skipped)
+        self.selected_depth = 0
+        self.skip_depth = 0
+        self.matched = False
+        self.done = False
+
+    def flush(self):
+        if not self.pending:
+            return
+        text = "".join(self.pending).strip()
+        self.pending = []
+        if text and not self.done:
+            self.parts.append(text)
+            self.chars += len(text) + 1
+            if self.max_chars is not None and self.chars >= self.max_chars:
+                self.done = True
+
+    def handle_starttag(self, tag, attrs):
+        self.flush()
+        if tag in VOID_TAGS:
+            return
+        selected = False
+        if self.selectors and not self.selected_depth:
+            attrs = dict(attrs)
+            classes = set((attrs.get("class") or "").split())
+            selected = _matches(self.selectors, tag, attrs.get("id"), classes)
+            self.matched = self.matched or selected
+        skipped = tag in SKIP_TAGS
+        self.stack.append((tag, selected, skipped))
+        self.selected_depth += selected
+        self.skip_depth += skipped
+
+    def handle_startendtag(self, tag, attrs):
+        self.flush()
+
+    def handle_endtag(self, tag):
+        self.flush()
+        if tag in VOID_TAGS or not any(open_tag == tag for open_tag, _, _ in self.stack):
+            return
+        while self.stack:
+            open_tag, selected, skipped = self.stack.pop()
+            self.selected_depth -= selected
+            self.skip_depth -= skipped
+            if open_tag == tag:
+                break
+
+    def handle_comment(self, data):
+        self.flush()
+
+    handle_decl = handle_pi = unknown_decl = handle_comment
+
+    def handle_data(self, data):
+        if self.done or self.skip_depth or (self.selectors and not self.selected_depth):
+            return
+        self.pending.append(data)
+
+
+def _extract_stream(html: str, selectors: List[Selector], max_chars: Optional[int]) -> Tuple[str, bool]:
+    collector = _TextCollector(selectors, max_chars)
+    for i in range(0, len(html), FEED_CHUNK):
+        collector.feed(html[i:i + FEED_CHUNK])
+        if collector.done:
+            break
+    else:
+        collector.close()
+        collector.flush()
+    return " ".join(collector.parts), collector.matched
+
+
+def _xpath(selector: Selector) -> str:
+    tag, element_id, classes = selector
+    path = f"//{tag or '*'}"
+    if element_id:
+        path += f"[@id='{element_id}']"
+    for cls in classes:
+        path += f"[contains(concat(' ', normalize-space(@class), ' '), ' {cls} ')]"
+    return path
+
+
+def _lxml_strings(element):
+    """Text and tail strings in document order, skipping script/style/template content and comments."""
+    if not isinstance(element.tag, str) or element.tag in SKIP_TAGS:
+        return
+    if element.text:
+        yield element.text
+    for child in element:
+        yield from _lxml_strings(child)
+        if child.tail:
+            yield child.tail
+
+
+def _extract_lxml(html: str, selectors: List[Selector], max_chars: Optional[int]) -> Tuple[str, bool]:
+    import lxml.html
+
+    root = lxml.html.fromstring(html)
+    selected = []
+    if selectors:
+        found = {el for sel in selectors for el in root.xpath(_xpath(sel))}
+        # Document order, without elements nested inside another match
+        selected = [el for el in root.iter() if el in found and
+                    not any(ancestor in found for ancestor in el.iterancestors())]
+    parts, chars = [], 0
+    for element in selected or [root]:
+        for text in _lxml_strings(element):
+            text = text.strip()
+            if text:
+                parts.append(text)
+                chars += len(text) + 1
+                if max_chars is not None and chars >= max_chars:
+                    return " ".join(parts), bool(selected)
+    return " ".join(parts), bool(selected)
+
+
+def _extract_bs4(html: str, selectors: List[Selector], max_chars: Optional[int]) -> Tuple[str, bool]:
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "html.parser")
+    if selectors:
+        css = ", ".join(f"{tag or ''}{'#' + element_id if element_id else ''}{''.join('.' + c for c in classes)}"
+                        for tag, element_id, classes in selectors)
+        found = soup.select(css)
+        found_ids = {id(el) for el in found}
+        selected = [el for el in found if not any(id(parent) in found_ids for parent in el.parents)]
+        if selected:
+            return " ".join(el.get_text(separator=" ", strip=True) for el in selected), True
+    return soup.get_text(separator=" ", strip=True), False
+
+
+BACKENDS = {"lxml": _extract_lxml, "stream": _extract_stream, "bs4": _extract_bs4}
+
+
+def available_backends() -> List[str]:
+    backends = []
+    try:
+        import lxml.html  # noqa: F401
+        backends.append("lxml")
+    except ImportError:
+        pass
+    backends.append("stream")
+    try:
+        import bs4  # noqa: F401
+        backends.append("bs4")
+    except ImportError:
+        pass
+    return backends
+
+
+def resolve_backend(backend: Optional[str] = None) -> str:
+    backend = (backend or config.HTML_PARSER or "auto").lower()
+    available = available_backends()
+    if backend == "auto" or backend not in available:
+        return available[0]
+    return backend
+
+
+def extract_text(html: Union[str, bytes], selectors: Union[str, List[str], None] = None,
+                 max_chars: Optional[int] = None, backend: Optional[str] = None) -> dict:
+    """Visible text of ``html`` (only the selected sections when any match).
+
+    Returns ``{"text", "backend", "matched", "truncated"}``. ``matched`` is
+    False when selectors were given but none matched and the whole document
+    was used instead. ``max_chars`` lets the stream and lxml backends stop
+    early; the text is cut to it.
+    """
+    if isinstance(html, bytes):
+        html = decode_html(html)
+    parsed = parse_selectors(selectors)
+    name = resolve_backend(backend)
+    text, matched = BACKENDS[name](html, parsed, max_chars)
+    if parsed and not matched and name == "stream":
+        # Nothing selected: fall back to the whole document, like the other backends
+        text, _ = _extract_stream(html, [], max_chars)
+    truncated = max_chars is not None and len(text) >= max_chars
+    return {"text": text[:max_chars] if truncated else text, "backend": name,
+            "matched": matched, "truncated": truncated}
@@ -0,0 +1,79 @@
+"""Shared HTTP session used by the tool integrations.
+
+Routing every outbound request through one ``requests.Session`` reuses
+connections across tool calls and gives a single place to account request
+timings and bytes moved. It is also where each service's circuit breaker is
+applied and where every request's timeout is capped to the remaining cycle
+budget (see ``src.resilience``).
+"""
+
+import time
+from typing import Optional
+from urllib.parse import urlparse
+
+import requests
+
+from src import instrumentation, resilience
+from src.config import config
+
+
+session = requests.Session()
+
+SERVICES = {
+    urlparse(config.COMPOSIO_BASE_URL).netloc: "composio",
+    urlparse(config.TELEGRAM_API_BASE).netloc: "telegram",
+    urlparse(config.POLLINATIONS_BASE_URL).netloc: "pollinations",
+    urlparse(config.FIRECRAWL_API_URL).netloc: "firecrawl",
+    urlparse(config.YIELDBOT_URL).netloc: "yieldbot",
+    urlparse(config.COINGECKO_API_URL).netloc: "coingecko",
+    urlparse(config.COINMARKETCAP_API_URL).netloc: "coinmarketcap",
+}
+
+
+def service_for(url: str) -> str:
+    """Short service name for a URL, used as the span name prefix."""
+    netloc = urlparse(url).netloc
+    return SERVICES.get(netloc, netloc or "http")
+
+
+def request(method: str, url: str, service: Optional[str] = None, **kwargs) -> requests.Response:
+    """Send a request on the shared session and record an ``http`` span for it.
+
+    Raises ``CircuitOpenError`` when the service's breaker is open and
+    ``DeadlineExceeded`` when the cycle budget is used up.
+    """
+    service = service or service_for(url)
+    kwargs["timeout"] = resilience.budget_timeout(kwargs.get("timeout"))
+    breaker = resilience.get_breaker(service)
+    breaker.before_call()
+    start = time.time()
+    t0 = time.perf_counter()
+    try:
+        response = session.request(method, url, **kwargs)
+    except Exception as e:
+        breaker.record_failure()
+        instrumentation.record_http(service, method, start, (time.perf_counter() - t0) * 1000, 0, 0, error=str(e)[:300])
+        raise
+    if resilience.is_failure_status(response.status_code):
+        breaker.record_failure()
+    else:
+        breaker.record_success()
+    body = response.request.body if response.request is not None else None
+    instrumentation.record_http(
+        service,
+        method,
+        start,
+        (time.perf_counter() - t0) * 1000,
+        len(body) if body else 0,
+        len(response.content),
+        status=response.status_code,
+    )
+    return response
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    return request("GET", url, **kwargs)
+
+
+def post(url: str, **kwargs) -> requests.Response:
+    return request("POST", url, **kwargs)
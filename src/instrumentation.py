@@ -0,0 +1,292 @@
+"""Structured timing and token-accounting spans for tools, HTTP calls and model turns.
+
+Every tool call, outbound HTTP request and chat-model turn emits one span::
+
+    {"name", "kind", "start", "duration_ms", "bytes_in", "bytes_out",
+     "prompt_tokens", "completion_tokens", "outcome", "error", "run_id"}
+
+Spans go to the configured sinks (``TELEMETRY_SINKS``): an in-memory ring
+buffer, a JSONL file and/or LangSmith. Emitting a span is a dict build plus a
+deque append, so instrumentation stays cheap next to the network calls it wraps.
+"""
+
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from functools import wraps
+from typing import Callable, Dict, List, Optional
+from uuid import UUID
+
+from src.config import config
+
+
+_run_id: ContextVar[Optional[str]] = ContextVar("ybot_run_id", default=None)
+# Per-tool-call byte counters, filled in by src.http_client
+_http_bytes: ContextVar[Optional[list]] = ContextVar("ybot_http_bytes", default=None)
+
+
+class RingBufferSink:
+    """Keeps the most recent spans in memory."""
+
+    def __init__(self, maxlen: int = 2048):
+        self._spans = deque(maxlen=maxlen)
+
+    def write(self, span: dict) -> None:
+        self._spans.append(span)
+
+    def spans(self, run_id: Optional[str] = None, kind: Optional[str] = None) -> List[dict]:
+        return [
+            s for s in list(self._spans)
+            if (run_id is None or s.get("run_id") == run_id) and (kind is None or s.get("kind") == kind)
+        ]
+
+    def clear(self) -> None:
+        self._spans.clear()
+
+
+class JsonlSink:
+    """Appends spans as JSON lines to a file."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def write(self, span: dict) -> None:
+        line = json.dumps(span, default=str) + "\n"
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as fh:
+                fh.write(line)
+
+
+class LangSmithSink:
+    """Forwards spans to LangSmith as runs (requires the optional ``langsmith`` client)."""
+
+    def __init__(self, project: Optional[str] = None):
+        from langsmith import Client
+
+        self.client = Client()
+        self.project = project or config.LANGSMITH_PROJECT
+
+    def write(self, span: dict) -> None:
+        start = datetime.fromtimestamp(span["start"], tz=timezone.utc)
+        end = datetime.fromtimestamp(span["start"] + span["duration_ms"] / 1000, tz=timezone.utc)
+        self.client.create_run(
+            name=span["name"],
+            inputs={},
+            run_type="llm" if span["kind"] == "llm" else "tool",
+            project_name=self.project,
+            start_time=start,
+            end_time=end,
+            outputs={k: span.get(k) for k in ("bytes_in", "bytes_out", "prompt_tokens", "completion_tokens", "outcome")},
+            error=span.get("error"),
+            extra={"metadata": {"ybot_run_id": span.get("run_id"), "kind": span["kind"]}},
+        )
+
+
+ring_buffer = RingBufferSink(config.TELEMETRY_BUFFER_SIZE)
+_sinks: list = []
+_collectors: Dict[str, List[dict]] = {}
+_collectors_lock = threading.Lock()
+
+
+def configure_sinks(names: Optional[str] = None) -> list:
+    """(Re)build the sink list from a comma-separated spec like ``"memory,jsonl"``."""
+    global _sinks
+    sinks = []
+    for name in (names if names is not None else config.TELEMETRY_SINKS).split(","):
+        name = name.strip().lower()
+        if name == "memory":
+            sinks.append(ring_buffer)
+        elif name == "jsonl":
+            sinks.append(JsonlSink(config.TELEMETRY_JSONL_PATH))
+        elif name == "langsmith":
+            try:
+                sinks.append(LangSmithSink())
+            except Exception as e:
+                print(f"[TELEMETRY] LangSmith sink unavailable: {e}")
+        elif name and name != "off":
+            print(f"[TELEMETRY] Unknown sink '{name}' ignored")
+    _sinks = sinks
+    return sinks
+
+
+def add_sink(sink) -> None:
+    """Register an extra sink object with a ``write(span)`` method."""
+    _sinks.append(sink)
+
+
+def emit(span: dict) -> None:
+    """Send a span to every sink and to the collector of its run, if any."""
+    for sink in _sinks:
+        try:
+            sink.write(span)
+        except Exception as e:
+            print(f"[TELEMETRY] Sink {type(sink).__name__} failed: {e}")
+    run_id = span.get("run_id")
+    if run_id and _collectors:
+        with _collectors_lock:
+            collected = _collectors.get(run_id)
+            if collected is not None:
+                collected.append(span)
+
+
+def _span(name: str, kind: str, start: float, duration_ms: float, outcome: str = "ok",
+          error: Optional[str] = None, **fields) -> dict:
+    span = {
+        "name": name,
+        "kind": kind,
+        "start": start,
+        "duration_ms": duration_ms,
+        "bytes_in": 0,
+        "bytes_out": 0,
+        "prompt_tokens": 0,
+        "completion_tokens": 0,
+        "outcome": outcome,
+        "error": error,
+        "run_id": _run_id.get(),
+    }
+    span.update(fields)
+    return span
+
+
+@contextmanager
+def collect(run_id: str):
+    """Tag spans emitted in this context with ``run_id`` and collect them into a list."""
+    token = _run_id.set(run_id)
+    collected: List[dict] = []
+    with _collectors_lock:
+        _collectors[run_id] = collected
+    try:
+        yield collected
+    finally:
+        with _collectors_lock:
+            _collectors.pop(run_id, None)
+        _run_id.reset(token)
+
+
+def current_run_id() -> Optional[str]:
+    return _run_id.get()
+
+
+def record_http(service: str, method: str, start: float, duration_ms: float,
+                bytes_out: int, bytes_in: int, status: Optional[int] = None,
+                error: Optional[str] = None) -> None:
+    """Account an outbound HTTP request to the enclosing tool span and emit its own span."""
+    counters = _http_bytes.get()
+    if counters is not None:
+        counters[0] += bytes_out
+        counters[1] += bytes_in
+    outcome = "error" if error or (status is not None and status >= 400) else "ok"
+    emit(_span(f"{service}.{method.lower()}", "http", start, duration_ms, outcome,
+               error or (f"HTTP {status}" if outcome == "error" else None),
+               bytes_in=bytes_in, bytes_out=bytes_out, status=status))
+
+
+def _result_outcome(result) -> tuple:
+    if isinstance(result, dict):
+        if result.get("status") == "error" or (result.get("error") and not result.get("successful")):
+            return "error", str(result.get("error") or result.get("message") or "error")[:300]
+        if result.get("status") == "skipped":
+            return "skipped", None
+    return "ok", None
+
+
+def traced_tool(name: str, func: Callable) -> Callable:
+    """Wrap a tool function so each call emits a ``tool`` span."""
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        counters = [0, 0]
+        token = _http_bytes.set(counters)
+        start = time.time()
+        t0 = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            _http_bytes.reset(token)
+            emit(_span(name, "tool", start, (time.perf_counter() - t0) * 1000, "error", str(e)[:300],
+                       bytes_out=counters[0], bytes_in=counters[1]))
+            raise
+        _http_bytes.reset(token)
+        outcome, error = _result_outcome(result)
+        emit(_span(name, "tool", start, (time.perf_counter() - t0) * 1000, outcome, error,
+                   bytes_out=counters[0], bytes_in=counters[1],
+                   result_chars=len(result) if isinstance(result, str) else len(json.dumps(result, default=str))))
+        return result
+
+    return wrapper
+
+
+def _token_usage(response) -> tuple:
+    """Prompt/completion tokens from an LLMResult (llm_output or message usage_metadata)."""
+    usage = (response.llm_output or {}).get("token_usage") or {}
+    prompt = usage.get("prompt_tokens") or 0
+    completion = usage.get("completion_tokens") or 0
+    if not (prompt or completion):
+        for generations in response.generations:
+            for generation in generations:
+                metadata = getattr(getattr(generation, "message", None), "usage_metadata", None) or {}
+                prompt += metadata.get("input_tokens", 0)
+                completion += metadata.get("output_tokens", 0)
+    return prompt, completion
+
+
+def _callback_handler_class():
+    from langchain_core.callbacks import BaseCallbackHandler
+
+    class SpanCallbackHandler(BaseCallbackHandler):
+        """Emits an ``llm`` span with token counts for every chat-model call."""
+
+        def __init__(self):
+            self._starts: Dict[UUID, tuple] = {}
+
+        def _start(self, serialized, run_id, kwargs):
+            params = kwargs.get("invocation_params") or {}
+            model = params.get("model") or params.get("model_name") or (serialized or {}).get("name") or "model"
+            self._starts[run_id] = (str(model), time.time(), time.perf_counter(), _run_id.get())
+
+        def on_chat_model_start(self, serialized, messages, *, run_id, **kwargs):
+            self._start(serialized, run_id, kwargs)
+
+        def on_llm_start(self, serialized, prompts, *, run_id, **kwargs):
+            self._start(serialized, run_id, kwargs)
+
+        def on_llm_end(self, response, *, run_id, **kwargs):
+            started = self._starts.pop(run_id, None)
+            if not started:
+                return
+            model, start, t0, cycle_run_id = started
+            prompt, completion = _token_usage(response)
+            span = _span(model, "llm", start, (time.perf_counter() - t0) * 1000,
+                         prompt_tokens=prompt, completion_tokens=completion)
+            span["run_id"] = span["run_id"] or cycle_run_id
+            emit(span)
+
+        def on_llm_error(self, error, *, run_id, **kwargs):
+            started = self._starts.pop(run_id, None)
+            if not started:
+                return
+            model, start, t0, cycle_run_id = started
+            span = _span(model, "llm", start, (time.perf_counter() - t0) * 1000, "error", str(error)[:300])
+            span["run_id"] = span["run_id"] or cycle_run_id
+            emit(span)
+
+    return SpanCallbackHandler
+
+
+_handler = None
+
+
+def get_callback_handler():
+    """Shared LangChain callback handler that turns model calls into spans."""
+    global _handler
+    if _handler is None:
+        _handler = _callback_handler_class()()
+    return _handler
+
+
+configure_sinks()
@@ -0,0 +1,280 @@
+"""Structured market data from JSON price APIs.
+
+``fast_scrape_and_cache`` used to render the CoinMarketCap and CoinGecko
+trending pages to markdown through Firecrawl. That spent a scrape credit per
+page on tens of KB of layout, and the model still had to read prices out of
+a markdown table. A market-data provider answers the same question with a
+few KB of JSON and exact numbers, and Firecrawl is kept for news.
+
+Providers (``MARKET_DATA_PROVIDER``):
+
+- ``coingecko``     - public CoinGecko API (``COINGECKO_API_KEY`` optional)
+- ``coinmarketcap`` - CoinMarketCap Pro API (needs ``COINMARKETCAP_API_KEY``)
+- ``fake``          - fixed local data, for tests and offline runs
+- ``none``          - no provider; the research scrape keeps the price pages
+
+Each provider implements two upstream calls, ``fetch_quotes`` (all symbols
+in one request) and ``fetch_trending``. The base class adds caching on top:
+quotes are cached per symbol for ``MARKET_DATA_TTL_SECONDS``, so a lookup
+only requests the symbols it has not seen recently, and identical concurrent
+requests share one upstream call. Every quote is normalized to::
+
+    {"symbol", "name", "price_usd", "change_24h_pct", "market_cap_usd",
+     "volume_24h_usd", "rank"}
+"""
+
+import re
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional
+
+from src import http_client
+from src.cache import get_cache
+from src.config import config
+
+
+class MarketDataError(RuntimeError):
+    """A market-data request that returned an error response."""
+
+
+def normalize_symbols(symbols: Iterable[str]) -> List[str]:
+    """``["$eth", "BTC ", "eth"]`` -> ``["ETH", "BTC"]``."""
+    seen = []
+    for symbol in symbols or []:
+        symbol = (symbol or "").strip().lstrip("$").upper()
+        if symbol and symbol not in seen:
+            seen.append(symbol)
+    return seen
+
+
+def _number(value) -> Optional[float]:
+    """A float from a number or a display string such as ``"$1,234.5"``."""
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    cleaned = re.sub(r"[^0-9.eE+-]", "", str(value))
+    try:
+        return float(cleaned)
+    except ValueError:
+        return None
+
+
+def quote(symbol: str, name: str = "", price_usd=None, change_24h_pct=None, market_cap_usd=None,
+          volume_24h_usd=None, rank=None) -> dict:
+    return {
+        "symbol": symbol.upper(),
+        "name": name or symbol.upper(),
+        "price_usd": _number(price_usd),
+        "change_24h_pct": None if _number(change_24h_pct) is None else round(_number(change_24h_pct), 2),
+        "market_cap_usd": _number(market_cap_usd),
+        "volume_24h_usd": _number(volume_24h_usd),
+        "rank": int(rank) if isinstance(rank, (int, float)) else None,
+    }
+
+
+def format_move(q: dict) -> str:
+    """``$SOL -1.30% at $221.1`` (the form ``batch.market_fingerprint`` reads)."""
+    change = q.get("change_24h_pct")
+    move = "n/a" if change is None else f"{change:+.2f}%"
+    price = q.get("price_usd")
+    return f"${q['symbol']} {move}" + ("" if price is None else f" at ${price:.6g}")
+
+
+class MarketDataProvider(ABC):
+    """Base provider: subclasses implement ``fetch_quotes`` and ``fetch_trending``."""
+
+    name = "base"
+
+    def __init__(self):
+        self.cache = get_cache("market", ttl=config.MARKET_DATA_TTL_SECONDS, max_entries=512)
+
+    @abstractmethod
+    def fetch_quotes(self, symbols: List[str]) -> Dict[str, dict]:
+        """One upstream request for all ``symbols``; unknown symbols are left out."""
+
+    @abstractmethod
+    def fetch_trending(self, limit: int) -> List[dict]:
+        """The ``limit`` currently trending tokens as normalized quotes."""
+
+    def quotes(self, symbols: Iterable[str]) -> Dict[str, dict]:
+        """Quotes for ``symbols``, requesting only the ones not cached in a single call."""
+        symbols = normalize_symbols(symbols)
+        found, missing = {}, []
+        for symbol in symbols:
+            cached = self.cache.get((self.name, "quote", symbol))
+            if cached is None:
+                missing.append(symbol)
+            elif not cached.get("missing"):
+                found[symbol] = cached
+        if missing:
+            fetched = self.cache.get_or_load((self.name, "batch", tuple(sorted(missing))),
+                                             lambda: self.fetch_quotes(missing))
+            for symbol in missing:
+                # Unknown symbols are cached too, so they are not requested again every call
+                entry = fetched.get(symbol) or {"symbol": symbol, "missing": True}
+                self.cache.set((self.name, "quote", symbol), entry)
+                if not entry.get("missing"):
+                    found[symbol] = entry
+        return {symbol: found[symbol] for symbol in symbols if symbol in found}
+
+    def trending(self, limit: int = 7) -> List[dict]:
+        return self.cache.get_or_load((self.name, "trending", limit), lambda: self.fetch_trending(limit))
+
+    def snapshot(self, symbols: Optional[Iterable[str]] = None, trending_limit: Optional[int] = None) -> dict:
+        """Quotes for ``symbols`` (default ``MARKET_SYMBOLS``) and the trending tokens."""
+        symbols = normalize_symbols(symbols or config.MARKET_SYMBOLS.split(","))
+        trending_limit = config.MARKET_TRENDING_LIMIT if trending_limit is None else trending_limit
+        quotes = self.quotes(symbols) if symbols else {}
+        trending = self.trending(trending_limit) if trending_limit > 0 else []
+        listed = list(quotes.values()) + [q for q in trending if q["symbol"] not in quotes]
+        return {
+            "provider": self.name,
+            "as_of": datetime.now(timezone.utc).replace(microsecond=0).isoformat(),
+            "quotes": quotes,
+            "trending": trending,
+            "summary": ", ".join(format_move(q) for q in listed),
+        }
+
+
+class _JSONProvider(MarketDataProvider):
+    """Shared GET helper for the HTTP providers."""
+
+    def __init__(self, api_url: str, headers: Optional[dict] = None):
+        super().__init__()
+        self.api_url = api_url.rstrip("/")
+        self.headers = {"Accept": "application/json", **(headers or {})}
+
+    def _get(self, path: str, params: Optional[dict] = None):
+        response = http_client.get(f"{self.api_url}{path}", service=self.name, params=params, headers=self.headers)
+        if response.status_code == 429:
+            raise MarketDataError(f"Rate Limit Exceeded: {self.name} {path}")
+        if not response.ok:
+            raise MarketDataError(f"{self.name} GET {path} failed ({response.status_code}): {response.text[:300]}")
+        try:
+            return response.json()
+        except ValueError:
+            raise MarketDataError(f"{self.name} GET {path} returned invalid JSON")
+
+
+class CoinGeckoProvider(_JSONProvider):
+    name = "coingecko"
+
+    def __init__(self, api_url: Optional[str] = None, api_key: Optional[str] = None):
+        api_url = api_url or config.COINGECKO_API_URL
+        api_key = api_key or config.COINGECKO_API_KEY
+        header = "x-cg-pro-api-key" if "pro-api" in api_url else "x-cg-demo-api-key"
+        super().__init__(api_url, {header: api_key} if api_key else None)
+
+    def fetch_quotes(self, symbols: List[str]) -> Dict[str, dict]:
+        coins = self._get("/coins/markets", {
+            "vs_currency": "usd",
+            "symbols": ",".join(s.lower() for s in symbols),
+            "per_page": 250,
+        })
+        wanted, quotes = set(symbols), {}
+        # A symbol can belong to several coins; keep the one with the best market-cap rank
+        for coin in sorted(coins or [], key=lambda c: c.get("market_cap_rank") or float("inf")):
+            symbol = (coin.get("symbol") or "").upper()
+            if symbol in wanted and symbol not in quotes:
+                quotes[symbol] = quote(symbol, coin.get("name"), coin.get("current_price"),
+                                       coin.get("price_change_percentage_24h"), coin.get("market_cap"),
+                                       coin.get("total_volume"), coin.get("market_cap_rank"))
+        return quotes
+
+    def fetch_trending(self, limit: int) -> List[dict]:
+        trending = []
+        for entry in (self._get("/search/trending") or {}).get("coins", [])[:limit]:
+            item = entry.get("item") or {}
+            data = item.get("data") or {}
+            change = (data.get("price_change_percentage_24h") or {}).get("usd")
+            trending.append(quote(item.get("symbol") or "", item.get("name"), data.get("price"), change,
+                                  data.get("market_cap"), data.get("total_volume"), item.get("market_cap_rank")))
+        return trending
+
+
+class CoinMarketCapProvider(_JSONProvider):
+    name = "coinmarketcap"
+
+    def __init__(self, api_url: Optional[str] = None, api_key: Optional[str] = None):
+        super().__init__(api_url or config.COINMARKETCAP_API_URL,
+                         {"X-CMC_PRO_API_KEY": api_key or config.COINMARKETCAP_API_KEY})
+
+    @staticmethod
+    def _quote(coin: dict) -> dict:
+        usd = (coin.get("quote") or {}).get("USD") or {}
+        return quote(coin.get("symbol") or "", coin.get("name"), usd.get("price"), usd.get("percent_change_24h"),
+                     usd.get("market_cap"), usd.get("volume_24h"), coin.get("cmc_rank"))
+
+    def fetch_quotes(self, symbols: List[str]) -> Dict[str, dict]:
+        data = (self._get("/v2/cryptocurrency/quotes/latest", {"symbol": ",".join(symbols)}) or {}).get("data") or {}
+        quotes = {}
+        for symbol, coins in data.items():
+            coins = coins if isinstance(coins, list) else [coins]
+            ranked = sorted(coins, key=lambda c: c.get("cmc_rank") or float("inf"))
+            if ranked:
+                quotes[symbol.upper()] = self._quote(ranked[0])
+        return quotes
+
+    def fetch_trending(self, limit: int) -> List[dict]:
+        # Top 24h gainers with real volume (the trending endpoints need a paid plan)
+        data = self._get("/v1/cryptocurrency/listings/latest", {
+            "limit": limit, "sort": "percent_change_24h", "sort_dir": "desc", "volume_24h_min": 1_000_000,
+        })
+        return [self._quote(coin) for coin in (data or {}).get("data") or []]
+
+
+FAKE_COINS = [
+    ("BTC", "Bitcoin", 97250.0, 1.8, 1.93e12, 3.1e10, 1),
+    ("ETH", "Ethereum", 3912.55, 2.4, 4.71e11, 1.9e10, 2),
+    ("SOL", "Solana", 221.1, -1.3, 1.05e11, 4.2e9, 5),
+    ("LINK", "Chainlink", 24.1, 4.1, 1.5e10, 9.8e8, 14),
+    ("POWER", "Power Protocol", 0.91, 106.2, 3.1e8, 2.2e8, 312),
+    ("LUNC", "Terra Classic", 0.00012, 53.0, 6.9e8, 1.4e8, 190),
+    ("AAVE", "Aave", 318.4, 6.7, 4.8e9, 6.1e8, 38),
+]
+
+
+class FakeMarketProvider(MarketDataProvider):
+    """Fixed, deterministic market data; ``calls`` counts upstream fetches."""
+
+    name = "fake"
+
+    def __init__(self, coins: Optional[list] = None):
+        super().__init__()
+        self.coins = {row[0]: quote(*row) for row in coins or FAKE_COINS}
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def fetch_quotes(self, symbols: List[str]) -> Dict[str, dict]:
+        with self._lock:
+            self.calls += 1
+        return {s: dict(self.coins[s]) for s in symbols if s in self.coins}
+
+    def fetch_trending(self, limit: int) -> List[dict]:
+        with self._lock:
+            self.calls += 1
+        movers = sorted(self.coins.values(), key=lambda q: -abs(q["change_24h_pct"] or 0))
+        return [dict(q) for q in movers[:limit]]
+
+
+PROVIDERS = {
+    "coingecko": CoinGeckoProvider,
+    "coinmarketcap": CoinMarketCapProvider,
+    "fake": FakeMarketProvider,
+}
+
+_providers: Dict[str, MarketDataProvider] = {}
+_providers_lock = threading.Lock()
+
+
+def get_market_provider(name: Optional[str] = None) -> Optional[MarketDataProvider]:
+    """The process-wide provider for ``name`` (default ``MARKET_DATA_PROVIDER``), or None when disabled."""
+    name = (name or config.MARKET_DATA_PROVIDER or "none").lower()
+    if name not in PROVIDERS:
+        return None
+    with _providers_lock:
+        if name not in _providers:
+            _providers[name] = PROVIDERS[name]()
+        return _providers[name]
@@ -0,0 +1,119 @@
+"""Image generation and upload off the critical path of an image post.
+
+The Twitter agent used to work strictly in order: render the image
+(Pollinations), upload it (Composio), then write the tweet and post it. The
+render and upload are the slowest steps, and no writing started until both
+were done. ``media_pipeline()`` starts them as one background job as soon as
+the topic is known, and the model writes the tweet in the meantime:
+
+- the ``pipelined`` tool wrapper joins the job when the model calls
+  ``twitter_create_post`` without media IDs, and attaches the uploaded media
+- the join waits at most ``MEDIA_PIPELINE_TIMEOUT_SECONDS`` (and never past
+  the cycle deadline). If the render or upload failed or is still running,
+  the tweet is posted text-only
+- the job calls the wrapped tools, so budget checks, breakers and spans apply
+  as if the model had called them
+"""
+
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from contextlib import contextmanager
+from contextvars import ContextVar, copy_context
+from functools import wraps
+from typing import Callable, Dict, Optional, Tuple
+
+from src import resilience
+from src.blobs import resolve_result
+from src.config import config
+
+
+SOURCES = ("generate_nft_image", "twitter_upload_media")
+
+# Tool name -> wrapped function of the tools the job runs, registered by ``pipelined``
+_tools: Dict[str, Callable] = {}
+
+_active: ContextVar[Optional["MediaJob"]] = ContextVar("ybot_media_job", default=None)
+
+
+class MediaJob:
+    """Background render + upload of one image; ``join`` returns its media ID."""
+
+    def __init__(self, topic: str, save_path: str):
+        self.topic = topic
+        self.save_path = save_path
+        self._pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="media")
+        self.future = self._pool.submit(copy_context().run, self._run)
+
+    def _run(self) -> str:
+        image = resolve_result(_tools["generate_nft_image"](topic=self.topic, save_path=self.save_path))
+        if not isinstance(image, dict) or not image.get("image_url"):
+            raise RuntimeError(f"image generation failed: {image.get('message') if isinstance(image, dict) else image}")
+        upload = resolve_result(_tools["twitter_upload_media"](image_url=image["image_url"]))
+        media_id = upload.get("media_id") if isinstance(upload, dict) else None
+        if not media_id:
+            raise RuntimeError(f"media upload failed: {upload.get('error') if isinstance(upload, dict) else upload}")
+        print(f"[MEDIA] Uploaded image for {self.topic}: media_id {media_id}")
+        return str(media_id)
+
+    def join(self) -> Tuple[Optional[str], str]:
+        """``(media_id, "")``, or ``(None, reason)`` when the post should go out text-only."""
+        timeout = config.MEDIA_PIPELINE_TIMEOUT_SECONDS
+        left = resilience.remaining()
+        if left is not None:
+            timeout = max(0.0, min(timeout, left))
+        try:
+            return self.future.result(timeout=timeout), ""
+        except FutureTimeout:
+            return None, f"image not ready after {timeout:g}s"
+        except Exception as e:
+            return None, str(e)
+
+    def close(self) -> None:
+        """Drop the job if it never started; a running one is logged as abandoned, with its late result."""
+        if not self.future.done() and not self.future.cancel():
+            print(f"[MEDIA] Image job for {self.topic} still running after the post; abandoning it")
+            self.future.add_done_callback(self._log_abandoned)
+        self._pool.shutdown(wait=False)
+
+    def _log_abandoned(self, future) -> None:
+        try:
+            print(f"[MEDIA] Abandoned image job for {self.topic} finished: media_id {future.result()} (unused)")
+        except Exception as e:
+            print(f"[MEDIA] Abandoned image job for {self.topic} failed: {e}")
+
+
+@contextmanager
+def media_pipeline(topic: str = "DeFi", save_path: str = "nft_image.png"):
+    """Render and upload an image for ``topic`` in the background for the enclosed post."""
+    if not all(name in _tools for name in SOURCES):
+        yield None
+        return
+    job = MediaJob(topic, save_path)
+    print(f"[MEDIA] Started image generation and upload for {topic}")
+    token = _active.set(job)
+    try:
+        yield job
+    finally:
+        _active.reset(token)
+        job.close()
+
+
+def pipelined(name: str, func: Callable) -> Callable:
+    """Tool wrapper: registers the job's tools and attaches the job's media to ``twitter_create_post``."""
+    if name in SOURCES:
+        _tools[name] = func
+        return func
+    if name != "twitter_create_post":
+        return func
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        job = _active.get()
+        if job is None or len(args) > 1 or kwargs.get("media_media_ids"):
+            return func(*args, **kwargs)
+        media_id, reason = job.join()
+        if media_id is None:
+            print(f"[MEDIA] Posting text-only: {reason}")
+            return func(*args, **kwargs)
+        return func(*args, **{**kwargs, "media_media_ids": [media_id]})
+
+    return wrapper
@@ -0,0 +1,248 @@
+"""Checkpoint and long-term memory backends for AI Agent YBot.
+
+``MEMORY_BACKEND`` selects where thread checkpoints and the ``/memories/``
+store live:
+
+- ``memory``   - in-process only (development)
+- ``sqlite``   - a local WAL-mode SQLite file, durable across restarts
+- ``postgres`` - ``DATABASE_URL`` through a shared psycopg connection pool
+
+Every backend applies retention: ``prune_checkpoints`` keeps the
+newest ``CHECKPOINT_KEEP_LAST`` checkpoints per thread and drops threads idle
+for longer than ``MEMORY_RETENTION_DAYS``; store items expire after
+``STORE_TTL_MINUTES`` via the store's TTL sweeper.
+"""
+
+import sqlite3
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+from src.config import config
+
+
+_lock = threading.Lock()
+_checkpointer = None
+_store = None
+_sqlite_conns: dict = {}
+_pg_pool = None
+
+
+def _backend() -> str:
+    backend = config.MEMORY_BACKEND.lower()
+    if backend == "postgres" and not config.DATABASE_URL:
+        print("MEMORY_BACKEND=postgres but DATABASE_URL is empty. Falling back to in-memory storage")
+        return "memory"
+    return backend
+
+
+def _sqlite_connection(role: str) -> sqlite3.Connection:
+    """Shared WAL-mode connection per role (``checkpoints`` or ``store``).
+
+    The checkpointer and the store each serialize access with their own lock,
+    so they get separate connections to the same file; WAL lets them and any
+    reader (e.g. pruning) proceed without blocking each other.
+    """
+    conn = _sqlite_conns.get(role)
+    if conn is None:
+        conn = sqlite3.connect(config.SQLITE_MEMORY_PATH, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        _sqlite_conns[role] = conn
+    return conn
+
+
+def _postgres_pool():
+    """Shared psycopg connection pool, opened once per process."""
+    global _pg_pool
+    if _pg_pool is None:
+        from psycopg.rows import dict_row
+        from psycopg_pool import ConnectionPool
+
+        _pg_pool = ConnectionPool(
+            conninfo=config.DATABASE_URL,
+            min_size=1,
+            max_size=config.POSTGRES_POOL_MAX_SIZE,
+            kwargs={"autocommit": True, "prepare_threshold": 0, "row_factory": dict_row},
+            open=True,
+        )
+    return _pg_pool
+
+
+def _store_ttl() -> Optional[dict]:
+    if config.STORE_TTL_MINUTES <= 0:
+        return None
+    return {
+        "default_ttl": config.STORE_TTL_MINUTES,
+        "refresh_on_read": True,
+        "sweep_interval_minutes": 60,
+    }
+
+
+def get_checkpointer():
+    """Get the thread checkpointer for the configured backend (created once per process)."""
+    global _checkpointer
+    with _lock:
+        if _checkpointer is not None:
+            return _checkpointer
+        backend = _backend()
+        try:
+            if backend == "sqlite":
+                from langgraph.checkpoint.sqlite import SqliteSaver
+
+                _checkpointer = SqliteSaver(_sqlite_connection("checkpoints"))
+                _checkpointer.setup()
+            elif backend == "postgres":
+                from langgraph.checkpoint.postgres import PostgresSaver
+
+                _checkpointer = PostgresSaver(_postgres_pool())
+                _checkpointer.setup()
+        except ImportError as e:
+            print(f"{backend} checkpointer not available ({e}). Falling back to InMemorySaver")
+        if _checkpointer is None:
+            from langgraph.checkpoint.memory import InMemorySaver
+
+            _checkpointer = InMemorySaver()
+        return _checkpointer
+
+
+def get_memory_store():
+    """Get the long-term ``/memories/`` store for the configured backend (created once per process)."""
+    global _store
+    with _lock:
+        if _store is not None:
+            return _store
+        backend = _backend()
+        try:
+            if backend == "sqlite":
+                from langgraph.store.sqlite import SqliteStore
+
+                _store = SqliteStore(_sqlite_connection("store"), ttl=_store_ttl())
+                _store.setup()
+            elif backend == "postgres":
+                from langgraph.store.postgres import PostgresStore
+
+                _store = PostgresStore(_postgres_pool(), ttl=_store_ttl())
+                _store.setup()
+            if _store is not None and _store_ttl():
+                _store.start_ttl_sweeper()
+        except ImportError as e:
+            print(f"{backend} store not available ({e}). Falling back to InMemoryStore")
+        if _store is None:
+            from langgraph.store.memory import InMemoryStore
+
+            _store = InMemoryStore()
+        return _store
+
+
+def _thread_ids(cursor_rows) -> list:
+    return [row["thread_id"] if isinstance(row, dict) else row[0] for row in cursor_rows]
+
+
+def _stale_threads(checkpointer, thread_ids: list, cutoff: datetime) -> list:
+    """Threads whose newest checkpoint is older than ``cutoff``."""
+    stale = []
+    for thread_id in thread_ids:
+        latest = checkpointer.get_tuple({"configurable": {"thread_id": thread_id}})
+        if latest is None:
+            continue
+        ts = datetime.fromisoformat(latest.checkpoint["ts"])
+        if ts.tzinfo is None:
+            ts = ts.replace(tzinfo=timezone.utc)
+        if ts < cutoff:
+            stale.append(thread_id)
+    return stale
+
+
+def prune_checkpoints(retention_days: Optional[int] = None, keep_last: Optional[int] = None) -> dict:
+    """Apply checkpoint retention for the persistent backends.
+
+    Deletes threads idle for more than ``retention_days`` and, for the threads
+    that remain, all but the newest ``keep_last`` checkpoints and their writes.
+    """
+    retention_days = config.MEMORY_RETENTION_DAYS if retention_days is None else retention_days
+    keep_last = config.CHECKPOINT_KEEP_LAST if keep_last is None else keep_last
+    backend = _backend()
+    checkpointer = get_checkpointer()
+    cutoff = datetime.now(timezone.utc) - timedelta(days=retention_days)
+    result = {"backend": backend, "threads_deleted": 0, "checkpoints_deleted": 0}
+
+    if backend not in ("sqlite", "postgres"):
+        # InMemorySaver: thread -> namespace -> {checkpoint_id: checkpoint}
+        storage = getattr(checkpointer, "storage", None)
+        if storage is None:
+            return {"backend": backend, "status": "skipped"}
+        stale = _stale_threads(checkpointer, list(storage), cutoff) if retention_days > 0 else []
+        for thread_id in stale:
+            checkpointer.delete_thread(thread_id)
+        if keep_last > 0:
+            for thread_id, namespaces in list(storage.items()):
+                for ns, checkpoints in namespaces.items():
+                    for checkpoint_id in sorted(checkpoints, reverse=True)[keep_last:]:
+                        del checkpoints[checkpoint_id]
+                        checkpointer.writes.pop((thread_id, ns, checkpoint_id), None)
+                        result["checkpoints_deleted"] += 1
+        result["threads_deleted"] = len(stale)
+        return result
+
+    if backend == "sqlite":
+        conn = _sqlite_connection("checkpoints")
+        thread_ids = _thread_ids(conn.execute("SELECT DISTINCT thread_id FROM checkpoints").fetchall())
+        stale = _stale_threads(checkpointer, thread_ids, cutoff) if retention_days > 0 else []
+        for thread_id in stale:
+            checkpointer.delete_thread(thread_id)
+        if keep_last > 0:
+            with checkpointer.lock:
+                cursor = conn.execute(
+                    """DELETE FROM checkpoints WHERE rowid IN (
+                           SELECT rowid FROM (
+                               SELECT rowid, ROW_NUMBER() OVER (
+                                   PARTITION BY thread_id, checkpoint_ns ORDER BY checkpoint_id DESC) AS rn
+                               FROM checkpoints)
+                           WHERE rn > ?)""",
+                    (keep_last,),
+                )
+                result["checkpoints_deleted"] = cursor.rowcount
+                conn.execute(
+                    """DELETE FROM writes WHERE NOT EXISTS (
+                           SELECT 1 FROM checkpoints c
+                           WHERE c.thread_id = writes.thread_id AND c.checkpoint_ns = writes.checkpoint_ns
+                             AND c.checkpoint_id = writes.checkpoint_id)"""
+                )
+        result["threads_deleted"] = len(stale)
+        return result
+
+    pool = _postgres_pool()
+    with pool.connection() as conn:
+        thread_ids = _thread_ids(conn.execute("SELECT DISTINCT thread_id FROM checkpoints").fetchall())
+    stale = _stale_threads(checkpointer, thread_ids, cutoff) if retention_days > 0 else []
+    for thread_id in stale:
+        checkpointer.delete_thread(thread_id)
+    result["threads_deleted"] = len(stale)
+    if keep_last > 0:
+        with pool.connection() as conn:
+            cursor = conn.execute(
+                """DELETE FROM checkpoints c USING (
+                       SELECT thread_id, checkpoint_ns, checkpoint_id,
+                              ROW_NUMBER() OVER (PARTITION BY thread_id, checkpoint_ns
+                                                 ORDER BY checkpoint_id DESC) AS rn
+                       FROM checkpoints) old
+                   WHERE c.thread_id = old.thread_id AND c.checkpoint_ns = old.checkpoint_ns
+                     AND c.checkpoint_id = old.checkpoint_id AND old.rn > %s""",
+                (keep_last,),
+            )
+            result["checkpoints_deleted"] = cursor.rowcount
+            conn.execute(
+                """DELETE FROM checkpoint_writes w WHERE NOT EXISTS (
+                       SELECT 1 FROM checkpoints c
+                       WHERE c.thread_id = w.thread_id AND c.checkpoint_ns = w.checkpoint_ns
+                         AND c.checkpoint_id = w.checkpoint_id)"""
+            )
+            conn.execute(
+                """DELETE FROM checkpoint_blobs b WHERE NOT EXISTS (
+                       SELECT 1 FROM checkpoints c
+                       WHERE c.thread_id = b.thread_id AND c.checkpoint_ns = b.checkpoint_ns
+                         AND c.checkpoint -> 'channel_versions' ->> b.channel = b.version)"""
+            )
+    return result
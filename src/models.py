@@ -0,0 +1,207 @@
+"""Per-role chat models and the cascade between them.
+
+Not every turn needs the large model: planning which tools to call, relaying
+already-written text and closing summaries are mechanical. Three roles are
+configured independently (model, temperature, max tokens):
+
+- ``router``    - tool routing, plain replies and follow-up turns
+- ``extractor`` - the first pass over gathered data, structured extraction
+  and summaries
+- ``writer``    - the turn that turns the data into copy (``MISTRAL_MODEL``)
+
+``role_for_turn`` picks the role from the conversation so far. A cheaper
+role's answer is escalated to the writer when it fails validation (malformed
+or unknown tool calls, an error) or when it turns out to be writing copy for
+a content platform. Set ``MODEL_CASCADE=false`` to use the writer for
+everything.
+"""
+
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from src.config import config
+from src.instrumentation import get_callback_handler
+
+
+ROLES = ("router", "extractor", "writer")
+
+# Cheaper role -> role that takes over when its output fails validation
+ESCALATION = {"router": "writer", "extractor": "writer"}
+
+# Publish tools whose arguments are original copy rather than a relay
+COPY_TOOLS = {"publish_content", "twitter_create_post", "twitter_post_and_reply", "linkedin_create_post"}
+
+_models: Dict[Tuple[str, Optional[float]], object] = {}
+_lock = threading.Lock()
+
+
+def role_settings(role: str) -> dict:
+    if role not in ROLES:
+        raise ValueError(f"Unknown model role {role!r}; expected one of {ROLES}")
+    prefix = f"MODEL_{role.upper()}"
+    return {
+        "model": getattr(config, prefix),
+        "temperature": getattr(config, f"{prefix}_TEMPERATURE"),
+        "max_tokens": getattr(config, f"{prefix}_MAX_TOKENS") or None,
+    }
+
+
+def get_model(role: str = "writer", temperature: Optional[float] = None):
+    """Shared ChatMistralAI instance for a role (``temperature`` overrides the role default)."""
+    from langchain_mistralai import ChatMistralAI
+
+    if not config.MODEL_CASCADE:
+        role = "writer"
+    key = (role, temperature)
+    with _lock:
+        if key not in _models:
+            settings = role_settings(role)
+            if temperature is not None:
+                settings["temperature"] = temperature
+            _models[key] = ChatMistralAI(
+                api_key=config.MISTRAL_API_KEY,
+                endpoint=config.MISTRAL_BASE_URL,
+                callbacks=[get_callback_handler()],
+                **settings,
+            )
+        return _models[key]
+
+
+def _current_turn(messages: List) -> List:
+    for i in range(len(messages) - 1, -1, -1):
+        if getattr(messages[i], "type", None) == "human":
+            return messages[i:]
+    return messages
+
+
+def _latest_tool_results(turn: List) -> List:
+    results = []
+    for message in reversed(turn):
+        if getattr(message, "type", None) != "tool":
+            break
+        results.append(message)
+    return results
+
+
+def _is_data(message, publish_tools: set) -> bool:
+    return getattr(message, "type", None) == "tool" and getattr(message, "name", None) not in publish_tools
+
+
+def role_for_turn(messages: List) -> str:
+    """Role for the next model call of the current turn.
+
+    - ``router``    - start of the turn, or after publish results
+    - ``extractor`` - the first round of gathered data, which mostly decides
+      what else to read
+    - ``writer``    - after an analysis result (``analytics`` tools) or a
+      second round of data, where the copy is written
+    """
+    from src.run_ledger import FANOUT_TOOLS, PUBLISH_TOOLS
+    from src.tool_registry import tags_for
+
+    if not config.MODEL_CASCADE:
+        return "writer"
+    publish_tools = PUBLISH_TOOLS.keys() | FANOUT_TOOLS
+    turn = _current_turn(messages)
+    latest = _latest_tool_results(turn)
+    data = [m for m in latest if _is_data(m, publish_tools)]
+    if not data:
+        return "router"
+    earlier = turn[:len(turn) - len(latest)]
+    if any(_is_data(m, publish_tools) for m in earlier) \
+            or any("analytics" in (tags_for(m.name or "") or ()) for m in data):
+        return "writer"
+    return "extractor"
+
+
+def needs_escalation(role: str, messages: List, response, tool_names: Optional[set] = None) -> Optional[str]:
+    """Reason to redo a cheaper role's response with the writer, or None to accept it."""
+    if role not in ESCALATION:
+        return None
+    if getattr(response, "invalid_tool_calls", None):
+        return "invalid tool call"
+    calls = getattr(response, "tool_calls", None) or []
+    if tool_names is not None and any(c["name"] not in tool_names for c in calls):
+        return "unknown tool"
+    if any(c["name"] in COPY_TOOLS for c in calls):
+        return "writes copy"
+    return None
+
+
+def _tool_names(tools) -> set:
+    return {t.name if hasattr(t, "name") else (t.get("function") or t).get("name") for t in tools or []}
+
+
+def invoke_with_cascade(messages: List, tools: List):
+    """Call the model for the next agent turn, escalating to the writer when needed (legacy graph)."""
+    role = role_for_turn(messages)
+    names = _tool_names(tools)
+    try:
+        response = get_model(role).bind_tools(tools).invoke(messages)
+        reason = needs_escalation(role, messages, response, names)
+    except Exception as e:
+        if role not in ESCALATION:
+            raise
+        reason = f"error: {e}"
+    if reason is None:
+        return response
+    print(f"[MODELS] Escalating {role} -> {ESCALATION[role]} ({reason})")
+    return get_model(ESCALATION[role]).bind_tools(tools).invoke(messages)
+
+
+def invoke_structured(schema, prompt, role: str = "extractor"):
+    """Structured output from ``role``, retried on the escalation role when parsing or validation fails."""
+    while True:
+        try:
+            result = get_model(role).with_structured_output(schema, include_raw=True).invoke(prompt)
+            if result.get("parsed") is not None and result.get("parsing_error") is None:
+                return result["parsed"]
+            reason = result.get("parsing_error") or "no structured output"
+        except Exception as e:
+            reason = e
+        if role not in ESCALATION or not config.MODEL_CASCADE:
+            raise ValueError(f"{role} model returned no valid {schema.__name__}: {reason}")
+        print(f"[MODELS] Escalating {role} -> {ESCALATION[role]} ({str(reason)[:200]})")
+        role = ESCALATION[role]
+
+
+def cascade_middleware():
+    """Deep-agent middleware that routes each model call to a role and escalates failed outputs."""
+    from langchain.agents.middleware import AgentMiddleware
+    from langchain.agents.middleware.types import ModelResponse
+
+    def _ai_message(response):
+        if isinstance(response, ModelResponse):
+            return next((m for m in response.result if getattr(m, "type", None) == "ai"), None)
+        return response
+
+    class ModelCascadeMiddleware(AgentMiddleware):
+        def wrap_model_call(self, request, handler):
+            role = role_for_turn(request.messages)
+            try:
+                response = handler(request.override(model=get_model(role)))
+                reason = needs_escalation(role, request.messages, _ai_message(response), _tool_names(request.tools))
+            except Exception as e:
+                if role not in ESCALATION:
+                    raise
+                reason = f"error: {e}"
+            if reason is None:
+                return response
+            print(f"[MODELS] Escalating {role} -> {ESCALATION[role]} ({reason})")
+            return handler(request.override(model=get_model(ESCALATION[role])))
+
+        async def awrap_model_call(self, request, handler):
+            role = role_for_turn(request.messages)
+            try:
+                response = await handler(request.override(model=get_model(role)))
+                reason = needs_escalation(role, request.messages, _ai_message(response), _tool_names(request.tools))
+            except Exception as e:
+                if role not in ESCALATION:
+                    raise
+                reason = f"error: {e}"
+            if reason is None:
+                return response
+            print(f"[MODELS] Escalating {role} -> {ESCALATION[role]} ({reason})")
+            return await handler(request.override(model=get_model(ESCALATION[role])))
+
+    return ModelCascadeMiddleware()
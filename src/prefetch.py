@@ -0,0 +1,129 @@
+"""Speculative prefetch of the research tools at cycle start.
+
+An autonomous cycle always begins the same way: the model's first turn asks
+for ``monitor_telegram_group``, ``fast_scrape_and_cache`` and
+``scrape_yieldbot_website``. Without prefetch, nothing is fetched until that
+first model call returns. ``prefetch_cycle()`` starts those tools in
+background threads as the cycle begins, so their network I/O overlaps the
+first model calls:
+
+- the ``prefetched`` tool wrapper serves the model's call from the
+  background result when the tool and arguments match what was prefetched.
+  Each result is used once; a second call, or a call with other arguments,
+  runs live
+- if the prefetch failed, the call runs live as if there had been none
+- the background calls run the tool's full wrapper stack in the cycle's
+  context, so the budget guard, cycle deadline, circuit breakers, tool spans
+  and output projection apply to them as to a live call. ``prefetched`` is
+  therefore the outermost wrapper (``tools.TOOL_WRAPPERS``)
+
+``PREFETCH_TOOLS`` lists the tools to prefetch (empty disables prefetch).
+"""
+
+import inspect
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from contextvars import ContextVar, copy_context
+from functools import wraps
+from typing import Callable, Dict, Optional
+
+from src import resilience
+from src.config import config
+
+
+# Tool name -> its wrapped function (every layer below ``prefetched``), registered by ``prefetched``
+_sources: Dict[str, Callable] = {}
+
+_active: ContextVar[Optional["Prefetch"]] = ContextVar("ybot_prefetch", default=None)
+
+
+def _call_key(func: Callable, args: tuple, kwargs: dict) -> Optional[tuple]:
+    """Arguments that differ from the function's defaults, so ``f()`` and ``f(limit=5)`` match."""
+    try:
+        signature = inspect.signature(func)
+        bound = signature.bind(*args, **kwargs)
+    except (TypeError, ValueError):
+        return None
+    return tuple(sorted((name, repr(value)) for name, value in bound.arguments.items()
+                        if value != signature.parameters[name].default))
+
+
+def default_plan() -> Dict[str, dict]:
+    return {name.strip(): {} for name in config.PREFETCH_TOOLS.split(",") if name.strip()}
+
+
+class Prefetch:
+    """Background calls started for one cycle, each consumed at most once."""
+
+    def __init__(self, plan: Dict[str, dict]):
+        self.plan = plan
+        self.futures: Dict[str, tuple] = {}  # name -> (call key, future)
+        self.served = 0
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    def start(self) -> None:
+        jobs = [(name, kwargs, _sources[name]) for name, kwargs in self.plan.items() if name in _sources]
+        if not jobs:
+            return
+        self._pool = ThreadPoolExecutor(max_workers=len(jobs), thread_name_prefix="prefetch")
+        for name, kwargs, func in jobs:
+            self.futures[name] = (_call_key(func, (), kwargs), self._pool.submit(copy_context().run, func, **kwargs))
+        print(f"[PREFETCH] Started {', '.join(name for name, _, _ in jobs)}")
+
+    def take(self, name: str, key: Optional[tuple]) -> Optional[Future]:
+        with self._lock:
+            entry = self.futures.get(name)
+            if entry is None or key is None or entry[0] != key:
+                return None
+            del self.futures[name]
+            self.served += 1
+            return entry[1]
+
+    def close(self) -> None:
+        """Drop unstarted calls and wait for running ones, so none outlives the cycle."""
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+        unused = sorted(self.futures)
+        print(f"[PREFETCH] Served {self.served} prefetched results"
+              + (f"; unused: {', '.join(unused)}" if unused else ""))
+
+
+@contextmanager
+def prefetch_cycle(plan: Optional[Dict[str, dict]] = None):
+    """Prefetch ``plan`` (tool name -> kwargs, default ``PREFETCH_TOOLS``) for the enclosed cycle."""
+    plan = default_plan() if plan is None else plan
+    if not plan:
+        yield None
+        return
+    prefetch = Prefetch(plan)
+    token = _active.set(prefetch)
+    try:
+        prefetch.start()
+        yield prefetch
+    finally:
+        _active.reset(token)
+        prefetch.close()
+
+
+def prefetched(name: str, func: Callable) -> Callable:
+    """Tool wrapper that returns the cycle's prefetched result for a matching call."""
+    _sources[name] = func
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        prefetch = _active.get()
+        future = prefetch.take(name, _call_key(func, args, kwargs)) if prefetch else None
+        if future is None:
+            return func(*args, **kwargs)
+        try:
+            left = resilience.remaining()
+            result = future.result(timeout=None if left is None else max(left, 0))
+        except Exception as e:
+            print(f"[PREFETCH] {name}: prefetch failed ({e}); fetching live")
+            return func(*args, **kwargs)
+        print(f"[PREFETCH] {name}: served prefetched result")
+        return result
+
+    return wrapper
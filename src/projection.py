@@ -0,0 +1,196 @@
+"""Per-tool result projections.
+
+Tools return raw platform responses (full Composio JSON, the whole Firecrawl
+search object, the entire daily research file). Everything a tool returns
+ends up in the conversation and is re-sent on every following turn. A
+projection keeps only what the model acts on: IDs, status, errors and short
+text. When the projection dropped a meaningful amount, the full payload is
+written to the blob store as debug storage and its ``debug_ref`` is added so
+``read_blob`` can still reach it.
+
+Projected publish results keep the fields ``src.run_ledger`` reads
+(``successful``/``status``, ``data.id``, ``message_id``, ``create``) and
+the HTTP status of failures, so outcome tracking and retries are unchanged.
+"""
+
+import json
+from functools import wraps
+from typing import Callable, Dict, Optional
+
+from src.blobs import get_blob_store
+from src.config import config
+from src.run_ledger import outcome_from_result
+
+
+# Only attach a debug_ref when the projection dropped at least this many chars
+DEBUG_REF_MIN_DROPPED = 500
+
+
+def _clip(text, limit: Optional[int] = None) -> str:
+    limit = limit or config.PROJECTION_TEXT_CHARS
+    text = "" if text is None else str(text)
+    return text if len(text) <= limit else text[:limit] + "..."
+
+
+def _field(item, key: str):
+    return item.get(key) if isinstance(item, dict) else getattr(item, key, None)
+
+
+def project_publish(platform: str, result) -> dict:
+    """Success flag, post ID and error of a publish call."""
+    if not isinstance(result, dict):
+        return result
+    outcome = outcome_from_result(platform, result)
+    ok = outcome["outcome"] == "ok"
+    projected = {"successful": ok, "status": "success" if ok else "error"}
+    if platform == "telegram":
+        projected["message_id"] = outcome.get("post_id")
+        if result.get("chat_id"):
+            projected["chat_id"] = result["chat_id"]
+    else:
+        projected["data"] = {"id": outcome.get("post_id")}
+    if not ok:
+        projected["error"] = _clip(outcome.get("error"), 500)
+        # The HTTP status decides whether the graph's publish branches retry
+        projected.update({k: result[k] for k in ("status_code", "error_code") if result.get(k) is not None})
+    return projected
+
+
+def _project_reply(result) -> dict:
+    if isinstance(result, dict) and "reply_result" in result:
+        projected = project_publish("twitter_reply", result["reply_result"])
+        projected["fallback_create"] = project_publish("twitter", result.get("fallback_create"))
+        return projected
+    return project_publish("twitter_reply", result)
+
+
+def _project_post_and_reply(result) -> dict:
+    if not isinstance(result, dict):
+        return result
+    projected = {"create": project_publish("twitter", result["create"]) if result.get("create") else None}
+    if "reply" in result:
+        projected["reply"] = _project_reply(result["reply"])
+    if "fallback" in result:
+        fallback = result["fallback"] or {}
+        telegram = fallback.get("telegram_post") or {}
+        projected["fallback"] = {
+            "saved_to": fallback.get("saved_to"),
+            "telegram_ok": bool(telegram.get("ok")),
+            "telegram_error": telegram.get("description") or telegram.get("error"),
+        }
+    return projected
+
+
+def _search_items(results) -> list:
+    """Flatten a Firecrawl search response (``web``/``news``/``data`` lists) into short entries."""
+    items = []
+    if not isinstance(results, dict):
+        return items
+    for key in ("web", "news", "data"):
+        for item in results.get(key) or []:
+            items.append({
+                "title": _clip(_field(item, "title"), 200),
+                "url": _field(item, "url"),
+                "description": _clip(_field(item, "description") or _field(item, "snippet") or _field(item, "markdown"), 300),
+            })
+    return items
+
+
+def _project_search(result) -> dict:
+    if not isinstance(result, dict) or result.get("error"):
+        return result
+    projected = {k: result.get(k) for k in ("status", "query", "queries", "result_count", "cached_to", "note") if k in result}
+    projected["results"] = _search_items(result.get("results"))
+    return projected
+
+
+def _project_market(market) -> dict:
+    """A market data snapshot as its one-line summary (``$SOL -1.30% at $221.1, ...``)."""
+    if not isinstance(market, dict) or market.get("error"):
+        return market
+    return {k: market.get(k) for k in ("provider", "as_of", "summary")}
+
+
+def _project_research_file(data) -> dict:
+    """A daily research file, either from ``fast_scrape_and_cache`` or from ``search_defi_news``."""
+    if not isinstance(data, dict):
+        return data
+    market = {"market": _project_market(data["market"])} if "market" in data else {}
+    if isinstance(data.get("data"), list):
+        entries = []
+        for entry in data["data"]:
+            if entry.get("error"):
+                entries.append({"url": entry.get("url"), "error": _clip(entry["error"], 200)})
+            else:
+                entries.append({"url": entry.get("url"), "title": _clip(entry.get("title"), 200),
+                                "snippet": _clip(entry.get("snippet"))})
+        projected = {"timestamp": data.get("timestamp"), "complete": data.get("complete", True),
+                     **market, "data": entries}
+        if "results" in data:
+            projected["queries"] = data.get("queries")
+            projected["results"] = _search_items(data.get("results"))
+        return projected
+    if "results" in data:
+        return {"query": data.get("query"), "timestamp": data.get("timestamp"), **market,
+                "results": _search_items(data.get("results"))}
+    return data
+
+
+def _project_cached_research(result) -> dict:
+    if not isinstance(result, dict) or "data" not in result:
+        return result
+    return {**result, "data": _project_research_file(result["data"])}
+
+
+def _project_text(key: str) -> Callable:
+    def project(result):
+        if isinstance(result, dict) and isinstance(result.get(key), str):
+            return {**result, key: _clip(result[key])}
+        return result
+    return project
+
+
+PROJECTIONS: Dict[str, Callable] = {
+    "twitter_create_post": lambda r: project_publish("twitter", r),
+    "twitter_reply_to_post": _project_reply,
+    "twitter_post_and_reply": _project_post_and_reply,
+    "linkedin_create_post": lambda r: project_publish("linkedin", r),
+    "send_telegram_message": lambda r: project_publish("telegram", r),
+    "send_telegram_photo": lambda r: project_publish("telegram", r),
+    "search_defi_news": _project_search,
+    "fast_scrape_and_cache": _project_research_file,
+    "get_cached_research": _project_cached_research,
+    "scrape_page": _project_text("content"),
+    "scrape_yieldbot_website": _project_text("summary"),
+    "generate_nft_image": _project_text("message"),
+}
+
+
+def project_output(name: str, func: Callable) -> Callable:
+    """Tool wrapper that returns the projected result and keeps the full one in debug storage."""
+    projection = PROJECTIONS.get(name)
+    if projection is None:
+        return func
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        result = func(*args, **kwargs)
+        if not config.TOOL_PROJECTION or (isinstance(result, dict) and result.get("status") == "skipped"):
+            return result
+        try:
+            projected = projection(result)
+        except Exception as e:
+            print(f"[PROJECTION] {name}: {e}; returning full result")
+            return result
+        if not isinstance(projected, dict):
+            return projected
+        full = json.dumps(result, ensure_ascii=False, default=str)
+        # Only store the full result when the projection dropped enough to attach a ref to it
+        if len(full) - len(json.dumps(projected, ensure_ascii=False, default=str)) < DEBUG_REF_MIN_DROPPED:
+            return projected
+        try:
+            return {**projected, "debug_ref": get_blob_store().put(full)}
+        except OSError:
+            return projected
+
+    return wrapper
@@ -0,0 +1,254 @@
+"""Circuit breakers per external service and a per-cycle deadline.
+
+A provider that hangs or fails repeatedly should not stall the whole cycle.
+Two mechanisms bound how long a cycle can spend on external calls:
+
+- **Circuit breakers** - one per service (composio, telegram, firecrawl, ...).
+  After ``BREAKER_FAILURE_THRESHOLD`` consecutive failures (connection
+  errors, timeouts, 5xx, 429) the breaker opens and calls fail immediately
+  for ``BREAKER_RESET_SECONDS``. After that, one trial call is let through
+  (half-open); if it succeeds the breaker closes again.
+- **Cycle deadline** - ``cycle_deadline()`` sets the cycle's end time
+  (``CYCLE_DEADLINE_SECONDS``) in a context variable. Every HTTP call uses
+  at most the remaining budget as its timeout, and retry sleeps never run
+  past the deadline. The ``budget_guard`` tool wrapper skips optional steps
+  (LinkedIn, image generation, ...) once less than
+  ``CYCLE_OPTIONAL_RESERVE_SECONDS`` is left, and skips every tool once the
+  deadline has passed. After the deadline the model is offered no tools,
+  so it wraps up with a final answer.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Callable, Dict, Optional
+
+from src.config import config
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a service whose breaker is open."""
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when the cycle's time budget does not cover a call."""
+
+
+class CircuitBreaker:
+    """Closed -> open after repeated failures -> half-open trial -> closed."""
+
+    CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+    def __init__(self, name: str, failure_threshold: Optional[int] = None,
+                 reset_seconds: Optional[float] = None):
+        self.name = name
+        self.failure_threshold = failure_threshold or config.BREAKER_FAILURE_THRESHOLD
+        self.reset_seconds = config.BREAKER_RESET_SECONDS if reset_seconds is None else reset_seconds
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return self.CLOSED
+        if time.monotonic() - self.opened_at >= self.reset_seconds:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def before_call(self) -> None:
+        """Raise ``CircuitOpenError`` unless a call may go through now."""
+        with self._lock:
+            state = self.state
+            if state == self.CLOSED:
+                return
+            if state == self.HALF_OPEN and not self._trial_running:
+                self._trial_running = True
+                return
+        raise CircuitOpenError(f"{self.name} unavailable (circuit open after {self.failures} failures)")
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self.opened_at is not None:
+                print(f"[BREAKER] {self.name} recovered; closing circuit")
+            self.failures = 0
+            self.opened_at = None
+            self._trial_running = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if self._trial_running or self.failures >= self.failure_threshold:
+                if self.opened_at is None or self._trial_running:
+                    print(f"[BREAKER] {self.name} opened after {self.failures} failures")
+                self.opened_at = time.monotonic()
+            self._trial_running = False
+
+    def call(self, func: Callable, *args, **kwargs):
+        """Run ``func`` through the breaker; any exception counts as a failure."""
+        self.before_call()
+        try:
+            result = func(*args, **kwargs)
+        except Exception:
+            self.record_failure()
+            raise
+        self.record_success()
+        return result
+
+    def snapshot(self) -> dict:
+        return {"service": self.name, "state": self.state, "failures": self.failures}
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(service: str) -> CircuitBreaker:
+    with _breakers_lock:
+        if service not in _breakers:
+            _breakers[service] = CircuitBreaker(service)
+        return _breakers[service]
+
+
+def breaker_states() -> Dict[str, dict]:
+    with _breakers_lock:
+        return {name: b.snapshot() for name, b in _breakers.items()}
+
+
+def is_failure_status(status: int) -> bool:
+    """Responses that say the service itself is struggling (not a bad request)."""
+    return status == 429 or status >= 500
+
+
+# Monotonic time at which the current cycle must be done, or None (no deadline)
+_deadline: ContextVar[Optional[float]] = ContextVar("ybot_cycle_deadline", default=None)
+
+
+@contextmanager
+def cycle_deadline(seconds: Optional[float] = None):
+    """Bound everything run in this context to ``seconds`` (default ``CYCLE_DEADLINE_SECONDS``).
+
+    A deadline already set by an enclosing context is kept when it is earlier.
+    ``seconds <= 0`` disables the deadline.
+    """
+    seconds = config.CYCLE_DEADLINE_SECONDS if seconds is None else seconds
+    deadline = time.monotonic() + seconds if seconds > 0 else None
+    outer = _deadline.get()
+    if outer is not None and (deadline is None or outer < deadline):
+        deadline = outer
+    token = _deadline.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _deadline.reset(token)
+
+
+def remaining() -> Optional[float]:
+    """Seconds left in the current cycle, or None when no deadline is set."""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+
+def expired() -> bool:
+    left = remaining()
+    return left is not None and left <= 0
+
+
+def budget_timeout(timeout: Optional[float] = None) -> float:
+    """``timeout`` (default ``HTTP_TIMEOUT_SECONDS``) capped to the remaining cycle budget."""
+    timeout = timeout or config.HTTP_TIMEOUT_SECONDS
+    left = remaining()
+    if left is None:
+        return timeout
+    if left <= 0:
+        raise DeadlineExceeded("cycle deadline exceeded")
+    return min(timeout, left)
+
+
+def sleep(seconds: float) -> None:
+    """``time.sleep`` that refuses to run past the cycle deadline."""
+    left = remaining()
+    if left is not None and left <= seconds:
+        raise DeadlineExceeded(f"no budget left to wait {seconds:.0f}s")
+    time.sleep(seconds)
+
+
+# Steps a cycle can drop without failing its main goal (a tweet plus Telegram post)
+OPTIONAL_TOOLS = {
+    "linkedin_create_post",
+    "generate_nft_image",
+    "twitter_upload_media",
+    "send_telegram_photo",
+    "scrape_page",
+    "search_defi_news",
+    "analyze_tweet_performance",
+}
+
+# Service behind each tool, to skip tools whose breaker is open without calling them
+TOOL_SERVICES = {
+    "twitter_upload_media": "composio",
+    "twitter_create_post": "composio",
+    "twitter_reply_to_post": "composio",
+    "twitter_post_and_reply": "composio",
+    "linkedin_create_post": "composio",
+    "send_telegram_message": "telegram",
+    "send_telegram_photo": "telegram",
+    "monitor_telegram_group": "telegram",
+    "generate_nft_image": "pollinations",
+    "search_defi_news": "firecrawl",
+    "scrape_page": "firecrawl",
+    "fast_scrape_and_cache": "firecrawl",
+    "scrape_yieldbot_website": "yieldbot",
+    "analyze_tweet_performance": "composio",
+    "get_market_data": config.MARKET_DATA_PROVIDER.lower(),
+}
+
+
+def _skipped(name: str, reason: str) -> dict:
+    print(f"[BUDGET] Skipping {name}: {reason}")
+    return {"status": "skipped", "skipped": True, "tool": name, "reason": reason}
+
+
+def budget_guard(name: str, func: Callable) -> Callable:
+    """Tool wrapper that skips calls the cycle budget or an open breaker cannot cover."""
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        left = remaining()
+        if left is not None:
+            if left <= 0:
+                return _skipped(name, "cycle deadline exceeded")
+            if name in OPTIONAL_TOOLS and left < config.CYCLE_OPTIONAL_RESERVE_SECONDS:
+                return _skipped(name, f"optional step, only {left:.0f}s of cycle budget left")
+        service = TOOL_SERVICES.get(name)
+        if service and get_breaker(service).state == CircuitBreaker.OPEN:
+            return _skipped(name, f"{service} unavailable (circuit open)")
+        try:
+            return func(*args, **kwargs)
+        except (CircuitOpenError, DeadlineExceeded) as e:
+            return _skipped(name, str(e))
+
+    return wrapper
+
+
+def deadline_middleware():
+    """Deep-agent middleware that stops offering tools once the cycle deadline has passed."""
+    from langchain.agents.middleware import AgentMiddleware
+
+    def _bounded(request):
+        if expired():
+            print("[BUDGET] Cycle deadline passed; asking the model to wrap up without tools")
+            return request.override(tools=[])
+        return request
+
+    class DeadlineMiddleware(AgentMiddleware):
+        def wrap_model_call(self, request, handler):
+            return handler(_bounded(request))
+
+        async def awrap_model_call(self, request, handler):
+            return await handler(_bounded(request))
+
+    return DeadlineMiddleware()
@@ -0,0 +1,324 @@
+"""Append-only run ledger for AI Agent YBot.
+
+Every scheduled cycle appends one row to ``runs`` together with its step
+timings and per-platform publish outcomes, so ``check_status.py`` can report
+history, latency percentiles and failure rates instead of only the last run.
+"""
+
+import json
+import math
+import os
+import sqlite3
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from src.config import config
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id TEXT UNIQUE NOT NULL,
+    started_at TEXT NOT NULL,
+    finished_at TEXT,
+    duration_ms REAL,
+    status TEXT NOT NULL,
+    error TEXT,
+    tweet_id TEXT,
+    linkedin_id TEXT,
+    telegram_message_id TEXT,
+    prompt_tokens INTEGER DEFAULT 0,
+    completion_tokens INTEGER DEFAULT 0,
+    deploy TEXT
+);
+CREATE TABLE IF NOT EXISTS steps (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    kind TEXT NOT NULL DEFAULT 'step',
+    duration_ms REAL,
+    outcome TEXT NOT NULL,
+    error TEXT
+);
+CREATE TABLE IF NOT EXISTS publishes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    run_id TEXT NOT NULL,
+    platform TEXT NOT NULL,
+    outcome TEXT NOT NULL,
+    post_id TEXT,
+    error TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_steps_run ON steps(run_id);
+CREATE INDEX IF NOT EXISTS idx_publishes_run ON publishes(run_id);
+"""
+
+# Tool name -> platform it publishes to
+PUBLISH_TOOLS = {
+    "twitter_create_post": "twitter",
+    "twitter_post_and_reply": "twitter",
+    "twitter_reply_to_post": "twitter_reply",
+    "linkedin_create_post": "linkedin",
+    "send_telegram_message": "telegram",
+    "send_telegram_photo": "telegram",
+}
+
+# Tools that publish to several platforms and return their per-platform ``outcomes``
+FANOUT_TOOLS = {"publish_content"}
+
+
+def connect(path: Optional[str] = None) -> sqlite3.Connection:
+    """Open the ledger database, creating the schema on first use."""
+    conn = sqlite3.connect(path or config.RUN_LEDGER_PATH, timeout=10)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+class RunRecorder:
+    """Collects timings and outcomes for one cycle and appends them on finish."""
+
+    def __init__(self, run_id: Optional[str] = None, path: Optional[str] = None):
+        self.run_id = run_id or uuid.uuid4().hex
+        self.path = path
+        self.started_at = datetime.now()
+        self._t0 = time.perf_counter()
+        self.steps: List[dict] = []
+        self.publishes: Dict[str, dict] = {}
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self._tokens_from_spans = False
+
+    @contextmanager
+    def step(self, name: str):
+        """Time a block of work; exceptions are recorded and re-raised."""
+        t0 = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            self.record_step(name, (time.perf_counter() - t0) * 1000, "error", str(e))
+            raise
+        self.record_step(name, (time.perf_counter() - t0) * 1000, "ok")
+
+    def record_step(self, name: str, duration_ms: float, outcome: str = "ok",
+                    error: Optional[str] = None, kind: str = "step") -> None:
+        self.steps.append({
+            "name": name,
+            "kind": kind,
+            "duration_ms": duration_ms,
+            "outcome": outcome,
+            "error": error,
+        })
+
+    def record_publish(self, platform: str, outcome: str, post_id: Optional[str] = None,
+                       error: Optional[str] = None) -> None:
+        """Record a platform outcome; a later success overrides an earlier failure."""
+        previous = self.publishes.get(platform)
+        if previous and previous["outcome"] == "ok" and outcome != "ok":
+            return
+        self.publishes[platform] = {"outcome": outcome, "post_id": post_id, "error": error}
+
+    def add_tokens(self, prompt: int = 0, completion: int = 0) -> None:
+        self.prompt_tokens += prompt or 0
+        self.completion_tokens += completion or 0
+
+    def ingest_messages(self, messages) -> None:
+        """Pull publish outcomes and token usage out of an agent's final message list."""
+        for outcome in outcomes_from_messages(messages):
+            self.record_publish(outcome["platform"], outcome["outcome"],
+                                outcome.get("post_id"), outcome.get("error"))
+        if self._tokens_from_spans:
+            return
+        for message in messages or []:
+            usage = getattr(message, "usage_metadata", None) or {}
+            self.add_tokens(usage.get("input_tokens", 0), usage.get("output_tokens", 0))
+
+    def ingest_spans(self, spans: List[dict]) -> None:
+        """Record tool, HTTP and model spans from ``src.instrumentation`` as steps.
+
+        Model spans carry exact per-call token counts, so when present they
+        replace the totals derived from message ``usage_metadata``.
+        """
+        llm_spans = [s for s in spans if s["kind"] == "llm"]
+        for span in spans:
+            self.record_step(span["name"], span["duration_ms"], span["outcome"], span.get("error"), kind=span["kind"])
+        if llm_spans:
+            self._tokens_from_spans = True
+            self.prompt_tokens = sum(s["prompt_tokens"] for s in llm_spans)
+            self.completion_tokens = sum(s["completion_tokens"] for s in llm_spans)
+
+    def finish(self, status: str = "Success", error: Optional[str] = None) -> dict:
+        """Append the run to the ledger and return it as a dict."""
+        duration_ms = (time.perf_counter() - self._t0) * 1000
+
+        def post_id(platform: str) -> Optional[str]:
+            return (self.publishes.get(platform) or {}).get("post_id")
+
+        row = {
+            "run_id": self.run_id,
+            "started_at": self.started_at.isoformat(),
+            "finished_at": datetime.now().isoformat(),
+            "duration_ms": duration_ms,
+            "status": status,
+            "error": error,
+            "tweet_id": post_id("twitter"),
+            "linkedin_id": post_id("linkedin"),
+            "telegram_message_id": post_id("telegram"),
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "deploy": os.getenv("RAILWAY_GIT_COMMIT_SHA", "")[:12] or None,
+        }
+        try:
+            conn = connect(self.path)
+            with conn:
+                conn.execute(
+                    f"INSERT INTO runs ({', '.join(row)}) VALUES ({', '.join('?' * len(row))})",
+                    tuple(row.values()),
+                )
+                conn.executemany(
+                    "INSERT INTO steps (run_id, name, kind, duration_ms, outcome, error) VALUES (?, ?, ?, ?, ?, ?)",
+                    [(self.run_id, s["name"], s["kind"], s["duration_ms"], s["outcome"], s["error"]) for s in self.steps],
+                )
+                conn.executemany(
+                    "INSERT INTO publishes (run_id, platform, outcome, post_id, error) VALUES (?, ?, ?, ?, ?)",
+                    [(self.run_id, p, o["outcome"], o["post_id"], o["error"]) for p, o in self.publishes.items()],
+                )
+            conn.close()
+        except Exception as e:
+            print(f"[LEDGER] Failed to record run {self.run_id}: {e}")
+        try:
+            from src.engagement import track_published
+            track_published(self.run_id, self.publishes)
+        except Exception as e:
+            print(f"[LEDGER] Failed to track published posts of {self.run_id}: {e}")
+        return row
+
+
+def _parse_tool_content(content) -> dict:
+    if isinstance(content, dict):
+        return content
+    try:
+        parsed = json.loads(content)
+        return parsed if isinstance(parsed, dict) else {"raw": parsed}
+    except (TypeError, ValueError):
+        return {"raw": str(content)}
+
+
+def _post_id(platform: str, result: dict) -> Optional[str]:
+    """Find the created post ID in the various Composio/Telegram response shapes."""
+    if platform == "telegram":
+        message_id = result.get("message_id") or (result.get("result") or {}).get("message_id")
+        return str(message_id) if message_id else None
+    if "create" in result and isinstance(result["create"], dict):
+        result = result["create"]
+    data = result.get("data") or {}
+    if not isinstance(data, dict):
+        return None
+    post_id = data.get("id") or (data.get("data") or {}).get("id")
+    if not post_id:
+        post_id = (data.get("response_headers") or {}).get("x-restli-id")
+    return str(post_id) if post_id else None
+
+
+def _is_success(result: dict) -> bool:
+    if "create" in result and isinstance(result["create"], dict):
+        result = result["create"]
+    return bool(result.get("successful")) or result.get("status") == "success"
+
+
+def outcome_from_result(platform: str, result) -> dict:
+    """Map one publish tool result to a per-platform outcome."""
+    result = _parse_tool_content(result)
+    if result.get("status") == "skipped":
+        return {"platform": platform, "outcome": "skipped", "error": str(result.get("reason") or "skipped")[:500]}
+    if _is_success(result):
+        return {"platform": platform, "outcome": "ok", "post_id": _post_id(platform, result)}
+    error = result.get("error") or result.get("description") or result.get("raw") or "unknown error"
+    return {"platform": platform, "outcome": "error", "error": str(error)[:500]}
+
+
+def outcomes_from_messages(messages) -> List[dict]:
+    """Map the publish tool results in a message list to per-platform outcomes."""
+    outcomes = []
+    for message in messages or []:
+        if getattr(message, "type", None) != "tool":
+            continue
+        if getattr(message, "name", None) in FANOUT_TOOLS:
+            outcomes.extend(_parse_tool_content(message.content).get("outcomes") or [])
+            continue
+        platform = PUBLISH_TOOLS.get(getattr(message, "name", None) or "")
+        if not platform:
+            continue
+        outcomes.append(outcome_from_result(platform, message.content))
+    return outcomes
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile of a list of numbers."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def last_runs(limit: int = 10, path: Optional[str] = None) -> List[dict]:
+    """Most recent runs, newest first."""
+    conn = connect(path)
+    rows = conn.execute("SELECT * FROM runs ORDER BY id DESC LIMIT ?", (limit,)).fetchall()
+    conn.close()
+    return [dict(row) for row in rows]
+
+
+def step_percentiles(window: int = 50, path: Optional[str] = None) -> Dict[str, dict]:
+    """p50/p95 duration per step name over the last ``window`` runs."""
+    conn = connect(path)
+    rows = conn.execute(
+        """SELECT name, kind, duration_ms FROM steps
+           WHERE run_id IN (SELECT run_id FROM runs ORDER BY id DESC LIMIT ?)""",
+        (window,),
+    ).fetchall()
+    conn.close()
+
+    durations: Dict[str, List[float]] = {}
+    kinds: Dict[str, str] = {}
+    for row in rows:
+        if row["duration_ms"] is None:
+            continue
+        durations.setdefault(row["name"], []).append(row["duration_ms"])
+        kinds[row["name"]] = row["kind"]
+    return {
+        name: {
+            "kind": kinds[name],
+            "count": len(values),
+            "p50_ms": percentile(values, 50),
+            "p95_ms": percentile(values, 95),
+        }
+        for name, values in durations.items()
+    }
+
+
+def platform_failure_rates(window: int = 50, path: Optional[str] = None) -> Dict[str, dict]:
+    """Attempts, failures and failure rate per platform over the last ``window`` runs (skips excluded)."""
+    conn = connect(path)
+    rows = conn.execute(
+        """SELECT platform,
+                  COUNT(*) AS attempts,
+                  SUM(CASE WHEN outcome = 'ok' THEN 0 ELSE 1 END) AS failures
+           FROM publishes
+           WHERE outcome != 'skipped' AND run_id IN (SELECT run_id FROM runs ORDER BY id DESC LIMIT ?)
+           GROUP BY platform""",
+        (window,),
+    ).fetchall()
+    conn.close()
+    return {
+        row["platform"]: {
+            "attempts": row["attempts"],
+            "failures": row["failures"],
+            "failure_rate": row["failures"] / row["attempts"] if row["attempts"] else 0.0,
+        }
+        for row in rows
+    }
@@ -0,0 +1,396 @@
+"""Streaming HTTP API for AI Agent YBot.
+
+A plain ASGI app that builds the agent once at startup and serves runs from
+that warm instance. Runs go through a bounded queue (``SERVER_MAX_CONCURRENCY``
+running, ``SERVER_MAX_QUEUE`` waiting) and their progress is streamed over
+Server-Sent Events.
+
+    POST /runs                  {"input": "...", "thread_id": "..."} or {"auto": true}
+    GET  /runs/{run_id}         run status and final response
+    GET  /runs/{run_id}/events  SSE: queued, started, token, message, done|error|cancelled
+    POST /runs/{run_id}/cancel  cancel a queued or running run
+    GET  /health
+
+Start it with ``python -m src.server`` (or ``uvicorn src.server:app``).
+``SERVER_AGENT`` picks the deep agent (``deep``) or ``create_agent_graph()``
+(``graph``); when ``SERVER_API_TOKEN`` is set every request except
+``/health`` needs ``Authorization: Bearer <token>``.
+"""
+
+import asyncio
+import json
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime
+from typing import Optional
+
+from src import instrumentation
+from src.cache import cache_stats
+from src.config import config
+from src.resilience import breaker_states, cycle_deadline
+from src.run_ledger import RunRecorder
+
+
+TERMINAL_EVENTS = ("done", "error", "cancelled")
+MAX_CONTENT_CHARS = 4000
+KEEPALIVE_SECONDS = 15
+MAX_RUNS_KEPT = 200
+
+
+def _text(content) -> str:
+    if isinstance(content, str):
+        return content
+    return "".join(part.get("text", "") if isinstance(part, dict) else str(part) for part in content or [])
+
+
+def _message_event(node: str, message) -> dict:
+    event = {
+        "node": node,
+        "type": getattr(message, "type", "unknown"),
+        "content": _text(getattr(message, "content", ""))[:MAX_CONTENT_CHARS],
+    }
+    if getattr(message, "name", None):
+        event["name"] = message.name
+    tool_calls = getattr(message, "tool_calls", None)
+    if tool_calls:
+        event["tool_calls"] = [{"name": c["name"], "args": c["args"]} for c in tool_calls]
+    return event
+
+
+def _since_last_input(messages: list) -> list:
+    """Messages produced by the latest run on a (possibly reused) thread."""
+    for i in range(len(messages) - 1, -1, -1):
+        if getattr(messages[i], "type", None) == "human":
+            return messages[i:]
+    return messages
+
+
+class Run:
+    """One agent run and the events it has produced so far."""
+
+    def __init__(self, user_input: str, thread_id: Optional[str] = None):
+        self.run_id = uuid.uuid4().hex
+        self.thread_id = thread_id or str(uuid.uuid4())
+        self.input = user_input
+        self.status = "queued"
+        self.created_at = datetime.now().isoformat()
+        self.response: Optional[str] = None
+        self.error: Optional[str] = None
+        self.task: Optional[asyncio.Task] = None
+        self.events: list = []
+        self._subscribers: list = []
+
+    def publish(self, event: str, data: dict) -> None:
+        item = (event, data)
+        self.events.append(item)
+        for queue in self._subscribers:
+            queue.put_nowait(item)
+
+    def subscribe(self) -> asyncio.Queue:
+        """Queue that receives every past and future event of this run."""
+        queue: asyncio.Queue = asyncio.Queue()
+        for item in self.events:
+            queue.put_nowait(item)
+        self._subscribers.append(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        if queue in self._subscribers:
+            self._subscribers.remove(queue)
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("completed", "failed", "cancelled")
+
+    def summary(self) -> dict:
+        return {
+            "run_id": self.run_id,
+            "thread_id": self.thread_id,
+            "status": self.status,
+            "created_at": self.created_at,
+            "response": self.response,
+            "error": self.error,
+        }
+
+
+class AgentService:
+    """Holds the warm agent and schedules runs on it with bounded concurrency."""
+
+    def __init__(self, kind: Optional[str] = None, max_concurrency: Optional[int] = None,
+                 max_queue: Optional[int] = None):
+        self.kind = (kind or config.SERVER_AGENT).lower()
+        self.max_concurrency = max_concurrency or config.SERVER_MAX_CONCURRENCY
+        self.max_queue = config.SERVER_MAX_QUEUE if max_queue is None else max_queue
+        self.agent = None
+        self.runs: "OrderedDict[str, Run]" = OrderedDict()
+        self._slots: Optional[asyncio.Semaphore] = None
+
+    def _build(self):
+        if self.kind == "graph":
+            from src.graph import create_agent_graph
+            from src.memory import get_checkpointer
+            return create_agent_graph(get_checkpointer())
+        from src.agent import create_twitter_agent
+        return create_twitter_agent()
+
+    async def start(self) -> None:
+        self._slots = asyncio.Semaphore(self.max_concurrency)
+        self.agent = await asyncio.to_thread(self._build)
+        print(f"[SERVER] {self.kind} agent ready (concurrency {self.max_concurrency}, queue {self.max_queue})")
+
+    async def stop(self) -> None:
+        for run in self.runs.values():
+            if run.task and not run.task.done():
+                run.task.cancel()
+
+    def pending(self) -> int:
+        return sum(1 for run in self.runs.values() if not run.finished)
+
+    def submit(self, user_input: str, thread_id: Optional[str] = None) -> Optional[Run]:
+        """Queue a run; returns None when the queue is full."""
+        if self.pending() >= self.max_concurrency + self.max_queue:
+            return None
+        run = Run(user_input, thread_id)
+        self.runs[run.run_id] = run
+        while len(self.runs) > MAX_RUNS_KEPT:
+            oldest = next(iter(self.runs.values()))
+            if not oldest.finished:
+                break
+            self.runs.popitem(last=False)
+        run.publish("queued", run.summary())
+        run.task = asyncio.create_task(self._execute(run))
+        run.task.add_done_callback(lambda task: self._cancelled_before_start(run))
+        return run
+
+    @staticmethod
+    def _cancelled_before_start(run: Run) -> None:
+        # A task cancelled before its first step never enters _execute
+        if not run.finished:
+            run.status = "cancelled"
+            run.publish("cancelled", {"run_id": run.run_id})
+
+    def cancel(self, run: Run) -> bool:
+        if run.finished or run.task is None:
+            return False
+        return run.task.cancel()
+
+    async def _execute(self, run: Run) -> None:
+        recorder = RunRecorder(run.run_id)
+        graph_config = {"configurable": {"thread_id": run.thread_id}}
+        t0 = time.perf_counter()
+        try:
+            async with self._slots:
+                run.status = "running"
+                run.publish("started", {"run_id": run.run_id, "thread_id": run.thread_id})
+                with instrumentation.collect(run.run_id) as spans, cycle_deadline():
+                    try:
+                        await self._stream(run, graph_config)
+                    finally:
+                        recorder.ingest_spans(spans)
+                recorder.record_step("agent_cycle", (time.perf_counter() - t0) * 1000)
+                state = await asyncio.to_thread(self.agent.get_state, graph_config)
+                messages = state.values.get("messages", [])
+                recorder.ingest_messages(_since_last_input(messages))
+                run.response = _text(messages[-1].content) if messages else ""
+                run.status = "completed"
+                recorder.finish("Success")
+                run.publish("done", {"run_id": run.run_id, "response": run.response,
+                                     "publishes": recorder.publishes})
+        except asyncio.CancelledError:
+            run.status = "cancelled"
+            recorder.record_step("agent_cycle", (time.perf_counter() - t0) * 1000, "cancelled")
+            recorder.finish("Cancelled")
+            run.publish("cancelled", {"run_id": run.run_id})
+        except Exception as e:
+            run.status = "failed"
+            run.error = f"{type(e).__name__}: {e}"
+            recorder.record_step("agent_cycle", (time.perf_counter() - t0) * 1000, "error", run.error)
+            recorder.finish("Failed", run.error)
+            run.publish("error", {"run_id": run.run_id, "error": run.error})
+
+    async def _stream(self, run: Run, graph_config: dict) -> None:
+        from src.agent import stream_in_thread
+
+        # The sync stream in a worker thread: the SQLite/Postgres checkpointers have no async API
+        inputs = {"messages": [{"role": "user", "content": run.input}]}
+        async for mode, chunk in stream_in_thread(self.agent, inputs, graph_config,
+                                                  stream_mode=["messages", "updates"]):
+            if mode == "messages":
+                message, metadata = chunk
+                text = _text(getattr(message, "content", ""))
+                if getattr(message, "type", None) == "AIMessageChunk" and text:
+                    run.publish("token", {"node": metadata.get("langgraph_node"), "text": text})
+                continue
+            for node, update in (chunk or {}).items():
+                messages = update.get("messages") if isinstance(update, dict) else None
+                if isinstance(messages, list):
+                    for message in messages:
+                        if getattr(message, "type", None) != "remove":
+                            run.publish("message", _message_event(node, message))
+
+
+async def _read_body(receive) -> bytes:
+    body = b""
+    while True:
+        message = await receive()
+        body += message.get("body", b"")
+        if not message.get("more_body"):
+            return body
+
+
+async def _send_json(send, status: int, payload: dict) -> None:
+    body = json.dumps(payload, default=str).encode()
+    await send({"type": "http.response.start", "status": status,
+                "headers": [(b"content-type", b"application/json"),
+                            (b"content-length", str(len(body)).encode())]})
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _wait_disconnect(receive) -> None:
+    while (await receive())["type"] != "http.disconnect":
+        pass
+
+
+def _sse(event: str, data: dict) -> bytes:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n".encode()
+
+
+async def _stream_events(run: Run, receive, send) -> None:
+    """Send a run's events as SSE until it finishes or the client goes away."""
+    await send({"type": "http.response.start", "status": 200,
+                "headers": [(b"content-type", b"text/event-stream"),
+                            (b"cache-control", b"no-cache"),
+                            (b"x-accel-buffering", b"no")]})
+    queue = run.subscribe()
+    disconnect = asyncio.ensure_future(_wait_disconnect(receive))
+    try:
+        while True:
+            get = asyncio.ensure_future(queue.get())
+            done, _ = await asyncio.wait({get, disconnect}, timeout=KEEPALIVE_SECONDS,
+                                         return_when=asyncio.FIRST_COMPLETED)
+            if disconnect in done:
+                get.cancel()
+                return
+            if get not in done:
+                get.cancel()
+                await send({"type": "http.response.body", "body": b": keepalive\n\n", "more_body": True})
+                continue
+            event, data = get.result()
+            await send({"type": "http.response.body", "body": _sse(event, data), "more_body": True})
+            if event in TERMINAL_EVENTS:
+                break
+        await send({"type": "http.response.body", "body": b""})
+    finally:
+        run.unsubscribe(queue)
+        disconnect.cancel()
+
+
+def _authorized(scope) -> bool:
+    if not config.SERVER_API_TOKEN:
+        return True
+    headers = dict(scope.get("headers") or [])
+    return headers.get(b"authorization", b"").decode() == f"Bearer {config.SERVER_API_TOKEN}"
+
+
+def create_app(service: Optional[AgentService] = None):
+    """Build the ASGI application around an ``AgentService``."""
+    service = service or AgentService()
+
+    async def lifespan(receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                try:
+                    await service.start()
+                except Exception as e:
+                    await send({"type": "lifespan.startup.failed", "message": str(e)})
+                    return
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await service.stop()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def app(scope, receive, send):
+        if scope["type"] == "lifespan":
+            await lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+
+        method = scope["method"]
+        parts = [p for p in scope["path"].split("/") if p]
+
+        if parts == ["health"]:
+            await _send_json(send, 200, {"status": "ok" if service.agent else "starting",
+                                         "agent": service.kind, "pending": service.pending(),
+                                         "breakers": breaker_states(), "caches": cache_stats()})
+            return
+        if not _authorized(scope):
+            await _send_json(send, 401, {"error": "unauthorized"})
+            return
+        if service.agent is None:
+            await _send_json(send, 503, {"error": "agent is still starting"})
+            return
+
+        if parts == ["runs"] and method == "POST":
+            try:
+                payload = json.loads(await _read_body(receive) or b"{}")
+            except ValueError:
+                await _send_json(send, 400, {"error": "body must be JSON"})
+                return
+            if payload.get("auto"):
+                from src.agent import AUTONOMOUS_COMMAND
+                user_input = AUTONOMOUS_COMMAND
+            else:
+                user_input = str(payload.get("input") or "").strip()
+            if not user_input:
+                await _send_json(send, 400, {"error": "'input' is required (or set 'auto': true)"})
+                return
+            run = service.submit(user_input, payload.get("thread_id"))
+            if run is None:
+                await _send_json(send, 429, {"error": "run queue is full", "pending": service.pending()})
+                return
+            await _send_json(send, 202, run.summary())
+            return
+
+        if parts == ["runs"] and method == "GET":
+            await _send_json(send, 200, {"runs": [run.summary() for run in reversed(service.runs.values())]})
+            return
+
+        run = service.runs.get(parts[1]) if len(parts) >= 2 and parts[0] == "runs" else None
+        if run is None:
+            await _send_json(send, 404, {"error": "not found"})
+            return
+        if len(parts) == 2 and method == "GET":
+            await _send_json(send, 200, run.summary())
+        elif parts[2:] == ["events"] and method == "GET":
+            await _stream_events(run, receive, send)
+        elif parts[2:] == ["cancel"] and method == "POST":
+            cancelled = service.cancel(run)
+            await _send_json(send, 202 if cancelled else 409, {**run.summary(), "cancel_requested": cancelled})
+        else:
+            await _send_json(send, 405, {"error": "method not allowed"})
+
+    app.service = service
+    return app
+
+
+app = create_app()
+
+
+def main():
+    """Run the API server with uvicorn."""
+    import uvicorn
+
+    config.validate()
+    if config.setup_tracing():
+        print(f"LangSmith tracing enabled -> Project: {config.LANGSMITH_PROJECT}")
+    from src.cassette import install_from_env
+    install_from_env()
+    uvicorn.run(app, host=config.SERVER_HOST, port=config.SERVER_PORT)
+
+
+if __name__ == "__main__":
+    main()
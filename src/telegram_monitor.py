@@ -53,7 +53,7 @@ def save_daily_report(messages: list, report_type: str = "telegram"):
     """
     date_str = datetime.now().strftime('%Y%m%d')
     report_file = f"daily_{report_type}_report_{date_str}.json"
-    report_path = os.path.join(os.path.dirname(__file__), "..", report_file)
+    report_path = config.data_path(report_file)
     
     # Load existing report if exists
     existing = []
@@ -110,7 +110,7 @@ def get_todays_report() -> dict:
     """
     date_str = datetime.now().strftime('%Y%m%d')
     report_file = f"daily_telegram_report_{date_str}.json"
-    report_path = os.path.join(os.path.dirname(__file__), "..", report_file)
+    report_path = config.data_path(report_file)
     
     if os.path.exists(report_path):
         with open(report_path, "r") as f:
@@ -0,0 +1,242 @@
+"""Rolling price history per token, kept across cycles in memory-mapped arrays.
+
+Each cycle used to see only the current snapshot, so "why is this token
+moving" was guessed from one scrape. The store keeps the last
+``TIMESERIES_WINDOW`` samples of every tracked series in a ring buffer:
+
+- ``series.npy`` - float64 ``(slots, window, 4)``, fields ``ts``, ``price``,
+  ``volume`` and ``change_24h`` (NaN when a source does not report one)
+- ``cursor.npy`` - int64 ``(slots, 2)``, ring head and sample count per slot
+- ``keys.json``  - slot order of the series keys (``"ETH|coingecko"``); it is
+  only rewritten when a new series is added
+
+The arrays are opened with ``numpy.lib.format.open_memmap``. An append
+writes one row and the cursor in place, and a window read is a slice of the
+mapped file: neither parses JSON nor loads the rest of the history. A series
+is one symbol from one source (the market data provider, or ``scrape`` for
+prices and moves read out of scraped pages), so sources can be compared.
+
+Samples closer than ``TIMESERIES_MIN_INTERVAL_SECONDS`` to the previous one
+in the same series are skipped, so cached snapshots read several times in a
+cycle are stored once. The store assumes one writing process.
+"""
+
+import json
+import math
+import os
+import re
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from numpy.lib.format import open_memmap
+
+from src.config import config
+
+
+FIELDS = ("ts", "price", "volume", "change_24h")
+TS, PRICE, VOLUME, CHANGE = range(len(FIELDS))
+
+# "$SOL | $221.10 | -1.3%" or "$SOL $221.10 -1.3%"; the price is optional ("$SOL -1.3%")
+_QUOTE_RE = re.compile(r"\$([A-Z][A-Z0-9]{1,9})\b[\s|:]*(?:\$([\d,]*\.?\d+)\b)?[^$%\n]{0,24}?([+-]?\d+(?:\.\d+)?)\s?%")
+
+
+def series_key(symbol: str, source: str) -> str:
+    return f"{symbol.upper()}|{source}"
+
+
+def _value(value) -> float:
+    return float("nan") if value is None else float(value)
+
+
+class TimeSeriesStore:
+    """Per-series ring buffers of ``(ts, price, volume, change_24h)`` rows in memory-mapped files."""
+
+    def __init__(self, directory: Optional[str] = None, window: Optional[int] = None, capacity: int = 64):
+        self.directory = directory or config.data_path("timeseries")
+        self.window = window or config.TIMESERIES_WINDOW
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+        self._open(capacity)
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def _open(self, capacity: int) -> None:
+        try:
+            with open(self._path("keys.json"), "r", encoding="utf-8") as fh:
+                keys = json.load(fh)
+            self.series = open_memmap(self._path("series.npy"), mode="r+")
+            self.cursor = open_memmap(self._path("cursor.npy"), mode="r+")
+            if self.series.shape[0] < len(keys) or self.cursor.shape[0] != self.series.shape[0]:
+                raise ValueError("index and arrays disagree")
+            if self.series.shape[1] != self.window:
+                print(f"[TIMESERIES] Keeping stored window of {self.series.shape[1]} samples "
+                      f"(TIMESERIES_WINDOW={self.window})")
+                self.window = self.series.shape[1]
+        except (OSError, ValueError) as e:
+            if os.path.exists(self._path("keys.json")):
+                print(f"[TIMESERIES] Store unreadable ({e}); starting a new one")
+            keys = []
+            self.series, self.cursor = self._create(capacity, self.window)
+            self._write_keys(keys)
+        self.keys: List[str] = keys
+        self.slots: Dict[str, int] = {key: i for i, key in enumerate(keys)}
+
+    def _create(self, capacity: int, window: int, suffix: str = "") -> Tuple[np.ndarray, np.ndarray]:
+        series = open_memmap(self._path(f"series.npy{suffix}"), mode="w+", dtype=np.float64,
+                             shape=(capacity, window, len(FIELDS)))
+        series[:] = np.nan
+        cursor = open_memmap(self._path(f"cursor.npy{suffix}"), mode="w+", dtype=np.int64, shape=(capacity, 2))
+        cursor[:] = 0
+        return series, cursor
+
+    def _write_keys(self, keys: List[str]) -> None:
+        tmp = self._path("keys.json.tmp")
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump(keys, fh)
+        os.replace(tmp, self._path("keys.json"))
+
+    def _grow(self) -> None:
+        """Double the number of slots (copies the arrays once)."""
+        capacity = self.series.shape[0] * 2
+        series, cursor = self._create(capacity, self.window, ".tmp")
+        series[:len(self.series)] = self.series
+        cursor[:len(self.cursor)] = self.cursor
+        series.flush()
+        cursor.flush()
+        del series, cursor
+        self.series = self.cursor = None
+        os.replace(self._path("series.npy.tmp"), self._path("series.npy"))
+        os.replace(self._path("cursor.npy.tmp"), self._path("cursor.npy"))
+        self.series = open_memmap(self._path("series.npy"), mode="r+")
+        self.cursor = open_memmap(self._path("cursor.npy"), mode="r+")
+
+    def _slot(self, key: str) -> int:
+        """Slot of ``key``, adding the series when it is new; caller holds the lock."""
+        slot = self.slots.get(key)
+        if slot is None:
+            if len(self.keys) >= self.series.shape[0]:
+                self._grow()
+            slot = self.slots[key] = len(self.keys)
+            self.keys.append(key)
+            self._write_keys(self.keys)
+        return slot
+
+    def _append(self, key: str, row: Tuple[float, float, float, float], min_interval: float) -> bool:
+        slot = self._slot(key)
+        head, count = self.cursor[slot]
+        if count and row[TS] - self.series[slot, (head - 1) % self.window, TS] < min_interval:
+            return False
+        self.series[slot, head] = row
+        self.cursor[slot] = ((head + 1) % self.window, min(count + 1, self.window))
+        return True
+
+    def append(self, symbol: str, price=None, volume=None, change_24h=None, ts: Optional[float] = None,
+               source: str = "market", min_interval: Optional[float] = None) -> bool:
+        """Add one sample; False when it was skipped as too close to the previous one."""
+        return self.extend([(symbol, price, volume, change_24h)], source, ts, min_interval) == 1
+
+    def extend(self, rows: Iterable[tuple], source: str, ts: Optional[float] = None,
+               min_interval: Optional[float] = None) -> int:
+        """Add ``(symbol, price, volume, change_24h)`` rows from one source; returns how many were stored."""
+        ts = time.time() if ts is None else ts
+        min_interval = config.TIMESERIES_MIN_INTERVAL_SECONDS if min_interval is None else min_interval
+        stored = 0
+        with self._lock:
+            for symbol, price, volume, change in rows:
+                row = (ts, _value(price), _value(volume), _value(change))
+                stored += self._append(series_key(symbol, source), row, min_interval)
+            if stored:
+                self.series.flush()
+                self.cursor.flush()
+        return stored
+
+    def window_for(self, symbol: str, source: str = "market", n: Optional[int] = None) -> np.ndarray:
+        """The last ``n`` samples (default all) of one series, oldest first, as an ``(k, 4)`` array."""
+        with self._lock:
+            slot = self.slots.get(series_key(symbol, source))
+            if slot is None:
+                return np.empty((0, len(FIELDS)))
+            head, count = self.cursor[slot]
+            n = count if n is None else min(n, count)
+            start = (head - n) % self.window
+            if start + n <= self.window:
+                return np.array(self.series[slot, start:start + n])
+            return np.concatenate([self.series[slot, start:], self.series[slot, :head]])
+
+    def matrix(self, field: str = "price", n: Optional[int] = None,
+               source: Optional[str] = None) -> Tuple[List[str], np.ndarray]:
+        """Keys and an ``(series, n)`` array of the last ``n`` values of ``field``, right-aligned.
+
+        Series with fewer than ``n`` samples are NaN-padded on the left, so
+        column ``-1`` is every series' latest sample. ``source`` limits the
+        result to one source.
+        """
+        column = FIELDS.index(field)
+        n = n or self.window
+        with self._lock:
+            keys = [k for k in self.keys if source is None or k.endswith(f"|{source}")]
+            if not keys:
+                return [], np.empty((0, n))
+            slots = np.array([self.slots[k] for k in keys])
+            head, count = self.cursor[slots, 0], self.cursor[slots, 1]
+            m = min(n, self.window)
+            offsets = np.arange(m)
+            positions = (head[:, None] - m + offsets[None, :]) % self.window
+            values = np.array(self.series[slots[:, None], positions, column])
+        values[offsets[None, :] < (m - count)[:, None]] = np.nan
+        if n > m:
+            values = np.concatenate([np.full((len(keys), n - m), np.nan), values], axis=1)
+        return keys, values
+
+    def flush(self) -> None:
+        with self._lock:
+            self.series.flush()
+            self.cursor.flush()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"series": len(self.keys), "slots": int(self.series.shape[0]), "window": self.window,
+                    "samples": int(self.cursor[:len(self.keys), 1].sum()) if self.keys else 0}
+
+
+_store: Optional[TimeSeriesStore] = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> TimeSeriesStore:
+    """The process-wide store in ``DATA_DIR/timeseries``."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = TimeSeriesStore()
+        return _store
+
+
+def record_snapshot(snapshot: dict, ts: Optional[float] = None) -> int:
+    """Store the quotes and trending tokens of a ``src.market_data`` snapshot."""
+    if not snapshot or snapshot.get("error"):
+        return 0
+    quotes = {q["symbol"]: q for q in snapshot.get("trending") or []}
+    quotes.update(snapshot.get("quotes") or {})
+    rows = [(q["symbol"], q.get("price_usd"), q.get("volume_24h_usd"), q.get("change_24h_pct"))
+            for q in quotes.values()]
+    return get_store().extend(rows, snapshot.get("provider") or "market", ts)
+
+
+def extract_quotes(text: str) -> Dict[str, Tuple[Optional[float], float]]:
+    """``{symbol: (price or None, change %)}`` for the first mention of each token in scraped text."""
+    quotes: Dict[str, Tuple[Optional[float], float]] = {}
+    for symbol, price, change in _QUOTE_RE.findall(text or ""):
+        if symbol not in quotes:
+            quotes[symbol] = (float(price.replace(",", "")) if price else None, float(change))
+    return quotes
+
+
+def record_text(text: str, source: str = "scrape", ts: Optional[float] = None) -> int:
+    """Store the prices and 24h % moves found in scraped text."""
+    rows = [(symbol, price, None, change) for symbol, (price, change) in extract_quotes(text).items()
+            if math.isfinite(change)]
+    return get_store().extend(rows, source, ts) if rows else 0
@@ -0,0 +1,173 @@
+"""Tool registry with tags and per-phase tool exposure.
+
+Binding every tool on every call re-sends ~16 tool schemas plus the deep
+agent's file/todo tools with each model request. Tools are tagged here, and
+``select_tools`` exposes only the ones relevant to the current phase of the
+turn and to the intent of the user's request:
+
+- ``research`` - nothing gathered yet: research tools, plus whatever the
+  request asks for (e.g. publish tools for "post a tweet about ...")
+- ``write``    - research results are in: research, analytics and publish
+  tools, so later research steps can still run (the copy is written as the
+  publish tool's arguments, so writing and publishing share one phase)
+- ``publish``  - a publish tool has been called: publish tools only, for
+  retries and follow-up posts
+
+Tools the registry does not know are always exposed, and JSON schemas are
+converted once per tool and cached. ``TOOL_EXPOSURE=all`` turns selection off.
+"""
+
+import re
+import threading
+from typing import Dict, Iterable, List, Optional, Set
+
+from src.config import config
+
+
+TOOL_TAGS: Dict[str, Set[str]] = {
+    # research
+    "search_defi_news": {"research"},
+    "fast_scrape_and_cache": {"research"},
+    "scrape_page": {"research"},
+    "scrape_yieldbot_website": {"research"},
+    "get_market_data": {"research"},
+    "get_cached_research": {"research", "core"},
+    "monitor_telegram_group": {"research", "telegram"},
+    "analyze_tweet_performance": {"research", "analytics"},
+    "get_engagement_summary": {"analytics"},
+    "get_top_movers": {"research", "analytics"},
+    # publishing
+    "publish_content": {"publish"},
+    "twitter_create_post": {"publish", "twitter"},
+    "twitter_reply_to_post": {"publish", "twitter"},
+    "twitter_post_and_reply": {"publish", "twitter"},
+    "twitter_upload_media": {"publish", "media", "twitter"},
+    "linkedin_create_post": {"publish", "linkedin"},
+    "send_telegram_message": {"publish", "telegram"},
+    "send_telegram_photo": {"publish", "media", "telegram"},
+    "generate_nft_image": {"media"},
+    # always useful
+    "get_current_time": {"core"},
+    "read_blob": {"core"},
+    # deepagents built-ins
+    "ls": {"memory"},
+    "read_file": {"memory"},
+    "write_file": {"memory"},
+    "edit_file": {"memory"},
+    "glob": {"files"},
+    "grep": {"files"},
+    "write_todos": {"planning"},
+    "task": {"planning"},
+}
+
+PHASE_TAGS = {
+    "research": {"core", "research"},
+    "write": {"core", "research", "analytics", "publish"},
+    "publish": {"core", "publish"},
+}
+
+# Words in the user's request that pull in extra tags for the whole turn
+INTENT_KEYWORDS = {
+    "memory": ("remember", "memory", "memories", "prefer", "preference", "forget"),
+    "media": ("image", "nft", "picture", "photo", "media"),
+    "publish": ("post", "tweet", "publish", "reply", "send"),
+    "research": ("research", "scrape", "search", "news", "price", "trend", "analy"),
+    "analytics": ("analy", "movers", "momentum", "performance", "engagement", "metrics"),
+    "files": ("file", "files", "directory"),
+    "planning": ("plan", "todo", "subagent"),
+}
+
+_schemas: Dict[str, dict] = {}
+_lock = threading.Lock()
+
+
+def tags_for(name: str) -> Optional[Set[str]]:
+    return TOOL_TAGS.get(name)
+
+
+def tool_schema(tool) -> dict:
+    """OpenAI-format schema for a tool, converted once per tool name."""
+    from langchain_core.utils.function_calling import convert_to_openai_tool
+
+    if isinstance(tool, dict):
+        return tool
+    with _lock:
+        schema = _schemas.get(tool.name)
+        if schema is None:
+            schema = _schemas[tool.name] = convert_to_openai_tool(tool)
+        return schema
+
+
+def _current_turn(messages: List) -> List:
+    for i in range(len(messages) - 1, -1, -1):
+        if getattr(messages[i], "type", None) == "human":
+            return messages[i:]
+    return messages
+
+
+def _text(content) -> str:
+    if isinstance(content, str):
+        return content
+    return " ".join(part.get("text", "") if isinstance(part, dict) else str(part) for part in content or [])
+
+
+def intent_tags(text: str) -> Set[str]:
+    words = text.lower()
+    return {tag for tag, keywords in INTENT_KEYWORDS.items()
+            if any(re.search(rf"\b{re.escape(k)}", words) for k in keywords)}
+
+
+def current_phase(messages: List) -> str:
+    """``publish`` once a publish tool has run in the current turn, ``write`` once
+    research results are in, else ``research``."""
+    phase = "research"
+    for message in _current_turn(messages):
+        if getattr(message, "type", None) != "tool":
+            continue
+        tags = tags_for(message.name or "") or set()
+        # Media uploads come before the post itself, so they don't end research
+        if "publish" in tags and "media" not in tags:
+            return "publish"
+        if "research" in tags:
+            phase = "write"
+    return phase
+
+
+def select_tools(messages: List, tools: Iterable) -> List:
+    """Subset of ``tools`` to expose for the next model call."""
+    tools = list(tools)
+    if config.TOOL_EXPOSURE == "all":
+        return tools
+    turn = _current_turn(messages)
+    request = _text(turn[0].content) if turn and getattr(turn[0], "type", None) == "human" else ""
+    phase = current_phase(messages)
+    intents = intent_tags(request)
+    if phase == "publish":
+        intents.discard("research")
+    wanted = PHASE_TAGS[phase] | intents
+    # Keep whatever the model already used this turn so follow-up calls still validate
+    used = {call["name"] for m in turn for call in (getattr(m, "tool_calls", None) or [])}
+    selected = []
+    for tool in tools:
+        name = tool["function"]["name"] if isinstance(tool, dict) and "function" in tool else getattr(tool, "name", None)
+        tags = tags_for(name or "")
+        if tags is None or tags & wanted or name in used:
+            selected.append(tool)
+    return selected or tools
+
+
+def tool_middleware():
+    """Deep-agent middleware that binds only the selected tools, as cached schemas."""
+    from langchain.agents.middleware import AgentMiddleware
+
+    def _narrow(request):
+        return request.override(tools=[tool_schema(t) for t in select_tools(request.messages, request.tools)])
+
+    class ToolExposureMiddleware(AgentMiddleware):
+        def wrap_model_call(self, request, handler):
+            return handler(_narrow(request))
+
+        async def awrap_model_call(self, request, handler):
+            return await handler(_narrow(request))
+
+    return ToolExposureMiddleware()
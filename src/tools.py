@@ -1,14 +1,46 @@
 """Composio tool integrations for AI Agent YBot - Twitter, Telegram & Image Generation."""
 
 import base64
-import requests
 import json
 import os
 import time
 from datetime import datetime
-from typing import List, Optional
+from typing import Callable, List, Optional
 from langchain_core.tools import BaseTool
+from src import http_client, resilience
+from src.blobs import get_blob_tools, offload_large_output
+from src.cache import get_cache
 from src.config import config
+from src.firecrawl_client import document_url, get_firecrawl, merge_search_results, normalize_url
+from src.html_extract import decode_html, extract_text
+from src.instrumentation import traced_tool
+from src.market_data import get_market_provider
+from src.prefetch import prefetched
+from src.projection import project_output
+from src.resilience import budget_guard
+from src.timeseries import record_snapshot, record_text
+
+
+def _status_line(result) -> str:
+    """Success flag, ID and error of a raw platform response, for logs.
+
+    The full payload is kept in debug storage by ``src.projection``.
+    """
+    if not isinstance(result, dict):
+        return str(result)[:200]
+    data = result.get("data") or result.get("result") or {}
+    if not isinstance(data, dict):
+        data = {}
+    inner = data.get("data") if isinstance(data.get("data"), dict) else {}
+    post_id = (data.get("id") or data.get("message_id") or data.get("media_id_string") or inner.get("id")
+               or (data.get("response_headers") or {}).get("x-restli-id"))
+    error = result.get("error") or result.get("description")
+    line = "ok" if result.get("successful") or result.get("ok") else "failed"
+    if post_id:
+        line += f", id {post_id}"
+    if error:
+        line += f", error: {str(error)[:200]}"
+    return line
 
 
 def get_twitter_tools(user_id: Optional[str] = None) -> List[BaseTool]:
@@ -23,14 +55,14 @@ def get_twitter_tools(user_id: Optional[str] = None) -> List[BaseTool]:
         try:
             # Download the image
             print(f"[TWITTER UPLOAD] Downloading image from URL...")
-            image_response = requests.get(image_url, timeout=30)
+            image_response = http_client.get(image_url, timeout=30)
             image_response.raise_for_status()
             
             # Encode as base64
             image_data = base64.b64encode(image_response.content).decode('utf-8')
             print(f"[TWITTER UPLOAD] Encoded image to base64 ({len(image_data)} chars)")
             
-            url = "https://backend.composio.dev/api/v3/tools/execute/TWITTER_UPLOAD_MEDIA"
+            url = f"{config.COMPOSIO_BASE_URL}/tools/execute/TWITTER_UPLOAD_MEDIA"
             headers = {
                 "x-api-key": config.COMPOSIO_API_KEY,
                 "Content-Type": "application/json"
@@ -46,16 +78,16 @@ def get_twitter_tools(user_id: Optional[str] = None) -> List[BaseTool]:
                 }
             }
             
-            response = requests.post(url, json=payload, headers=headers)
+            response = http_client.post(url, json=payload, headers=headers)
             result = response.json()
-            print(f"[TWITTER UPLOAD] Response: {result}")
+            print(f"[TWITTER UPLOAD] Response: {_status_line(result)}")
             
             if result.get('successful'):
                 media_id = result.get('data', {}).get('media_id_string')
                 print(f"[TWITTER UPLOAD] Got media_id: {media_id}")
                 return {"status": "success", "media_id": media_id}
             else:
-                print(f"[TWITTER UPLOAD] Tool error: {result}")
+                print(f"[TWITTER UPLOAD] Tool error: {result.get('error', 'Upload failed')}")
                 return {"status": "error", "error": result.get('error', 'Upload failed')}
         except Exception as e:
             print(f"[TWITTER UPLOAD] Error: {e}")
@@ -68,7 +100,7 @@ def get_twitter_tools(user_id: Optional[str] = None) -> List[BaseTool]:
         if media_media_ids:
             print(f"[TWITTER] With media IDs: {media_media_ids}")
         
-        url = "https://backend.composio.dev/api/v3/tools/execute/TWITTER_CREATION_OF_A_POST"
+        url = f"{config.COMPOSIO_BASE_URL}/tools/execute/TWITTER_CREATION_OF_A_POST"
         headers = {
             "x-api-key": config.COMPOSIO_API_KEY,
             "Content-Type": "application/json"
@@ -89,9 +121,9 @@ def get_twitter_tools(user_id: Optional[str] = None) -> List[BaseTool]:
             payload["arguments"]["media_media_ids"] = media_media_ids
         
         try:
-            response = requests.post(url, json=payload, headers=headers)
+            response = http_client.post(url, json=payload, headers=headers)
             result = response.json()
-            print(f"[TWITTER] Response: {result}")
+            print(f"[TWITTER] Response: {_status_line(result)}")
             # On success, save last successful tweet to local cache to avoid duplicate attempts
             try:
                 if result.get('successful'):
@@ -100,7 +132,7 @@ def get_twitter_tools(user_id: Optional[str] = None) -> List[BaseTool]:
                     tweet_id = None
                     if isinstance(data, dict):
                         tweet_id = data.get('id') or (data.get('data') or {}).get('id')
-                    cache_path = os.path.join(os.path.dirname(__file__), '..', 'last_tweet_cache.json')
+                    cache_path = config.data_path('last_tweet_cache.json')
                     with open(cache_path, 'w', encoding='utf-8') as fh:
                         json.dump({'id': tweet_id, 'text': text, 'timestamp': datetime.utcnow().isoformat()}, fh)
             except Exception as e:
@@ -115,7 +147,7 @@ def get_twitter_tools(user_id: Optional[str] = None) -> List[BaseTool]:
         """Reply to a tweet on Twitter."""
         print(f"\n[TWITTER REPLY] Replying to tweet {tweet_id}: {reply_text[:50]}")
 
-        url = "https://backend.composio.dev/api/v3/tools/execute/TWITTER_CREATION_OF_A_POST"
+        url = f"{config.COMPOSIO_BASE_URL}/tools/execute/TWITTER_CREATION_OF_A_POST"
         headers = {
             "x-api-key": config.COMPOSIO_API_KEY,
             "Content-Type": "application/json"
@@ -139,9 +171,9 @@ def get_twitter_tools(user_id: Optional[str] = None) -> List[BaseTool]:
             }
 
             try:
-                response = requests.post(url, json=payload, headers=headers)
+                response = http_client.post(url, json=payload, headers=headers)
                 result = response.json()
-                print(f"[TWITTER REPLY] Response: {result}")
+                print(f"[TWITTER REPLY] Response: {_status_line(result)}")
                 last_result = result
 
                 # If success, return
@@ -179,7 +211,7 @@ def get_twitter_tools(user_id: Optional[str] = None) -> List[BaseTool]:
         print(f"\n[TWITTER COMBINED] Creating tweet and reply (tweet len={len(tweet_text)}, reply len={len(reply_text)})")
 
         # Duplicate check: if we have a cached last tweet with identical text, reuse it to reply instead of creating duplicate
-        cache_path = os.path.join(os.path.dirname(__file__), '..', 'last_tweet_cache.json')
+        cache_path = config.data_path('last_tweet_cache.json')
         tweet_id = None
         try:
             if os.path.exists(cache_path):
@@ -218,7 +250,7 @@ def get_twitter_tools(user_id: Optional[str] = None) -> List[BaseTool]:
         print("[TWITTER COMBINED] Tweet creation failed or forbidden. Saving pending tweet and posting to Telegram fallback.")
         # Save pending tweet locally for manual retry
         cache_file = f"pending_tweet_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-        cache_path = os.path.join(os.path.dirname(__file__), "..", cache_file)
+        cache_path = config.data_path(cache_file)
         try:
             with open(cache_path, "w", encoding="utf-8") as fh:
                 json.dump({"tweet_text": tweet_text, "reply_text": reply_text, "created_at": datetime.utcnow().isoformat()}, fh, ensure_ascii=False, indent=2)
@@ -229,10 +261,10 @@ def get_twitter_tools(user_id: Optional[str] = None) -> List[BaseTool]:
         bot_token = config.TELEGRAM_BOT_TOKEN
         tg_result = None
         if bot_token:
-            tg_url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
+            tg_url = f"{config.TELEGRAM_API_BASE}/bot{bot_token}/sendMessage"
             tg_payload = {"chat_id": telegram_chat, "text": tweet_text + "\n\n" + reply_text}
             try:
-                tg_resp = requests.post(tg_url, json=tg_payload)
+                tg_resp = http_client.post(tg_url, json=tg_payload)
                 tg_result = tg_resp.json()
             except Exception as e:
                 tg_result = {"error": str(e)}
@@ -260,13 +292,13 @@ def get_telegram_tools(user_id: Optional[str] = None) -> List[BaseTool]:
         if not bot_token:
             return {"error": "TELEGRAM_BOT_TOKEN not set"}
         
-        url = f"https://api.telegram.org/bot{bot_token}/sendMessage"
+        url = f"{config.TELEGRAM_API_BASE}/bot{bot_token}/sendMessage"
         data = {"chat_id": chat_id, "text": text, "parse_mode": "HTML"}
         
         try:
-            response = requests.post(url, json=data)
+            response = http_client.post(url, json=data)
             result = response.json()
-            print(f"[TELEGRAM] Response: {result}")
+            print(f"[TELEGRAM] Response: {_status_line(result)}")
             
             if response.status_code == 200:
                 return {
@@ -279,6 +311,7 @@ def get_telegram_tools(user_id: Optional[str] = None) -> List[BaseTool]:
                 return {
                     "status": "error",
                     "error": result.get("description", "Unknown error"),
+                    "error_code": result.get("error_code", response.status_code),
                     "chat_id": chat_id
                 }
         except Exception as e:
@@ -295,13 +328,13 @@ def get_telegram_tools(user_id: Optional[str] = None) -> List[BaseTool]:
         if not bot_token:
             return {"error": "TELEGRAM_BOT_TOKEN not set"}
         
-        url = f"https://api.telegram.org/bot{bot_token}/sendPhoto"
+        url = f"{config.TELEGRAM_API_BASE}/bot{bot_token}/sendPhoto"
         data = {"chat_id": chat_id, "photo": photo_url, "caption": caption, "parse_mode": "HTML"}
         
         try:
-            response = requests.post(url, json=data)
+            response = http_client.post(url, json=data)
             result = response.json()
-            print(f"[TELEGRAM PHOTO] Response: {result}")
+            print(f"[TELEGRAM PHOTO] Response: {_status_line(result)}")
             
             if response.status_code == 200:
                 return {
@@ -312,7 +345,8 @@ def get_telegram_tools(user_id: Optional[str] = None) -> List[BaseTool]:
             else:
                 return {
                     "status": "error",
-                    "error": result.get("description", "Unknown error")
+                    "error": result.get("description", "Unknown error"),
+                    "error_code": result.get("error_code", response.status_code)
                 }
         except Exception as e:
             print(f"[TELEGRAM PHOTO] Error: {e}")
@@ -327,10 +361,10 @@ def get_telegram_tools(user_id: Optional[str] = None) -> List[BaseTool]:
         if not bot_token:
             return {"error": "TELEGRAM_BOT_TOKEN not set"}
         
-        url = f"https://api.telegram.org/bot{bot_token}/getUpdates"
+        url = f"{config.TELEGRAM_API_BASE}/bot{bot_token}/getUpdates"
         
         try:
-            response = requests.get(url)
+            response = http_client.get(url)
             result = response.json()
             print(f"[TELEGRAM MONITOR] Got {len(result.get('result', []))} updates")
             
@@ -380,7 +414,7 @@ def get_linkedin_tools(user_id: Optional[str] = None) -> List[BaseTool]:
             print(f"[LINKEDIN] Fetching fresh profile info...")
             
             # Fetch fresh profile
-            url = "https://backend.composio.dev/api/v3/tools/execute/LINKEDIN_GET_MY_INFO"
+            url = f"{config.COMPOSIO_BASE_URL}/tools/execute/LINKEDIN_GET_MY_INFO"
             headers = {
                 "x-api-key": config.COMPOSIO_API_KEY,
                 "Content-Type": "application/json"
@@ -393,7 +427,7 @@ def get_linkedin_tools(user_id: Optional[str] = None) -> List[BaseTool]:
                 "arguments": {}
             }
 
-            response = requests.post(url, json=payload, headers=headers, timeout=30)
+            response = http_client.post(url, json=payload, headers=headers, timeout=30)
             result = response.json()
             
             if result.get('successful'):
@@ -407,7 +441,7 @@ def get_linkedin_tools(user_id: Optional[str] = None) -> List[BaseTool]:
                 print(f"[LINKEDIN] Cached fresh profile")
                 return result
             else:
-                print(f"[LINKEDIN] Failed to fetch profile: {result}")
+                print(f"[LINKEDIN] Failed to fetch profile: {_status_line(result)}")
                 return None
                 
         except Exception as e:
@@ -430,7 +464,7 @@ def get_linkedin_tools(user_id: Optional[str] = None) -> List[BaseTool]:
         if not author_urn:
             return {"error": "Could not get LinkedIn author URN from cached profile"}
 
-        url = "https://backend.composio.dev/api/v3/tools/execute/LINKEDIN_CREATE_LINKED_IN_POST"
+        url = f"{config.COMPOSIO_BASE_URL}/tools/execute/LINKEDIN_CREATE_LINKED_IN_POST"
         headers = {
             "x-api-key": config.COMPOSIO_API_KEY,
             "Content-Type": "application/json"
@@ -451,9 +485,9 @@ def get_linkedin_tools(user_id: Optional[str] = None) -> List[BaseTool]:
         }
 
         try:
-            response = requests.post(url, json=payload, headers=headers, timeout=30)
+            response = http_client.post(url, json=payload, headers=headers, timeout=30)
             result = response.json()
-            print(f"[LINKEDIN] Post Response: {result}")
+            print(f"[LINKEDIN] Post Response: {_status_line(result)}")
             return result
         except Exception as e:
             print(f"[LINKEDIN] Error creating post: {e}")
@@ -490,11 +524,11 @@ def get_image_generation_tools() -> List[BaseTool]:
             prompt = nft_prompts.get(topic, nft_prompts["Crypto"])
             print(f"[IMAGE GEN] Prompt: {prompt[:80]}")
             
-            url = f"https://image.pollinations.ai/prompt/{quote(prompt)}"
+            url = f"{config.POLLINATIONS_BASE_URL}/prompt/{quote(prompt)}"
             params = {"width": 1024, "height": 1024, "model": "flux"}
             
             print(f"[IMAGE GEN] Requesting from Pollinations API")
-            response = requests.get(url, params=params, timeout=60)
+            response = http_client.get(url, params=params, timeout=60)
             print(f"[IMAGE GEN] Response status: {response.status_code}")
             
             if response.status_code == 200:
@@ -502,7 +536,7 @@ def get_image_generation_tools() -> List[BaseTool]:
                     f.write(response.content)
                 
                 print(f"[IMAGE GEN] SUCCESS - Image saved: {save_path}")
-                image_url = f"https://image.pollinations.ai/prompt/{quote(prompt)}"
+                image_url = f"{config.POLLINATIONS_BASE_URL}/prompt/{quote(prompt)}"
                 return {
                     "status": "success",
                     "file_path": save_path,
@@ -534,20 +568,114 @@ def get_analytics_tools() -> List[BaseTool]:
     
     @tool
     def analyze_tweet_performance(tweet_id: str) -> dict:
-        """Analyze the performance of a tweet."""
-        return {
-            "tweet_id": tweet_id,
-            "status": "placeholder",
-            "message": "Implement with Twitter API v2 to get real metrics",
-            "analyzed_at": datetime.now().isoformat()
-        }
+        """Analyze the performance of a tweet: likes, reposts, replies, quotes, bookmarks and impressions."""
+        from src import engagement
+        
+        print(f"\n[ENGAGEMENT] Analyzing tweet {tweet_id}")
+        try:
+            engagement.track_post("twitter", tweet_id)
+            metrics = engagement.post_metrics("twitter", tweet_id)
+            if metrics["last_checked_at"] is None:
+                # Fetch it together with any other tweets that are due, in one lookup
+                refresh = engagement.refresh_due(["twitter"], include=[tweet_id])
+                metrics = engagement.post_metrics("twitter", tweet_id)
+                if refresh["errors"] and metrics["last_checked_at"] is None:
+                    return {"tweet_id": tweet_id, "status": "error", "error": refresh["errors"][0]}
+            return {"tweet_id": tweet_id, "status": "success", **metrics,
+                    "analyzed_at": datetime.now().isoformat()}
+        except Exception as e:
+            print(f"[ENGAGEMENT] Error: {e}")
+            return {"tweet_id": tweet_id, "status": "error", "error": str(e)}
+    
+    @tool
+    def get_engagement_summary(days: int = 7, platform: str = "twitter") -> dict:
+        """Get engagement totals, averages, engagement rate, top posts and best posting hours (UTC) for posts published in the last N days. Uses locally stored metrics - no API calls."""
+        from src import engagement
+        
+        try:
+            return {"status": "success", **engagement.summary(days, platform or None)}
+        except Exception as e:
+            print(f"[ENGAGEMENT] Error: {e}")
+            return {"status": "error", "error": str(e)}
     
     @tool
     def get_current_time() -> str:
         """Get the current date and time."""
         return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     
-    return [analyze_tweet_performance, get_current_time]
+    @tool
+    def get_top_movers(limit: int = 5, direction: str = "all") -> dict:
+        """Get a ranked table of the tokens with the biggest 24h moves, computed from stored price history: % change over several windows, momentum, volatility z-score and cross-source agreement. direction: "all", "gainers" or "losers". Use this for the top tokens instead of reading prices out of scraped text."""
+        from src.analytics import top_movers
+        
+        print(f"\n[ANALYTICS] Ranking top {limit} movers ({direction})")
+        try:
+            table = top_movers(limit, direction)
+            print(f"[ANALYTICS] {len(table['rows'])} of {table['tracked']} tracked tokens ranked")
+            return {"status": "success", **table}
+        except Exception as e:
+            print(f"[ANALYTICS] Error: {e}")
+            return {"error": str(e)}
+    
+    return [analyze_tweet_performance, get_engagement_summary, get_current_time, get_top_movers]
+
+
+def _record_history(snapshot: Optional[dict] = None, text: str = "") -> None:
+    """Add a market snapshot and/or the prices found in scraped text to the price history."""
+    try:
+        if snapshot:
+            record_snapshot(snapshot)
+        if text:
+            record_text(text, source="scrape")
+    except Exception as e:
+        print(f"[TIMESERIES] Could not record history: {e}")
+
+
+def get_market_tools() -> List[BaseTool]:
+    """Get market data tools (prices and trending tokens from a JSON market API)."""
+    from langchain_core.tools import tool
+    
+    @tool
+    def get_market_data(symbols: Optional[List[str]] = None, trending_limit: int = 7) -> dict:
+        """Get live USD prices and 24h moves for token symbols (e.g. ["BTC", "ETH"]) plus the currently trending tokens. Use this for prices instead of scraping price pages."""
+        provider = get_market_provider()
+        if provider is None:
+            return {"error": "No market data provider configured (MARKET_DATA_PROVIDER=none)"}
+        
+        print(f"\n[MARKET] Fetching {provider.name} data for {', '.join(symbols or []) or config.MARKET_SYMBOLS}")
+        try:
+            snapshot = provider.snapshot(symbols, trending_limit)
+            _record_history(snapshot)
+            print(f"[MARKET] {len(snapshot['quotes'])} quotes, {len(snapshot['trending'])} trending")
+            return {"status": "success", **snapshot}
+        except Exception as e:
+            print(f"[MARKET] Error: {e}")
+            return {"error": str(e), "provider": provider.name}
+    
+    return [get_market_data]
+
+
+def get_content_tools(publishers: List[BaseTool]) -> List[BaseTool]:
+    """Get the tool that publishes every platform variant of a post from one call."""
+    from langchain_core.tools import tool
+    from src.content import PostContent, finalize, publish, recent_posts
+    
+    @tool(args_schema=PostContent)
+    def publish_content(tweet: str, reply: str, linkedin: str, telegram: str,
+                        hashtags: Optional[List[str]] = None, tokens: Optional[List[str]] = None) -> dict:
+        """Publish one post everywhere at once: the tweet, a reply to it, the LinkedIn version and the Telegram message. Write all versions in this single call."""
+        content, issues = finalize(PostContent(tweet=tweet, reply=reply, linkedin=linkedin, telegram=telegram,
+                                               hashtags=hashtags or [], tokens=tokens or []), recent_posts())
+        if issues:
+            # Only what the auto-fixes cannot repair (e.g. a near-duplicate tweet) needs a rewrite
+            print(f"[CONTENT] Not publishing: {'; '.join(issues)}")
+            return {"status": "invalid", "issues": issues, "published": False}
+        print(f"\n[CONTENT] Publishing to all platforms (tokens: {', '.join(content.tokens) or 'none'})")
+        outcomes = publish(content, {t.name: t for t in publishers})
+        return {"status": "success" if any(o["outcome"] == "ok" for o in outcomes) else "error",
+                "outcomes": outcomes}
+    
+    return [publish_content]
 
 
 def get_firecrawl_tools() -> List[BaseTool]:
@@ -559,47 +687,74 @@ def get_firecrawl_tools() -> List[BaseTool]:
     
     FIRECRAWL_API_KEY = config.FIRECRAWL_API_KEY
     
+    def _research_cache_path() -> str:
+        return config.data_path(f"daily_research_{datetime.now().strftime('%Y%m%d')}.json")
+    
+    research_files = get_cache("research", ttl=config.RESEARCH_CACHE_TTL_SECONDS, max_entries=8)
+    scraped_pages = get_cache("scrape", ttl=config.SCRAPE_CACHE_TTL_SECONDS, max_entries=128)
+    
+    def _read_research_file() -> Optional[dict]:
+        """Today's research file, parsed once per version of the file (keyed by mtime and size)."""
+        path = _research_cache_path()
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        
+        def load():
+            with open(path, "r", encoding="utf-8") as fh:
+                return json.load(fh)
+        
+        return research_files.get_or_load((path, st.st_mtime_ns, st.st_size), load, size=st.st_size)
+    
+    def _load_research_cache() -> dict:
+        """A copy of today's research file to update, or {} when there is none."""
+        try:
+            data = _read_research_file()
+        except (OSError, ValueError):
+            return {}
+        return dict(data) if isinstance(data, dict) else {}
+    
+    def _write_research_cache(data: dict) -> None:
+        with open(_research_cache_path(), "w", encoding="utf-8") as fh:
+            json.dump(data, fh, ensure_ascii=False, indent=2, default=str)
+    
     @tool
-    def search_defi_news(query: str, limit: int = 5) -> dict:
-        """Search for DeFi/crypto news and data. USE SPARINGLY - max 1x per day!"""
-        print(f"\n[FIRECRAWL] Searching: {query}")
+    def search_defi_news(query: str, limit: int = 5, extra_queries: Optional[List[str]] = None) -> dict:
+        """Search for DeFi/crypto news and data. Pass extra_queries to run several searches in one call (results merged, duplicates removed). USE SPARINGLY - max 1x per day!"""
+        queries = [query] + [q for q in extra_queries or [] if q and q != query]
+        print(f"\n[FIRECRAWL] Searching: {' | '.join(queries)}")
         
         if not FIRECRAWL_API_KEY:
             return {"error": "FIRECRAWL_API_KEY not set"}
         
         try:
-            from firecrawl import Firecrawl
+            from concurrent.futures import ThreadPoolExecutor
+            from contextvars import copy_context
             
-            fc = Firecrawl(api_key=FIRECRAWL_API_KEY)
-            results = fc.search(query=query, limit=limit)
+            fc = get_firecrawl()
+            with ThreadPoolExecutor(max_workers=min(4, len(queries))) as pool:
+                futures = [pool.submit(copy_context().run, fc.search, q, limit) for q in queries]
+                results_dict = merge_search_results(*(f.result() for f in futures))
             
-            if hasattr(results, '__dict__'):
-                results_dict = results.__dict__
-            elif hasattr(results, 'data'):
-                results_dict = {"data": results.data}
-            else:
-                results_dict = {"raw": str(results)}
-            
-            cache_file = f"daily_research_{datetime.now().strftime('%Y%m%d')}.json"
-            cache_path = os.path.join(os.path.dirname(__file__), "..", cache_file)
-            
-            cache_data = {
+            # Merge into today's research file instead of replacing earlier searches
+            cache_file = os.path.basename(_research_cache_path())
+            cache_data = _load_research_cache()
+            cache_data.update({
                 "query": query,
+                "queries": sorted(set(cache_data.get("queries") or []) | set(queries)),
                 "timestamp": datetime.now().isoformat(),
-                "results": results_dict
-            }
-            
-            with open(cache_path, "w") as f:
-                json.dump(cache_data, f, indent=2, default=str)
+                "results": merge_search_results(cache_data.get("results") or {}, results_dict),
+            })
+            _write_research_cache(cache_data)
             
-            result_count = 0
-            if hasattr(results, 'data') and results.data:
-                result_count = len(results.data) if isinstance(results.data, list) else 1
+            result_count = sum(len(items) for items in results_dict.values())
             
             print(f"[FIRECRAWL] Found {result_count} results")
             return {
                 "status": "success",
                 "query": query,
+                "queries": queries,
                 "result_count": result_count,
                 "results": results_dict,
                 "cached_to": cache_file,
@@ -619,30 +774,17 @@ def get_firecrawl_tools() -> List[BaseTool]:
             return {"error": "FIRECRAWL_API_KEY not set"}
         
         try:
-            from firecrawl import Firecrawl
-            
-            fc = Firecrawl(api_key=FIRECRAWL_API_KEY)
-            result = fc.scrape(url, formats=["markdown"])
-            
-            # Handle Document object from Firecrawl
-            if hasattr(result, 'markdown'):
-                # Document object has attributes, not dict methods
-                content = getattr(result, 'markdown', '')
-                # Metadata is also an object with attributes
-                metadata = getattr(result, 'metadata', None)
-                title = getattr(metadata, 'title', '') if metadata else ''
-                markdown = content
-            else:
-                # Fallback for dict response (older API versions)
-                content = result.get("data", {}).get("content", "")
-                title = result.get("data", {}).get("metadata", {}).get("title", "")
-                markdown = result.get("data", {}).get("markdown", content)
+            # Repeated and concurrent scrapes of one URL share a single Firecrawl call
+            document = scraped_pages.get_or_load(
+                normalize_url(url), lambda: get_firecrawl().scrape(url, formats=["markdown"]))
+            markdown = document.get("markdown") or ""
+            title = (document.get("metadata") or {}).get("title", "")
             
             return {
                 "status": "success",
                 "url": url,
                 "title": title,
-                "content": markdown[:3000] if markdown else content[:3000],
+                "content": markdown[:3000],
                 "note": "Content truncated to 3000 chars to save tokens"
             }
             
@@ -656,16 +798,13 @@ def get_firecrawl_tools() -> List[BaseTool]:
         print(f"\n[YIELDBOT SCRAPE] Scraping yieldbot.cc for real data...")
         
         try:
-            import requests
-            from bs4 import BeautifulSoup
-            
-            response = requests.get("https://yieldbot.cc", timeout=30)
+            response = http_client.get(config.YIELDBOT_URL, timeout=30)
             response.raise_for_status()
             
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Extract text content
-            text_content = soup.get_text(separator=' ', strip=True)
+            # Extract text content (configured sections only, if any match)
+            extracted = extract_text(decode_html(response.content, response.headers.get("Content-Type", "")),
+                                     selectors=config.YIELDBOT_SELECTORS, max_chars=config.HTML_SCAN_CHARS)
+            text_content = extracted["text"]
             
             # Look for specific patterns
             token_info = []
@@ -698,22 +837,23 @@ def get_firecrawl_tools() -> List[BaseTool]:
                 "note": "Direct scrape of yieldbot.ai - real token data, trends, fundraiser info"
             }
             
-            print(f"[YIELDBOT SCRAPE] Scraped {len(text_content)} chars, found {len(token_info)} data points")
+            print(f"[YIELDBOT SCRAPE] Scraped {len(text_content)} chars ({extracted['backend']} parser), "
+                  f"found {len(token_info)} data points")
             return token_data
             
         except Exception as e:
             print(f"[YIELDBOT SCRAPE] Error: {e}")
             return {"error": str(e), "url": "https://yieldbot.ai"}
 
-    def _fc_scrape_with_backoff(fc, url, formats=None, maxAge=3600000, max_retries=2):
-        """Helper: call Firecrawl.scrape with simple backoff on transient errors and return Document/dict or error."""
+    def _fc_scrape_with_backoff(url, formats=None, maxAge=3600000, max_retries=2):
+        """Helper: scrape one URL with simple backoff on transient errors and return the document or an error dict."""
         formats = formats or ["markdown"]
         attempt = 0
         while attempt <= max_retries:
             try:
-                if maxAge is not None:
-                    return fc.scrape(url, formats=formats, max_age=maxAge)
-                return fc.scrape(url, formats=formats)
+                return get_firecrawl().scrape(url, formats=formats, max_age=maxAge)
+            except (resilience.CircuitOpenError, resilience.DeadlineExceeded) as e:
+                return {"error": str(e)}
             except Exception as e:
                 err = str(e)
                 print(f"[FIRECRAWL BACKOFF] Attempt {attempt} error for {url}: {err}")
@@ -723,95 +863,126 @@ def get_firecrawl_tools() -> List[BaseTool]:
                 # transient network or engine errors -> backoff and retry
                 attempt += 1
                 wait = 1 + attempt * 2
-                time.sleep(wait)
+                try:
+                    resilience.sleep(wait)
+                except resilience.DeadlineExceeded as e:
+                    return {"error": str(e)}
         return {"error": f"Failed after {max_retries} retries: {url}"}
 
+    def _research_entry(url: str, document: dict) -> dict:
+        if document.get("error"):
+            return {"url": url, "error": document["error"]}
+        title = (document.get("metadata") or {}).get("title", "")
+        return {"url": url, "title": title, "snippet": (document.get("markdown") or "")[:4000]}
+
     @tool
     def fast_scrape_and_cache(force_refresh: bool = False) -> dict:
         """Perform one regulated fast scrape+crawl of selected sources and cache results for the day.
 
         - Limits the number of target URLs to avoid burning credits
-        - Uses Firecrawl `maxAge` caching to reduce fresh scrapes
-        - Saves consolidated output to `daily_research_YYYYMMDD.json` for rest-of-day usage
+        - Submits all targets as one Firecrawl batch scrape job (with `maxAge` caching)
+        - Adds a `market` section (prices, trending tokens) from the market data provider
+        - Saves consolidated output to `daily_research_YYYYMMDD.json` for rest-of-day usage,
+          updated as each page completes
         """
         print("\n[FIRECRAWL FAST] Starting fast regulated scrape and cache")
 
         if not FIRECRAWL_API_KEY:
             return {"error": "FIRECRAWL_API_KEY not set"}
 
-        # Targets (keep this list small to control credits)
-        targets = [
-            "https://yieldbot.cc",
-            "https://coinmarketcap.com/trending-cryptocurrencies/",
-            "https://www.coingecko.com/en/highlights/trending-crypto",
+        # Targets (keep this list small to control credits). Prices and trending tokens
+        # come from the market data provider; the price pages are scraped only without one.
+        provider = get_market_provider()
+        targets = [config.YIELDBOT_URL]
+        if provider is None:
+            targets += [
+                "https://coinmarketcap.com/trending-cryptocurrencies/",
+                "https://www.coingecko.com/en/highlights/trending-crypto",
+            ]
+        targets += [
             "https://www.coindesk.com/markets/",
             "https://www.theblock.co/latest",
         ]
+        
+        def market_section() -> Optional[dict]:
+            if provider is None:
+                return None
+            try:
+                snapshot = provider.snapshot()
+                _record_history(snapshot)
+                return snapshot
+            except Exception as e:
+                print(f"[FIRECRAWL FAST] Market data error: {e}")
+                return {"provider": provider.name, "error": str(e)}
 
-        cache_file = f"daily_research_{datetime.now().strftime('%Y%m%d')}.json"
-        cache_path = os.path.join(os.path.dirname(__file__), "..", cache_file)
+        cache_file = os.path.basename(_research_cache_path())
+        cache_path = _research_cache_path()
+        cached = _load_research_cache()
 
-        # If cached and not forcing refresh, return it
+        # If a complete cache exists and not forcing refresh, return it
         try:
-            if os.path.exists(cache_path) and not force_refresh:
-                mtime = os.path.getmtime(cache_path)
-                age_seconds = time.time() - mtime
+            if cached.get("data") and cached.get("complete", True) and not force_refresh:
+                age_seconds = time.time() - os.path.getmtime(cache_path)
                 # Use cached file for up to 24 hours
                 if age_seconds < 86400:
                     print(f"[FIRECRAWL FAST] Using existing cache ({cache_file}), age {int(age_seconds)}s")
-                    with open(cache_path, "r", encoding="utf-8") as fh:
-                        return json.load(fh)
+                    # Pages are reused for the day, prices are not
+                    market = market_section()
+                    return {**cached, "market": market} if market else cached
         except Exception as e:
             print(f"[FIRECRAWL FAST] Cache check error: {e}")
 
-        from firecrawl import Firecrawl
-        fc = Firecrawl(api_key=FIRECRAWL_API_KEY)
-
-        results = {"timestamp": datetime.now().isoformat(), "data": []}
+        # Keep today's search results; the scrape section is rebuilt
+        results = {**{k: v for k, v in cached.items() if k in ("query", "queries", "results")},
+                   "timestamp": datetime.now().isoformat(), "complete": False}
+        market = market_section()
+        if market:
+            results["market"] = market
+        results["data"] = []
+        by_key = {normalize_url(url): url for url in targets}
+        done = {}
 
-        for url in targets:
-            print(f"[FIRECRAWL FAST] Scraping (cached maxAge=1h): {url}")
-            res = _fc_scrape_with_backoff(fc, url, formats=["markdown"], maxAge=3600000, max_retries=2)
-            # If we get a dict-like error, record and break on rate-limit
-            if isinstance(res, dict) and res.get("error"):
-                results["data"].append({"url": url, "error": res.get("error")})
-                if 'Rate Limit' in res.get("error") or 'rate limit' in res.get("error"):
-                    print("[FIRECRAWL FAST] Rate limit encountered; stopping further scrapes")
-                    break
-                continue
-
-            # Normalize Document or dict response
+        def save():
+            results["data"] = [done[url] for url in targets if url in done]
             try:
-                if hasattr(res, 'markdown'):
-                    content = getattr(res, 'markdown', '')
-                    metadata = getattr(res, 'metadata', None)
-                    if metadata and hasattr(metadata, '__dict__'):
-                        meta_dict = {k: v for k, v in vars(metadata).items() if not k.startswith('_')}
-                    else:
-                        meta_dict = metadata if isinstance(metadata, dict) else {}
-                    title = meta_dict.get('title', '') if isinstance(meta_dict, dict) else getattr(metadata, 'title', '') if metadata else ''
-                else:
-                    content = res.get('markdown') or res.get('data', {}).get('markdown') or ''
-                    meta_dict = res.get('data', {}).get('metadata', {}) if isinstance(res, dict) else {}
-                    title = meta_dict.get('title', '')
+                _write_research_cache(results)
             except Exception as e:
-                print(f"[FIRECRAWL FAST] Normalization error for {url}: {e}")
-                results["data"].append({"url": url, "error": str(e)})
-                continue
+                print(f"[FIRECRAWL FAST] Failed to write cache: {e}")
 
-            snippet = (content or '')[:4000]
-            results["data"].append({"url": url, "title": title, "snippet": snippet})
-            # small pause to spread requests
-            time.sleep(1)
-
-        # Save consolidated cache
+        print(f"[FIRECRAWL FAST] Batch scraping {len(targets)} targets (cached maxAge=1h)")
         try:
-            with open(cache_path, "w", encoding="utf-8") as fh:
-                json.dump(results, fh, ensure_ascii=False, indent=2)
-            print(f"[FIRECRAWL FAST] Cached results to {cache_file}")
+            for document in get_firecrawl().iter_batch_scrape(targets, formats=["markdown"], max_age=3600000):
+                url = by_key.get(normalize_url(document_url(document) or ""))
+                if url is None or url in done:
+                    continue
+                done[url] = _research_entry(url, document)
+                print(f"[FIRECRAWL FAST] Got {url} ({len(done)}/{len(targets)})")
+                save()
         except Exception as e:
-            print(f"[FIRECRAWL FAST] Failed to write cache: {e}")
+            err = str(e)
+            print(f"[FIRECRAWL FAST] Batch scrape failed: {err}")
+            if 'Rate Limit' in err or 'rate limit' in err:
+                print("[FIRECRAWL FAST] Rate limit encountered; stopping further scrapes")
+            else:
+                # Fall back to one scrape per remaining target
+                for url in targets:
+                    if url in done:
+                        continue
+                    if resilience.expired() or resilience.get_breaker("firecrawl").state == "open":
+                        print("[FIRECRAWL FAST] Out of budget or circuit open; skipping remaining targets")
+                        break
+                    print(f"[FIRECRAWL FAST] Scraping (cached maxAge=1h): {url}")
+                    done[url] = _research_entry(url, _fc_scrape_with_backoff(url, maxAge=3600000))
+                    if 'Rate Limit' in str(done[url].get("error")):
+                        print("[FIRECRAWL FAST] Rate limit encountered; stopping further scrapes")
+                        break
 
+        for url in targets:
+            done.setdefault(url, {"url": url, "error": "not scraped (batch incomplete)"})
+        results["complete"] = True
+        save()
+        _record_history(text="\n".join(entry.get("snippet") or "" for entry in results["data"]))
+        print(f"[FIRECRAWL FAST] Cached results to {cache_file}")
         return results
     
     @tool
@@ -819,20 +990,16 @@ def get_firecrawl_tools() -> List[BaseTool]:
         """Get today's cached research data. Use this instead of new searches!"""
         print(f"\n[RESEARCH] Getting cached research")
         
-        import os
+        cache_file = os.path.basename(_research_cache_path())
+        data = _read_research_file()
         
-        cache_file = f"daily_research_{datetime.now().strftime('%Y%m%d')}.json"
-        cache_path = os.path.join(os.path.dirname(__file__), "..", cache_file)
-        
-        if os.path.exists(cache_path):
-            with open(cache_path, "r") as f:
-                data = json.load(f)
-                print(f"[RESEARCH] Found cached data")
-                return {
-                    "status": "success",
-                    "source": cache_file,
-                    "data": data
-                }
+        if data is not None:
+            print(f"[RESEARCH] Found cached data")
+            return {
+                "status": "success",
+                "source": cache_file,
+                "data": data
+            }
         else:
             print(f"[RESEARCH] No cached data found")
             return {
@@ -844,6 +1011,22 @@ def get_firecrawl_tools() -> List[BaseTool]:
     return [search_defi_news, fast_scrape_and_cache, scrape_page, scrape_yieldbot_website, get_cached_research]
 
 
+# Innermost first. ``prefetched`` is outermost so background prefetches run the whole stack
+TOOL_WRAPPERS = (budget_guard, traced_tool, project_output, offload_large_output, prefetched)
+
+
+def wrap_tools(tools: List[BaseTool], *wrappers: Callable) -> List[BaseTool]:
+    """Apply ``wrapper(name, func) -> func`` layers to each tool's function, innermost first."""
+    for t in tools:
+        func = getattr(t, "func", None)
+        if func is None:
+            continue
+        for wrapper in wrappers:
+            func = wrapper(t.name, func)
+        t.func = func
+    return tools
+
+
 def get_all_tools(user_id: Optional[str] = None) -> List[BaseTool]:
     """Get all available tools for the agent."""
     all_tools = []
@@ -853,6 +1036,9 @@ def get_all_tools(user_id: Optional[str] = None) -> List[BaseTool]:
     all_tools.extend(get_linkedin_tools(user_id))
     all_tools.extend(get_image_generation_tools())
     all_tools.extend(get_firecrawl_tools())
+    all_tools.extend(get_market_tools())
     all_tools.extend(get_analytics_tools())
+    all_tools.extend(get_blob_tools())
+    all_tools.extend(get_content_tools(all_tools))
     
-    return all_tools
+    return wrap_tools(all_tools, *TOOL_WRAPPERS)
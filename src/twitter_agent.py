@@ -1,32 +1,32 @@
 """Twitter Agent - Handles autonomous Twitter posting with images."""
 
 import sys
+from src.cassette import install_from_env
 from src.config import config
-from src.tools import get_all_tools
+from src.media_pipeline import SOURCES as MEDIA_TOOLS, media_pipeline, pipelined
+from src.models import cascade_middleware, get_model
+from src.resilience import cycle_deadline, deadline_middleware
+from src.tool_registry import tool_middleware
+from src.tools import get_all_tools, wrap_tools
 
 
 TWITTER_AGENT_PROMPT = """You are YBot, an AUTONOMOUS Twitter agent for Yieldbot ($YBOT).
 
-## WORKFLOW - 4 STEPS:
-1. Generate NFT image: generate_nft_image(topic="DeFi", save_path="nft_image.png")
-   - Returns: {"status": "success", "image_url": "https://..."}
-   
-2. Upload media to Twitter: twitter_upload_media(image_url=image_url_from_step_1)
-   - Returns: {"status": "success", "media_id": "1234567890"}
-   - WAIT for media_id before proceeding
-   
-3. Write tweet (280 chars max, include $YBOT, 2-3 hashtags, NO EMOJIS)
+## WORKFLOW - 2 STEPS:
+The NFT image is generated and uploaded to Twitter in the background while you write,
+and attached to your post automatically.
+
+1. Write tweet (280 chars max, include $YBOT, 2-3 hashtags, NO EMOJIS)
    
-4. Post to Twitter with media: twitter_create_post(text=tweet_text, media_media_ids=[media_id_from_step_2])
-   - Pass media_id in array format
+2. Post to Twitter: twitter_create_post(text=tweet_text)
+   - Do NOT pass media_media_ids; the uploaded image is attached for you
 
 CRITICAL:
 - NO EMOJIS in tweet text
 - Max 280 characters
 - Use $YBOT token symbol
 - Include hashtags: #DeFi #AI #Crypto
-- ALWAYS upload media first and get media_id
-- ALWAYS pass media_id as array: [media_id]
+- Do NOT call generate_nft_image or twitter_upload_media yourself
 
 ## NEVER:
 - Ask for approval
@@ -34,37 +34,40 @@ CRITICAL:
 - Edit files
 - Repeat the same post
 - Use emojis
-- Skip media upload step
 
-Just execute the 4 steps above.
+Just execute the 2 steps above.
 """
 
+# Tools the prompt rules out: the image tools run in the background job, and
+# publish_content would post to every platform
+HIDDEN_TOOLS = {"publish_content", *MEDIA_TOOLS}
+
 
 def create_twitter_agent():
     """Create Twitter agent for autonomous posting."""
     from deepagents import create_deep_agent
-    from langchain.chat_models import init_chat_model
     
-    model = init_chat_model(
-        model=config.MISTRAL_MODEL,
-        model_provider="mistralai",
-        api_key=config.MISTRAL_API_KEY,
-        temperature=0.3,
-    )
+    model = get_model("writer")
     
-    tools = get_all_tools()
+    # Wrap every tool so the media pipeline registers its sources, then hide them from the model
+    tools = [t for t in wrap_tools(get_all_tools(), pipelined) if t.name not in HIDDEN_TOOLS]
     
     agent = create_deep_agent(
         model=model,
         tools=tools,
         system_prompt=TWITTER_AGENT_PROMPT,
+        middleware=[cascade_middleware(), tool_middleware(), deadline_middleware()],
     )
     
     return agent
 
 
-def run_twitter_post(agent=None, thread_id: str = None) -> str:
-    """Run autonomous Twitter post."""
+def run_twitter_post(agent=None, thread_id: str = None, topic: str = "DeFi") -> str:
+    """Run autonomous Twitter post.
+
+    The image for ``topic`` is rendered and uploaded in the background while
+    the model writes the tweet (see ``src.media_pipeline``).
+    """
     import uuid
     
     if agent is None:
@@ -76,12 +79,13 @@ def run_twitter_post(agent=None, thread_id: str = None) -> str:
         }
     }
     
-    command = "Create and post unique DeFi content NOW. Generate image, upload to Twitter, write tweet, post with media. NO EMOJIS."
+    command = f"Create and post unique {topic} content NOW. Write the tweet and post it; the image is attached automatically. NO EMOJIS."
     
-    result = agent.invoke(
-        {"messages": [{"role": "user", "content": command}]},
-        config=config_dict
-    )
+    with cycle_deadline(), media_pipeline(topic):
+        result = agent.invoke(
+            {"messages": [{"role": "user", "content": command}]},
+            config=config_dict
+        )
     
     if "messages" in result and result["messages"]:
         return result["messages"][-1].content
@@ -106,6 +110,8 @@ def main():
     if config.setup_tracing():
         print(f"LangSmith tracing enabled -> Project: {config.LANGSMITH_PROJECT}")
     
+    install_from_env()
+    
     print("Initializing Twitter Agent...")
     try:
         agent = create_twitter_agent()
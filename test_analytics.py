@@ -0,0 +1,123 @@
+"""Tests for the top-movers metrics in src/analytics.py (no network needed)."""
+
+import numpy as np
+import pytest
+
+from src import analytics
+from src.config import config
+from src.timeseries import TimeSeriesStore
+
+HOUR = 3600
+NOW = 1_700_000_000.0
+nan = np.nan
+
+
+@pytest.fixture(autouse=True)
+def trend_settings(monkeypatch):
+    monkeypatch.setattr(config, "MARKET_DATA_PROVIDER", "coingecko")
+    monkeypatch.setattr(config, "TREND_WINDOWS_HOURS", "6")
+    monkeypatch.setattr(config, "TREND_MOMENTUM_SAMPLES", 3)
+    monkeypatch.setattr(config, "TREND_STALE_HOURS", 6)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return TimeSeriesStore(str(tmp_path), window=16)
+
+
+def add_hourly(store, symbol, prices, change=None, source="coingecko", end=NOW):
+    for i, price in enumerate(prices):
+        ts = end - (len(prices) - 1 - i) * HOUR
+        store.append(symbol, price, change_24h=change, ts=ts, source=source, min_interval=0)
+
+
+def rows_by_symbol(table):
+    return {row[0]: dict(zip(table["columns"], row)) for row in table["rows"]}
+
+
+def test_window_changes_use_the_last_sample_at_least_that_old():
+    ts = np.array([[0, HOUR, 2 * HOUR, 3 * HOUR]], dtype=float)
+    price = np.array([[100.0, 110.0, 120.0, 132.0]])
+    changes = analytics.window_changes(ts, price, [1, 2, 5])
+    assert changes[0, 0] == pytest.approx(10.0)    # 132 vs 120
+    assert changes[0, 1] == pytest.approx(20.0)    # 132 vs 110
+    assert np.isnan(changes[0, 2])                 # not enough history
+
+
+def test_window_changes_skip_missing_prices():
+    ts = np.array([[0, HOUR, 2 * HOUR]], dtype=float)
+    price = np.array([[100.0, 150.0, nan]])
+    assert analytics.window_changes(ts, price, [1])[0, 0] == pytest.approx(50.0)
+
+
+def test_short_series_are_padded_and_still_scored(store):
+    add_hourly(store, "OLD", [100, 101, 102, 103, 104, 105, 106, 107])
+    add_hourly(store, "NEW", [10, 11])
+    keys, price = store.matrix("price", 8)
+    new = price[keys.index("NEW|coingecko")]
+    assert np.isnan(new[:6]).all() and list(new[6:]) == [10, 11]
+
+    _, ts = store.matrix("ts", 8)
+    _, change = store.matrix("change_24h", 8)
+    metrics = analytics.trend_metrics(ts, price, change, [6.0], 3)
+    i = keys.index("NEW|coingecko")
+    assert metrics["price"][i] == 11
+    assert metrics["momentum"][i] == pytest.approx(np.log(1.1) * 100)
+    assert np.isnan(metrics["z"][i])               # too few earlier returns
+    assert np.isnan(metrics["windows"][i, 0])
+    assert metrics["windows"][keys.index("OLD|coingecko"), 0] == pytest.approx((107 / 101 - 1) * 100)
+
+
+def test_z_score_flags_an_unusual_latest_move():
+    price = np.array([[100, 101, 100, 101, 100, 101, 130]], dtype=float)
+    ts = np.arange(7, dtype=float)[None, :] * HOUR
+    metrics = analytics.trend_metrics(ts, price, np.full_like(price, nan), [1.0], 3)
+    assert metrics["z"][0] > 2
+
+
+def test_ranking_orders_by_absolute_24h_move(store):
+    add_hourly(store, "AAA", [1, 1], change=3.0)
+    add_hourly(store, "BBB", [1, 1], change=-9.0)
+    add_hourly(store, "CCC", [1, 1], change=5.0)
+    table = analytics.top_movers(limit=5, store=store, now=NOW)
+    assert [row[0] for row in table["rows"]] == ["BBB", "CCC", "AAA"]
+    assert table["columns"][:3] == ["symbol", "price", "chg_24h"] and "chg_6h" in table["columns"]
+
+    assert [r[0] for r in analytics.top_movers(2, store=store, now=NOW)["rows"]] == ["BBB", "CCC"]
+    assert [r[0] for r in analytics.top_movers(5, "gainers", store, NOW)["rows"]] == ["CCC", "AAA"]
+    assert [r[0] for r in analytics.top_movers(5, "losers", store, NOW)["rows"]] == ["BBB"]
+
+
+def test_change_is_computed_when_the_source_reports_none(tmp_path):
+    store = TimeSeriesStore(str(tmp_path), window=32)
+    add_hourly(store, "CALC", [100] + [110] * 24)
+    row = rows_by_symbol(analytics.top_movers(store=store, now=NOW))["CALC"]
+    assert row["chg_24h"] == pytest.approx(10.0)
+
+
+def test_stale_series_are_left_out(store):
+    add_hourly(store, "OLD", [1, 1], change=50.0, end=NOW - 7 * HOUR)
+    add_hourly(store, "NEW", [1, 1], change=1.0)
+    assert [r[0] for r in analytics.top_movers(store=store, now=NOW)["rows"]] == ["NEW"]
+
+
+def test_sources_agreement_counts_the_same_direction(store):
+    add_hourly(store, "SOL", [200, 210], change=5.0)
+    add_hourly(store, "SOL", [200, 210], change=4.0, source="scrape")
+    add_hourly(store, "ETH", [3000, 2900], change=-3.0)
+    add_hourly(store, "ETH", [3000, 3100], change=2.0, source="scrape")
+    rows = rows_by_symbol(analytics.top_movers(store=store, now=NOW))
+    assert (rows["SOL"]["sources"], rows["SOL"]["agree"]) == (2, 2)
+    assert (rows["ETH"]["sources"], rows["ETH"]["agree"]) == (2, 1)
+    assert rows["ETH"]["chg_24h"] == -3.0     # the provider's series is the primary one
+
+
+def test_scrape_only_symbols_use_the_scraped_series(store):
+    add_hourly(store, "YBOT", [nan, nan], change=12.0, source="scrape")
+    row = rows_by_symbol(analytics.top_movers(store=store, now=NOW))["YBOT"]
+    assert row["chg_24h"] == 12.0 and row["price"] is None and row["sources"] == 1
+
+
+def test_empty_store_returns_a_note(store):
+    table = analytics.top_movers(store=store, now=NOW)
+    assert table["rows"] == [] and table["tracked"] == 0 and "note" in table
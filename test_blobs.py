@@ -0,0 +1,49 @@
+"""Tests for the content-addressed blob store in src/blobs.py (no network needed)."""
+
+import os
+import time
+
+from src.blobs import REF_PREFIX, BlobStore
+
+
+def age(store: BlobStore, ref: str, days: float) -> None:
+    path = store._path(ref[len(REF_PREFIX):])
+    old = time.time() - days * 86400
+    os.utime(path, (old, old))
+
+
+def test_put_is_content_addressed_and_round_trips(tmp_path):
+    store = BlobStore(str(tmp_path))
+    ref = store.put("payload")
+    assert ref.startswith(REF_PREFIX)
+    assert store.put("payload") == ref
+    assert store.get(ref) == "payload"
+    assert store.get(REF_PREFIX + "0" * 64) is None
+    assert store.get("not-a-ref") is None
+
+
+def test_prune_deletes_only_blobs_older_than_retention(tmp_path):
+    store = BlobStore(str(tmp_path))
+    old_ref, new_ref = store.put("old"), store.put("new")
+    age(store, old_ref, 10)
+    assert store.prune(retention_days=7) == 1
+    assert store.get(old_ref) is None
+    assert store.get(new_ref) == "new"
+
+
+def test_put_again_keeps_a_blob_alive(tmp_path):
+    store = BlobStore(str(tmp_path))
+    ref = store.put("reused")
+    age(store, ref, 10)
+    store.put("reused")  # referenced again by a newer result
+    assert store.prune(retention_days=7) == 0
+    assert store.get(ref) == "reused"
+
+
+def test_prune_disabled_or_missing_root(tmp_path):
+    store = BlobStore(str(tmp_path))
+    ref = store.put("kept")
+    age(store, ref, 100)
+    assert store.prune(retention_days=0) == 0
+    assert store.get(ref) == "kept"
+    assert BlobStore(str(tmp_path / "missing")).prune(retention_days=1) == 0
@@ -0,0 +1,95 @@
+"""Tests for the TTL/LRU cache in src/cache.py (no network needed)."""
+
+import threading
+import time
+
+import pytest
+
+from src.cache import TTLCache
+
+
+def test_entries_expire_after_ttl():
+    cache = TTLCache("test", ttl=0.05, max_bytes=0)
+    cache.set("a", 1)
+    assert cache.get("a") == 1
+    time.sleep(0.1)
+    assert cache.get("a", "missing") == "missing"
+    assert cache.stats()["expirations"] == 1
+
+
+def test_per_entry_ttl_overrides_default():
+    cache = TTLCache("test", ttl=60, max_bytes=0)
+    cache.set("short", 1, ttl=0.05)
+    cache.set("long", 2)
+    time.sleep(0.1)
+    assert cache.get("short") is None
+    assert cache.get("long") == 2
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TTLCache("test", ttl=60, max_entries=2, max_bytes=0)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")  # "b" is now the least recently used
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+
+
+def test_byte_bound_evicts_and_skips_oversized_values():
+    cache = TTLCache("test", ttl=60, max_bytes=10)
+    cache.set("a", "x" * 6)
+    cache.set("b", "y" * 6)
+    assert cache.get("a") is None
+    assert cache.stats()["bytes"] == 6
+    cache.set("huge", "z" * 11)
+    assert cache.get("huge") is None
+    assert cache.get("b") == "y" * 6
+
+
+def test_get_or_load_is_single_flight():
+    cache = TTLCache("test", ttl=60, max_bytes=0)
+    calls = []
+    release = threading.Event()
+
+    def loader():
+        calls.append(1)
+        release.wait(2)
+        return "value"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get_or_load("k", loader))) for _ in range(5)]
+    for t in threads:
+        t.start()
+    while cache.stats()["coalesced"] < 4:
+        time.sleep(0.01)
+    release.set()
+    for t in threads:
+        t.join()
+
+    assert calls == [1]
+    assert results == ["value"] * 5
+    assert cache.get_or_load("k", loader) == "value"
+    assert calls == [1]
+
+
+def test_loader_errors_are_shared_but_not_cached():
+    cache = TTLCache("test", ttl=60, max_bytes=0)
+
+    def failing():
+        raise RuntimeError("upstream down")
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_load("k", failing)
+    assert cache.get_or_load("k", lambda: "recovered") == "recovered"
+
+
+def test_invalidate_one_key_or_everything():
+    cache = TTLCache("test", ttl=60, max_bytes=0)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.invalidate("a")
+    assert cache.get("a") is None and cache.get("b") == 2
+    cache.invalidate()
+    assert cache.stats()["entries"] == 0 and cache.stats()["bytes"] == 0
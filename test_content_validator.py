@@ -0,0 +1,126 @@
+"""Tests for the post content rules in src/content_validator.py (no network needed)."""
+
+import pytest
+
+from src import content_validator as cv
+from src.content import PostContent
+
+
+def make_post(**overrides) -> PostContent:
+    fields = {
+        "tweet": "$YBOT vault at 12.8% APY while $SOL +6% leads the majors #DeFi #Crypto",
+        "reply": "Live vault numbers at https://yieldbot.cc",
+        "linkedin": "Yieldbot's vault currently yields 12.8% APY.",
+        "telegram": "$YBOT vault at 12.8% APY",
+        "hashtags": ["#DeFi", "#Crypto"],
+    }
+    fields.update(overrides)
+    return PostContent(**fields)
+
+
+def test_weighted_length_counts_urls_and_wide_characters():
+    assert cv.weighted_length("abc") == 3
+    assert cv.weighted_length("see https://example.com/a/very/long/path") == 4 + cv.URL_WEIGHT
+    assert cv.weighted_length("日本") == 4
+
+
+def test_fit_drops_unprotected_words_from_the_end():
+    text = "one two three four $YBOT #DeFi"
+    fitted = cv.fit(text, 20, keep=["$YBOT"])
+    assert cv.weighted_length(fitted) <= 20
+    assert "$YBOT" in fitted and "#DeFi" in fitted
+
+
+def test_valid_post_has_no_issues():
+    assert cv.validate(make_post()) == []
+
+
+@pytest.mark.parametrize("overrides, issue", [
+    ({"tweet": "$YBOT up 5% today 🚀 #DeFi #Crypto"}, "tweet: contains emojis"),
+    ({"tweet": "Vault at 12.8% APY #DeFi #Crypto"}, "tweet: missing $YBOT"),
+    ({"tweet": "$YBOT vault at 12.8% APY #DeFi"}, "tweet: 1 hashtags (want 2-3)"),
+    ({"reply": "More at our site"}, "reply: missing https://yieldbot.cc"),
+])
+def test_rule_violations_are_reported(overrides, issue):
+    assert issue in cv.validate(make_post(**overrides))
+
+
+def test_repair_fixes_what_it_can():
+    post = make_post(tweet="vault at 12.8% APY 🚀 #DeFi", hashtags=["#DeFi", "#Yield"])
+    repaired, issues, fixes = cv.repair(post)
+    assert issues == []
+    assert "🚀" not in repaired.tweet
+    assert "$YBOT" in repaired.tweet
+    assert "#Yield" in repaired.tweet
+    assert {"tweet: no_emojis", "tweet: required_text", "tweet: hashtag_count"} <= set(fixes)
+    assert post.tweet == "vault at 12.8% APY 🚀 #DeFi"  # the input is not modified
+
+
+def test_repair_shortens_long_tweets_keeping_required_parts():
+    filler = " ".join(f"word{i}" for i in range(80))
+    repaired, issues, _ = cv.repair(make_post(tweet=f"$YBOT {filler} #DeFi #Crypto"))
+    assert issues == []
+    assert cv.weighted_length(repaired.tweet) <= 280
+    assert repaired.tweet.startswith("$YBOT") and repaired.tweet.endswith("#DeFi #Crypto")
+
+
+def test_exact_repeat_gets_a_time_stamp_when_that_makes_it_unique():
+    post = make_post()
+    repaired, issues, fixes = cv.repair(post, history=[post.reply])
+    assert issues == [] and "reply: unique" in fixes
+    assert repaired.reply.startswith(post.reply) and repaired.reply.endswith("UTC")
+
+
+def test_tweet_repeats_need_a_rewrite():
+    post = make_post()
+    # A stamped tweet would still be too similar, so it is left for the model to rewrite
+    repaired, issues, fixes = cv.repair(post, history=[post.tweet])
+    assert "tweet: repeats a recent post" in issues and "tweet: unique" not in fixes
+    assert repaired.tweet == post.tweet
+
+    near = post.tweet.replace("12.8%", "12.9%")
+    _, issues, _ = cv.repair(make_post(tweet=near), history=[post.tweet])
+    assert "tweet: too similar to a recent post" in issues
+
+
+def test_reply_must_differ_from_the_tweet():
+    post = make_post(reply="$YBOT at https://yieldbot.cc #DeFi #Crypto")
+    post.tweet = post.reply
+    assert "reply: repeats a recent post" in cv.validate(post)
+
+
+def test_best_prefers_fewest_remaining_issues_then_fewest_fixes():
+    broken = make_post(tweet="$YBOT up again #DeFi #Crypto")
+    needs_fix = make_post(tweet="$YBOT vault yield holds at 12.8% #DeFi")
+    clean = make_post()
+    content, issues, fixes = cv.best([broken, needs_fix, clean], history=[broken.tweet.replace("again", "today")])
+    assert issues == [] and fixes == []
+    assert content.tweet == clean.tweet
+
+    with pytest.raises(ValueError):
+        cv.best([])
+
+
+def test_add_rule_runs_after_the_built_in_rules(monkeypatch):
+    class NoShouting(cv.Rule):
+        name = "no_shouting"
+
+        def check(self, text, context):
+            return "all caps" if text.isupper() else None
+
+        def fix(self, text, context):
+            return text.capitalize()
+
+    monkeypatch.setattr(cv, "RULES", cv.default_rules())
+    cv.add_rule("telegram", NoShouting())
+    repaired, issues, fixes = cv.repair(make_post(telegram="BUY NOW"))
+    assert issues == [] and repaired.telegram == "Buy now"
+    assert "telegram: no_shouting" in fixes
+
+
+def test_rules_must_implement_check():
+    class NoCheck(cv.Rule):
+        name = "no_check"
+
+    with pytest.raises(TypeError):
+        NoCheck()
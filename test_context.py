@@ -0,0 +1,100 @@
+"""Tests for history compaction in src/context.py (no network needed)."""
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+from langchain_core.messages.utils import count_tokens_approximately
+
+from src.context import SUMMARY_HEADER, SUMMARY_ID, ContextCompactor, context_node
+
+
+def turn(n: int, output_chars: int = 4000) -> list:
+    call_id = f"call-{n}"
+    return [
+        HumanMessage(content=f"request {n}", id=f"h{n}"),
+        AIMessage(content="", id=f"a{n}", tool_calls=[{"name": "scrape_page", "args": {}, "id": call_id}]),
+        ToolMessage(content=f"page {n} " + "x" * output_chars, name="scrape_page", tool_call_id=call_id, id=f"t{n}"),
+        AIMessage(content=f"answer {n}", id=f"r{n}"),
+    ]
+
+
+def history(turns: int, **kwargs) -> list:
+    return [SystemMessage(content="You are YBot", id="sys")] + [m for n in range(turns) for m in turn(n, **kwargs)]
+
+
+def ids(messages) -> list:
+    return [m.id for m in messages]
+
+
+def test_within_budget_is_returned_unchanged():
+    messages = history(3, output_chars=10)
+    compacted = ContextCompactor(max_tokens=10_000, keep_turns=1).compact(messages)
+    assert all(a is b for a, b in zip(compacted, messages)) and len(compacted) == len(messages)
+
+
+def test_old_tool_outputs_become_stubs_and_recent_turns_stay_verbatim():
+    messages = history(3)
+    compactor = ContextCompactor(max_tokens=1500, keep_turns=1, tool_output_chars=50)
+    compacted = compactor.compact(messages)
+
+    assert ids(compacted) == ids(messages)
+    stubs = {m.id: m.content for m in compacted if isinstance(m, ToolMessage)}
+    for n in (0, 1):
+        assert stubs[f"t{n}"].startswith(f"[earlier scrape_page output compacted from {4000 + len(f'page {n} ')} chars]")
+        assert len(stubs[f"t{n}"]) < 120
+    assert stubs["t2"] == messages[-2].content          # the last turn is untouched
+    assert compacted[0].content == "You are YBot"
+    assert messages[3].content.endswith("x" * 100)      # the input list is not modified
+    assert count_tokens_approximately(compacted) <= 1500
+
+
+def test_keep_turns_sets_the_verbatim_boundary():
+    messages = history(4)
+    compacted = ContextCompactor(max_tokens=2500, keep_turns=2, tool_output_chars=50).compact(messages)
+    full = {m.id for m in compacted if isinstance(m, ToolMessage) and len(m.content) > 1000}
+    assert full == {"t2", "t3"}
+
+
+def test_whole_old_turns_are_folded_into_one_summary():
+    messages = history(4, output_chars=400)
+    compacted = ContextCompactor(max_tokens=300, keep_turns=1, tool_output_chars=200).compact(messages)
+
+    assert ids(compacted) == ["sys", SUMMARY_ID, "h3", "a3", "t3", "r3"]
+    summary = compacted[1]
+    assert isinstance(summary, SystemMessage) and summary.content.startswith(SUMMARY_HEADER)
+    assert "User: request 0" in summary.content and "Assistant: answer 2" in summary.content
+    assert summary.content.count(SUMMARY_HEADER) == 1
+
+
+def test_turn_summaries_are_cached_and_extended_as_turns_age_out():
+    calls = []
+
+    def summarizer(turn_messages):
+        calls.append(turn_messages[0].id)
+        return f"summary of {turn_messages[0].id}"
+
+    compactor = ContextCompactor(max_tokens=250, keep_turns=1, tool_output_chars=200, summarizer=summarizer)
+    messages = history(3, output_chars=400)
+    first = compactor.compact(messages)
+    assert calls == ["h0", "h1"]
+    assert compactor.compact(messages)[1].content == first[1].content
+    assert calls == ["h0", "h1"]                         # reused from the cache
+
+    # The next turn starts from the compacted thread, as the graph's context node stores it
+    grown = first + turn(3, output_chars=400)
+    compacted = compactor.compact(grown)
+    assert calls == ["h0", "h1", "h2"]
+    assert compacted[1].content == SUMMARY_HEADER + "summary of h0\nsummary of h1\nsummary of h2"
+    assert ids(compacted)[2:] == ["h3", "a3", "t3", "r3"]
+
+
+def test_fewer_user_turns_than_keep_turns_keeps_everything():
+    messages = history(2)
+    compacted = ContextCompactor(max_tokens=100, keep_turns=3, tool_output_chars=50).compact(messages)
+    assert ids(compacted) == ids(messages)
+    assert [m.content for m in compacted] == [m.content for m in messages]
+
+
+def test_context_node_replaces_the_thread_only_when_compacted():
+    node = context_node(ContextCompactor(max_tokens=1500, keep_turns=1, tool_output_chars=50))
+    assert node({"messages": history(1, output_chars=10)}) == {}
+    update = node({"messages": history(3)})["messages"]
+    assert update[0].type == "remove" and ids(update[1:]) == ids(history(3))
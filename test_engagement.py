@@ -0,0 +1,38 @@
+"""Tests for the engagement refresh schedule in src/engagement.py (no network needed)."""
+
+import pytest
+
+from src import engagement
+from src.config import config
+
+HOUR = 3600
+
+
+@pytest.fixture(autouse=True)
+def schedule(monkeypatch):
+    monkeypatch.setattr(config, "ENGAGEMENT_REFRESH_FACTOR", 0.25)
+    monkeypatch.setattr(config, "ENGAGEMENT_MIN_REFRESH_MINUTES", 15)
+    monkeypatch.setattr(config, "ENGAGEMENT_MAX_REFRESH_HOURS", 24)
+    monkeypatch.setattr(config, "ENGAGEMENT_MAX_AGE_DAYS", 14)
+
+
+@pytest.mark.parametrize("age, interval", [
+    (0, 15 * 60),                 # fresh posts: the minimum
+    (30 * 60, 15 * 60),
+    (4 * HOUR, HOUR),             # a quarter of the age in between
+    (48 * HOUR, 12 * HOUR),
+    (5 * 24 * HOUR, 24 * HOUR),   # old posts: the maximum
+])
+def test_next_interval_grows_with_age_within_bounds(age, interval):
+    assert engagement.next_interval(age) == interval
+
+
+def test_next_interval_is_monotonic():
+    intervals = [engagement.next_interval(age) for age in range(0, 10 * 24 * HOUR, HOUR)]
+    assert intervals == sorted(intervals)
+
+
+def test_posts_past_max_age_are_no_longer_checked():
+    now = 1_000_000_000.0
+    assert engagement._next_check(now - 4 * HOUR, now) == now + HOUR
+    assert engagement._next_check(now - 15 * 24 * HOUR, now) is None
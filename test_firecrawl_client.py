@@ -0,0 +1,148 @@
+"""Tests for the Firecrawl v2 REST client in src/firecrawl_client.py (stubbed HTTP session, no network needed)."""
+
+import json
+
+import pytest
+import requests
+
+from src import firecrawl_client, http_client, resilience
+from src.firecrawl_client import FirecrawlClient, FirecrawlError
+
+API = "https://fc.example"
+
+
+def response(status: int, body) -> requests.Response:
+    resp = requests.Response()
+    resp.status_code = status
+    resp._content = body.encode() if isinstance(body, str) else json.dumps(body).encode()
+    return resp
+
+
+class StubSession:
+    """Replays queued responses per (method, path) and records every request."""
+
+    def __init__(self, routes):
+        self.routes = {key: list(replies) for key, replies in routes.items()}
+        self.calls = []
+
+    def request(self, method, url, **kwargs):
+        path = url[len(API):] if url.startswith(API) else url
+        self.calls.append((method, path, kwargs.get("json")))
+        replies = self.routes[(method, path)]
+        return replies.pop(0) if len(replies) > 1 else replies[0]
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    monkeypatch.setattr(resilience, "_breakers", {})
+
+    def install(routes):
+        session = StubSession(routes)
+        monkeypatch.setattr(http_client, "session", session)
+        return session
+
+    return install
+
+
+@pytest.fixture
+def client():
+    return FirecrawlClient(api_key="fc-test", api_url=API + "/")
+
+
+def doc(url: str, text: str = "page") -> dict:
+    return {"markdown": text, "metadata": {"sourceURL": url}}
+
+
+def test_normalize_url_and_document_url():
+    assert firecrawl_client.normalize_url(" HTTPS://Example.com/Path/#top") == "https://example.com/Path"
+    assert firecrawl_client.document_url({"metadata": {"url": "u"}, "url": "x"}) == "u"
+    assert firecrawl_client.document_url({"url": "x"}) == "x"
+
+
+def test_scrape_sends_auth_and_returns_the_document(stub, client):
+    session = stub({("POST", "/v2/scrape"): [response(200, {"success": True, "data": doc("https://a")})]})
+    assert client.scrape("https://a", max_age=3600) == doc("https://a")
+    assert session.calls == [("POST", "/v2/scrape", {"url": "https://a", "formats": ["markdown"], "maxAge": 3600})]
+
+
+def test_search_normalizes_list_and_dict_responses(stub, client):
+    stub({("POST", "/v2/search"): [response(200, {"success": True, "data": [{"url": "https://w"}]}),
+                                   response(200, {"success": True, "data": {"news": [{"url": "https://n"}]}})]})
+    assert client.search("defi") == {"web": [{"url": "https://w"}]}
+    assert client.search("defi") == {"news": [{"url": "https://n"}]}
+
+
+@pytest.mark.parametrize("reply, status, text", [
+    (response(429, {"error": "slow down"}), 429, "Rate Limit Exceeded: slow down"),
+    (response(500, "<html>oops</html>"), 500, "failed (500)"),
+    (response(200, {"success": False, "error": "bad url"}), 200, "bad url"),
+])
+def test_error_responses_raise_with_status(stub, client, reply, status, text):
+    stub({("POST", "/v2/scrape"): [reply]})
+    with pytest.raises(FirecrawlError) as raised:
+        client.scrape("https://a")
+    assert raised.value.status == status and text in str(raised.value)
+
+
+def test_batch_status_follows_result_pages_once_done(stub, client):
+    session = stub({
+        ("GET", "/v2/batch/scrape/job"): [response(200, {"status": "completed", "completed": 3, "total": 3,
+                                                         "data": [doc("https://a")], "next": API + "/page2"})],
+        ("GET", "/page2"): [response(200, {"data": [doc("https://b"), doc("https://c")]})],
+    })
+    status = client.batch_status("job")
+    assert status["status"] == "completed" and (status["completed"], status["total"]) == (3, 3)
+    assert [firecrawl_client.document_url(d) for d in status["data"]] == ["https://a", "https://b", "https://c"]
+    assert [c[1] for c in session.calls] == ["/v2/batch/scrape/job", "/page2"]
+
+
+def test_iter_batch_scrape_yields_new_documents_as_they_arrive(stub, client, monkeypatch):
+    monkeypatch.setattr(resilience, "sleep", lambda seconds: None)
+    stub({
+        ("POST", "/v2/batch/scrape"): [response(200, {"success": True, "id": "job"})],
+        ("GET", "/v2/batch/scrape/job"): [
+            response(200, {"status": "scraping", "completed": 1, "total": 2, "data": [doc("https://a")]}),
+            response(200, {"status": "completed", "completed": 2, "total": 2,
+                           "data": [doc("https://A/"), doc("https://b")]}),
+        ],
+    })
+    urls = [firecrawl_client.document_url(d) for d in client.iter_batch_scrape(["https://a", "https://b"],
+                                                                                poll_seconds=0, timeout=60)]
+    assert urls == ["https://a", "https://b"]
+
+
+def test_iter_batch_scrape_gives_up_after_the_timeout(stub, client, monkeypatch):
+    monkeypatch.setattr(resilience, "sleep", lambda seconds: None)
+    session = stub({
+        ("POST", "/v2/batch/scrape"): [response(200, {"success": True, "id": "job"})],
+        ("GET", "/v2/batch/scrape/job"): [response(200, {"status": "scraping", "completed": 1, "total": 2,
+                                                         "data": [doc("https://a")]})],
+        ("DELETE", "/v2/batch/scrape/job"): [response(200, {"success": True})],
+    })
+    documents = list(client.iter_batch_scrape(["https://a", "https://b"], poll_seconds=1, timeout=0))
+    assert [firecrawl_client.document_url(d) for d in documents] == ["https://a"]
+    assert session.calls[-1][:2] == ("DELETE", "/v2/batch/scrape/job")
+
+
+def test_iter_batch_scrape_stops_at_the_cycle_deadline(stub, client, monkeypatch):
+    def out_of_budget(seconds):
+        raise resilience.DeadlineExceeded("cycle budget used up")
+
+    monkeypatch.setattr(resilience, "sleep", out_of_budget)
+    session = stub({
+        ("POST", "/v2/batch/scrape"): [response(200, {"success": True, "id": "job"})],
+        ("GET", "/v2/batch/scrape/job"): [response(200, {"status": "scraping", "data": []})],
+        ("DELETE", "/v2/batch/scrape/job"): [response(500, "down")],
+    })
+    assert list(client.iter_batch_scrape(["https://a"], poll_seconds=1, timeout=60)) == []
+    assert session.calls[-1][:2] == ("DELETE", "/v2/batch/scrape/job")   # a failed cancel is only logged
+
+
+def test_merge_search_results_keeps_the_first_hit_per_url():
+    merged = firecrawl_client.merge_search_results(
+        {"web": [{"url": "https://a/"}, {"title": "no url"}], "news": [{"url": "https://b"}]},
+        {"web": [{"url": "https://A"}, {"url": "https://c"}], "images": "not a list"},
+        None,
+    )
+    assert merged == {"web": [{"url": "https://a/"}, {"title": "no url"}, {"url": "https://c"}],
+                      "news": [{"url": "https://b"}]}
@@ -0,0 +1,136 @@
+"""Tests for the publish stage pieces of src/graph.py (no network needed)."""
+
+from types import SimpleNamespace
+
+import pytest
+import requests
+
+from src import graph
+from src.config import config
+from src.resilience import CircuitOpenError
+
+CONTENT = {"tweet": "$YBOT tweet", "reply": "reply https://yieldbot.cc", "linkedin": "LinkedIn post",
+           "telegram": "$YBOT telegram", "hashtags": []}
+TWEET_OK = {"successful": True, "data": {"id": "111"}}
+
+
+def test_merge_outcomes_appends_and_none_clears():
+    assert graph.merge_outcomes(None, [{"platform": "twitter"}]) == [{"platform": "twitter"}]
+    merged = graph.merge_outcomes([{"platform": "twitter"}], [{"platform": "telegram"}])
+    assert [o["platform"] for o in merged] == ["twitter", "telegram"]
+    assert graph.merge_outcomes(merged, None) == []
+
+
+def test_route_content_fans_out_or_goes_back_to_the_model():
+    assert graph.route_content({"content": None}) == "context"
+    assert graph.route_content({"content": CONTENT}) == ["publish_twitter", "publish_linkedin", "publish_telegram"]
+    assert graph.route_content({"content": {**CONTENT, "linkedin": ""}}) == ["publish_twitter", "publish_telegram"]
+
+
+@pytest.mark.parametrize("result, code", [
+    ({"error": "boom", "status_code": 503}, 503),
+    ({"status": "error", "error": "Bad Request: chat not found", "error_code": 400}, 400),
+    ({"successful": False, "data": {"status_code": 429}}, 429),
+    ({"reply_result": {"error": "HTTP 403"}, "fallback_create": {"error": "x"}}, 403),
+    ({"error": "Twitter said 401 Unauthorized"}, 401),
+    ({"error": "status code: 502 from upstream"}, 502),
+    ({"error": "Post 400123 failed after 4003 ms at $403.50"}, None),
+    ({"error": "invalid response"}, None),
+    ("plain text", None),
+])
+def test_status_code_only_reads_labelled_statuses(result, code):
+    assert graph.status_code(result) == code
+
+
+@pytest.mark.parametrize("result, retry", [
+    ({"error": "x", "status_code": 500}, True),
+    ({"error": "x", "status_code": 429}, True),
+    ({"error": "x", "status_code": 408}, True),
+    ({"error": "x", "status_code": 403}, False),
+    ({"error": "Bad Request", "error_code": 400}, False),
+    ({"error": "You are not allowed to create a Tweet with duplicate content."}, False),
+    ({"error": "Read timed out after 4003 ms"}, True),
+    ({"error": "invalid upstream response for tweet 400"}, True),
+])
+def test_results_are_retried_on_transient_statuses_only(result, retry):
+    assert graph.is_retryable(result) is retry
+
+
+def test_exceptions_are_classified_by_type():
+    assert graph.is_retryable({}, requests.ConnectionError("reset"))
+    assert graph.is_retryable({}, TimeoutError())
+    assert graph.is_retryable({}, CircuitOpenError("open"))
+    assert not graph.is_retryable({}, KeyError("text"))
+
+
+def fake_tools(**funcs):
+    return {name: SimpleNamespace(func=func) for name, func in funcs.items()}
+
+
+def run_branch(node, state, attempts=3):
+    """Call a branch node the way its RetryPolicy would."""
+    for _ in range(attempts):
+        try:
+            return node(state)
+        except graph.PublishRetry:
+            continue
+    raise AssertionError("branch never finished")
+
+
+@pytest.fixture(autouse=True)
+def retry_settings(monkeypatch):
+    monkeypatch.setattr(config, "PUBLISH_RETRY_ATTEMPTS", 3)
+
+
+def test_transient_reply_failure_retries_only_the_reply():
+    calls = []
+    replies = iter([{"error": "x", "status_code": 503}, {"successful": True, "data": {"id": "222"}}])
+
+    def create(text):
+        calls.append("create")
+        return TWEET_OK
+
+    def reply(tweet_id, reply_text):
+        calls.append(f"reply:{tweet_id}")
+        return next(replies)
+
+    node = graph.publish_branch("twitter", fake_tools(twitter_create_post=create, twitter_reply_to_post=reply))
+    result = run_branch(node, {"publish_id": "p1", "content": CONTENT})
+    assert calls == ["create", "reply:111", "reply:111"]
+    assert {o["platform"]: o["outcome"] for o in result["outcomes"]} == {"twitter": "ok", "twitter_reply": "ok"}
+    assert all(o["publish_id"] == "p1" for o in result["outcomes"])
+
+
+def test_permanent_failure_is_returned_without_retry():
+    calls = []
+
+    def send(chat_id, text):
+        calls.append(chat_id)
+        return {"status": "error", "error": "Forbidden: bot was blocked", "error_code": 403}
+
+    node = graph.publish_branch("telegram", fake_tools(send_telegram_message=send))
+    result = node({"publish_id": "p2", "content": CONTENT})
+    assert calls == [graph.TELEGRAM_CHAT]
+    assert result["outcomes"][0]["outcome"] == "error"
+
+
+def test_retries_stop_after_the_configured_attempts():
+    calls = []
+
+    def post(commentary):
+        calls.append(commentary)
+        raise requests.ConnectionError("reset")
+
+    node = graph.publish_branch("linkedin", fake_tools(linkedin_create_post=post))
+    state = {"publish_id": "p3", "content": CONTENT}
+    for _ in range(2):
+        with pytest.raises(graph.PublishRetry):
+            node(state)
+    result = node(state)
+    assert len(calls) == 3 and result["outcomes"][0]["error"] == "reset"
+
+
+def test_missing_tool_is_skipped():
+    result = graph.publish_branch("linkedin", {})({"publish_id": "p4", "content": CONTENT})
+    assert result["outcomes"][0]["outcome"] == "skipped"
+
@@ -0,0 +1,98 @@
+"""Tests for HTML text extraction in src/html_extract.py, run through every available backend (no network needed)."""
+
+import pytest
+
+from src import html_extract
+from src.html_extract import extract_text
+
+BACKENDS = html_extract.available_backends()
+
+PAGE = """<!DOCTYPE html>
+<html><head><title>Yieldbot</title><meta charset="utf-8">
+<style>body { color: red }</style><script>var hidden = "script text";</script></head>
+<body>
+  <nav class="menu top"><a href="/">Home</a> | <a href="/vault">Vault</a></nav>
+  <!-- a comment -->
+  <h1 id="hero">Yieldbot <b>AI</b> vaults</h1>
+  <section id="tokens" class="panel">
+    <div class="price up">$YBOT 12.8% APY</div>
+    <div class="price">$SOL &amp; $ETH<br>steady</div>
+    <template><p>template text</p></template>
+  </section>
+  <p class="note">Fundraiser pool: 42 ETH</p>
+  <img src="x.png" alt="logo"><p>Footer &copy; 2026</p>
+</body></html>"""
+
+FULL_TEXT = ("Yieldbot Home | Vault Yieldbot AI vaults $YBOT 12.8% APY $SOL & $ETH steady "
+             "Fundraiser pool: 42 ETH Footer © 2026")
+
+
+def test_stream_backend_is_always_available():
+    assert "stream" in BACKENDS
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_plain_text_matches_the_reference(backend):
+    result = extract_text(PAGE, backend=backend)
+    assert result["text"] == FULL_TEXT
+    assert result["backend"] == backend
+    assert (result["matched"], result["truncated"]) == (False, False)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("selectors, text", [
+    ("h1#hero", "Yieldbot AI vaults"),
+    (".price.up", "$YBOT 12.8% APY"),
+    ("div.price", "$YBOT 12.8% APY $SOL & $ETH steady"),
+    ("p.note, h1", "Yieldbot AI vaults Fundraiser pool: 42 ETH"),               # document order
+    ("section#tokens.panel, .price", "$YBOT 12.8% APY $SOL & $ETH steady"),     # nested matches once
+    (["nav.menu", "#hero"], "Home | Vault Yieldbot AI vaults"),
+])
+def test_selectors_match_tag_id_and_class(backend, selectors, text):
+    result = extract_text(PAGE, selectors, backend=backend)
+    assert result["matched"] is True
+    assert result["text"] == text
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_unmatched_selectors_fall_back_to_the_whole_page(backend):
+    result = extract_text(PAGE, "#missing", backend=backend)
+    assert result["matched"] is False
+    assert result["text"] == FULL_TEXT
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_max_chars_truncates(backend):
+    result = extract_text(PAGE, max_chars=30, backend=backend)
+    assert result["truncated"] is True
+    assert result["text"] == FULL_TEXT[:30]
+    assert extract_text(PAGE, max_chars=10_000, backend=backend)["truncated"] is False
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_stream_chunks_and_bytes_give_the_same_text(backend, monkeypatch):
+    monkeypatch.setattr(html_extract, "FEED_CHUNK", 7)
+    body = PAGE.replace("Fundraiser", "Fundraiser café").encode("latin-1")
+    result = extract_text(body.replace(b'charset="utf-8"', b'charset="latin-1"'), "p.note", backend=backend)
+    assert result["text"] == "Fundraiser café pool: 42 ETH"
+
+
+def test_parse_selectors():
+    assert html_extract.parse_selectors("section#tokens.panel.wide, .price, H1") == [
+        ("section", "tokens", ("panel", "wide")), (None, None, ("price",)), ("h1", None, ())]
+    assert html_extract.parse_selectors(None) == []
+    with pytest.raises(ValueError):
+        html_extract.parse_selectors("div > p")
+
+
+def test_decode_html_prefers_the_header_charset():
+    body = "café".encode("latin-1")
+    assert html_extract.decode_html(body, "text/html; charset=ISO-8859-1") == "café"
+    assert html_extract.decode_html("café".encode(), "") == "café"
+    assert html_extract.decode_html(b"abc", "charset=unknown-charset") == "abc"
+
+
+def test_resolve_backend_falls_back_to_an_available_one():
+    assert html_extract.resolve_backend("auto") == BACKENDS[0]
+    assert html_extract.resolve_backend("not-a-parser") == BACKENDS[0]
+    assert html_extract.resolve_backend("stream") == "stream"
@@ -0,0 +1,140 @@
+"""Tests for quote normalization and provider caching in src/market_data.py (no network needed)."""
+
+import pytest
+
+from src import market_data
+from src.cache import get_cache
+from src.config import config
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    get_cache("market").invalidate()
+    yield
+    get_cache("market").invalidate()
+
+
+class CountingProvider(market_data.MarketDataProvider):
+    """Serves fixed quotes and records every upstream request."""
+
+    name = "counting"
+
+    def __init__(self, coins):
+        super().__init__()
+        self.coins = {row[0]: market_data.quote(*row) for row in coins}
+        self.requests = []
+
+    def fetch_quotes(self, symbols):
+        self.requests.append(("quotes", tuple(symbols)))
+        return {s: self.coins[s] for s in symbols if s in self.coins}
+
+    def fetch_trending(self, limit):
+        self.requests.append(("trending", limit))
+        return [market_data.quote("PEPE", "Pepe", "0.0000123", "55.5"), self.coins["ETH"]][:limit]
+
+
+COINS = [("BTC", "Bitcoin", 97000, 1.8), ("ETH", "Ethereum", 3900, -2.456)]
+
+
+def test_normalize_symbols():
+    assert market_data.normalize_symbols(["$eth", "BTC ", "eth", "", None]) == ["ETH", "BTC"]
+
+
+def test_quote_normalizes_numbers_and_names():
+    q = market_data.quote("sol", "", "$1,234.50", "-1.2345", "1.05e11", None, 5.0)
+    assert q == {"symbol": "SOL", "name": "SOL", "price_usd": 1234.5, "change_24h_pct": -1.23,
+                 "market_cap_usd": 1.05e11, "volume_24h_usd": None, "rank": 5}
+    assert market_data.quote("X", price_usd=True, change_24h_pct="n/a")["price_usd"] is None
+    assert market_data.quote("X", change_24h_pct="n/a")["change_24h_pct"] is None
+
+
+def test_format_move():
+    assert market_data.format_move(market_data.quote("SOL", price_usd=221.1, change_24h_pct=-1.3)) == "$SOL -1.30% at $221.1"
+    assert market_data.format_move(market_data.quote("NEW")) == "$NEW n/a"
+
+
+def test_providers_must_implement_both_fetches():
+    class QuotesOnly(market_data.MarketDataProvider):
+        def fetch_quotes(self, symbols):
+            return {}
+
+    with pytest.raises(TypeError):
+        QuotesOnly()
+    with pytest.raises(TypeError):
+        market_data.MarketDataProvider()
+
+
+def test_quotes_request_only_uncached_symbols_once():
+    provider = CountingProvider(COINS)
+    assert list(provider.quotes(["eth", "$BTC", "NOPE"])) == ["ETH", "BTC"]
+    assert provider.requests == [("quotes", ("ETH", "BTC", "NOPE"))]
+
+    # Known and unknown symbols are both cached; only the new one is requested
+    assert list(provider.quotes(["BTC", "NOPE", "ETH", "SOL"])) == ["BTC", "ETH"]
+    assert provider.requests[1:] == [("quotes", ("SOL",))]
+    assert provider.quotes(["NOPE"]) == {}
+    assert len(provider.requests) == 2
+
+
+def test_snapshot_merges_quotes_and_trending(monkeypatch):
+    monkeypatch.setattr(config, "MARKET_SYMBOLS", "BTC,ETH")
+    provider = CountingProvider(COINS)
+    snapshot = provider.snapshot(trending_limit=2)
+    assert snapshot["provider"] == "counting"
+    assert list(snapshot["quotes"]) == ["BTC", "ETH"]
+    assert [q["symbol"] for q in snapshot["trending"]] == ["PEPE", "ETH"]
+    # ETH is both quoted and trending; the summary lists it once
+    assert snapshot["summary"] == "$BTC +1.80% at $97000, $ETH -2.46% at $3900, $PEPE +55.50% at $1.23e-05"
+
+    provider.snapshot(trending_limit=2)
+    assert provider.requests == [("quotes", ("BTC", "ETH")), ("trending", 2)]
+    assert provider.snapshot(["BTC"], trending_limit=0)["trending"] == []
+
+
+class CannedGecko(market_data.CoinGeckoProvider):
+    def __init__(self, responses):
+        super().__init__(api_url="https://api.example/api/v3", api_key="")
+        self.responses = responses
+
+    def _get(self, path, params=None):
+        return self.responses[path]
+
+
+def test_coingecko_keeps_the_best_ranked_coin_per_symbol():
+    provider = CannedGecko({"/coins/markets": [
+        {"symbol": "eth", "name": "Bridged Ether", "current_price": 3890, "market_cap_rank": 900},
+        {"symbol": "eth", "name": "Ethereum", "current_price": 3912.55, "price_change_percentage_24h": 2.4,
+         "market_cap": 4.71e11, "total_volume": 1.9e10, "market_cap_rank": 2},
+        {"symbol": "doge", "name": "Dogecoin", "current_price": 0.4, "market_cap_rank": None},
+    ]})
+    quotes = provider.fetch_quotes(["ETH"])
+    assert quotes == {"ETH": market_data.quote("ETH", "Ethereum", 3912.55, 2.4, 4.71e11, 1.9e10, 2)}
+
+
+def test_coingecko_trending_is_normalized():
+    provider = CannedGecko({"/search/trending": {"coins": [
+        {"item": {"symbol": "power", "name": "Power", "market_cap_rank": 312,
+                  "data": {"price": "$0.91", "price_change_percentage_24h": {"usd": 106.23},
+                           "market_cap": "$310,000,000", "total_volume": "$220,000,000"}}},
+        {"item": {"symbol": "x"}},
+    ]}})
+    assert provider.fetch_trending(1) == [market_data.quote("POWER", "Power", 0.91, 106.23, 3.1e8, 2.2e8, 312)]
+
+
+def test_coinmarketcap_picks_the_top_ranked_listing():
+    class CannedCMC(market_data.CoinMarketCapProvider):
+        def _get(self, path, params=None):
+            return {"data": {"UNI": [
+                {"symbol": "UNI", "name": "Unicorn", "cmc_rank": 4000, "quote": {"USD": {"price": 0.1}}},
+                {"symbol": "UNI", "name": "Uniswap", "cmc_rank": 20,
+                 "quote": {"USD": {"price": 9.5, "percent_change_24h": -3.21, "market_cap": 5.7e9}}},
+            ]}}
+
+    quotes = CannedCMC(api_url="https://cmc.example", api_key="k").fetch_quotes(["UNI"])
+    assert quotes == {"UNI": market_data.quote("UNI", "Uniswap", 9.5, -3.21, 5.7e9, None, 20)}
+
+
+def test_unknown_or_disabled_provider_is_none():
+    assert market_data.get_market_provider("none") is None
+    assert market_data.get_market_provider("nope") is None
+    assert isinstance(market_data.get_market_provider("fake"), market_data.FakeMarketProvider)
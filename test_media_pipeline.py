@@ -0,0 +1,122 @@
+"""Tests for the background image render and upload in src/media_pipeline.py (fake tools, no network needed)."""
+
+import threading
+import time
+
+import pytest
+
+from src import media_pipeline
+from src.config import config
+from src.media_pipeline import media_pipeline as pipeline, pipelined
+from src.resilience import cycle_deadline
+
+IMAGE_URL = "https://img.example/defi.png"
+
+
+@pytest.fixture(autouse=True)
+def tools(monkeypatch):
+    monkeypatch.setattr(media_pipeline, "_tools", {})
+    monkeypatch.setattr(config, "MEDIA_PIPELINE_TIMEOUT_SECONDS", 5.0)
+
+
+class FakeTools:
+    """Fake render, upload and post functions registered through ``pipelined``; each records its calls."""
+
+    def __init__(self, image=None, upload=None, gate=None):
+        self.image = {"status": "success", "image_url": IMAGE_URL} if image is None else image
+        self.upload = {"media_id": 1790} if upload is None else upload
+        self.gate = gate
+        self.calls = []
+        pipelined("generate_nft_image", self.render)
+        pipelined("twitter_upload_media", self.upload_media)
+        self.post = pipelined("twitter_create_post", self.create_post)
+
+    def render(self, topic, save_path):
+        self.calls.append(("render", topic, save_path))
+        if self.gate is not None:
+            self.gate.wait(5)
+        if isinstance(self.image, Exception):
+            raise self.image
+        return self.image
+
+    def upload_media(self, image_url):
+        self.calls.append(("upload", image_url))
+        return self.upload
+
+    def create_post(self, text, media_media_ids=None):
+        self.calls.append(("post", text, media_media_ids))
+        return {"successful": True, "data": {"id": "1"}}
+
+
+def test_the_post_waits_for_the_job_and_attaches_its_media():
+    fake = FakeTools()
+    with pipeline("ETH staking", "eth.png"):
+        fake.post(text="gm")
+    assert fake.calls == [("render", "ETH staking", "eth.png"), ("upload", IMAGE_URL), ("post", "gm", ["1790"])]
+
+
+def test_media_ids_from_the_model_are_kept():
+    fake = FakeTools()
+    with pipeline() as job:
+        fake.post(text="gm", media_media_ids=["42"])
+        job.future.result()
+    assert [c for c in fake.calls if c[0] == "post"] == [("post", "gm", ["42"])]
+
+
+@pytest.mark.parametrize("image, upload, reason", [
+    ({"status": "error", "message": "rate limited"}, None, "image generation failed: rate limited"),
+    (RuntimeError("pollinations down"), None, "pollinations down"),
+    (None, {"successful": False, "error": "413 too large"}, "media upload failed: 413 too large"),
+])
+def test_a_failed_job_posts_text_only(capsys, image, upload, reason):
+    fake = FakeTools(image, upload)
+    with pipeline():
+        fake.post(text="gm")
+    assert fake.calls[-1] == ("post", "gm", None)
+    assert f"Posting text-only: {reason}" in capsys.readouterr().out
+
+
+def test_a_slow_job_times_out_and_is_abandoned(monkeypatch, capsys):
+    monkeypatch.setattr(config, "MEDIA_PIPELINE_TIMEOUT_SECONDS", 0.05)
+    gate = threading.Event()
+    fake = FakeTools(gate=gate)
+    with pipeline() as job:
+        fake.post(text="gm")
+    assert fake.calls[-1] == ("post", "gm", None)
+
+    gate.set()
+    job._pool.shutdown(wait=True)
+    out = capsys.readouterr().out
+    assert "image not ready after 0.05s" in out
+    assert "Abandoned image job for DeFi finished: media_id 1790 (unused)" in out
+
+
+def test_the_wait_never_runs_past_the_cycle_deadline():
+    gate = threading.Event()
+    fake = FakeTools(gate=gate)
+    try:
+        with cycle_deadline(0.1), pipeline() as job:
+            start = time.monotonic()
+            media_id, reason = job.join()
+            assert media_id is None and reason.startswith("image not ready")
+            assert time.monotonic() - start < 1
+    finally:
+        gate.set()
+    assert fake.calls[0][0] == "render"
+
+
+def test_no_job_without_both_source_tools():
+    calls = []
+    post = pipelined("twitter_create_post", lambda text, media_media_ids=None: calls.append(media_media_ids))
+    pipelined("generate_nft_image", lambda topic, save_path: {"image_url": IMAGE_URL})
+    with pipeline() as job:
+        assert job is None
+        post(text="gm")
+    assert calls == [None]
+
+
+def test_other_tools_are_not_wrapped():
+    def func():
+        return "ok"
+    assert pipelined("send_telegram_message", func) is func
+    assert media_pipeline._tools == {}
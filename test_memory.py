@@ -0,0 +1,81 @@
+"""Tests for checkpoint retention on the SQLite memory backend in src/memory.py (no network needed)."""
+
+import operator
+from datetime import datetime, timedelta, timezone
+from typing import Annotated, TypedDict
+
+import pytest
+from langgraph.checkpoint.base import empty_checkpoint
+from langgraph.graph import END, StateGraph
+
+from src import memory
+from src.config import config
+
+
+class Counter(TypedDict):
+    count: Annotated[int, operator.add]
+
+
+@pytest.fixture
+def sqlite_backend(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "MEMORY_BACKEND", "sqlite")
+    monkeypatch.setattr(config, "SQLITE_MEMORY_PATH", str(tmp_path / "memory.db"))
+    monkeypatch.setattr(memory, "_checkpointer", None)
+    monkeypatch.setattr(memory, "_sqlite_conns", {})
+    yield memory.get_checkpointer()
+    for conn in memory._sqlite_conns.values():
+        conn.close()
+
+
+def run_counter(checkpointer, thread_id: str, times: int) -> None:
+    workflow = StateGraph(Counter)
+    workflow.add_node("step", lambda state: {"count": 1})
+    workflow.set_entry_point("step")
+    workflow.add_edge("step", END)
+    graph = workflow.compile(checkpointer=checkpointer)
+    for _ in range(times):
+        graph.invoke({"count": 0}, {"configurable": {"thread_id": thread_id}})
+
+
+def add_old_thread(checkpointer, thread_id: str, days: int) -> None:
+    checkpoint = empty_checkpoint()
+    checkpoint["ts"] = (datetime.now(timezone.utc) - timedelta(days=days)).isoformat()
+    checkpointer.put({"configurable": {"thread_id": thread_id, "checkpoint_ns": ""}}, checkpoint, {}, {})
+
+
+def checkpoint_count(thread_id: str) -> int:
+    conn = memory._sqlite_connection("checkpoints")
+    return conn.execute("SELECT COUNT(*) FROM checkpoints WHERE thread_id = ?", (thread_id,)).fetchone()[0]
+
+
+def test_sqlite_backend_is_used(sqlite_backend):
+    assert type(sqlite_backend).__name__ == "SqliteSaver"
+
+
+def test_prune_keeps_the_newest_checkpoints_per_thread(sqlite_backend):
+    run_counter(sqlite_backend, "busy", times=4)
+    before = checkpoint_count("busy")
+    assert before > 3
+
+    result = memory.prune_checkpoints(retention_days=0, keep_last=3)
+
+    assert result == {"backend": "sqlite", "threads_deleted": 0, "checkpoints_deleted": before - 3}
+    assert checkpoint_count("busy") == 3
+    latest = sqlite_backend.get_tuple({"configurable": {"thread_id": "busy"}})
+    assert latest.checkpoint["channel_values"]["count"] == 4
+    orphans = memory._sqlite_connection("checkpoints").execute(
+        """SELECT COUNT(*) FROM writes w WHERE NOT EXISTS (
+               SELECT 1 FROM checkpoints c WHERE c.thread_id = w.thread_id
+                 AND c.checkpoint_ns = w.checkpoint_ns AND c.checkpoint_id = w.checkpoint_id)""").fetchone()[0]
+    assert orphans == 0
+
+
+def test_prune_deletes_idle_threads(sqlite_backend):
+    run_counter(sqlite_backend, "active", times=1)
+    add_old_thread(sqlite_backend, "idle", days=40)
+
+    result = memory.prune_checkpoints(retention_days=30, keep_last=0)
+
+    assert result["threads_deleted"] == 1
+    assert checkpoint_count("idle") == 0
+    assert checkpoint_count("active") > 0
@@ -0,0 +1,68 @@
+"""Tests for turn routing and escalation in src/models.py (no network needed)."""
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from src import models
+from src.config import config
+
+
+@pytest.fixture(autouse=True)
+def cascade(monkeypatch):
+    monkeypatch.setattr(config, "MODEL_CASCADE", True)
+
+
+def call(name: str, call_id: str) -> dict:
+    return {"name": name, "args": {}, "id": call_id}
+
+
+def results(*names: str) -> list:
+    return [AIMessage(content="", tool_calls=[call(n, n) for n in names])] + \
+        [ToolMessage(content="{}", name=n, tool_call_id=n) for n in names]
+
+
+def test_turn_roles_follow_the_research_and_publish_flow():
+    turn = [HumanMessage(content="Run the cycle")]
+    assert models.role_for_turn(turn) == "router"
+
+    turn += results("fast_scrape_and_cache", "monitor_telegram_group")
+    assert models.role_for_turn(turn) == "extractor"
+
+    turn += results("get_top_movers")
+    assert models.role_for_turn(turn) == "writer"
+
+    turn += results("publish_content")
+    assert models.role_for_turn(turn) == "router"
+
+
+def test_second_round_of_data_goes_to_the_writer():
+    turn = [HumanMessage(content="Tweet about SOL")] + results("search_defi_news") + results("scrape_page")
+    assert models.role_for_turn(turn) == "writer"
+
+
+def test_roles_restart_with_each_user_message():
+    history = [HumanMessage(content="first")] + results("search_defi_news") + results("scrape_page")
+    assert models.role_for_turn(history + [AIMessage(content="done"), HumanMessage(content="next")]) == "router"
+
+
+def test_no_cascade_uses_the_writer(monkeypatch):
+    monkeypatch.setattr(config, "MODEL_CASCADE", False)
+    assert models.role_for_turn([HumanMessage(content="hi")]) == "writer"
+
+
+def test_plain_replies_are_not_escalated():
+    messages = [HumanMessage(content="What can you do?")]
+    assert models.needs_escalation("router", messages, AIMessage(content="I research and post.")) is None
+
+
+@pytest.mark.parametrize("response, reason", [
+    (AIMessage(content="", tool_calls=[call("publish_content", "1")]), "writes copy"),
+    (AIMessage(content="", tool_calls=[call("made_up_tool", "1")]), "unknown tool"),
+    (AIMessage(content="", invalid_tool_calls=[{"name": "scrape_page", "args": "{", "id": "1",
+                                                "error": "bad json", "type": "invalid_tool_call"}]),
+     "invalid tool call"),
+])
+def test_invalid_calls_and_copy_are_escalated(response, reason):
+    names = {"publish_content", "scrape_page"}
+    assert models.needs_escalation("extractor", [HumanMessage(content="go")], response, names) == reason
+    assert models.needs_escalation("writer", [HumanMessage(content="go")], response, names) is None
@@ -0,0 +1,87 @@
+"""Tests for the research prefetch in src/prefetch.py (fake tools, no network needed)."""
+
+import time
+
+import pytest
+from langchain_core.tools import StructuredTool
+
+from src import blobs, instrumentation, prefetch, resilience
+from src.blobs import BlobStore
+from src.config import config
+from src.resilience import cycle_deadline
+from src.tools import TOOL_WRAPPERS, wrap_tools
+
+NAME = "scrape_yieldbot_website"
+SUMMARY = "Yieldbot vaults " * 200
+
+
+@pytest.fixture(autouse=True)
+def isolated(tmp_path, monkeypatch):
+    monkeypatch.setattr(prefetch, "_sources", {})
+    monkeypatch.setattr(resilience, "_breakers", {})
+    monkeypatch.setattr(config, "TOOL_PROJECTION", True)
+    monkeypatch.setattr(blobs, "_store", BlobStore(str(tmp_path)))
+
+
+@pytest.fixture
+def spans(monkeypatch):
+    emitted = []
+    monkeypatch.setattr(instrumentation, "emit", emitted.append)
+    return emitted
+
+
+@pytest.fixture
+def calls():
+    return []
+
+
+@pytest.fixture
+def tool(calls):
+    """A research tool wrapped like ``get_all_tools`` wraps it; ``calls`` records the real fetches."""
+
+    def scrape(page: str = "home") -> dict:
+        calls.append(page)
+        return {"status": "success", "page": page, "summary": SUMMARY}
+
+    return wrap_tools([StructuredTool.from_function(scrape, name=NAME, description="scrape")], *TOOL_WRAPPERS)[0]
+
+
+def test_prefetched_result_is_projected_traced_and_served_once(tool, calls, spans):
+    with prefetch.prefetch_cycle({NAME: {}}) as active:
+        first = tool.func()
+        second = tool.func(page="home")   # same arguments, but the prefetched result is used up
+    assert calls == ["home", "home"] and active.served == 1
+    for result in (first, second):
+        assert len(result["summary"]) == config.PROJECTION_TEXT_CHARS + 3
+    assert [s["name"] for s in spans if s["kind"] == "tool"] == [NAME, NAME]
+
+
+def test_other_arguments_run_live(tool, calls):
+    with prefetch.prefetch_cycle({NAME: {}}) as active:
+        assert tool.func(page="vault")["page"] == "vault"
+    assert sorted(calls) == ["home", "vault"] and active.served == 0
+
+
+def test_background_call_goes_through_the_budget_guard(tool, calls):
+    with cycle_deadline(0.001):
+        time.sleep(0.01)
+        with prefetch.prefetch_cycle({NAME: {}}):
+            result = tool.func()
+    assert result["status"] == "skipped" and "deadline" in result["reason"]
+    assert calls == []
+
+
+def test_background_call_skips_an_open_breaker(tool, calls):
+    breaker = resilience.get_breaker(resilience.TOOL_SERVICES[NAME])
+    for _ in range(config.BREAKER_FAILURE_THRESHOLD):
+        breaker.record_failure()
+    with prefetch.prefetch_cycle({NAME: {}}):
+        assert tool.func()["status"] == "skipped"
+    assert calls == []
+
+
+def test_empty_plan_starts_nothing(tool, calls):
+    with prefetch.prefetch_cycle({}) as active:
+        assert active is None
+        tool.func()
+    assert calls == ["home"]
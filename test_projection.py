@@ -0,0 +1,106 @@
+"""Tests for the per-tool result projections in src/projection.py (no network needed)."""
+
+import json
+import os
+
+import pytest
+
+from src import blobs, graph, projection
+from src.blobs import BlobStore
+from src.config import config
+from src.run_ledger import outcome_from_result
+
+BIG = "x" * 3000
+
+
+@pytest.fixture(autouse=True)
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(config, "TOOL_PROJECTION", True)
+    store = BlobStore(str(tmp_path))
+    monkeypatch.setattr(blobs, "_store", store)
+    return store
+
+
+@pytest.mark.parametrize("tool, platform, raw", [
+    ("twitter_create_post", "twitter",
+     {"successful": True, "data": {"data": {"id": "1790", "text": BIG, "edit_history_tweet_ids": ["1790"]}}}),
+    ("twitter_create_post", "twitter",
+     {"successful": False, "error": "403 Forbidden: duplicate content", "data": {"detail": BIG}}),
+    ("linkedin_create_post", "linkedin",
+     {"successful": True, "data": {"response_headers": {"x-restli-id": "urn:li:share:42"}, "body": BIG}}),
+    ("send_telegram_message", "telegram",
+     {"status": "success", "message_id": 77, "chat_id": "@yieldbotai", "text": BIG}),
+    ("send_telegram_message", "telegram",
+     {"status": "error", "error": "Bad Request: chat not found", "error_code": 400, "chat_id": "@x"}),
+])
+def test_publish_projection_keeps_what_the_ledger_reads(tool, platform, raw):
+    projected = projection.PROJECTIONS[tool](raw)
+    assert outcome_from_result(platform, projected) == outcome_from_result(platform, raw)
+    assert graph.status_code(projected) == graph.status_code(raw)
+    assert len(json.dumps(projected)) < 300
+
+
+def test_reply_fallback_and_post_and_reply_shapes():
+    reply = {"reply_result": {"successful": False, "error": "403"},
+             "fallback_create": {"successful": True, "data": {"id": "9"}}}
+    projected = projection.PROJECTIONS["twitter_reply_to_post"](reply)
+    assert projected["status"] == "error" and projected["fallback_create"]["data"]["id"] == "9"
+
+    both = {"create": {"successful": True, "data": {"id": "5", "text": BIG}},
+            "reply": {"successful": True, "data": {"id": "6"}}}
+    projected = projection.PROJECTIONS["twitter_post_and_reply"](both)
+    assert outcome_from_result("twitter", projected) == {"platform": "twitter", "outcome": "ok", "post_id": "5"}
+    assert projected["reply"]["data"]["id"] == "6"
+
+
+def test_research_file_projection_keeps_urls_and_short_snippets():
+    data = {"timestamp": "2026-10-19T06:00:00", "complete": False,
+            "market": {"provider": "coingecko", "as_of": "now", "summary": "$SOL +2%", "quotes": {"SOL": {}}},
+            "data": [{"url": "https://a", "title": "A", "snippet": BIG, "markdown": BIG},
+                     {"url": "https://b", "error": "timeout"}]}
+    projected = projection.PROJECTIONS["fast_scrape_and_cache"](data)
+    assert projected["complete"] is False
+    assert projected["market"] == {"provider": "coingecko", "as_of": "now", "summary": "$SOL +2%"}
+    assert projected["data"][0]["url"] == "https://a"
+    assert len(projected["data"][0]["snippet"]) == config.PROJECTION_TEXT_CHARS + 3
+    assert projected["data"][1] == {"url": "https://b", "error": "timeout"}
+
+    cached = projection.PROJECTIONS["get_cached_research"]({"status": "success", "data": data})
+    assert cached["status"] == "success" and cached["data"] == projected
+
+
+def test_search_projection_flattens_result_lists():
+    result = {"status": "success", "query": "defi", "results": {
+        "web": [{"title": "T", "url": "https://w", "description": "d", "markdown": BIG}],
+        "news": [{"title": "N", "url": "https://n", "snippet": "s"}]}}
+    projected = projection.PROJECTIONS["search_defi_news"](result)
+    assert projected["query"] == "defi"
+    assert projected["results"] == [{"title": "T", "url": "https://w", "description": "d"},
+                                    {"title": "N", "url": "https://n", "description": "s"}]
+
+
+def test_large_drops_get_a_debug_ref_that_resolves(store):
+    raw = {"successful": True, "data": {"id": "1", "text": BIG}}
+    tool = projection.project_output("twitter_create_post", lambda: raw)
+    projected = tool()
+    assert projected["data"] == {"id": "1"}
+    assert json.loads(store.get(projected["debug_ref"])) == raw
+
+
+def test_small_drops_store_nothing(store):
+    tool = projection.project_output("twitter_create_post", lambda: {"successful": True, "data": {"id": "1"}})
+    assert "debug_ref" not in tool()
+    assert os.listdir(store.root) == []
+
+
+def test_skipped_unknown_and_disabled_pass_through(monkeypatch):
+    skipped = {"status": "skipped", "reason": "dry run", "data": {"text": BIG}}
+    assert projection.project_output("twitter_create_post", lambda: skipped)() is skipped
+
+    def func():
+        return {"anything": BIG}
+    assert projection.project_output("get_current_time", func) is func
+
+    monkeypatch.setattr(config, "TOOL_PROJECTION", False)
+    raw = {"successful": True, "data": {"id": "1", "text": BIG}}
+    assert projection.project_output("twitter_create_post", lambda: raw)() is raw
@@ -0,0 +1,99 @@
+"""Tests for circuit breakers and the cycle deadline in src/resilience.py (no network needed)."""
+
+import time
+
+import pytest
+
+from src import resilience
+from src.resilience import CircuitBreaker, CircuitOpenError, DeadlineExceeded
+
+
+def failing():
+    raise ConnectionError("service down")
+
+
+def test_breaker_opens_after_consecutive_failures():
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_seconds=60)
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            breaker.call(failing)
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.call(lambda: "not called")
+
+
+def test_success_resets_the_failure_count():
+    breaker = CircuitBreaker("test", failure_threshold=2, reset_seconds=60)
+    with pytest.raises(ConnectionError):
+        breaker.call(failing)
+    assert breaker.call(lambda: "ok") == "ok"
+    with pytest.raises(ConnectionError):
+        breaker.call(failing)
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_half_open_allows_one_trial_then_closes_on_success():
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_seconds=0.05)
+    with pytest.raises(ConnectionError):
+        breaker.call(failing)
+    time.sleep(0.1)
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+
+    breaker.before_call()  # the trial call
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()  # no second call while the trial runs
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED and breaker.failures == 0
+
+
+def test_failed_trial_reopens_the_breaker():
+    breaker = CircuitBreaker("test", failure_threshold=1, reset_seconds=0.05)
+    with pytest.raises(ConnectionError):
+        breaker.call(failing)
+    time.sleep(0.1)
+    with pytest.raises(ConnectionError):
+        breaker.call(failing)
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_budget_timeout_without_a_deadline_uses_the_timeout():
+    assert resilience.remaining() is None
+    assert resilience.budget_timeout(7) == 7
+
+
+def test_budget_timeout_is_capped_by_the_cycle_deadline():
+    with resilience.cycle_deadline(1):
+        assert 0 < resilience.budget_timeout(30) <= 1
+        assert resilience.budget_timeout(0.5) == 0.5
+    assert resilience.remaining() is None
+
+
+def test_budget_timeout_raises_once_the_deadline_passed():
+    with resilience.cycle_deadline(0.01):
+        time.sleep(0.02)
+        assert resilience.expired()
+        with pytest.raises(DeadlineExceeded):
+            resilience.budget_timeout(5)
+
+
+def test_nested_deadline_keeps_the_earlier_one():
+    with resilience.cycle_deadline(1) as outer:
+        with resilience.cycle_deadline(60) as inner:
+            assert inner == outer
+        with resilience.cycle_deadline(0.5) as inner:
+            assert inner < outer
+
+
+def test_sleep_refuses_to_run_past_the_deadline():
+    with resilience.cycle_deadline(0.1):
+        with pytest.raises(DeadlineExceeded):
+            resilience.sleep(1)
+
+
+def test_budget_guard_skips_calls_past_the_deadline():
+    guarded = resilience.budget_guard("scrape_page", lambda: "called")
+    assert guarded() == "called"
+    with resilience.cycle_deadline(0.01):
+        time.sleep(0.02)
+        result = guarded()
+    assert result["status"] == "skipped" and "deadline" in result["reason"]
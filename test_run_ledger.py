@@ -0,0 +1,78 @@
+"""Tests for publish outcome mapping and percentiles in src/run_ledger.py (no network needed)."""
+
+import json
+
+import pytest
+from langchain_core.messages import AIMessage, ToolMessage
+
+from src.run_ledger import RunRecorder, outcome_from_result, outcomes_from_messages, percentile
+
+
+def test_composio_success_with_post_id():
+    result = {"successful": True, "data": {"data": {"id": "1790"}}}
+    assert outcome_from_result("twitter", result) == {"platform": "twitter", "outcome": "ok", "post_id": "1790"}
+
+
+def test_linkedin_post_id_from_response_headers():
+    result = {"successful": True, "data": {"response_headers": {"x-restli-id": "urn:li:share:1"}}}
+    assert outcome_from_result("linkedin", result)["post_id"] == "urn:li:share:1"
+
+
+def test_telegram_message_id():
+    outcome = outcome_from_result("telegram", {"status": "success", "message_id": 42})
+    assert outcome == {"platform": "telegram", "outcome": "ok", "post_id": "42"}
+
+
+def test_post_and_reply_reads_the_create_result():
+    result = {"create": {"successful": True, "data": {"id": "7"}}, "reply": {"successful": False}}
+    assert outcome_from_result("twitter", result)["post_id"] == "7"
+
+
+def test_errors_and_skips():
+    assert outcome_from_result("twitter", {"successful": False, "error": "duplicate content"}) == \
+        {"platform": "twitter", "outcome": "error", "error": "duplicate content"}
+    assert outcome_from_result("telegram", {"description": "chat not found"})["error"] == "chat not found"
+    assert outcome_from_result("linkedin", {"status": "skipped", "reason": "budget"}) == \
+        {"platform": "linkedin", "outcome": "skipped", "error": "budget"}
+
+
+def test_json_string_and_unparseable_results():
+    assert outcome_from_result("twitter", json.dumps({"successful": True, "data": {"id": "1"}}))["outcome"] == "ok"
+    outcome = outcome_from_result("twitter", "Error: boom")
+    assert outcome["outcome"] == "error" and outcome["error"] == "Error: boom"
+
+
+def test_outcomes_from_messages_maps_publish_tools_and_fanout():
+    fanout = {"status": "success", "outcomes": [{"platform": "twitter", "outcome": "ok", "post_id": "1"},
+                                                {"platform": "telegram", "outcome": "error", "error": "down"}]}
+    messages = [
+        AIMessage(content="", tool_calls=[{"name": "scrape_page", "args": {}, "id": "a"}]),
+        ToolMessage(content="{}", name="scrape_page", tool_call_id="a"),
+        ToolMessage(content=json.dumps({"successful": True, "data": {"id": "9"}}),
+                    name="linkedin_create_post", tool_call_id="b"),
+        ToolMessage(content=json.dumps(fanout), name="publish_content", tool_call_id="c"),
+    ]
+    outcomes = outcomes_from_messages(messages)
+    assert [(o["platform"], o["outcome"]) for o in outcomes] == \
+        [("linkedin", "ok"), ("twitter", "ok"), ("telegram", "error")]
+
+
+def test_recorder_keeps_a_success_over_a_later_failure():
+    recorder = RunRecorder(path=":memory:")
+    recorder.record_publish("twitter", "ok", "1")
+    recorder.record_publish("twitter", "error", error="duplicate")
+    assert recorder.publishes["twitter"]["outcome"] == "ok"
+
+
+@pytest.mark.parametrize("values, pct, expected", [
+    ([], 50, None),
+    ([5.0], 95, 5.0),
+    ([1, 2, 3, 4], 50, 2),
+    ([1, 2, 3, 4], 75, 3),
+    ([1, 2, 3, 4], 100, 4),
+    ([10, 1, 7, 3, 5], 50, 5),
+    (list(range(1, 101)), 95, 95),
+    ([3, 1, 2], 0, 1),
+])
+def test_percentile_is_nearest_rank(values, pct, expected):
+    assert percentile(values, pct) == expected
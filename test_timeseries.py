@@ -0,0 +1,107 @@
+"""Tests for the memory-mapped price history in src/timeseries.py (no network needed)."""
+
+import numpy as np
+import pytest
+
+from src import timeseries
+from src.timeseries import PRICE, TS, TimeSeriesStore
+
+
+def fill(store, symbol, prices, source="market", start=1000.0):
+    for i, price in enumerate(prices):
+        store.append(symbol, price, ts=start + i * 600, source=source, min_interval=0)
+
+
+def test_ring_buffer_keeps_the_last_window_oldest_first(tmp_path):
+    store = TimeSeriesStore(str(tmp_path), window=4)
+    fill(store, "ETH", [1, 2, 3, 4, 5, 6])
+    window = store.window_for("ETH")
+    assert list(window[:, PRICE]) == [3, 4, 5, 6]
+    assert list(store.window_for("ETH", n=2)[:, PRICE]) == [5, 6]
+    assert np.all(np.diff(window[:, TS]) > 0)
+    assert store.stats() == {"series": 1, "slots": 64, "window": 4, "samples": 4}
+    assert store.window_for("BTC").shape == (0, 4)
+
+
+def test_samples_closer_than_min_interval_are_skipped(tmp_path):
+    store = TimeSeriesStore(str(tmp_path), window=8)
+    assert store.append("SOL", 200, ts=1000, min_interval=300)
+    assert not store.append("SOL", 201, ts=1100, min_interval=300)
+    assert store.append("SOL", 202, ts=1300, min_interval=300)
+    assert store.append("SOL", 199, ts=1100, source="scrape", min_interval=300)  # other series
+    assert list(store.window_for("SOL")[:, PRICE]) == [200, 202]
+
+
+def test_matrix_is_right_aligned_and_nan_padded(tmp_path):
+    store = TimeSeriesStore(str(tmp_path), window=4)
+    fill(store, "ETH", [1, 2, 3, 4, 5])
+    fill(store, "SOL", [10])
+    fill(store, "SOL", [20], source="scrape")
+
+    keys, values = store.matrix("price", 3)
+    assert keys == ["ETH|market", "SOL|market", "SOL|scrape"]
+    np.testing.assert_array_equal(values, [[3, 4, 5], [np.nan, np.nan, 10], [np.nan, np.nan, 20]])
+
+    # Asking for more than the window pads on the left as well
+    _, wide = store.matrix("price", 6)
+    np.testing.assert_array_equal(wide[0], [np.nan, np.nan, 2, 3, 4, 5])
+
+    keys, values = store.matrix("price", 2, source="scrape")
+    assert keys == ["SOL|scrape"] and values.shape == (1, 2)
+    assert store.matrix("price", 2, source="none")[0] == []
+
+
+def test_reopen_keeps_history_and_stored_window(tmp_path):
+    store = TimeSeriesStore(str(tmp_path), window=4)
+    fill(store, "ETH", [1, 2, 3, 4, 5])
+    del store
+
+    reopened = TimeSeriesStore(str(tmp_path), window=16)
+    assert reopened.window == 4
+    assert list(reopened.window_for("ETH")[:, PRICE]) == [2, 3, 4, 5]
+    fill(reopened, "ETH", [6], start=10_000)
+    assert list(reopened.window_for("ETH")[:, PRICE]) == [3, 4, 5, 6]
+
+
+def test_grow_doubles_slots_and_keeps_existing_series(tmp_path):
+    store = TimeSeriesStore(str(tmp_path), window=4, capacity=2)
+    for i, symbol in enumerate(["AAA", "BBB", "CCC"]):
+        fill(store, symbol, [i + 1, i + 2])
+    assert store.stats()["slots"] == 4
+    assert list(store.window_for("AAA")[:, PRICE]) == [1, 2]
+    assert list(store.window_for("CCC")[:, PRICE]) == [3, 4]
+
+    reopened = TimeSeriesStore(str(tmp_path), window=4)
+    assert reopened.keys == ["AAA|market", "BBB|market", "CCC|market"]
+    assert list(reopened.window_for("BBB")[:, PRICE]) == [2, 3]
+
+
+def test_unreadable_store_starts_over(tmp_path):
+    store = TimeSeriesStore(str(tmp_path), window=4)
+    fill(store, "ETH", [1])
+    (tmp_path / "series.npy").write_bytes(b"garbage")
+    fresh = TimeSeriesStore(str(tmp_path), window=4)
+    assert fresh.keys == [] and fresh.window_for("ETH").shape == (0, 4)
+
+
+@pytest.mark.parametrize("text, quotes", [
+    ("$SOL | $221.10 | -1.3%", {"SOL": (221.10, -1.3)}),
+    ("$ETH $3,120.50 +2.5% and $SOL 4%", {"ETH": (3120.5, 2.5), "SOL": (None, 4.0)}),
+    ("$BTC up 3% today, later $BTC 5%", {"BTC": (None, 3.0)}),
+    ("no tickers here, 5% APY", {}),
+    ("", {}),
+])
+def test_extract_quotes(text, quotes):
+    assert timeseries.extract_quotes(text) == quotes
+
+
+def test_record_snapshot_and_text_use_the_shared_store(tmp_path, monkeypatch):
+    store = TimeSeriesStore(str(tmp_path), window=4)
+    monkeypatch.setattr(timeseries, "_store", store)
+    snapshot = {"provider": "coingecko",
+                "quotes": {"ETH": {"symbol": "ETH", "price_usd": 3000, "change_24h_pct": 1.5}},
+                "trending": [{"symbol": "PEPE", "price_usd": 0.00001}]}
+    assert timeseries.record_snapshot(snapshot, ts=1000) == 2
+    assert timeseries.record_snapshot({"error": "down"}) == 0
+    assert timeseries.record_text("$SOL $200 +4%", ts=1000) == 1
+    assert sorted(store.keys) == ["ETH|coingecko", "PEPE|coingecko", "SOL|scrape"]
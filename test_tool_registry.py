@@ -0,0 +1,91 @@
+"""Tests for per-phase tool exposure in src/tool_registry.py (no network needed)."""
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from src import tool_registry
+from src.agent import AUTONOMOUS_COMMAND
+from src.config import config
+from src.tools import get_all_tools
+
+RESEARCH = {"monitor_telegram_group", "fast_scrape_and_cache", "scrape_yieldbot_website",
+            "search_defi_news", "scrape_page", "get_market_data", "get_top_movers"}
+
+
+@pytest.fixture(autouse=True)
+def phase_exposure(monkeypatch):
+    monkeypatch.setattr(config, "TOOL_EXPOSURE", "phase")
+
+
+@pytest.fixture(scope="module")
+def tools():
+    return get_all_tools()
+
+
+def step(*names: str) -> list:
+    return [AIMessage(content="", tool_calls=[{"name": n, "args": {}, "id": n} for n in names])] + \
+        [ToolMessage(content="{}", name=n, tool_call_id=n) for n in names]
+
+
+def exposed(messages, tools) -> set:
+    return {t.name for t in tool_registry.select_tools(messages, tools)}
+
+
+def test_autonomous_cycle_keeps_research_tools_until_publishing(tools):
+    turn = [HumanMessage(content=AUTONOMOUS_COMMAND)]
+    assert tool_registry.current_phase(turn) == "research"
+    assert RESEARCH | {"publish_content"} <= exposed(turn, tools)
+
+    # Step 1: the Telegram result must not hide the remaining research steps
+    turn += step("monitor_telegram_group")
+    assert tool_registry.current_phase(turn) == "write"
+    assert RESEARCH | {"publish_content"} <= exposed(turn, tools)
+
+    # Step 2
+    turn += step("fast_scrape_and_cache", "scrape_yieldbot_website")
+    assert RESEARCH | {"publish_content"} <= exposed(turn, tools)
+
+    # Step 3
+    turn += step("get_top_movers")
+    assert tool_registry.current_phase(turn) == "write"
+    assert {"get_top_movers", "publish_content"} <= exposed(turn, tools)
+
+    # Step 4: after publishing only publish tools (and those already used) remain
+    turn += step("publish_content")
+    assert tool_registry.current_phase(turn) == "publish"
+    after = exposed(turn, tools)
+    assert {"publish_content", "get_top_movers"} <= after
+    assert {"search_defi_news", "scrape_page", "get_market_data"}.isdisjoint(after)
+
+
+def test_analysis_requests_keep_top_movers_for_the_whole_turn(tools):
+    assert "analytics" in tool_registry.intent_tags(AUTONOMOUS_COMMAND)
+    turn = [HumanMessage(content="Analyze the top movers")] + step("get_market_data") + step("publish_content")
+    assert "get_top_movers" in exposed(turn, tools)
+
+
+def test_research_request_does_not_bind_publish_tools_up_front(tools):
+    turn = [HumanMessage(content="Search the news for SOL")]
+    names = exposed(turn, tools)
+    assert "search_defi_news" in names
+    assert "publish_content" not in names and "write_file" not in names
+
+
+def test_media_upload_does_not_end_research():
+    turn = [HumanMessage(content="Post a tweet with an image")] + step("twitter_upload_media")
+    assert tool_registry.current_phase(turn) == "research"
+
+
+def test_phase_restarts_with_each_user_message():
+    history = [HumanMessage(content="first")] + step("search_defi_news") + step("publish_content")
+    assert tool_registry.current_phase(history) == "publish"
+    assert tool_registry.current_phase(history + [HumanMessage(content="next")]) == "research"
+
+
+def test_unknown_tools_and_exposure_all_keep_everything(tools, monkeypatch):
+    extra = {"type": "function", "function": {"name": "custom_tool", "parameters": {}}}
+    selected = tool_registry.select_tools([HumanMessage(content="hi")], tools + [extra])
+    assert extra in selected
+
+    monkeypatch.setattr(config, "TOOL_EXPOSURE", "all")
+    assert tool_registry.select_tools([HumanMessage(content="hi")], tools) == tools